@@ -1,9 +1,15 @@
+from app.core.startup import tiempos_arranque
 import os
+import time
 from datetime import datetime
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config.config import config
 from app.core.extensions import init_extensions
+from app.core.lifespan import lifespan
+from app.core.middleware import AdmissionMiddleware, CompressionMiddleware, ProfilingMiddleware
+from app.core.routers import CargadorRouters
+from app.shared.services.request_profiler import instrumentar_endpoints
 
 def create_app(config_name=None):
     """
@@ -14,7 +20,14 @@ def create_app(config_name=None):
     
     Returns:
         FastAPI: Instancia de la aplicación configurada
+    
+    No conecta a la base de datos ni importa los controladores: el engine se
+    crea en el lifespan y los routers se cargan en segundo plano o con la
+    primera petición a su prefijo (ver app/core/routers.py).
     """
+    tiempos_arranque.registrar("importacion")
+    inicio = time.perf_counter()
+    
     # Obtener configuración del entorno
     if config_name is None:
         config_name = os.environ.get('ENV', 'development')
@@ -26,11 +39,21 @@ def create_app(config_name=None):
         version="1.0.0",
         docs_url="/docs",
         redoc_url="/redoc",
-        openapi_url="/openapi.json"
+        openapi_url="/openapi.json",
+        lifespan=lifespan
     )
     
-    # Obtener config
+    # Obtener config (el lifespan la usa para crear el engine)
     app_config = config[config_name]
+    app_config.validar()
+    app.state.config = app_config
+    
+    # Limitación de tasa y control de admisión (dentro de CORS para que los
+    # 429/503 lleguen al navegador con sus headers)
+    app.add_middleware(AdmissionMiddleware)
+    
+    # Compresión gzip/brotli y ETag para catálogos
+    app.add_middleware(CompressionMiddleware)
     
     # Configurar CORS
     app.add_middleware(
@@ -39,14 +62,19 @@ def create_app(config_name=None):
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Retry-After", "ETag"],
     )
     
+    # Perfilado por petición (se activa en caliente desde /api/admin/perfilado)
+    app.add_middleware(ProfilingMiddleware)
+    
     # Inicializar extensiones (base de datos, etc)
     init_extensions(app)
     
     # Registrar rutas
     register_routes(app)
     
+    tiempos_arranque.registrar("app", inicio)
     return app
 
 def register_routes(app):
@@ -55,20 +83,11 @@ def register_routes(app):
     # Health check
     from app.modules.health.routes import health_router
     app.include_router(health_router, prefix="/api", tags=["Health"])
+    instrumentar_endpoints(app.router.routes)
     
-    # Módulo Profesores
-    try:
-        from app.modules.profesores.controllers.profesor_controller import router as profesores_router
-        app.include_router(profesores_router)
-    except ModuleNotFoundError:
-        print("⚠️  Módulo 'profesores' no encontrado, omitiendo rutas de profesores")
-    
-    # Módulo Usuarios (ejemplo)
-    # try:
-    #     from app.modules.usuarios.controllers.usuario_controller import usuarios_router
-    #     app.include_router(usuarios_router, prefix="/api", tags=["Usuarios"])
-    # except ModuleNotFoundError:
-    #     print("⚠️  Módulo 'usuarios' no encontrado, omitiendo rutas de usuarios")
+    # Módulos: se importan con la primera petición o en segundo plano al arrancar
+    app.state.routers = CargadorRouters(app)
+    app.state.routers.registrar()
 
 # Import de modelos para SQLAlchemy
 # Los equipos agregarán sus imports aquí cuando implementen sus módulos
@@ -1,5 +1,5 @@
 # Inicialización del paquete config
 from .config import *
-from .database import *
 
-# Esto permite importar config y database desde app.config
+# La base de datos se importa explícitamente desde app.config.database: así
+# importar la configuración no carga SQLAlchemy ni crea el engine
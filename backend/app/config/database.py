@@ -1,32 +1,231 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from fastapi import Request
+from collections import OrderedDict
 from dotenv import load_dotenv
+from typing import Optional
+import itertools
 import os
+import threading
+import time
 
 # Cargar variables del .env
 load_dotenv()
 
+# El engine no se crea al importar este módulo: lo crea inicializar() desde el
+# lifespan con la configuración de la app, o el primer acceso a `engine`.
+
 # URL de la base de datos
 DATABASE_URL = os.getenv("DATABASE_URL") or "mysql+pymysql://root:@localhost:3306/bienestar_estudiantil"
 
-# Motor de conexión
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    echo=True  # Mostrar queries en consola (solo desarrollo)
-)
+# Réplicas de solo lectura separadas por coma (vacío = todo va a la primaria)
+DATABASE_REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+# Segundos que las lecturas de un cliente van a la primaria después de que escribió
+DB_STICKY_SEGUNDOS = float(os.getenv("DB_STICKY_SEGUNDOS", 5))
+# Segundos que una réplica caída queda fuera de la rotación antes de reintentarla
+DB_REPLICA_REINTENTO = float(os.getenv("DB_REPLICA_REINTENTO", 30))
+DB_STICKY_MAX_CLIENTES = 10000
+# Mostrar queries en consola (solo desarrollo)
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() == "true"
+
+_lock_inicio = threading.Lock()
+
+
+def _crear_engine(url: str, echo: bool):
+    return create_engine(
+        url,
+        pool_pre_ping=True,
+        echo=echo
+    )
+
+
+class EnrutadorReplicas:
+    """
+    Estado compartido del enrutamiento lectura/escritura (por proceso)
+
+    - Réplicas en rotación round-robin; una réplica que falla al conectar queda
+      fuera DB_REPLICA_REINTENTO segundos y sus lecturas van a la primaria.
+    - Lectura de lo propio: después de confirmar una escritura, las lecturas
+      del mismo cliente van a la primaria durante DB_STICKY_SEGUNDOS para no
+      ver datos anteriores por el retraso de replicación.
+    """
+
+    def __init__(self, primaria, replicas, sticky_segundos: float = DB_STICKY_SEGUNDOS,
+                 reintento_segundos: float = DB_REPLICA_REINTENTO):
+        self.sticky_segundos = sticky_segundos
+        self.reintento_segundos = reintento_segundos
+        self.configurar(primaria, replicas)
+        self._caidas = {}
+        self._escrituras = OrderedDict()
+        self._lock = threading.Lock()
+        self._contadores = {"primaria": 0, "replica": 0, "fallos_replica": 0, "sticky": 0}
+
+    def configurar(self, primaria, replicas) -> None:
+        self.primaria = primaria
+        self.replicas = list(replicas)
+        self._rotacion = itertools.cycle(range(len(self.replicas))) if self.replicas else None
+
+    def elegir_replica(self, excluir=()):
+        """Siguiente réplica disponible o None si no hay ninguna"""
+        ahora = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                replica = self.replicas[next(self._rotacion)]
+                if replica not in excluir and self._caidas.get(id(replica), 0) <= ahora:
+                    return replica
+        return None
+
+    def marcar_caida(self, replica, error) -> None:
+        with self._lock:
+            self._caidas[id(replica)] = time.monotonic() + self.reintento_segundos
+            self._contadores["fallos_replica"] += 1
+        print(f"[ERROR] Réplica {replica.url.render_as_string(hide_password=True)} no disponible, "
+              f"se usa la primaria por {self.reintento_segundos:.0f}s: {error}")
+
+    def registrar_escritura(self, cliente) -> None:
+        if cliente is None or not self.sticky_segundos:
+            return
+        with self._lock:
+            self._escrituras[cliente] = time.monotonic() + self.sticky_segundos
+            self._escrituras.move_to_end(cliente)
+            while len(self._escrituras) > DB_STICKY_MAX_CLIENTES:
+                self._escrituras.popitem(last=False)
+
+    def escribio_hace_poco(self, cliente) -> bool:
+        with self._lock:
+            hasta = self._escrituras.get(cliente)
+            if hasta is None:
+                return False
+            if hasta <= time.monotonic():
+                del self._escrituras[cliente]
+                return False
+            self._contadores["sticky"] += 1
+            return True
+
+    def contar(self, destino: str) -> None:
+        with self._lock:
+            self._contadores[destino] += 1
+
+    def estadisticas(self) -> dict:
+        ahora = time.monotonic()
+        with self._lock:
+            return {
+                "replicas": len(self.replicas),
+                "replicas_caidas": sum(1 for hasta in self._caidas.values() if hasta > ahora),
+                "clientes_sticky": len(self._escrituras),
+                **self._contadores
+            }
+
+
+# Instancia compartida por proceso (sin engines hasta inicializar())
+enrutador = EnrutadorReplicas(None, [])
 
-# Sesión
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+class RoutingSession(Session):
+    """
+    Sesión que envía las lecturas de peticiones de solo lectura a una réplica
+
+    Solo las sesiones con info["lectura"] (ver get_db) usan réplicas; el resto
+    (tareas, escrituras) trabaja siempre contra la primaria. En cuanto una
+    sesión escribe (flush o UPDATE/INSERT/DELETE construido con SQLAlchemy),
+    ella y todo lo que siga en la misma sesión pasan a la primaria, y al
+    confirmar se registra la escritura del cliente para las peticiones siguientes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.bind is None:
+            # Sesión creada antes de inicializar() (scripts, tests)
+            self.bind = inicializar()
+        if not enrutador.replicas:
+            return super().get_bind(mapper, clause=clause, **kw)
+        if self._flushing or (clause is not None and getattr(clause, "is_dml", False)):
+            self.info["escribio"] = True
+        if not self.info.get("lectura") or self.info.get("escribio"):
+            return enrutador.primaria
+        replica = self.info.get("replica")
+        if replica is None:
+            replica = self._conectar_replica()
+            self.info["replica"] = replica
+        return replica
+
+    def _conectar_replica(self):
+        """Toma la conexión de la réplica por adelantado para poder caer a la primaria si falla"""
+        intentadas = []
+        while True:
+            replica = enrutador.elegir_replica(excluir=intentadas)
+            if replica is None:
+                enrutador.contar("primaria")
+                return enrutador.primaria
+            try:
+                self.connection(bind_arguments={"bind": replica})
+                enrutador.contar("replica")
+                return replica
+            except DBAPIError as e:
+                enrutador.marcar_caida(replica, e.orig)
+                intentadas.append(replica)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _registrar_escritura(sesion):
+    if sesion.info.get("escribio"):
+        enrutador.registrar_escritura(sesion.info.get("cliente"))
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _liberar_replica(sesion, transaccion):
+    # La conexión vuelve al pool con la transacción; la siguiente se elige de nuevo
+    if transaccion.parent is None:
+        sesion.info.pop("replica", None)
+
+
+# Sesión (se enlaza al engine en inicializar())
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+
+
+def inicializar(url: Optional[str] = None, echo: Optional[bool] = None):
+    """
+    Crea el engine de la primaria y los de las réplicas (una sola vez por proceso)
+
+    Sin argumentos usa DATABASE_URL y SQL_ECHO del entorno. Retorna el engine
+    de la primaria; las llamadas siguientes lo retornan sin crear nada.
+    """
+    global engine, replica_engines
+    with _lock_inicio:
+        if "engine" not in globals():
+            eco = SQL_ECHO if echo is None else echo
+            engine = _crear_engine(url or DATABASE_URL, eco)
+            replica_engines = [_crear_engine(u, eco) for u in DATABASE_REPLICA_URLS]
+            SessionLocal.configure(bind=engine)
+            enrutador.configurar(engine, replica_engines)
+    return engine
+
+
+def __getattr__(nombre):
+    # `from app.config.database import engine` crea el engine al primer uso
+    if nombre in ("engine", "replica_engines"):
+        inicializar()
+        return globals()[nombre]
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
 
 # Base para los modelos
 Base = declarative_base()
 
 # Dependencia para endpoints FastAPI
-def get_db():
+def get_db(request: Request):
     db = SessionLocal()
+    if enrutador.replicas:
+        cliente = _identificar_cliente(request)
+        db.info["cliente"] = cliente
+        # GET/HEAD van a una réplica salvo que el cliente haya escrito hace poco
+        db.info["lectura"] = request.method in ("GET", "HEAD") and not enrutador.escribio_hace_poco(cliente)
     try:
         yield db
     finally:
         db.close()
+
+
+def _identificar_cliente(request: Request):
+    from app.shared.services.admission_control import identificar_cliente
+    return identificar_cliente(request.scope)
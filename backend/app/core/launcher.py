@@ -0,0 +1,326 @@
+"""
+Lanzador de producción: varios procesos uvicorn sobre un mismo socket
+
+- El proceso maestro abre el socket y arranca WEB_WORKERS procesos (por
+  defecto uno por CPU); el kernel reparte las conexiones entre ellos.
+- WEB_PRELOAD=true arma la app e importa todos los módulos en el maestro y
+  crea los workers con fork: comparten esa memoria y arrancan más rápido.
+  El engine no se crea en el maestro (lo crea el lifespan de cada worker),
+  así que ninguna conexión a la BD se hereda entre procesos.
+- Reciclado: un worker sale solo, drenando sus conexiones, después de
+  WEB_MAX_REQUESTS peticiones (+ un azar de hasta WEB_MAX_REQUESTS_JITTER
+  para que no se reinicien todos juntos) o si su memoria residente supera
+  WEB_MAX_MEMORIA_MB. El maestro lo reemplaza.
+- Chequeo de arranque: cada worker, con el lifespan ya ejecutado, verifica la
+  BD y avisa al maestro. Si no avisa en WEB_TIMEOUT_ARRANQUE segundos se
+  mata y se reintenta con espera creciente; tras WEB_MAX_FALLOS_ARRANQUE
+  fallos seguidos el lanzador se detiene (la configuración está mal, no
+  tiene sentido reintentar para siempre).
+- SIGTERM/SIGINT: cada worker deja de aceptar conexiones, termina las que
+  tiene (hasta WEB_GRACEFUL_TIMEOUT segundos) y ejecuta el apagado del
+  lifespan; a los que no terminan a tiempo se los mata.
+
+Estado por worker: cada proceso tiene su propia memoria, así que con más de
+un worker
+- el feed de cambios tiene que repartirse por la BD: CHANGE_FEED_FANOUT=local
+  entregaría cada evento solo a los clientes SSE del worker que lo publicó, y
+  el lanzador lo cambia a "bd" antes de crear los workers;
+- el índice de búsqueda de personas, el snapshot de catálogos y el índice de
+  retiros son copias por worker que se invalidan con las versiones de datos
+  de la BD (o se refrescan periódicamente), no con avisos entre procesos;
+- los buckets de RATE_LIMIT_* y el límite de concurrencia se cuentan por
+  worker (el límite efectivo por IP es WEB_WORKERS veces el configurado);
+- los cambios del panel /api/admin (cachés, perfilado, admisión, consultas
+  lentas) se aplican en el worker que atiende la petición; la respuesta
+  indica el pid.
+"""
+import asyncio
+import multiprocessing
+import os
+import random
+import signal
+import sys
+import time
+from dataclasses import dataclass
+from multiprocessing.connection import wait
+from typing import Dict, Optional
+
+import uvicorn
+
+# El apagado del lifespan (cola de trabajos, escritores) puede tardar hasta 30 s
+# después de drenar las conexiones
+_MARGEN_APAGADO = 35
+_ESPERA_MAXIMA_REINTENTO = 30
+_CHEQUEO_MEMORIA_TICKS = 50  # on_tick corre cada 0.1 s: cada 5 s
+
+multiprocessing.allow_connection_pickling()
+
+# App armada en el maestro con WEB_PRELOAD (los workers la heredan con fork)
+_app_precargada = None
+
+
+@dataclass
+class AjustesLanzador:
+    app: str
+    host: str
+    port: int
+    workers: int
+    preload: bool = False
+    max_requests: int = 0
+    max_requests_jitter: int = 0
+    max_memoria_mb: int = 0
+    graceful_timeout: int = 30
+    timeout_arranque: int = 30
+    max_fallos_arranque: int = 5
+    log_level: str = "info"
+
+    @classmethod
+    def desde_entorno(cls, app: str, host: str, port: int) -> "AjustesLanzador":
+        return cls(
+            app=app,
+            host=host,
+            port=port,
+            workers=int(os.getenv("WEB_WORKERS", 0)) or os.cpu_count() or 1,
+            preload=os.getenv("WEB_PRELOAD", "false").lower() == "true",
+            max_requests=int(os.getenv("WEB_MAX_REQUESTS", 0)),
+            max_requests_jitter=int(os.getenv("WEB_MAX_REQUESTS_JITTER", 0)),
+            max_memoria_mb=int(os.getenv("WEB_MAX_MEMORIA_MB", 0)),
+            graceful_timeout=int(os.getenv("WEB_GRACEFUL_TIMEOUT", 30)),
+            timeout_arranque=int(os.getenv("WEB_TIMEOUT_ARRANQUE", 30)),
+            max_fallos_arranque=int(os.getenv("WEB_MAX_FALLOS_ARRANQUE", 5)),
+            log_level=os.getenv("WEB_LOG_LEVEL", "info")
+        )
+
+
+def preparar_entorno_multiproceso(workers: int) -> None:
+    """
+    Ajusta la configuración que no funciona repartida entre varios procesos.
+    Se llama en el maestro antes de importar la app: los workers heredan el
+    entorno (spawn) o la app ya armada (fork con WEB_PRELOAD).
+    """
+    # Cantidad real de workers (WEB_WORKERS=0 es uno por CPU): los pools por
+    # proceso, como el de esquelas, reparten las CPUs según este valor
+    os.environ["WEB_WORKERS"] = str(workers)
+    if workers <= 1 or os.getenv("CHANGE_FEED_FANOUT", "local") != "local":
+        return
+    os.environ["CHANGE_FEED_FANOUT"] = "bd"
+    print(f"[INFO] CHANGE_FEED_FANOUT=local no reparte eventos entre {workers} workers; se usa 'bd'")
+    modulo = sys.modules.get("app.shared.services.change_feed")
+    if modulo is not None:
+        # El feed ya se creó en este proceso con el reparto local
+        modulo.change_feed.configurar_fanout(modulo.crear_fanout("bd"))
+
+
+def memoria_residente_mb() -> float:
+    """RSS actual del proceso (Linux); en otros sistemas, el pico"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def verificar_bd() -> Optional[str]:
+    """None si la BD responde; si no, el error"""
+    from sqlalchemy import text
+    from app.config.database import engine
+    try:
+        with engine.connect() as conexion:
+            conexion.execute(text("SELECT 1"))
+        return None
+    except Exception as e:
+        return str(e)
+
+
+# ============ WORKER ============
+class ServidorWorker(uvicorn.Server):
+    """uvicorn.Server con chequeo de arranque y reciclado por memoria"""
+
+    def __init__(self, config: uvicorn.Config, canal, max_memoria_mb: int = 0):
+        super().__init__(config)
+        self.canal = canal
+        self.max_memoria_mb = max_memoria_mb
+        self.motivo_salida = None
+
+    async def startup(self, sockets=None) -> None:
+        inicio = time.perf_counter()
+        await super().startup(sockets=sockets)
+        if self.should_exit:
+            self._avisar("fallo", "el lifespan no pudo arrancar")
+            return
+        error = await asyncio.to_thread(verificar_bd)
+        if error:
+            # Se sale por main_loop para que el lifespan se apague normalmente
+            self.motivo_salida = f"BD no disponible: {error}"
+            self._avisar("fallo", self.motivo_salida)
+            return
+        self._avisar("listo", round((time.perf_counter() - inicio) * 1000))
+
+    async def on_tick(self, counter: int) -> bool:
+        if self.motivo_salida:
+            return True
+        if self.max_memoria_mb and counter % _CHEQUEO_MEMORIA_TICKS == 0:
+            memoria = memoria_residente_mb()
+            if memoria > self.max_memoria_mb:
+                self.motivo_salida = f"memoria {memoria:.0f} MB > {self.max_memoria_mb} MB"
+                print(f"[INFO] Worker {os.getpid()} se recicla: {self.motivo_salida}")
+                return True
+        return await super().on_tick(counter)
+
+    def _avisar(self, estado: str, detalle) -> None:
+        try:
+            self.canal.send((estado, detalle))
+        except OSError:
+            pass
+
+
+def _ejecutar_worker(ajustes: AjustesLanzador, sockets, canal, limite_peticiones: int) -> None:
+    config = uvicorn.Config(
+        _app_precargada if _app_precargada is not None else ajustes.app,
+        log_level=ajustes.log_level,
+        limit_max_requests=limite_peticiones or None,
+        timeout_graceful_shutdown=ajustes.graceful_timeout
+    )
+    ServidorWorker(config, canal, ajustes.max_memoria_mb).run(sockets=sockets)
+
+
+# ============ MAESTRO ============
+class _Worker:
+    __slots__ = ("proceso", "canal", "inicio", "listo")
+
+    def __init__(self, proceso, canal):
+        self.proceso = proceso
+        self.canal = canal
+        self.inicio = time.monotonic()
+        self.listo = False
+
+
+class Lanzador:
+
+    def __init__(self, ajustes: AjustesLanzador):
+        self.ajustes = ajustes
+        self._contexto = multiprocessing.get_context("fork" if ajustes.preload else "spawn")
+        self._workers: Dict[int, _Worker] = {}
+        self._detener = False
+        self._fallos_seguidos = 0
+        self._reinicios = 0
+        self._proximo_arranque = 0.0
+        self._socket = None
+
+    def ejecutar(self) -> int:
+        """Bloquea hasta SIGTERM/SIGINT. Retorna el código de salida del proceso."""
+        global _app_precargada
+        preparar_entorno_multiproceso(self.ajustes.workers)
+        if self.ajustes.preload:
+            from uvicorn.importer import import_from_string
+            _app_precargada = import_from_string(self.ajustes.app)
+            routers = getattr(_app_precargada.state, "routers", None)
+            if routers is not None:
+                routers.cargar_todos_sync()
+
+        self._socket = uvicorn.Config(self.ajustes.app, host=self.ajustes.host, port=self.ajustes.port).bind_socket()
+        anteriores = {senal: signal.signal(senal, self._al_recibir_senal) for senal in (signal.SIGTERM, signal.SIGINT)}
+        print(f"[INFO] Lanzador {os.getpid()}: {self.ajustes.workers} workers en "
+              f"{self.ajustes.host}:{self.ajustes.port} (preload={self.ajustes.preload})")
+
+        codigo = 0
+        try:
+            while not self._detener:
+                self._completar_workers()
+                self._atender(timeout=1.0)
+                if self._fallos_seguidos >= self.ajustes.max_fallos_arranque:
+                    print(f"[ERROR] {self._fallos_seguidos} workers seguidos fallaron al arrancar; se detiene el lanzador")
+                    codigo = 1
+                    break
+        finally:
+            self._apagar()
+            self._socket.close()
+            for senal, manejador in anteriores.items():
+                signal.signal(senal, manejador)
+        return codigo
+
+    # ---- Internos ----
+
+    def _al_recibir_senal(self, senal, frame) -> None:
+        self._detener = True
+
+    def _completar_workers(self) -> None:
+        ahora = time.monotonic()
+        while len(self._workers) < self.ajustes.workers and ahora >= self._proximo_arranque:
+            self._iniciar_worker()
+
+    def _iniciar_worker(self) -> None:
+        limite = self.ajustes.max_requests
+        if limite and self.ajustes.max_requests_jitter:
+            limite += random.randint(0, self.ajustes.max_requests_jitter)
+        lectura, escritura = self._contexto.Pipe(duplex=False)
+        proceso = self._contexto.Process(
+            target=_ejecutar_worker,
+            args=(self.ajustes, [self._socket], escritura, limite),
+            name="brisa-worker"
+        )
+        proceso.start()
+        escritura.close()
+        self._workers[proceso.pid] = _Worker(proceso, lectura)
+
+    def _atender(self, timeout: float) -> None:
+        """Procesa avisos de arranque, workers que terminaron y arranques vencidos"""
+        objetos = {}
+        for worker in self._workers.values():
+            objetos[worker.proceso.sentinel] = worker
+            if not worker.listo:
+                objetos[worker.canal] = worker
+        for listo in wait(list(objetos), timeout=timeout):
+            worker = objetos[listo]
+            if listo is worker.canal:
+                self._leer_aviso(worker)
+
+        ahora = time.monotonic()
+        for pid, worker in list(self._workers.items()):
+            if not worker.proceso.is_alive():
+                worker.proceso.join()
+                self._retirar(pid, worker)
+            elif not worker.listo and ahora - worker.inicio > self.ajustes.timeout_arranque:
+                print(f"[ERROR] Worker {pid} no arrancó en {self.ajustes.timeout_arranque}s")
+                worker.proceso.kill()
+
+    def _leer_aviso(self, worker: _Worker) -> None:
+        try:
+            estado, detalle = worker.canal.recv()
+        except (EOFError, OSError):
+            return
+        if estado == "listo":
+            worker.listo = True
+            self._fallos_seguidos = 0
+            print(f"[INFO] Worker {worker.proceso.pid} listo en {detalle} ms")
+        else:
+            print(f"[ERROR] Worker {worker.proceso.pid} falló el chequeo de arranque: {detalle}")
+
+    def _retirar(self, pid: int, worker: _Worker) -> None:
+        del self._workers[pid]
+        worker.canal.close()
+        if self._detener:
+            return
+        if worker.listo:
+            # Reciclado (max_requests / memoria) o caída en servicio: se reemplaza enseguida
+            self._reinicios += 1
+            print(f"[INFO] Worker {pid} terminó (código {worker.proceso.exitcode}); se reemplaza")
+            return
+        self._fallos_seguidos += 1
+        espera = min(2 ** (self._fallos_seguidos - 1), _ESPERA_MAXIMA_REINTENTO)
+        self._proximo_arranque = time.monotonic() + espera
+
+    def _apagar(self) -> None:
+        """SIGTERM a todos los workers; se espera que drenen y se mata a los que no terminan"""
+        for worker in self._workers.values():
+            if worker.proceso.is_alive():
+                worker.proceso.terminate()
+        limite = time.monotonic() + self.ajustes.graceful_timeout + _MARGEN_APAGADO
+        for worker in self._workers.values():
+            worker.proceso.join(max(0.0, limite - time.monotonic()))
+            if worker.proceso.is_alive():
+                print(f"[ERROR] Worker {worker.proceso.pid} no terminó a tiempo; se mata")
+                worker.proceso.kill()
+                worker.proceso.join()
+        print(f"[INFO] Lanzador detenido ({self._reinicios} workers reciclados)")
@@ -0,0 +1,78 @@
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+
+from app.core.startup import tiempos_arranque
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ciclo de vida de la aplicación: arranca y detiene los procesos en segundo plano
+
+    Antes de aceptar peticiones solo se crea el engine y se arrancan los
+    escritores; los routers, la cola de trabajos y la precarga del índice de
+    retiros siguen en segundo plano (ver _precargar). Al apagar se vacían las
+    colas pendientes antes de salir.
+    """
+    from app.config.database import inicializar
+    from app.shared.services.query_monitor import query_monitor
+
+    with tiempos_arranque.medir("bd"):
+        configuracion = getattr(app.state, "config", None)
+        inicializar(getattr(configuracion, "DATABASE_URL", None), getattr(configuracion, "SQL_ECHO", None))
+        from app.config.database import engine, replica_engines
+        # Muestreo de consultas lentas
+        for motor in (engine, *replica_engines):
+            query_monitor.instalar(motor)
+
+    with tiempos_arranque.medir("servicios"):
+        from app.shared.services.audit_writer import audit_writer
+        from app.shared.services.notification_dispatcher import notification_dispatcher
+        from app.shared.services.job_queue import job_queue
+        from app.modules.esquelas.services.esquela_renderer import cerrar_pool
+        from app.modules.usuarios.services.password_hasher import password_hasher
+        from app.shared.services.change_feed import change_feed
+
+        audit_writer.iniciar()
+        await notification_dispatcher.iniciar()
+        await change_feed.iniciar()
+
+    precarga = asyncio.create_task(_precargar(app), name="precarga-arranque")
+    listo_ms = tiempos_arranque.marcar_listo()
+    print(f"[INFO] Listo en {listo_ms:.0f} ms: {tiempos_arranque.resumen()['fases']}")
+    try:
+        yield
+    finally:
+        precarga.cancel()
+        await asyncio.gather(precarga, return_exceptions=True)
+        await change_feed.detener()
+        await job_queue.detener()
+        await notification_dispatcher.detener()
+        audit_writer.detener()
+        cerrar_pool()
+        password_hasher.cerrar()
+
+
+async def _precargar(app: FastAPI) -> None:
+    """
+    Trabajo de arranque que no necesita bloquear la primera petición
+
+    La cola de trabajos arranca después de cargar los routers: las tareas se
+    registran al importar los servicios de cada módulo y un trabajo reclamado
+    antes fallaría con "Tarea no registrada".
+    """
+    from app.shared.services.job_queue import job_queue
+    from app.modules.retiros_tempranos.services.retiro_index import retiro_index
+
+    cargador = getattr(app.state, "routers", None)
+    if cargador is not None:
+        with tiempos_arranque.medir("routers"):
+            await cargador.cargar_todos()
+    await job_queue.iniciar()
+    try:
+        # Precarga del índice de portería para que la primera salida no espere a la BD
+        with tiempos_arranque.medir("indice_retiros"):
+            await asyncio.to_thread(retiro_index.asegurar_actualizado)
+    except Exception as e:
+        print(f"[ERROR] No se pudo precargar el índice de retiros: {e}")
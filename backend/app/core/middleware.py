@@ -0,0 +1,214 @@
+import asyncio
+import json
+import time
+
+from starlette.datastructures import MutableHeaders
+
+from app.shared.services.admission_control import Rechazo, admission_controller, identificar_cliente
+from app.shared.services.compression import (
+    COMPRESSION_ENABLED, COMPRESSION_MIN_BYTES, COMPRESSION_RUTAS_CACHE, TIPOS_COMPRIMIBLES, BYTES_EN_HILO,
+    calcular_etag, comprimir, compression_cache, elegir_codificacion, parsear_rutas, ruta_cacheable
+)
+from app.shared.services.request_profiler import perfil_actual, request_profiler
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI de perfilado por petición (ver request_profiler)
+
+    Es ASGI puro en lugar de BaseHTTPMiddleware para no agregar costo cuando
+    el perfilado está desactivado y no romper respuestas en streaming. El
+    perfil queda en perfil_actual para que el endpoint y query_monitor
+    aporten sus tiempos; el flamegraph se escribe en un hilo al terminar.
+    Server-Timing y X-Perfil solo van en las respuestas que un admin pidió
+    perfilar con X-Perfilar, no en las elegidas por el muestreo configurado.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        perfil = request_profiler.iniciar_perfil(scope) if scope["type"] == "http" else None
+        if perfil is None:
+            await self.app(scope, receive, send)
+            return
+
+        estado = {"codigo": 500}
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start":
+                estado["codigo"] = mensaje["status"]
+                perfil.marcar_respuesta()
+                if perfil.por_header:
+                    headers = list(mensaje.get("headers", []))
+                    headers.append((b"server-timing", perfil.server_timing().encode()))
+                    if perfil.flamegraph:
+                        headers.append((b"x-perfil", perfil.flamegraph.encode()))
+                    mensaje["headers"] = headers
+            await send(mensaje)
+
+        token = perfil_actual.set(perfil)
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            perfil_actual.reset(token)
+            request_profiler.finalizar(perfil, estado["codigo"])
+            if perfil.pilas:
+                await asyncio.to_thread(request_profiler.guardar_flamegraph, perfil)
+
+
+class AdmissionMiddleware:
+    """
+    Middleware ASGI de limitación de tasa y control de admisión (ver admission_control)
+
+    Las peticiones rechazadas no llegan a la aplicación: se responde 429 o 503
+    con Retry-After sin tocar la BD.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or admission_controller.exento(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            admission_controller.verificar_tasa(identificar_cliente(scope), scope["path"])
+            await admission_controller.admitir()
+        except Rechazo as rechazo:
+            await _responder_rechazo(send, rechazo)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission_controller.liberar()
+
+
+async def _responder_rechazo(send, rechazo: Rechazo) -> None:
+    cuerpo = json.dumps({"detail": rechazo.detalle}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": rechazo.estado,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(cuerpo)).encode()),
+            (b"retry-after", str(rechazo.reintentar_en).encode()),
+        ]
+    })
+    await send({"type": "http.response.body", "body": cuerpo})
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI de compresión gzip/brotli con ETag y caché para catálogos (ver compression)
+
+    Solo comprime respuestas completas de tipos de texto/JSON desde
+    COMPRESSION_MIN_BYTES; las respuestas en streaming (zip de esquelas,
+    eventos) pasan sin tocar.
+    """
+
+    def __init__(self, app, activo: bool = COMPRESSION_ENABLED, minimo: int = COMPRESSION_MIN_BYTES,
+                 rutas_cache: str = COMPRESSION_RUTAS_CACHE):
+        self.app = app
+        self.activo = activo
+        self.minimo = minimo
+        self.rutas_cache = parsear_rutas(rutas_cache)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.activo:
+            await self.app(scope, receive, send)
+            return
+
+        headers = {nombre: valor for nombre, valor in scope["headers"]}
+        codificacion = elegir_codificacion(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        cacheable = scope["method"] == "GET" and ruta_cacheable(
+            self.rutas_cache, scope["path"], scope.get("query_string", b"")
+        )
+        if codificacion is None and not cacheable:
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = headers.get(b"if-none-match", b"").decode("latin-1")
+        inicio = None
+        partes = []
+        en_streaming = False
+
+        async def enviar(mensaje):
+            nonlocal inicio, en_streaming
+            if mensaje["type"] == "http.response.start":
+                inicio = mensaje
+                return
+            if en_streaming or mensaje["type"] != "http.response.body":
+                await send(mensaje)
+                return
+            partes.append(mensaje.get("body", b""))
+            if mensaje.get("more_body", False):
+                # Respuesta en streaming: se envía tal cual
+                en_streaming = True
+                await send(inicio)
+                await send({"type": "http.response.body", "body": b"".join(partes), "more_body": True})
+                partes.clear()
+                return
+            await self._responder(send, inicio, b"".join(partes), codificacion, cacheable, if_none_match)
+
+        await self.app(scope, receive, enviar)
+
+    async def _responder(self, send, inicio, cuerpo: bytes, codificacion, cacheable: bool, if_none_match: str):
+        inicio["headers"] = list(inicio.get("headers", []))
+        headers = MutableHeaders(raw=inicio["headers"])
+        comprimible = (
+            inicio["status"] == 200
+            and "content-encoding" not in headers
+            and headers.get("content-type", "").startswith(TIPOS_COMPRIMIBLES)
+        )
+
+        comprimir_cuerpo = comprimible and len(cuerpo) >= self.minimo
+        if comprimir_cuerpo:
+            headers.add_vary_header("Accept-Encoding")
+
+        etag = None
+        if cacheable and comprimible:
+            # Respeta el ETag que ya fija el endpoint (p. ej. un snapshot versionado) y evita el hash
+            etag = headers.get("etag")
+            if etag is None:
+                etag = calcular_etag(cuerpo)
+                headers["etag"] = etag
+            if "cache-control" not in headers:
+                headers["cache-control"] = "no-cache"
+            if etag in (e.strip() for e in if_none_match.split(",")) or if_none_match.strip() == "*":
+                compression_cache.registrar_no_modificado()
+                del headers["content-length"]
+                del headers["content-type"]
+                inicio["status"] = 304
+                await send(inicio)
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        if comprimir_cuerpo and codificacion is not None:
+            entrada = compression_cache.obtener(etag, codificacion) if etag else None
+            if entrada is None:
+                # Primera vez (o fuera del caché): nivel rápido
+                comprimido = await self._comprimir(cuerpo, codificacion, para_cache=False)
+                if etag:
+                    compression_cache.guardar(etag, codificacion, comprimido, definitivo=False)
+            elif not entrada[1]:
+                # Se repitió: vale la pena el nivel máximo para las próximas
+                comprimido = await self._comprimir(cuerpo, codificacion, para_cache=True)
+                compression_cache.guardar(etag, codificacion, comprimido)
+            else:
+                comprimido = entrada[0]
+            compression_cache.registrar_envio(len(cuerpo), len(comprimido))
+            cuerpo = comprimido
+            headers["content-encoding"] = codificacion
+            headers["content-length"] = str(len(cuerpo))
+
+        await send(inicio)
+        await send({"type": "http.response.body", "body": cuerpo})
+
+    @staticmethod
+    async def _comprimir(cuerpo: bytes, codificacion: str, para_cache: bool) -> bytes:
+        if len(cuerpo) >= BYTES_EN_HILO:
+            return await asyncio.to_thread(comprimir, cuerpo, codificacion, para_cache)
+        return comprimir(cuerpo, codificacion, para_cache)
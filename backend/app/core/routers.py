@@ -0,0 +1,124 @@
+"""
+Carga perezosa de los routers de los módulos
+
+register_routes no importa los controladores: por cada módulo agrega una
+ruta comodín que cubre su prefijo. El módulo se importa (en un hilo, sin
+bloquear el event loop) y sus routers se incluyen en la app con la primera
+petición a ese prefijo, o antes con cargar_todos(), que el lifespan lanza en
+segundo plano apenas el servidor está listo. /openapi.json carga todo antes
+de generar el esquema.
+"""
+import asyncio
+import importlib
+import threading
+import time
+from typing import Dict, List, Sequence, Tuple
+
+from starlette.routing import BaseRoute, Match, NoMatchFound
+
+from app.shared.services.request_profiler import instrumentar_endpoints
+
+# (nombre, prefijo, módulos que exponen `router`), en el orden de registro
+MODULOS: List[Tuple[str, str, Sequence[str]]] = [
+    ("profesores", "/api/profesores", ("app.modules.profesores.controllers.profesor_controller",)),
+    ("retiros_tempranos", "/api/retiros", ("app.modules.retiros_tempranos.controllers.retiro_controller",)),
+    ("incidentes", "/api/incidentes", ("app.modules.incidentes.controllers.incidente_controller",)),
+    ("esquelas", "/api/esquelas", ("app.modules.esquelas.controllers.esquela_controller",)),
+    ("reportes", "/api/reportes", ("app.modules.reportes.controllers.reporte_controller",)),
+    ("administracion", "/api/admin", (
+        "app.modules.administracion.controllers.job_controller",
+        "app.modules.administracion.controllers.control_controller",
+    )),
+    ("usuarios", "/api/usuarios", ("app.modules.usuarios.controllers.usuario_controller",)),
+]
+
+
+class RutaPerezosa(BaseRoute):
+    """Comodín del prefijo de un módulo todavía no cargado"""
+
+    def __init__(self, cargador: "CargadorRouters", nombre: str, prefijo: str, modulos: Sequence[str]):
+        self.cargador = cargador
+        self.nombre = nombre
+        self.prefijo = prefijo
+        self.modulos = tuple(modulos)
+
+    def matches(self, scope):
+        if scope["type"] == "http":
+            ruta = scope["path"]
+            if ruta == self.prefijo or ruta.startswith(self.prefijo + "/"):
+                return Match.FULL, {}
+        return Match.NONE, {}
+
+    def url_path_for(self, name: str, **path_params):
+        raise NoMatchFound(name, path_params)
+
+    async def handle(self, scope, receive, send):
+        await self.cargador.cargar(self)
+        # Con el router ya incluido (o el comodín quitado si el módulo no existe) se enruta de nuevo
+        await self.cargador.app.router(scope, receive, send)
+
+
+class CargadorRouters:
+    """Routers pendientes de una app (uno por app, en app.state.routers)"""
+
+    def __init__(self, app):
+        self.app = app
+        self._pendientes: Dict[str, RutaPerezosa] = {}
+        self._tiempos: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, modulos=MODULOS) -> None:
+        for nombre, prefijo, rutas in modulos:
+            ruta = RutaPerezosa(self, nombre, prefijo, rutas)
+            self._pendientes[nombre] = ruta
+            self.app.router.routes.append(ruta)
+
+        generar_openapi = self.app.openapi
+
+        def openapi():
+            # El esquema debe listar todos los módulos, no solo los ya usados
+            if self._pendientes:
+                self.cargar_todos_sync()
+            return generar_openapi()
+
+        self.app.openapi = openapi
+
+    async def cargar(self, ruta: RutaPerezosa) -> None:
+        if ruta.nombre not in self._pendientes:
+            return
+        inicio = time.perf_counter()
+        routers = await asyncio.to_thread(self._importar, ruta)
+        self._incluir(ruta, routers, inicio)
+
+    async def cargar_todos(self) -> None:
+        for ruta in list(self._pendientes.values()):
+            await self.cargar(ruta)
+
+    def cargar_todos_sync(self) -> None:
+        for ruta in list(self._pendientes.values()):
+            inicio = time.perf_counter()
+            self._incluir(ruta, self._importar(ruta), inicio)
+
+    def estadisticas(self) -> Dict:
+        return {"cargados_ms": dict(self._tiempos), "pendientes": list(self._pendientes)}
+
+    # ---- Internos ----
+
+    def _importar(self, ruta: RutaPerezosa) -> List:
+        with self._lock:
+            try:
+                return [importlib.import_module(modulo).router for modulo in ruta.modulos]
+            except ModuleNotFoundError:
+                print(f"⚠️  Módulo '{ruta.nombre}' no encontrado, omitiendo rutas de {ruta.nombre}")
+                return []
+
+    def _incluir(self, ruta: RutaPerezosa, routers: List, inicio: float) -> None:
+        # Siempre en el hilo del event loop: el enrutamiento recorre app.router.routes sin awaits
+        if self._pendientes.pop(ruta.nombre, None) is None:
+            return
+        for router in routers:
+            self.app.include_router(router)
+        instrumentar_endpoints(self.app.router.routes)
+        self.app.router.routes.remove(ruta)
+        self.app.openapi_schema = None
+        self._tiempos[ruta.nombre] = round((time.perf_counter() - inicio) * 1000, 2)
@@ -0,0 +1,44 @@
+"""
+Tiempos de arranque por fase
+
+create_app y el lifespan miden cada fase (importación, armado de la app,
+base de datos, servicios, routers). Al quedar listo se imprime el resumen y
+queda disponible en /api/admin/resumen para comparar reinicios de workers.
+"""
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+# Referencia: el momento en que se empezó a importar el paquete app
+_INICIO = time.perf_counter()
+
+
+class TiemposArranque:
+
+    def __init__(self):
+        self._fases: Dict[str, float] = {}
+        self._listo_ms = None
+
+    @contextmanager
+    def medir(self, fase: str):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._fases[fase] = round((time.perf_counter() - inicio) * 1000, 2)
+
+    def registrar(self, fase: str, desde: float = _INICIO) -> None:
+        """Registra una fase que empezó en `desde` (por defecto, el inicio de la importación)"""
+        self._fases.setdefault(fase, round((time.perf_counter() - desde) * 1000, 2))
+
+    def marcar_listo(self) -> float:
+        """Milisegundos desde la importación hasta que el servidor acepta peticiones"""
+        self._listo_ms = round((time.perf_counter() - _INICIO) * 1000, 2)
+        return self._listo_ms
+
+    def resumen(self) -> Dict:
+        return {"fases": dict(self._fases), "listo_ms": self._listo_ms}
+
+
+# Instancia compartida por proceso
+tiempos_arranque = TiemposArranque()
@@ -0,0 +1,141 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import FileResponse
+from typing import Dict, List
+from app.modules.administracion.dto.control_dto import (
+    CacheVaciadaDTO, PoolStatsDTO, ConsultaLentaDTO, HuellaLentaDTO, ConsultasLentasConfigDTO, ConsultasLentasStatsDTO,
+    PerfiladoConfigDTO, PerfiladoStatsDTO, PeticionPerfiladaDTO, FlamegraphDTO, AdmisionConfigDTO, ControlResumenDTO
+)
+from app.modules.administracion.services.control_service import ControlService
+from app.shared.decorators.auth_decorators import require_roles
+
+router = APIRouter(
+    prefix="/api/admin",
+    tags=["Administración - Control"],
+    dependencies=[Depends(require_roles("admin"))]
+)
+
+
+# ============ ENDPOINTS ESTÁTICOS (PRIMERO) ============
+
+@router.get("/resumen", response_model=ControlResumenDTO)
+def obtener_resumen():
+    """Estado de cachés, pool de conexiones, colas, consultas lentas y perfilado de este proceso"""
+    return ControlService.obtener_resumen()
+
+
+@router.get("/caches")
+def listar_caches() -> Dict[str, Dict]:
+    """Estadísticas de cada caché en memoria registrada"""
+    return ControlService.listar_caches()
+
+
+@router.post("/caches/vaciar", response_model=List[CacheVaciadaDTO])
+def vaciar_caches():
+    """Vacía todas las cachés registradas"""
+    return ControlService.vaciar_caches()
+
+
+@router.get("/pool", response_model=PoolStatsDTO)
+def obtener_pool():
+    """Conexiones en uso, disponibles y en overflow del pool de la base de datos"""
+    return ControlService.obtener_pool()
+
+
+@router.get("/colas")
+def obtener_colas() -> Dict[str, Dict]:
+    """Profundidad de la cola de jobs, notificaciones y escrituras por lotes"""
+    return ControlService.obtener_colas()
+
+
+@router.get("/admision")
+def obtener_admision() -> Dict:
+    """Límites y contadores de limitación de tasa (429) y control de admisión (503)"""
+    return ControlService.obtener_admision()
+
+
+@router.put("/admision")
+def configurar_admision(data: AdmisionConfigDTO) -> Dict:
+    """Cambia los límites en caliente; solo se envían los campos a modificar"""
+    return ControlService.configurar_admision(data)
+
+
+@router.get("/consultas-lentas", response_model=List[ConsultaLentaDTO])
+def listar_consultas_lentas(limite: int = Query(50, ge=1, le=500)):
+    """Consultas SQL más recientes que superaron el umbral"""
+    return ControlService.listar_consultas_lentas(limite)
+
+
+@router.get("/consultas-lentas/top", response_model=List[HuellaLentaDTO])
+def listar_huellas_lentas(
+    limite: int = Query(20, ge=1, le=200),
+    orden: str = Query("total_ms", pattern="^(total_ms|max_ms|promedio_ms|veces)$")
+):
+    """
+    Consultas lentas agrupadas por huella (la sentencia sin valores), con su
+    origen en el código y el último plan (EXPLAIN)
+    """
+    return ControlService.listar_huellas_lentas(limite, orden)
+
+
+@router.delete("/consultas-lentas", response_model=ConsultasLentasStatsDTO)
+def limpiar_consultas_lentas():
+    """Descarta las muestras de consultas lentas y el ranking de huellas"""
+    return ControlService.limpiar_consultas_lentas()
+
+
+@router.get("/consultas-lentas/config", response_model=ConsultasLentasStatsDTO)
+def obtener_config_consultas_lentas():
+    return ControlService.obtener_consultas_lentas_stats()
+
+
+@router.put("/consultas-lentas/config", response_model=ConsultasLentasStatsDTO)
+def configurar_consultas_lentas(data: ConsultasLentasConfigDTO):
+    """Cambia el umbral (ms) a partir del cual se guarda una consulta y activa o desactiva el EXPLAIN"""
+    return ControlService.configurar_consultas_lentas(data)
+
+
+@router.get("/perfilado", response_model=PerfiladoStatsDTO)
+def obtener_perfilado():
+    return ControlService.obtener_perfilado()
+
+
+@router.put("/perfilado", response_model=PerfiladoStatsDTO)
+def configurar_perfilado(data: PerfiladoConfigDTO):
+    """
+    Activa o desactiva el perfilado por petición
+
+    - **muestreo**: fracción de peticiones a medir (0 a 1)
+    - **prefijo**: limitar a rutas que empiecen con este prefijo
+    - **perfilador**: tiempos (solo desglose), muestreo o determinista (además guardan un flamegraph)
+
+    Las mediciones se consultan en /perfilado/peticiones. Para perfilar una sola
+    petición sin activarlo, enviarla con el header `X-Perfilar: muestreo` (o
+    determinista) y un token de admin: solo esa respuesta trae Server-Timing y X-Perfil.
+    """
+    return ControlService.configurar_perfilado(data)
+
+
+@router.get("/perfilado/peticiones", response_model=List[PeticionPerfiladaDTO])
+def listar_peticiones_perfiladas(limite: int = Query(50, ge=1, le=500)):
+    """Últimas peticiones medidas, con el desglose de Python, SQL por sentencia y serialización"""
+    return ControlService.listar_peticiones_perfiladas(limite)
+
+
+@router.get("/perfilado/flamegraphs", response_model=List[FlamegraphDTO])
+def listar_flamegraphs():
+    """Flamegraphs guardados, los más recientes primero (el nombre lleva el pid del worker)"""
+    return ControlService.listar_flamegraphs()
+
+
+# ============ ENDPOINTS DINÁMICOS (DESPUÉS) ============
+
+@router.post("/caches/{nombre}/vaciar", response_model=CacheVaciadaDTO)
+def vaciar_cache(nombre: str):
+    """Vacía una caché por nombre (ver GET /caches)"""
+    return ControlService.vaciar_cache(nombre)
+
+
+@router.get("/perfilado/flamegraphs/{nombre}")
+def descargar_flamegraph(nombre: str):
+    """Descarga un flamegraph en formato collapsed (flamegraph.pl, speedscope, inferno)"""
+    return FileResponse(ControlService.obtener_flamegraph(nombre), media_type="text/plain", filename=nombre)
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+from app.modules.administracion.dto.job_dto import JobReadDTO, JobStatsDTO
+from app.modules.administracion.services.job_service import JobService
+from app.shared.decorators.auth_decorators import require_roles
+
+router = APIRouter(
+    prefix="/api/admin/jobs",
+    tags=["Administración - Jobs"],
+    dependencies=[Depends(require_roles("admin"))]
+)
+
+
+@router.get("/", response_model=List[JobReadDTO])
+def listar_jobs(
+    estado: Optional[str] = Query(None, description="pendiente, en_proceso, completado, error o cancelado"),
+    tipo: Optional[str] = Query(None, description="Nombre de la tarea, ej: profesores.rollover_gestion"),
+    limite: int = Query(50, ge=1, le=500)
+):
+    """Lista los jobs más recientes de la cola de trabajos"""
+    return JobService.listar_jobs(estado, tipo, limite)
+
+
+@router.get("/stats", response_model=JobStatsDTO)
+def obtener_estadisticas_jobs():
+    """
+    Profundidad de la cola por estado y métricas del worker de este proceso
+    (jobs en curso, completados, reintentos y errores)
+    """
+    return JobService.obtener_estadisticas()
+
+
+@router.get("/{id_job}", response_model=JobReadDTO)
+def obtener_job(id_job: int):
+    """Obtiene el estado, resultado o error de un job"""
+    return JobService.obtener_job(id_job)
+
+
+@router.post("/{id_job}/cancelar", response_model=JobReadDTO)
+def cancelar_job(id_job: int):
+    """Cancela un job que todavía no empezó a ejecutarse"""
+    return JobService.cancelar_job(id_job)
@@ -0,0 +1,133 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, Literal
+from datetime import datetime
+
+
+# ============ CACHÉ DTOs ============
+class CacheVaciadaDTO(BaseModel):
+    nombre: str
+    vaciada: bool = True
+    pid: Optional[int] = Field(None, description="Worker que atendió la petición; los demás lo aplican vía feed")
+
+
+# ============ POOL DE CONEXIONES DTOs ============
+class PoolStatsDTO(BaseModel):
+    clase: str
+    tamaño: Optional[int] = None
+    en_uso: Optional[int] = None
+    disponibles: Optional[int] = None
+    overflow: Optional[int] = None
+    estado: str
+    replicas: Dict[str, Any] = {}
+
+
+# ============ CONSULTAS LENTAS DTOs ============
+class ConsultaLentaDTO(BaseModel):
+    sql: str
+    parametros: Optional[str] = None
+    executemany: bool
+    duracion_ms: float
+    fecha: datetime
+    huella_id: Optional[str] = None
+    origen: Optional[str] = None
+
+
+class HuellaLentaDTO(BaseModel):
+    huella_id: str
+    huella: str
+    ejemplo: str
+    veces: int
+    total_ms: float
+    max_ms: float
+    promedio_ms: float
+    ultima: datetime
+    origenes: Dict[str, int] = {}
+    plan: Optional[List[Dict[str, Any]]] = None
+    plan_error: Optional[str] = None
+    plan_fecha: Optional[datetime] = None
+
+
+class ConsultasLentasConfigDTO(BaseModel):
+    umbral_ms: float = Field(..., ge=0)
+    explain: Optional[bool] = Field(None, description="Tomar EXPLAIN de los SELECT lentos")
+
+
+class ConsultasLentasStatsDTO(BaseModel):
+    umbral_ms: float
+    consultas: int
+    lentas: int
+    muestras: int
+    capacidad: int
+    huellas: int = 0
+    explain: bool = False
+    planes: int = 0
+    parametros: bool = False
+
+
+# ============ PERFILADO DTOs ============
+class PerfiladoConfigDTO(BaseModel):
+    activo: bool
+    muestreo: Optional[float] = Field(None, gt=0, le=1)
+    prefijo: Optional[str] = Field(None, max_length=200, description="Solo perfilar rutas con este prefijo, ej: /api/profesores")
+    perfilador: Optional[Literal["tiempos", "muestreo", "determinista"]] = Field(
+        None, description="tiempos: solo desglose; muestreo/determinista: además guarda un flamegraph"
+    )
+
+
+class PerfiladoStatsDTO(BaseModel):
+    activo: bool
+    muestreo: float
+    prefijo: Optional[str] = None
+    perfilador: str
+    medidas: int
+    muestras: int
+    capacidad: int
+    flamegraphs: int = 0
+
+
+class ConsultaPerfiladaDTO(BaseModel):
+    sql: str
+    veces: int
+    duracion_ms: float
+
+
+class PeticionPerfiladaDTO(BaseModel):
+    metodo: str
+    ruta: str
+    estado: int
+    duracion_ms: float
+    fecha: datetime
+    perfilador: Optional[str] = None
+    endpoint_ms: Optional[float] = None
+    python_ms: Optional[float] = None
+    sql_ms: Optional[float] = None
+    consultas: Optional[int] = None
+    serializacion_ms: Optional[float] = None
+    detalle_sql: List[ConsultaPerfiladaDTO] = []
+    flamegraph: Optional[str] = None
+
+
+class FlamegraphDTO(BaseModel):
+    nombre: str
+    bytes: int
+    fecha: datetime
+
+
+# ============ ADMISIÓN DTOs ============
+class AdmisionConfigDTO(BaseModel):
+    activo: Optional[bool] = None
+    rafaga: Optional[float] = Field(None, ge=1, description="Peticiones seguidas permitidas por cliente")
+    por_segundo: Optional[float] = Field(None, gt=0, description="Recarga del bucket por cliente")
+    max_concurrencia: Optional[int] = Field(None, ge=1, description="Peticiones simultáneas en el proceso")
+
+
+# ============ RESUMEN DTOs ============
+class ControlResumenDTO(BaseModel):
+    pid: int
+    caches: Dict[str, Dict[str, Any]]
+    pool: PoolStatsDTO
+    colas: Dict[str, Dict[str, Any]]
+    admision: Dict[str, Any]
+    consultas_lentas: ConsultasLentasStatsDTO
+    perfilado: PerfiladoStatsDTO
+    arranque: Dict[str, Any] = {}
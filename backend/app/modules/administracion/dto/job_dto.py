@@ -0,0 +1,37 @@
+from pydantic import BaseModel
+from typing import Optional, List, Dict
+from datetime import datetime
+
+
+# ============ JOB DTOs ============
+class JobReadDTO(BaseModel):
+    id_job: int
+    tipo: str
+    estado: str
+    prioridad: int
+    idempotency_key: Optional[str] = None
+    intentos: int
+    max_intentos: int
+    programado_para: datetime
+    fecha_creacion: datetime
+    fecha_inicio: Optional[datetime] = None
+    fecha_fin: Optional[datetime] = None
+    payload: Optional[str] = None
+    resultado: Optional[str] = None
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class JobStatsDTO(BaseModel):
+    por_estado: Dict[str, int]
+    en_curso_local: int
+    concurrencia: int
+    tareas_registradas: List[str]
+    periodicas: List[str]
+    activo: bool
+    completados: int
+    errores: int
+    reintentos: int
+    errores_bucle: int
@@ -0,0 +1,221 @@
+import os
+import socket
+from typing import Any, Dict, List
+
+from fastapi import HTTPException
+
+from app.core.startup import tiempos_arranque
+from app.modules.administracion.dto.control_dto import (
+    CacheVaciadaDTO, PoolStatsDTO, ConsultaLentaDTO, HuellaLentaDTO, ConsultasLentasConfigDTO, ConsultasLentasStatsDTO,
+    PerfiladoConfigDTO, PerfiladoStatsDTO, PeticionPerfiladaDTO, FlamegraphDTO, AdmisionConfigDTO, ControlResumenDTO
+)
+from app.shared.services.admission_control import admission_controller
+from app.shared.services.audit_writer import audit_writer
+from app.shared.services.cache_registry import cache_registry
+from app.shared.services.change_feed import change_feed
+from app.shared.services.job_queue import job_queue
+from app.shared.services.notification_dispatcher import notification_dispatcher
+from app.shared.services.query_monitor import query_monitor
+from app.shared.services.request_profiler import request_profiler
+
+# Identifica al worker que originó un cambio para no aplicarlo dos veces
+_ORIGEN = f"{socket.gethostname()}:{os.getpid()}"
+
+
+# ============ CONTROL SERVICE ============
+class ControlService:
+    """
+    Inspección y control en caliente de cachés, pool de conexiones, colas,
+    consultas lentas y perfilado
+
+    Las lecturas son por proceso: con varios workers cada petición ve el
+    proceso que la atiende (el pid va en el resumen). Los cambios (vaciar
+    cachés, admisión, umbral de consultas lentas, perfilado) se aplican aquí y
+    se difunden por el feed de cambios como entidad interna "control": con
+    CHANGE_FEED_FANOUT=bd cada worker los aplica en su siguiente lectura del feed.
+    """
+
+    @staticmethod
+    def _difundir(accion: str, datos: Dict[str, Any]) -> None:
+        change_feed.publicar("control", accion, {"origen": _ORIGEN, "pid": os.getpid()}, datos)
+
+    @staticmethod
+    def aplicar_difusion(evento: Dict[str, Any]) -> None:
+        """Aplica en este worker un cambio hecho desde el panel en otro worker"""
+        if evento["clave"].get("origen") == _ORIGEN:
+            return
+        datos = evento["datos"] or {}
+        accion = evento["accion"]
+        if accion == "vaciar_caches":
+            for nombre in datos["caches"]:
+                cache_registry.vaciar(nombre)
+        elif accion == "admision":
+            ControlService._aplicar_admision(AdmisionConfigDTO(**datos))
+        elif accion == "consultas_lentas":
+            ControlService._aplicar_consultas_lentas(ConsultasLentasConfigDTO(**datos))
+        elif accion == "limpiar_consultas_lentas":
+            query_monitor.limpiar()
+        elif accion == "perfilado":
+            ControlService._aplicar_perfilado(PerfiladoConfigDTO(**datos))
+        print(f"[INFO] Control '{accion}' aplicado desde el worker {evento['clave'].get('pid')}")
+
+    @staticmethod
+    def obtener_resumen() -> ControlResumenDTO:
+        return ControlResumenDTO(
+            pid=os.getpid(),
+            caches=ControlService.listar_caches(),
+            pool=ControlService.obtener_pool(),
+            colas=ControlService.obtener_colas(),
+            admision=ControlService.obtener_admision(),
+            consultas_lentas=ControlService.obtener_consultas_lentas_stats(),
+            perfilado=ControlService.obtener_perfilado(),
+            arranque=tiempos_arranque.resumen()
+        )
+
+    # ---- Cachés ----
+
+    @staticmethod
+    def listar_caches() -> Dict[str, Dict]:
+        return cache_registry.estadisticas()
+
+    @staticmethod
+    def vaciar_cache(nombre: str) -> CacheVaciadaDTO:
+        if not cache_registry.vaciar(nombre):
+            raise HTTPException(
+                status_code=404,
+                detail=f"Caché '{nombre}' no registrada. Disponibles: {', '.join(cache_registry.nombres())}"
+            )
+        ControlService._difundir("vaciar_caches", {"caches": [nombre]})
+        return CacheVaciadaDTO(nombre=nombre, pid=os.getpid())
+
+    @staticmethod
+    def vaciar_caches() -> List[CacheVaciadaDTO]:
+        nombres = cache_registry.nombres()
+        for nombre in nombres:
+            cache_registry.vaciar(nombre)
+        ControlService._difundir("vaciar_caches", {"caches": nombres})
+        return [CacheVaciadaDTO(nombre=nombre, pid=os.getpid()) for nombre in nombres]
+
+    # ---- Pool de conexiones ----
+
+    @staticmethod
+    def obtener_pool() -> PoolStatsDTO:
+        from app.config.database import engine, enrutador
+        pool = engine.pool
+        # Los pools sin cola (NullPool, StaticPool, SingletonThreadPool) no exponen contadores
+        contador = lambda metodo: getattr(pool, metodo)() if hasattr(pool, metodo) else None
+        return PoolStatsDTO(
+            clase=type(pool).__name__,
+            tamaño=contador("size"),
+            en_uso=contador("checkedout"),
+            disponibles=contador("checkedin"),
+            overflow=contador("overflow"),
+            estado=pool.status(),
+            replicas=enrutador.estadisticas()
+        )
+
+    # ---- Colas ----
+
+    @staticmethod
+    def obtener_colas() -> Dict[str, Dict]:
+        """Profundidad de las colas en segundo plano"""
+        from app.modules.usuarios.services.password_hasher import password_hasher
+        job_stats = job_queue.estadisticas()
+        return {
+            "jobs": {
+                "pendientes": job_stats["por_estado"].get("pendiente", 0),
+                "en_proceso": job_stats["por_estado"].get("en_proceso", 0),
+                "en_curso_local": job_stats["en_curso_local"],
+                "activo": job_stats["activo"]
+            },
+            "notificaciones": notification_dispatcher.estadisticas(),
+            "auditoria": audit_writer.estadisticas(),
+            "hash_passwords": password_hasher.estadisticas(),
+            "feed_cambios": change_feed.estadisticas()
+        }
+
+    # ---- Admisión ----
+
+    @staticmethod
+    def obtener_admision() -> Dict:
+        return admission_controller.estadisticas()
+
+    @staticmethod
+    def configurar_admision(data: AdmisionConfigDTO) -> Dict:
+        try:
+            ControlService._aplicar_admision(data)
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        ControlService._difundir("admision", data.model_dump())
+        return ControlService.obtener_admision()
+
+    @staticmethod
+    def _aplicar_admision(data: AdmisionConfigDTO) -> None:
+        admission_controller.configurar(data.activo, data.rafaga, data.por_segundo, data.max_concurrencia)
+
+    # ---- Consultas lentas ----
+
+    @staticmethod
+    def listar_consultas_lentas(limite: int = 50) -> List[ConsultaLentaDTO]:
+        return [ConsultaLentaDTO(**m) for m in query_monitor.muestras(limite)]
+
+    @staticmethod
+    def listar_huellas_lentas(limite: int = 20, orden: str = "total_ms") -> List[HuellaLentaDTO]:
+        return [HuellaLentaDTO(**h) for h in query_monitor.ranking(limite, orden)]
+
+    @staticmethod
+    def obtener_consultas_lentas_stats() -> ConsultasLentasStatsDTO:
+        return ConsultasLentasStatsDTO(**query_monitor.estadisticas())
+
+    @staticmethod
+    def configurar_consultas_lentas(data: ConsultasLentasConfigDTO) -> ConsultasLentasStatsDTO:
+        ControlService._aplicar_consultas_lentas(data)
+        ControlService._difundir("consultas_lentas", data.model_dump())
+        return ControlService.obtener_consultas_lentas_stats()
+
+    @staticmethod
+    def _aplicar_consultas_lentas(data: ConsultasLentasConfigDTO) -> None:
+        query_monitor.configurar(data.umbral_ms, data.explain)
+
+    @staticmethod
+    def limpiar_consultas_lentas() -> ConsultasLentasStatsDTO:
+        query_monitor.limpiar()
+        ControlService._difundir("limpiar_consultas_lentas", {})
+        return ControlService.obtener_consultas_lentas_stats()
+
+    # ---- Perfilado ----
+
+    @staticmethod
+    def obtener_perfilado() -> PerfiladoStatsDTO:
+        return PerfiladoStatsDTO(**request_profiler.estadisticas())
+
+    @staticmethod
+    def configurar_perfilado(data: PerfiladoConfigDTO) -> PerfiladoStatsDTO:
+        if data.prefijo and not data.prefijo.startswith("/"):
+            raise HTTPException(status_code=400, detail="El prefijo debe empezar con '/'")
+        ControlService._aplicar_perfilado(data)
+        ControlService._difundir("perfilado", data.model_dump())
+        return ControlService.obtener_perfilado()
+
+    @staticmethod
+    def _aplicar_perfilado(data: PerfiladoConfigDTO) -> None:
+        request_profiler.configurar(data.activo, data.muestreo, data.prefijo, data.perfilador)
+
+    @staticmethod
+    def listar_peticiones_perfiladas(limite: int = 50) -> List[PeticionPerfiladaDTO]:
+        return [PeticionPerfiladaDTO(**m) for m in request_profiler.muestras(limite)]
+
+    @staticmethod
+    def listar_flamegraphs() -> List[FlamegraphDTO]:
+        return [FlamegraphDTO(**f) for f in request_profiler.flamegraphs()]
+
+    @staticmethod
+    def obtener_flamegraph(nombre: str) -> str:
+        """Ruta del archivo collapsed guardado por el perfilador"""
+        ruta = request_profiler.ruta_flamegraph(nombre)
+        if ruta is None:
+            raise HTTPException(status_code=404, detail=f"Flamegraph '{nombre}' no encontrado")
+        return ruta
+
+
+change_feed.escuchar("control", ControlService.aplicar_difusion)
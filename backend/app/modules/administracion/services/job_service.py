@@ -0,0 +1,37 @@
+from typing import List, Optional
+
+from fastapi import HTTPException
+
+from app.modules.administracion.dto.job_dto import JobReadDTO, JobStatsDTO
+from app.shared.services.job_queue import job_queue
+
+ESTADOS_JOB = ("pendiente", "en_proceso", "completado", "error", "cancelado")
+
+
+# ============ JOB SERVICE ============
+class JobService:
+
+    @staticmethod
+    def listar_jobs(estado: Optional[str] = None, tipo: Optional[str] = None, limite: int = 50) -> List[JobReadDTO]:
+        if estado and estado not in ESTADOS_JOB:
+            raise HTTPException(status_code=400, detail=f"Estado inválido. Use: {', '.join(ESTADOS_JOB)}")
+        return [JobReadDTO.from_orm(j) for j in job_queue.listar(estado, tipo, limite)]
+
+    @staticmethod
+    def obtener_job(id_job: int) -> JobReadDTO:
+        job = job_queue.obtener(id_job)
+        if not job:
+            raise HTTPException(status_code=404, detail=f"Job con ID {id_job} no encontrado")
+        return JobReadDTO.from_orm(job)
+
+    @staticmethod
+    def cancelar_job(id_job: int) -> JobReadDTO:
+        """Cancela un job pendiente; los que ya empezaron no se interrumpen"""
+        job = JobService.obtener_job(id_job)
+        if not job_queue.cancelar(id_job):
+            raise HTTPException(status_code=400, detail=f"El job {id_job} está {job.estado} y no se puede cancelar")
+        return JobService.obtener_job(id_job)
+
+    @staticmethod
+    def obtener_estadisticas() -> JobStatsDTO:
+        return JobStatsDTO(**job_queue.estadisticas())
@@ -1 +1,10 @@
 # Esquelas (Reconocimiento y Orientación)
+
+
+def __getattr__(nombre):
+    # El router se importa al pedirlo: importar un modelo o servicio del
+    # módulo no debe cargar sus controladores (ver app/core/routers.py)
+    if nombre == "esquelas_router":
+        from .controllers.esquela_controller import router
+        return router
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
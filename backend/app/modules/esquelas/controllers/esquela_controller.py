@@ -0,0 +1,118 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.config.database import get_db
+from app.modules.esquelas.dto.esquela_dto import (
+    PlantillaEsquelaCreateDTO, PlantillaEsquelaUpdateDTO, PlantillaEsquelaReadDTO,
+    EsquelaLoteCreateDTO, EsquelaLoteResultDTO, EsquelaReadDTO
+)
+from app.modules.esquelas.services.esquela_service import PlantillaService, EsquelaService
+
+router = APIRouter(prefix="/api/esquelas", tags=["Esquelas"])
+
+
+def _respuesta_archivo(db: Session, lote: str, formato: str) -> StreamingResponse:
+    contenido = EsquelaService.generar_archivo(db, lote, formato)
+    return StreamingResponse(
+        contenido,
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="esquelas_{lote}.zip"',
+            "X-Esquelas-Lote": lote
+        }
+    )
+
+
+# ============ ENDPOINTS ESTÁTICOS (PRIMERO) ============
+
+# ---- PLANTILLAS ----
+@router.post("/plantillas", response_model=PlantillaEsquelaReadDTO, status_code=status.HTTP_201_CREATED)
+def crear_plantilla(plantilla: PlantillaEsquelaCreateDTO, db: Session = Depends(get_db)):
+    """
+    Crea una plantilla de esquela
+    
+    El contenido usa marcadores `$variable`: $nombre_estudiante, $nombre_tutor,
+    $curso, $motivo, $fecha y las claves de `datos` de cada estudiante.
+    Los párrafos se separan con una línea en blanco.
+    """
+    return PlantillaService.crear_plantilla(db, plantilla)
+
+
+@router.get("/plantillas", response_model=List[PlantillaEsquelaReadDTO])
+def listar_plantillas(db: Session = Depends(get_db)):
+    """Lista las plantillas de esquela"""
+    return PlantillaService.listar_plantillas(db)
+
+
+@router.put("/plantillas/{id_plantilla}", response_model=PlantillaEsquelaReadDTO)
+def actualizar_plantilla(id_plantilla: int, plantilla: PlantillaEsquelaUpdateDTO, db: Session = Depends(get_db)):
+    """Actualiza una plantilla; cada cambio incrementa su versión"""
+    actualizada = PlantillaService.actualizar_plantilla(db, id_plantilla, plantilla)
+    if not actualizada:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Plantilla con ID {id_plantilla} no encontrada"
+        )
+    return actualizada
+
+
+# ---- LOTES ----
+@router.post("/lote", status_code=status.HTTP_201_CREATED,
+             responses={201: {"model": EsquelaLoteResultDTO}, 200: {"content": {"application/zip": {}}}})
+def emitir_lote(
+    data: EsquelaLoteCreateDTO,
+    formato: Optional[str] = Query(None, pattern="^(html|pdf)$",
+                                   description="Si se indica, responde directamente con el ZIP de esquelas"),
+    db: Session = Depends(get_db)
+):
+    """
+    Emite esquelas para un curso o una lista de estudiantes (hasta 500) en una petición
+    
+    - Sin **formato**: registra el lote y retorna su identificador
+    - Con **formato=html|pdf**: registra el lote y responde con un ZIP que se
+      transmite a medida que cada esquela se genera (header `X-Esquelas-Lote`)
+    
+    Ejemplo:
+    ```json
+    {
+        "id_plantilla": 1,
+        "id_curso": 3,
+        "motivo": "Inasistencias reiteradas",
+        "estudiantes": [
+            {"id_estudiante": 101, "nombre_estudiante": "Ana Rojas", "nombre_tutor": "Carlos Rojas"}
+        ]
+    }
+    ```
+    """
+    resultado = EsquelaService.emitir_lote(db, data)
+    if formato:
+        respuesta = _respuesta_archivo(db, resultado.lote, formato)
+        respuesta.status_code = status.HTTP_201_CREATED
+        return respuesta
+    return resultado
+
+
+@router.get("/lote/{lote}", response_model=List[EsquelaReadDTO])
+def listar_lote(lote: str, db: Session = Depends(get_db)):
+    """Lista las esquelas de un lote"""
+    esquelas = EsquelaService.listar_lote(db, lote)
+    if not esquelas:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Lote {lote} no encontrado")
+    return esquelas
+
+
+@router.get("/lote/{lote}/archivo")
+def descargar_lote(
+    lote: str,
+    formato: str = Query("pdf", pattern="^(html|pdf)$"),
+    db: Session = Depends(get_db)
+):
+    """Descarga todas las esquelas de un lote en un solo ZIP"""
+    return _respuesta_archivo(db, lote, formato)
+
+
+@router.get("/estudiante/{id_estudiante}", response_model=List[EsquelaReadDTO])
+def listar_por_estudiante(id_estudiante: int, db: Session = Depends(get_db)):
+    """Esquelas emitidas para un estudiante"""
+    return EsquelaService.listar_por_estudiante(db, id_estudiante)
@@ -0,0 +1,103 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, List, Dict
+from datetime import datetime, date
+from string import Template
+
+
+# ============ PLANTILLA DTOs ============
+class PlantillaEsquelaCreateDTO(BaseModel):
+    """
+    Variables disponibles en `contenido` y `asunto`: $nombre_estudiante,
+    $nombre_tutor, $curso, $motivo, $fecha, además de las claves de `datos`
+    de cada estudiante
+    """
+    nombre: str = Field(..., min_length=3, max_length=100)
+    tipo: str = Field(..., pattern="^(reconocimiento|orientacion)$")
+    asunto: str = Field(..., min_length=3, max_length=200)
+    contenido: str = Field(..., min_length=10)
+
+    @field_validator('asunto', 'contenido')
+    def validar_plantilla(cls, v):
+        if not Template(v).is_valid():
+            raise ValueError('Plantilla inválida: use $variable o ${variable}, y $$ para el símbolo $')
+        return v
+
+
+class PlantillaEsquelaUpdateDTO(BaseModel):
+    nombre: Optional[str] = Field(None, min_length=3, max_length=100)
+    asunto: Optional[str] = Field(None, min_length=3, max_length=200)
+    contenido: Optional[str] = Field(None, min_length=10)
+    estado: Optional[str] = Field(None, pattern="^(activo|inactivo)$")
+
+    @field_validator('asunto', 'contenido')
+    def validar_plantilla(cls, v):
+        if v is not None and not Template(v).is_valid():
+            raise ValueError('Plantilla inválida: use $variable o ${variable}, y $$ para el símbolo $')
+        return v
+
+    class Config:
+        extra = "ignore"
+
+
+class PlantillaEsquelaReadDTO(BaseModel):
+    id_plantilla: int
+    nombre: str
+    tipo: str
+    asunto: str
+    contenido: str
+    version: int
+    estado: str
+    fecha_actualizacion: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# ============ ESQUELA DTOs ============
+class EsquelaEstudianteDTO(BaseModel):
+    id_estudiante: int = Field(..., gt=0)
+    nombre_estudiante: str = Field(..., min_length=3, max_length=150)
+    nombre_tutor: Optional[str] = Field(None, max_length=150)
+    motivo: Optional[str] = None
+    datos: Dict[str, str] = {}
+
+
+class EsquelaLoteCreateDTO(BaseModel):
+    """Esquelas de una misma plantilla para un curso completo o una lista de estudiantes"""
+    id_plantilla: int = Field(..., gt=0)
+    id_curso: int = Field(..., gt=0)
+    motivo: str = Field(..., min_length=3)
+    fecha_emision: date = Field(default_factory=date.today)
+    emitido_por: Optional[int] = None
+    estudiantes: List[EsquelaEstudianteDTO] = Field(..., min_length=1, max_length=500)
+
+    @field_validator('estudiantes')
+    def sin_repetidos(cls, v):
+        unicos = {}
+        for estudiante in v:
+            unicos.setdefault(estudiante.id_estudiante, estudiante)
+        return list(unicos.values())
+
+
+class EsquelaReadDTO(BaseModel):
+    id_esquela: int
+    lote: str
+    id_plantilla: int
+    id_curso: int
+    id_estudiante: int
+    nombre_estudiante: str
+    nombre_tutor: Optional[str] = None
+    motivo: str
+    fecha_emision: date
+    emitido_por: Optional[int] = None
+    fecha_registro: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class EsquelaLoteResultDTO(BaseModel):
+    lote: str
+    id_plantilla: int
+    id_curso: int
+    emitidas: int
@@ -0,0 +1,46 @@
+from sqlalchemy import Column, BigInteger, Integer, String, ForeignKey, DateTime, Date, Text, Enum, Index
+from app.config.database import Base
+from datetime import datetime
+
+
+class PlantillaEsquela(Base):
+    """
+    Plantilla de esquela
+
+    `contenido` usa marcadores $variable (string.Template). `version` se
+    incrementa en cada cambio e invalida la plantilla compilada en caché.
+    """
+    __tablename__ = "plantillas_esquela"
+
+    id_plantilla = Column(Integer, primary_key=True, autoincrement=True)
+    nombre = Column(String(100), nullable=False, unique=True)
+    tipo = Column(Enum('reconocimiento', 'orientacion'), nullable=False)
+    asunto = Column(String(200), nullable=False)
+    contenido = Column(Text, nullable=False)
+    version = Column(Integer, nullable=False, default=1)
+    estado = Column(Enum('activo', 'inactivo'), nullable=False, default='activo')
+    fecha_actualizacion = Column(DateTime, default=datetime.utcnow)
+
+
+class Esquela(Base):
+    __tablename__ = "esquelas"
+    __table_args__ = (
+        Index("ix_esquelas_lote", "lote"),
+        Index("ix_esquelas_estudiante", "id_estudiante"),
+        Index("ix_esquelas_curso_fecha", "id_curso", "fecha_emision"),
+    )
+
+    id_esquela = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    lote = Column(String(32), nullable=False)
+    id_plantilla = Column(Integer, ForeignKey("plantillas_esquela.id_plantilla"), nullable=False)
+    id_curso = Column(Integer, ForeignKey("cursos.id_curso"), nullable=False)
+    # El módulo de estudiantes todavía no tiene tabla: se guardan ID y nombres sin FK
+    id_estudiante = Column(Integer, nullable=False)
+    nombre_estudiante = Column(String(150), nullable=False)
+    nombre_tutor = Column(String(150), nullable=True)
+    motivo = Column(Text, nullable=False)
+    # Variables adicionales de la plantilla (JSON)
+    datos = Column(Text, nullable=True)
+    fecha_emision = Column(Date, nullable=False)
+    emitido_por = Column(Integer, ForeignKey("personas.id_persona"), nullable=True)
+    fecha_registro = Column(DateTime, default=datetime.utcnow)
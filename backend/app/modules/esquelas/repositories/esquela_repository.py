@@ -0,0 +1,80 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.modules.esquelas.models.esquela_models import PlantillaEsquela, Esquela
+from app.modules.profesores.models.profesor_models import Curso
+
+
+# ============ PLANTILLA REPOSITORY ============
+class PlantillaRepository:
+
+    @staticmethod
+    def create(db: Session, plantilla_data: dict) -> PlantillaEsquela:
+        plantilla = PlantillaEsquela(**plantilla_data, version=1, fecha_actualizacion=datetime.utcnow())
+        db.add(plantilla)
+        db.commit()
+        db.refresh(plantilla)
+        return plantilla
+
+    @staticmethod
+    def get_all(db: Session) -> List[PlantillaEsquela]:
+        return db.query(PlantillaEsquela).order_by(PlantillaEsquela.nombre).all()
+
+    @staticmethod
+    def get_by_id(db: Session, id_plantilla: int) -> Optional[PlantillaEsquela]:
+        return db.query(PlantillaEsquela).filter(PlantillaEsquela.id_plantilla == id_plantilla).first()
+
+    @staticmethod
+    def update(db: Session, plantilla: PlantillaEsquela, update_data: dict) -> PlantillaEsquela:
+        """Aplica los cambios e incrementa la versión (invalida la plantilla compilada)"""
+        for key, value in update_data.items():
+            setattr(plantilla, key, value)
+        plantilla.version += 1
+        plantilla.fecha_actualizacion = datetime.utcnow()
+        db.commit()
+        db.refresh(plantilla)
+        return plantilla
+
+
+# ============ ESQUELA REPOSITORY ============
+class EsquelaRepository:
+
+    @staticmethod
+    def bulk_create(db: Session, filas: List[dict]) -> int:
+        """Inserta todas las esquelas del lote con un solo executemany. No hace commit."""
+        if not filas:
+            return 0
+        db.execute(insert(Esquela), filas)
+        return len(filas)
+
+    @staticmethod
+    def get_curso(db: Session, id_curso: int) -> Optional[Curso]:
+        return db.query(Curso).filter(Curso.id_curso == id_curso).first()
+
+    @staticmethod
+    def get_by_lote(db: Session, lote: str) -> List[Esquela]:
+        return db.query(Esquela).filter(Esquela.lote == lote).order_by(Esquela.id_esquela).all()
+
+    @staticmethod
+    def get_by_lote_con_plantilla(db: Session, lote: str) -> List[Tuple[Esquela, PlantillaEsquela, Curso]]:
+        """Esquelas del lote junto con su plantilla y curso, en una sola consulta"""
+        return (
+            db.query(Esquela, PlantillaEsquela, Curso)
+            .join(PlantillaEsquela, PlantillaEsquela.id_plantilla == Esquela.id_plantilla)
+            .join(Curso, Curso.id_curso == Esquela.id_curso)
+            .filter(Esquela.lote == lote)
+            .order_by(Esquela.id_esquela)
+            .all()
+        )
+
+    @staticmethod
+    def get_by_estudiante(db: Session, id_estudiante: int) -> List[Esquela]:
+        return (
+            db.query(Esquela)
+            .filter(Esquela.id_estudiante == id_estudiante)
+            .order_by(Esquela.fecha_emision.desc(), Esquela.id_esquela.desc())
+            .all()
+        )
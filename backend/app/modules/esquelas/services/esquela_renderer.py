@@ -0,0 +1,182 @@
+"""
+Render de esquelas en un pool de procesos
+
+Las funciones de este módulo corren dentro de los procesos del pool: solo
+dependen de la biblioteca estándar (y de reportlab para PDF) y reciben datos
+planos, nunca objetos de SQLAlchemy. Cada proceso compila cada plantilla una
+sola vez y la guarda en caché por (id_plantilla, version).
+"""
+import html
+import io
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from string import Template
+from typing import Dict, Iterator, List, Tuple
+
+from app.shared.services.cache_registry import cache_registry
+
+
+
+def _workers_por_defecto() -> int:
+    """CPUs repartidas entre los workers web: cada uno tiene su propio pool"""
+    web_workers = int(os.getenv("WEB_WORKERS", 1)) or os.cpu_count() or 1
+    return max(1, (os.cpu_count() or 2) // web_workers)
+
+
+ESQUELAS_WORKERS = int(os.getenv("ESQUELAS_WORKERS", 0)) or _workers_por_defecto()
+# Por debajo de este número de esquelas se renderiza en el proceso actual:
+# el costo de enviar el trabajo al pool supera al del render
+ESQUELAS_MIN_POOL = int(os.getenv("ESQUELAS_MIN_POOL", 8))
+# Esquelas por envío al pool
+_TAMANO_BLOQUE = 10
+
+FORMATOS = ("html", "pdf")
+
+# (id_plantilla, version) -> (asunto, contenido) compilados
+_compiladas: Dict[Tuple[int, int], Tuple[Template, Template]] = {}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+_PARRAFOS = re.compile(r"\n\s*\n")
+
+_HTML_BASE = """<!DOCTYPE html>
+<html lang="es">
+<head><meta charset="utf-8"><title>{titulo}</title></head>
+<body>
+{cuerpo}
+</body>
+</html>
+"""
+
+
+def _compilar(id_plantilla: int, version: int, asunto: str, contenido: str) -> Tuple[Template, Template]:
+    clave = (id_plantilla, version)
+    compilada = _compiladas.get(clave)
+    if compilada is None:
+        compilada = (Template(asunto), Template(contenido))
+        _compiladas[clave] = compilada
+    return compilada
+
+
+def _renderizar_html(asunto: Template, contenido: Template, variables: Dict[str, str]) -> bytes:
+    escapadas = {clave: html.escape(str(valor)) for clave, valor in variables.items()}
+    titulo = asunto.safe_substitute(escapadas)
+    cuerpo = "\n".join(
+        f"<p>{parrafo.strip()}</p>"
+        for parrafo in _PARRAFOS.split(contenido.safe_substitute(escapadas)) if parrafo.strip()
+    )
+    return _HTML_BASE.format(titulo=titulo, cuerpo=f"<h1>{titulo}</h1>\n{cuerpo}").encode("utf-8")
+
+
+def _renderizar_pdf(asunto: Template, contenido: Template, variables: Dict[str, str]) -> bytes:
+    """PDF A4 con reportlab; el contenido admite su marcado en línea (<b>, <i>, <br/>)"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+    escapadas = {clave: html.escape(str(valor)) for clave, valor in variables.items()}
+    estilos = getSampleStyleSheet()
+    titulo = asunto.safe_substitute(escapadas)
+    elementos = [Paragraph(titulo, estilos["Title"]), Spacer(1, 12)]
+    for parrafo in _PARRAFOS.split(contenido.safe_substitute(escapadas)):
+        if parrafo.strip():
+            elementos.append(Paragraph(parrafo.strip(), estilos["Normal"]))
+            elementos.append(Spacer(1, 8))
+
+    salida = io.BytesIO()
+    SimpleDocTemplate(salida, pagesize=A4, title=titulo).build(elementos)
+    return salida.getvalue()
+
+
+def renderizar_bloque(formato: str, plantillas: Dict[int, tuple], trabajos: List[dict]) -> List[Tuple[str, bytes]]:
+    """
+    Renderiza un bloque de esquelas (se ejecuta dentro del pool)
+
+    plantillas: {id_plantilla: (version, asunto, contenido)}
+    trabajos: [{"nombre_archivo", "id_plantilla", "variables"}]
+    """
+    renderizar = _renderizar_pdf if formato == "pdf" else _renderizar_html
+    resultado = []
+    for trabajo in trabajos:
+        version, asunto, contenido = plantillas[trabajo["id_plantilla"]]
+        compilada = _compilar(trabajo["id_plantilla"], version, asunto, contenido)
+        resultado.append((f"{trabajo['nombre_archivo']}.{formato}", renderizar(*compilada, trabajo["variables"])))
+    return resultado
+
+
+def renderizar(formato: str, plantillas: Dict[int, tuple], trabajos: List[dict]) -> Iterator[Tuple[str, bytes]]:
+    """
+    Renderiza todas las esquelas y las entrega en orden a medida que terminan
+
+    Los lotes pequeños se renderizan aquí mismo; los grandes se reparten en
+    bloques entre los procesos del pool.
+    """
+    if len(trabajos) < ESQUELAS_MIN_POOL:
+        yield from renderizar_bloque(formato, plantillas, trabajos)
+        return
+
+    bloques = [trabajos[i:i + _TAMANO_BLOQUE] for i in range(0, len(trabajos), _TAMANO_BLOQUE)]
+    futuros = [_obtener_pool().submit(renderizar_bloque, formato, plantillas, bloque) for bloque in bloques]
+    try:
+        for futuro in futuros:
+            yield from futuro.result()
+    finally:
+        for futuro in futuros:
+            futuro.cancel()
+
+
+def pdf_disponible() -> bool:
+    try:
+        import reportlab  # noqa: F401
+        return True
+    except ModuleNotFoundError:
+        return False
+
+
+def _obtener_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=ESQUELAS_WORKERS)
+        return _pool
+
+
+def cerrar_pool() -> None:
+    """Detiene los procesos del pool (al apagar la aplicación)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def estadisticas_cache() -> Dict:
+    return {
+        "plantillas_compiladas": len(_compiladas),
+        "pool_activo": _pool is not None,
+        "workers": ESQUELAS_WORKERS
+    }
+
+
+def vaciar_cache() -> None:
+    """
+    Descarta las plantillas compiladas de este proceso y reemplaza el pool,
+    cuyos procesos guardan su propia copia de la caché. Los lotes en curso
+    terminan en el pool anterior, que se cierra solo al quedar vacío; los
+    siguientes usan uno nuevo.
+    """
+    global _pool
+    _compiladas.clear()
+    with _pool_lock:
+        anterior, _pool = _pool, None
+    if anterior is not None:
+        anterior.shutdown(wait=False)
+
+
+cache_registry.registrar(
+    "esquelas.plantillas", estadisticas_cache, vaciar_cache,
+    "Plantillas de esquela compiladas (el pool se reemplaza al vaciar)"
+)
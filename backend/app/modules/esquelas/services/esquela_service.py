@@ -0,0 +1,166 @@
+import json
+import re
+import unicodedata
+import uuid
+import zipfile
+from typing import Dict, Iterator, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.modules.esquelas.dto.esquela_dto import (
+    PlantillaEsquelaCreateDTO, PlantillaEsquelaUpdateDTO, PlantillaEsquelaReadDTO,
+    EsquelaLoteCreateDTO, EsquelaLoteResultDTO, EsquelaReadDTO
+)
+from app.modules.esquelas.repositories.esquela_repository import PlantillaRepository, EsquelaRepository
+from app.modules.esquelas.services import esquela_renderer
+
+
+class _SalidaZip:
+    """Destino no posicionable para ZipFile: acumula lo escrito hasta que se lo vacía"""
+
+    def __init__(self):
+        self._partes: List[bytes] = []
+
+    def write(self, datos: bytes) -> int:
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self) -> None:
+        pass
+
+    def vaciar(self) -> bytes:
+        datos = b"".join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+# ============ PLANTILLA SERVICE ============
+class PlantillaService:
+
+    @staticmethod
+    def crear_plantilla(db: Session, data: PlantillaEsquelaCreateDTO) -> PlantillaEsquelaReadDTO:
+        try:
+            return PlantillaEsquelaReadDTO.from_orm(PlantillaRepository.create(db, data.model_dump()))
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=f"Ya existe una plantilla con el nombre '{data.nombre}'")
+
+    @staticmethod
+    def listar_plantillas(db: Session) -> List[PlantillaEsquelaReadDTO]:
+        return [PlantillaEsquelaReadDTO.from_orm(p) for p in PlantillaRepository.get_all(db)]
+
+    @staticmethod
+    def actualizar_plantilla(db: Session, id_plantilla: int,
+                             data: PlantillaEsquelaUpdateDTO) -> Optional[PlantillaEsquelaReadDTO]:
+        plantilla = PlantillaRepository.get_by_id(db, id_plantilla)
+        if not plantilla:
+            return None
+        try:
+            plantilla = PlantillaRepository.update(db, plantilla, data.model_dump(exclude_unset=True))
+            return PlantillaEsquelaReadDTO.from_orm(plantilla)
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Error al actualizar la plantilla")
+
+
+# ============ ESQUELA SERVICE ============
+class EsquelaService:
+
+    @staticmethod
+    def emitir_lote(db: Session, data: EsquelaLoteCreateDTO) -> EsquelaLoteResultDTO:
+        """Registra las esquelas de todos los estudiantes en una sola transacción"""
+        plantilla = PlantillaRepository.get_by_id(db, data.id_plantilla)
+        if not plantilla:
+            raise HTTPException(status_code=404, detail=f"Plantilla con ID {data.id_plantilla} no encontrada")
+        if plantilla.estado != "activo":
+            raise HTTPException(status_code=400, detail=f"La plantilla '{plantilla.nombre}' está inactiva")
+        if not EsquelaRepository.get_curso(db, data.id_curso):
+            raise HTTPException(status_code=404, detail=f"Curso con ID {data.id_curso} no encontrado")
+
+        lote = uuid.uuid4().hex
+        filas = [
+            {
+                "lote": lote,
+                "id_plantilla": data.id_plantilla,
+                "id_curso": data.id_curso,
+                "id_estudiante": estudiante.id_estudiante,
+                "nombre_estudiante": estudiante.nombre_estudiante,
+                "nombre_tutor": estudiante.nombre_tutor,
+                "motivo": estudiante.motivo or data.motivo,
+                "datos": json.dumps(estudiante.datos, ensure_ascii=False) if estudiante.datos else None,
+                "fecha_emision": data.fecha_emision,
+                "emitido_por": data.emitido_por
+            }
+            for estudiante in data.estudiantes
+        ]
+        try:
+            emitidas = EsquelaRepository.bulk_create(db, filas)
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error al emitir las esquelas: {str(e.orig)}")
+
+        return EsquelaLoteResultDTO(lote=lote, id_plantilla=data.id_plantilla, id_curso=data.id_curso, emitidas=emitidas)
+
+    @staticmethod
+    def listar_lote(db: Session, lote: str) -> List[EsquelaReadDTO]:
+        return [EsquelaReadDTO.from_orm(e) for e in EsquelaRepository.get_by_lote(db, lote)]
+
+    @staticmethod
+    def listar_por_estudiante(db: Session, id_estudiante: int) -> List[EsquelaReadDTO]:
+        return [EsquelaReadDTO.from_orm(e) for e in EsquelaRepository.get_by_estudiante(db, id_estudiante)]
+
+    @staticmethod
+    def generar_archivo(db: Session, lote: str, formato: str) -> Iterator[bytes]:
+        """
+        Prepara el render del lote y retorna el ZIP como generador de bytes
+
+        Los datos se leen de la BD antes de empezar a transmitir; el render se
+        hace en el pool de procesos y cada esquela se agrega al ZIP (y se envía)
+        apenas está lista.
+        """
+        if formato not in esquela_renderer.FORMATOS:
+            raise HTTPException(status_code=400, detail=f"Formato inválido. Use: {', '.join(esquela_renderer.FORMATOS)}")
+        if formato == "pdf" and not esquela_renderer.pdf_disponible():
+            raise HTTPException(status_code=400, detail="Generación de PDF no disponible: instale reportlab")
+
+        filas = EsquelaRepository.get_by_lote_con_plantilla(db, lote)
+        if not filas:
+            raise HTTPException(status_code=404, detail=f"Lote {lote} no encontrado")
+
+        plantillas: Dict[int, tuple] = {}
+        trabajos = []
+        for esquela, plantilla, curso in filas:
+            plantillas[plantilla.id_plantilla] = (plantilla.version, plantilla.asunto, plantilla.contenido)
+            trabajos.append({
+                "nombre_archivo": f"{esquela.id_esquela}_{EsquelaService._slug(esquela.nombre_estudiante)}",
+                "id_plantilla": plantilla.id_plantilla,
+                "variables": {
+                    **json.loads(esquela.datos or "{}"),
+                    "nombre_estudiante": esquela.nombre_estudiante,
+                    "nombre_tutor": esquela.nombre_tutor or "Padre/Madre de familia",
+                    "curso": curso.nombre_curso,
+                    "motivo": esquela.motivo,
+                    "fecha": esquela.fecha_emision.strftime("%d/%m/%Y")
+                }
+            })
+
+        # Los PDF ya vienen comprimidos
+        compresion = zipfile.ZIP_STORED if formato == "pdf" else zipfile.ZIP_DEFLATED
+        return EsquelaService._zip_stream(formato, plantillas, trabajos, compresion)
+
+    @staticmethod
+    def _zip_stream(formato: str, plantillas: Dict[int, tuple], trabajos: List[dict], compresion: int) -> Iterator[bytes]:
+        salida = _SalidaZip()
+        with zipfile.ZipFile(salida, "w", compression=compresion) as archivo:
+            for nombre, contenido in esquela_renderer.renderizar(formato, plantillas, trabajos):
+                archivo.writestr(nombre, contenido)
+                yield salida.vaciar()
+        yield salida.vaciar()
+
+    @staticmethod
+    def _slug(texto: str) -> str:
+        sin_tildes = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode()
+        return re.sub(r"[^A-Za-z0-9]+", "_", sin_tildes).strip("_").lower() or "esquela"
@@ -0,0 +1,131 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import date
+from app.config.database import get_db
+from app.modules.incidentes.dto.incidente_dto import (
+    IncidenteCreateDTO, IncidenteLoteCreateDTO, IncidenteReadDTO, IncidenteLoteResultDTO,
+    IncidenteResumenDTO
+)
+from app.modules.incidentes.services.incidente_service import IncidenteService
+from app.shared.decorators.auth_decorators import require_roles
+
+router = APIRouter(prefix="/api/incidentes", tags=["Incidentes"])
+
+PERIODO_PATTERN = "^[0-9]{4}-(0[1-9]|1[0-2])$"
+
+
+# ============ ENDPOINTS ESTÁTICOS (PRIMERO) ============
+
+@router.post("/", response_model=IncidenteReadDTO, status_code=status.HTTP_201_CREATED)
+def registrar_incidente(incidente: IncidenteCreateDTO, db: Session = Depends(get_db)):
+    """
+    Registra un incidente de un estudiante
+    
+    Los incidentes no se editan ni eliminan: las correcciones se registran
+    como un incidente nuevo.
+    
+    - **tipo**: conducta, academico, convivencia, salud, asistencia u otro
+    - **gravedad**: leve, moderada o grave
+    """
+    return IncidenteService.registrar_incidente(db, incidente)
+
+
+@router.post("/lote", response_model=IncidenteLoteResultDTO, status_code=status.HTTP_201_CREATED)
+def registrar_lote(lote: IncidenteLoteCreateDTO, db: Session = Depends(get_db)):
+    """
+    Registra el mismo incidente para varios estudiantes de un curso (hasta 500)
+    
+    Todo el lote se guarda en una sola transacción.
+    
+    Ejemplo:
+    ```json
+    {
+        "id_curso": 3,
+        "estudiantes": [101, 102, 103],
+        "tipo": "convivencia",
+        "gravedad": "moderada",
+        "descripcion": "Pelea en el recreo",
+        "fecha_incidente": "2025-05-12"
+    }
+    ```
+    """
+    return IncidenteService.registrar_lote(db, lote)
+
+
+@router.get("/", response_model=List[IncidenteReadDTO])
+def listar_por_fechas(
+    desde: date = Query(..., description="Fecha inicial (YYYY-MM-DD)"),
+    hasta: date = Query(..., description="Fecha final (YYYY-MM-DD)"),
+    tipo: Optional[str] = Query(None, pattern="^(conducta|academico|convivencia|salud|asistencia|otro)$"),
+    limite: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """Lista incidentes de todos los cursos en un rango de fechas"""
+    return IncidenteService.listar_por_fechas(db, desde, hasta, tipo, limite, offset)
+
+
+@router.get("/resumen", response_model=IncidenteResumenDTO)
+def obtener_resumen(
+    id_curso: Optional[int] = Query(None, description="Filtrar por curso"),
+    desde: Optional[str] = Query(None, pattern=PERIODO_PATTERN, description="Mes inicial (YYYY-MM)"),
+    hasta: Optional[str] = Query(None, pattern=PERIODO_PATTERN, description="Mes final (YYYY-MM)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Totales de incidentes por tipo, gravedad y mes para el dashboard
+    
+    Se leen de los contadores por curso y mes, que se actualizan al registrar
+    cada incidente.
+    """
+    return IncidenteService.obtener_resumen(db, id_curso, desde, hasta)
+
+
+@router.post("/contadores/recalcular", dependencies=[Depends(require_roles("admin"))])
+def recalcular_contadores(db: Session = Depends(get_db)):
+    """
+    Reconstruye los contadores desde la tabla de incidentes (solo admin)
+
+    Mientras corre, los registros de incidentes esperan a que termine.
+    """
+    total = IncidenteService.recalcular_contadores(db)
+    return {"message": "Contadores recalculados", "contadores": total}
+
+
+@router.get("/estudiante/{id_estudiante}", response_model=List[IncidenteReadDTO])
+def listar_por_estudiante(
+    id_estudiante: int,
+    limite: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """Historial de incidentes de un estudiante, del más reciente al más antiguo"""
+    return IncidenteService.listar_por_estudiante(db, id_estudiante, limite, offset)
+
+
+@router.get("/curso/{id_curso}", response_model=List[IncidenteReadDTO])
+def listar_por_curso(
+    id_curso: int,
+    desde: Optional[date] = Query(None),
+    hasta: Optional[date] = Query(None),
+    limite: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """Incidentes de un curso, opcionalmente en un rango de fechas"""
+    return IncidenteService.listar_por_curso(db, id_curso, desde, hasta, limite, offset)
+
+
+# ============ ENDPOINTS DINÁMICOS (DESPUÉS) ============
+
+@router.get("/{id_incidente}", response_model=IncidenteReadDTO)
+def obtener_incidente(id_incidente: int, db: Session = Depends(get_db)):
+    """Obtiene un incidente por su ID"""
+    incidente = IncidenteService.obtener_incidente(db, id_incidente)
+    if not incidente:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Incidente con ID {id_incidente} no encontrado"
+        )
+    return incidente
@@ -0,0 +1,77 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, List, Dict
+from datetime import datetime, date
+
+TIPO_PATTERN = "^(conducta|academico|convivencia|salud|asistencia|otro)$"
+GRAVEDAD_PATTERN = "^(leve|moderada|grave)$"
+
+
+# ============ INCIDENTE DTOs ============
+class IncidenteCreateDTO(BaseModel):
+    id_estudiante: int = Field(..., gt=0)
+    id_curso: int = Field(..., gt=0)
+    tipo: str = Field(..., pattern=TIPO_PATTERN)
+    gravedad: str = Field(default="leve", pattern=GRAVEDAD_PATTERN)
+    descripcion: str = Field(..., min_length=3)
+    fecha_incidente: date
+    registrado_por: Optional[int] = None
+
+
+class IncidenteLoteCreateDTO(BaseModel):
+    """Un mismo incidente registrado para varios estudiantes de un curso"""
+    id_curso: int = Field(..., gt=0)
+    estudiantes: List[int] = Field(..., min_length=1, max_length=500)
+    tipo: str = Field(..., pattern=TIPO_PATTERN)
+    gravedad: str = Field(default="leve", pattern=GRAVEDAD_PATTERN)
+    descripcion: str = Field(..., min_length=3)
+    fecha_incidente: date
+    registrado_por: Optional[int] = None
+
+    @field_validator('estudiantes')
+    def sin_repetidos(cls, v):
+        if any(id_estudiante <= 0 for id_estudiante in v):
+            raise ValueError('Los IDs de estudiante deben ser mayores a 0')
+        return list(dict.fromkeys(v))
+
+
+class IncidenteReadDTO(BaseModel):
+    id_incidente: int
+    id_estudiante: int
+    id_curso: int
+    tipo: str
+    gravedad: str
+    descripcion: str
+    fecha_incidente: date
+    registrado_por: Optional[int] = None
+    lote: Optional[str] = None
+    fecha_registro: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class IncidenteLoteResultDTO(BaseModel):
+    lote: str
+    id_curso: int
+    fecha_incidente: date
+    registrados: int
+
+
+# ============ CONTADORES DTOs ============
+class IncidenteContadorDTO(BaseModel):
+    id_curso: int
+    periodo: str
+    tipo: str
+    gravedad: str
+    total: int
+
+    class Config:
+        from_attributes = True
+
+
+class IncidenteResumenDTO(BaseModel):
+    total: int
+    por_tipo: Dict[str, int] = {}
+    por_gravedad: Dict[str, int] = {}
+    por_periodo: Dict[str, int] = {}
+    detalle: List[IncidenteContadorDTO] = []
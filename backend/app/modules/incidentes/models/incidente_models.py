@@ -0,0 +1,49 @@
+from sqlalchemy import Column, BigInteger, Integer, String, ForeignKey, DateTime, Date, Text, Enum, Index
+from app.config.database import Base
+from datetime import datetime
+
+TIPOS_INCIDENTE = ('conducta', 'academico', 'convivencia', 'salud', 'asistencia', 'otro')
+GRAVEDADES = ('leve', 'moderada', 'grave')
+
+
+class Incidente(Base):
+    """
+    Registro de incidentes (solo inserción)
+
+    Los incidentes no se editan ni se eliminan: una corrección se registra como
+    un incidente nuevo. Así la escritura es siempre un INSERT al final de la
+    tabla y los contadores de incidentes_contadores nunca hay que descontarlos.
+    """
+    __tablename__ = "incidentes"
+    __table_args__ = (
+        Index("ix_incidentes_estudiante_fecha", "id_estudiante", "fecha_incidente"),
+        Index("ix_incidentes_curso_fecha", "id_curso", "fecha_incidente"),
+        Index("ix_incidentes_fecha", "fecha_incidente"),
+    )
+
+    id_incidente = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    # El módulo de estudiantes todavía no tiene tabla: se guarda el ID sin FK
+    id_estudiante = Column(Integer, nullable=False)
+    # El historial no se borra con el curso: un curso con incidentes no se puede eliminar
+    id_curso = Column(Integer, ForeignKey("cursos.id_curso", ondelete="RESTRICT"), nullable=False)
+    tipo = Column(Enum(*TIPOS_INCIDENTE), nullable=False)
+    gravedad = Column(Enum(*GRAVEDADES), nullable=False, default='leve')
+    descripcion = Column(Text, nullable=False)
+    fecha_incidente = Column(Date, nullable=False)
+    # Mes del incidente (YYYY-MM), desnormalizado para mantener los contadores
+    periodo = Column(String(7), nullable=False)
+    registrado_por = Column(Integer, ForeignKey("personas.id_persona"), nullable=True)
+    # Identifica los incidentes registrados juntos en un mismo lote
+    lote = Column(String(32), nullable=True)
+    fecha_registro = Column(DateTime, default=datetime.utcnow)
+
+
+class IncidenteContador(Base):
+    """Conteo de incidentes por curso, mes, tipo y gravedad, actualizado en cada inserción"""
+    __tablename__ = "incidentes_contadores"
+
+    id_curso = Column(Integer, ForeignKey("cursos.id_curso", ondelete="CASCADE"), primary_key=True)
+    periodo = Column(String(7), primary_key=True)
+    tipo = Column(Enum(*TIPOS_INCIDENTE), primary_key=True)
+    gravedad = Column(Enum(*GRAVEDADES), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
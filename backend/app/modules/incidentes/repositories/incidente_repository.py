@@ -0,0 +1,200 @@
+from collections import Counter
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, insert, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.modules.incidentes.models.incidente_models import Incidente, IncidenteContador
+from app.modules.profesores.models.profesor_models import Curso
+from app.shared.services.data_version import DataVersion
+
+# (id_curso, periodo, tipo, gravedad)
+ClaveContador = Tuple[int, str, str, str]
+
+
+# ============ INCIDENTE REPOSITORY ============
+class IncidenteRepository:
+
+    @staticmethod
+    def create(db: Session, incidente_data: dict) -> Incidente:
+        """Inserta un incidente y actualiza su contador. No hace commit."""
+        ContadorRepository.bloquear(db, compartido=True)
+        incidente = Incidente(**incidente_data)
+        db.add(incidente)
+        db.flush()
+        ContadorRepository.incrementar(db, ContadorRepository.claves([incidente_data]))
+        return incidente
+
+    @staticmethod
+    def bulk_create(db: Session, filas: List[dict]) -> int:
+        """
+        Inserta un lote de incidentes con un solo executemany
+
+        Los contadores se agregan en memoria y se actualizan con un upsert por
+        combinación (curso, mes, tipo, gravedad), no por incidente. No hace commit.
+        """
+        if not filas:
+            return 0
+        ContadorRepository.bloquear(db, compartido=True)
+        db.execute(insert(Incidente), filas)
+        ContadorRepository.incrementar(db, ContadorRepository.claves(filas))
+        return len(filas)
+
+    @staticmethod
+    def curso_existe(db: Session, id_curso: int) -> bool:
+        return db.query(Curso.id_curso).filter(Curso.id_curso == id_curso).first() is not None
+
+    @staticmethod
+    def get_by_id(db: Session, id_incidente: int) -> Optional[Incidente]:
+        return db.query(Incidente).filter(Incidente.id_incidente == id_incidente).first()
+
+    @staticmethod
+    def get_by_estudiante(db: Session, id_estudiante: int, limite: int, offset: int) -> List[Incidente]:
+        """Usa ix_incidentes_estudiante_fecha"""
+        return (
+            db.query(Incidente)
+            .filter(Incidente.id_estudiante == id_estudiante)
+            .order_by(Incidente.fecha_incidente.desc(), Incidente.id_incidente.desc())
+            .offset(offset).limit(limite)
+            .all()
+        )
+
+    @staticmethod
+    def get_by_curso(db: Session, id_curso: int, desde: Optional[date], hasta: Optional[date],
+                     limite: int, offset: int) -> List[Incidente]:
+        """Usa ix_incidentes_curso_fecha"""
+        query = db.query(Incidente).filter(Incidente.id_curso == id_curso)
+        if desde:
+            query = query.filter(Incidente.fecha_incidente >= desde)
+        if hasta:
+            query = query.filter(Incidente.fecha_incidente <= hasta)
+        return (
+            query.order_by(Incidente.fecha_incidente.desc(), Incidente.id_incidente.desc())
+            .offset(offset).limit(limite)
+            .all()
+        )
+
+    @staticmethod
+    def get_by_fechas(db: Session, desde: date, hasta: date, tipo: Optional[str],
+                      limite: int, offset: int) -> List[Incidente]:
+        """Usa ix_incidentes_fecha"""
+        query = db.query(Incidente).filter(Incidente.fecha_incidente.between(desde, hasta))
+        if tipo:
+            query = query.filter(Incidente.tipo == tipo)
+        return (
+            query.order_by(Incidente.fecha_incidente.desc(), Incidente.id_incidente.desc())
+            .offset(offset).limit(limite)
+            .all()
+        )
+
+
+# ============ CONTADOR REPOSITORY ============
+class ContadorRepository:
+
+    # Fila de versiones_datos: las inserciones la toman compartida y recalcular exclusiva
+    LOCK_CONTADORES = "incidentes_contadores.lock"
+
+    @staticmethod
+    def bloquear(db: Session, compartido: bool = False) -> None:
+        """Lock entre procesos hasta el commit o rollback de `db`"""
+        DataVersion.bloquear(db.connection(), ContadorRepository.LOCK_CONTADORES, compartido)
+
+    @staticmethod
+    def claves(filas: List[dict]) -> Dict[ClaveContador, int]:
+        return Counter(
+            (f["id_curso"], f["periodo"], f["tipo"], f["gravedad"]) for f in filas
+        )
+
+    @staticmethod
+    def incrementar(db: Session, incrementos: Dict[ClaveContador, int]) -> None:
+        """
+        Suma los incrementos a incidentes_contadores con un upsert atómico
+
+        MySQL usa ON DUPLICATE KEY UPDATE y SQLite/PostgreSQL ON CONFLICT, de
+        modo que dos lotes simultáneos del mismo curso no pierden incrementos.
+        Otros motores usan UPDATE + INSERT (ver _incrementar_portable).
+        """
+        filas = [
+            {"id_curso": id_curso, "periodo": periodo, "tipo": tipo, "gravedad": gravedad, "total": total}
+            for (id_curso, periodo, tipo, gravedad), total in incrementos.items()
+        ]
+        if not filas:
+            return
+
+        dialecto = db.get_bind().dialect.name
+        if dialecto == "mysql":
+            stmt = mysql.insert(IncidenteContador)
+            stmt = stmt.on_duplicate_key_update(total=IncidenteContador.total + stmt.inserted.total)
+        elif dialecto in ("sqlite", "postgresql"):
+            stmt = (sqlite if dialecto == "sqlite" else postgresql).insert(IncidenteContador)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["id_curso", "periodo", "tipo", "gravedad"],
+                set_={"total": IncidenteContador.total + stmt.excluded.total}
+            )
+        else:
+            ContadorRepository._incrementar_portable(db, filas)
+            return
+        db.execute(stmt, filas)
+
+    @staticmethod
+    def _incrementar_portable(db: Session, filas: List[dict], intentos: int = 3) -> None:
+        """
+        UPDATE total = total + n por fila y, si no existía, INSERT en un savepoint
+
+        Si otra transacción insertó la misma clave entre el UPDATE y el INSERT,
+        la clave primaria rechaza el INSERT y se vuelve a intentar el UPDATE.
+        """
+        tabla = IncidenteContador.__table__
+        for fila in filas:
+            clave = and_(
+                tabla.c.id_curso == fila["id_curso"], tabla.c.periodo == fila["periodo"],
+                tabla.c.tipo == fila["tipo"], tabla.c.gravedad == fila["gravedad"]
+            )
+            for intento in range(intentos):
+                if db.execute(update(tabla).where(clave).values(total=tabla.c.total + fila["total"])).rowcount:
+                    break
+                try:
+                    with db.begin_nested():
+                        db.execute(insert(tabla), [fila])
+                    break
+                except IntegrityError:
+                    if intento == intentos - 1:
+                        raise
+
+    @staticmethod
+    def get_contadores(db: Session, id_curso: Optional[int], desde: Optional[str],
+                       hasta: Optional[str]) -> List[IncidenteContador]:
+        query = db.query(IncidenteContador)
+        if id_curso:
+            query = query.filter(IncidenteContador.id_curso == id_curso)
+        if desde:
+            query = query.filter(IncidenteContador.periodo >= desde)
+        if hasta:
+            query = query.filter(IncidenteContador.periodo <= hasta)
+        return query.order_by(
+            IncidenteContador.periodo, IncidenteContador.id_curso,
+            IncidenteContador.tipo, IncidenteContador.gravedad
+        ).all()
+
+    @staticmethod
+    def recalcular(db: Session) -> int:
+        """
+        Reconstruye los contadores desde la tabla incidentes (INSERT ... SELECT). No hace commit.
+
+        Espera a que terminen las inserciones en curso y las bloquea hasta el
+        commit: un incidente confirmado entre el DELETE y el INSERT ... SELECT
+        quedaría contado dos veces (o ninguna).
+        """
+        ContadorRepository.bloquear(db)
+        db.query(IncidenteContador).delete(synchronize_session=False)
+        columnas = (Incidente.id_curso, Incidente.periodo, Incidente.tipo, Incidente.gravedad)
+        origen = select(*columnas, func.count(Incidente.id_incidente)).group_by(*columnas)
+        resultado = db.execute(
+            insert(IncidenteContador).from_select(
+                ["id_curso", "periodo", "tipo", "gravedad", "total"], origen
+            )
+        )
+        return resultado.rowcount
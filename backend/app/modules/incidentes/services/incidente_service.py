@@ -0,0 +1,110 @@
+import uuid
+from datetime import date
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.modules.incidentes.dto.incidente_dto import (
+    IncidenteCreateDTO, IncidenteLoteCreateDTO, IncidenteReadDTO, IncidenteLoteResultDTO,
+    IncidenteContadorDTO, IncidenteResumenDTO
+)
+from app.modules.incidentes.repositories.incidente_repository import IncidenteRepository, ContadorRepository
+
+
+# ============ INCIDENTE SERVICE ============
+class IncidenteService:
+
+    @staticmethod
+    def registrar_incidente(db: Session, data: IncidenteCreateDTO) -> IncidenteReadDTO:
+        IncidenteService._validar_curso(db, data.id_curso)
+        try:
+            incidente = IncidenteRepository.create(db, IncidenteService._fila(data.model_dump()))
+            resultado = IncidenteReadDTO.from_orm(incidente)
+            db.commit()
+            return resultado
+        except IntegrityError as e:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error al registrar el incidente: {str(e.orig)}")
+
+    @staticmethod
+    def registrar_lote(db: Session, data: IncidenteLoteCreateDTO) -> IncidenteLoteResultDTO:
+        """
+        Registra el mismo incidente para todos los estudiantes indicados
+
+        Un executemany para los incidentes y un upsert de contadores, en una sola
+        transacción: o se registra el lote completo o nada.
+        """
+        IncidenteService._validar_curso(db, data.id_curso)
+        lote = uuid.uuid4().hex
+        comun = IncidenteService._fila(data.model_dump(exclude={"estudiantes"}))
+        filas = [{**comun, "id_estudiante": id_estudiante, "lote": lote} for id_estudiante in data.estudiantes]
+        try:
+            registrados = IncidenteRepository.bulk_create(db, filas)
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error al registrar el lote: {str(e.orig)}")
+
+        return IncidenteLoteResultDTO(
+            lote=lote, id_curso=data.id_curso, fecha_incidente=data.fecha_incidente, registrados=registrados
+        )
+
+    @staticmethod
+    def obtener_incidente(db: Session, id_incidente: int) -> Optional[IncidenteReadDTO]:
+        incidente = IncidenteRepository.get_by_id(db, id_incidente)
+        return IncidenteReadDTO.from_orm(incidente) if incidente else None
+
+    @staticmethod
+    def listar_por_estudiante(db: Session, id_estudiante: int, limite: int, offset: int) -> List[IncidenteReadDTO]:
+        incidentes = IncidenteRepository.get_by_estudiante(db, id_estudiante, limite, offset)
+        return [IncidenteReadDTO.from_orm(i) for i in incidentes]
+
+    @staticmethod
+    def listar_por_curso(db: Session, id_curso: int, desde: Optional[date], hasta: Optional[date],
+                         limite: int, offset: int) -> List[IncidenteReadDTO]:
+        incidentes = IncidenteRepository.get_by_curso(db, id_curso, desde, hasta, limite, offset)
+        return [IncidenteReadDTO.from_orm(i) for i in incidentes]
+
+    @staticmethod
+    def listar_por_fechas(db: Session, desde: date, hasta: date, tipo: Optional[str],
+                          limite: int, offset: int) -> List[IncidenteReadDTO]:
+        if desde > hasta:
+            raise HTTPException(status_code=400, detail="La fecha 'desde' debe ser anterior a 'hasta'")
+        incidentes = IncidenteRepository.get_by_fechas(db, desde, hasta, tipo, limite, offset)
+        return [IncidenteReadDTO.from_orm(i) for i in incidentes]
+
+    @staticmethod
+    def obtener_resumen(db: Session, id_curso: Optional[int], desde: Optional[str],
+                        hasta: Optional[str]) -> IncidenteResumenDTO:
+        """Totales para el dashboard, leídos de incidentes_contadores (sin COUNT(*) sobre incidentes)"""
+        detalle = [IncidenteContadorDTO.from_orm(c) for c in ContadorRepository.get_contadores(db, id_curso, desde, hasta)]
+        resumen = IncidenteResumenDTO(total=0, detalle=detalle)
+        for contador in detalle:
+            resumen.total += contador.total
+            resumen.por_tipo[contador.tipo] = resumen.por_tipo.get(contador.tipo, 0) + contador.total
+            resumen.por_gravedad[contador.gravedad] = resumen.por_gravedad.get(contador.gravedad, 0) + contador.total
+            resumen.por_periodo[contador.periodo] = resumen.por_periodo.get(contador.periodo, 0) + contador.total
+        return resumen
+
+    @staticmethod
+    def recalcular_contadores(db: Session) -> int:
+        """Reconstruye los contadores desde cero (migraciones o cargas directas a la tabla)"""
+        try:
+            total = ContadorRepository.recalcular(db)
+            db.commit()
+            return total
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error al recalcular contadores: {str(e)}")
+
+    @staticmethod
+    def _validar_curso(db: Session, id_curso: int) -> None:
+        if not IncidenteRepository.curso_existe(db, id_curso):
+            raise HTTPException(status_code=404, detail=f"Curso con ID {id_curso} no encontrado")
+
+    @staticmethod
+    def _fila(data: dict) -> dict:
+        data["periodo"] = data["fecha_incidente"].strftime("%Y-%m")
+        return data
@@ -1,2 +1,10 @@
 # Profesores y Materias
-from .controllers.profesor_controller import router as profesores_router
\ No newline at end of file
+
+
+def __getattr__(nombre):
+    # El router se importa al pedirlo: importar un modelo o servicio del
+    # módulo no debe cargar sus controladores (ver app/core/routers.py)
+    if nombre == "profesores_router":
+        from .controllers.profesor_controller import router
+        return router
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
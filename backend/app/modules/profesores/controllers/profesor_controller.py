@@ -1,19 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Response, Header, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Union
 from app.config.database import get_db
 from app.modules.profesores.dto.profesor_dto import (
-    ProfesorCreateDTO, ProfesorReadDTO, ProfesorFullDTO, ProfesorUpdateDTO,
+    ProfesorCreateDTO, ProfesorReadDTO, ProfesorFullDTO, ProfesorUpdateDTO, ProfesorDetalleDTO,
+    ProfesorImportResultDTO, PersonaSearchResultDTO,
     MateriaReadDTO, MateriaCreateDTO,
     CursoReadDTO, CursoCreateDTO,
     AsignacionCreateDTO, AsignacionReadDTO, AsignacionReadNombreDTO,
     CargoReadDTO,
-    BloqueHorarioCreateDTO, BloqueHorarioReadDTO, BloqueHorarioUpdateDTO
+    BloqueHorarioCreateDTO, BloqueHorarioReadDTO, BloqueHorarioUpdateDTO,
+    GestionRolloverRequestDTO, GestionRolloverPreviewDTO, GestionRolloverJobDTO,
+    GestionArchivadaDTO, CatalogoBootstrapDTO, DeltaDTO
 )
 from app.modules.profesores.services.profesor_service import (
     ProfesorService, MateriaService, CursoService, AsignacionService, 
     CargoService, BloqueHorarioService
 )
+from app.modules.profesores.services.profesor_import_service import ProfesorImportService
+from app.modules.profesores.services.persona_search_service import PersonaSearchService
+from app.modules.profesores.services.gestion_service import GestionService
+from app.modules.profesores.services.bootstrap_service import BootstrapService
+from app.shared.decorators.auth_decorators import get_autor
+from app.shared.services.base_services import Autor
+from app.shared.services.change_feed import change_feed
 
 router = APIRouter(prefix="/api/profesores", tags=["Profesores"])
 
@@ -22,7 +33,8 @@ router = APIRouter(prefix="/api/profesores", tags=["Profesores"])
 
 # ---- PROFESORES ----
 @router.post("/", response_model=ProfesorReadDTO, status_code=status.HTTP_201_CREATED)
-def crear_profesor(profesor: dict, db: Session = Depends(get_db)):
+def crear_profesor(profesor: dict, db: Session = Depends(get_db),
+                   autor: Autor = Depends(get_autor)):
     """
     Crea un nuevo profesor con sus datos personales
     
@@ -44,12 +56,13 @@ def crear_profesor(profesor: dict, db: Session = Depends(get_db)):
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=f"Datos inválidos: {str(e)}"
         )
-    return ProfesorService.crear_profesor(db, validated_data)
+    return ProfesorService.crear_profesor(db, validated_data, autor)
 
 
-@router.get("/", response_model=List[ProfesorFullDTO])
+@router.get("/", response_model=Union[List[ProfesorFullDTO], DeltaDTO[ProfesorReadDTO]])
 def listar_profesores(
     completo: bool = Query(True, description="Si es True, incluye materias, cursos y carga horaria"),
+    since: Optional[int] = Query(None, ge=0, description="Número de secuencia de la última sincronización (0 = carga inicial)"),
     db: Session = Depends(get_db)
 ):
     """
@@ -57,34 +70,116 @@ def listar_profesores(
     
     - **completo=True**: Incluye materias, cursos asignados y horas semanales
     - **completo=False**: Solo datos básicos
+    - **since=<seq>**: Solo los profesores creados, modificados o eliminados desde esa
+      sincronización (datos básicos), con el nuevo `hasta` para la siguiente
     """
+    if since is not None:
+        return ProfesorService.listar_profesores_delta(db, since)
     if completo:
         return ProfesorService.listar_profesores_completo(db)
     else:
         return ProfesorService.listar_profesores(db)
 
 
+@router.post("/importar", response_model=ProfesorImportResultDTO)
+def importar_profesores(archivo: UploadFile = File(...), db: Session = Depends(get_db),
+                        autor: Autor = Depends(get_autor)):
+    """
+    Importa profesores en bloque desde un archivo CSV o XLSX
+    
+    - La primera fila debe contener los nombres de columna de ProfesorCreateDTO
+      (ci, nombres, apellido_paterno, correo, id_cargo, especialidad, ...)
+    - El archivo se procesa por lotes; las filas válidas se insertan aunque otras fallen
+    - Retorna el total de filas, insertados, rechazados y los errores por fila
+    """
+    return ProfesorImportService.importar(db, archivo.file, archivo.filename, autor)
+
+
+@router.get("/search", response_model=List[PersonaSearchResultDTO])
+def buscar_profesores(
+    q: str = Query(..., min_length=1, description="Texto a buscar (nombres, apellidos, CI o correo)"),
+    limite: int = Query(20, ge=1, le=100, description="Cantidad máxima de resultados"),
+    modo: Optional[str] = Query(None, description="memoria | fulltext (por defecto PERSONA_SEARCH_MODE)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Búsqueda aproximada de profesores ordenada por relevancia
+    
+    - Ignora mayúsculas y tildes ("nunez" encuentra "Núñez")
+    - Admite prefijos ("ma" -> "María", "Martínez") y errores de tipeo leves
+    - Busca también por CI y correo
+    """
+    return PersonaSearchService.buscar(db, q, limite, modo)
+
+
+@router.get("/bootstrap", response_model=CatalogoBootstrapDTO)
+def obtener_bootstrap(
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    db: Session = Depends(get_db)
+):
+    """
+    Snapshot versionado de catálogos para el arranque del frontend
+    
+    - Incluye cargos, materias, cursos y el resumen de profesores en una sola respuesta
+    - El cuerpo se construye una vez por versión de datos y se sirve desde memoria
+    - Reenviar el **ETag** en If-None-Match retorna 304 mientras la versión no cambie
+    - El header **X-Catalogo-Version** indica la versión servida
+    """
+    return BootstrapService.obtener_respuesta(db, if_none_match)
+
+
+@router.get("/cambios")
+async def feed_cambios(
+    request: Request,
+    entidades: Optional[str] = Query(None, description="Filtro separado por comas: profesor,materia,curso,asignacion,bloque"),
+    desde: Optional[int] = Query(None, description="Último ID de evento recibido (alternativa a Last-Event-ID)"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Feed de cambios en vivo (Server-Sent Events)
+    
+    - Evento **cambio**: `{id, entidad, accion, clave, datos, fecha}` con accion
+      creado | actualizado | eliminado | recargar (cambio masivo: recargar la lista)
+    - Evento **resync**: se perdieron eventos; recargar las listas y reconectar
+    - Al reconectar, EventSource reenvía Last-Event-ID y se reciben los eventos pendientes
+    """
+    ultimo_id = desde
+    if last_event_id and last_event_id.isdigit():
+        ultimo_id = int(last_event_id)
+    filtro = {e.strip() for e in entidades.split(",") if e.strip()} if entidades else None
+    return StreamingResponse(
+        change_feed.eventos_sse(ultimo_id, filtro, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 # ---- MATERIAS ----
 @router.post("/materias", response_model=MateriaReadDTO, status_code=status.HTTP_201_CREATED)
-def crear_materia(materia: MateriaCreateDTO, db: Session = Depends(get_db)):
+def crear_materia(materia: MateriaCreateDTO, db: Session = Depends(get_db), autor: Autor = Depends(get_autor)):
     """
     Crea una nueva materia
     
     - **nombre_materia**: Nombre de la materia
     - **nivel**: inicial, primaria, secundaria
     """
-    return MateriaService.crear_materia(db, materia)
+    return MateriaService.crear_materia(db, materia, autor)
 
 
-@router.get("/materias", response_model=List[MateriaReadDTO])
-def listar_materias(db: Session = Depends(get_db)):
-    """Lista todas las materias disponibles"""
+@router.get("/materias", response_model=Union[List[MateriaReadDTO], DeltaDTO[MateriaReadDTO]])
+def listar_materias(
+    since: Optional[int] = Query(None, ge=0, description="Número de secuencia de la última sincronización (0 = carga inicial)"),
+    db: Session = Depends(get_db)
+):
+    """Lista todas las materias disponibles (con **since**, solo los cambios desde esa sincronización)"""
+    if since is not None:
+        return MateriaService.listar_materias_delta(db, since)
     return MateriaService.listar_materias(db)
 
 
 # ---- CURSOS ----
 @router.post("/cursos", response_model=CursoReadDTO, status_code=status.HTTP_201_CREATED)
-def crear_curso(curso: CursoCreateDTO, db: Session = Depends(get_db)):
+def crear_curso(curso: CursoCreateDTO, db: Session = Depends(get_db), autor: Autor = Depends(get_autor)):
     """
     Crea un nuevo curso
     
@@ -92,18 +187,23 @@ def crear_curso(curso: CursoCreateDTO, db: Session = Depends(get_db)):
     - **nivel**: inicial, primaria, secundaria
     - **gestion**: Año de gestión
     """
-    return CursoService.crear_curso(db, curso)
+    return CursoService.crear_curso(db, curso, autor)
 
 
-@router.get("/cursos", response_model=List[CursoReadDTO])
-def listar_cursos(db: Session = Depends(get_db)):
-    """Lista todos los cursos disponibles"""
+@router.get("/cursos", response_model=Union[List[CursoReadDTO], DeltaDTO[CursoReadDTO]])
+def listar_cursos(
+    since: Optional[int] = Query(None, ge=0, description="Número de secuencia de la última sincronización (0 = carga inicial)"),
+    db: Session = Depends(get_db)
+):
+    """Lista todos los cursos disponibles (con **since**, solo los cambios desde esa sincronización)"""
+    if since is not None:
+        return CursoService.listar_cursos_delta(db, since)
     return CursoService.listar_cursos(db)
 
 
 # ---- ASIGNACIONES ----
 @router.post("/asignaciones", response_model=AsignacionReadDTO, status_code=status.HTTP_201_CREATED)
-def asignar_materia(data: AsignacionCreateDTO, db: Session = Depends(get_db)):
+def asignar_materia(data: AsignacionCreateDTO, db: Session = Depends(get_db), autor: Autor = Depends(get_autor)):
     """
     Asigna una materia a un profesor en un curso específico
     
@@ -111,21 +211,38 @@ def asignar_materia(data: AsignacionCreateDTO, db: Session = Depends(get_db)):
     - **id_curso**: ID del curso
     - **id_materia**: ID de la materia
     """
-    return AsignacionService.asignar_materia(db, data)
+    return AsignacionService.asignar_materia(db, data, autor)
 
 
-@router.get("/asignaciones", response_model=List[AsignacionReadDTO])
-def listar_asignaciones(db: Session = Depends(get_db)):
-    """Lista todas las asignaciones (profesor-curso-materia)"""
+@router.get("/asignaciones", response_model=Union[List[AsignacionReadDTO], DeltaDTO[AsignacionReadDTO]])
+def listar_asignaciones(
+    since: Optional[int] = Query(None, ge=0, description="Número de secuencia de la última sincronización (0 = carga inicial)"),
+    db: Session = Depends(get_db)
+):
+    """Lista todas las asignaciones (profesor-curso-materia); con **since**, solo los cambios"""
+    if since is not None:
+        return AsignacionService.listar_asignaciones_delta(db, since)
     return AsignacionService.listar_asignaciones(db)
 
 
+@router.get("/asignaciones/detalle", response_model=List[AsignacionReadNombreDTO])
+def listar_asignaciones_detalle(db: Session = Depends(get_db)):
+    """
+    Lista todas las asignaciones con nombres de profesor, curso y materia
+
+    Reemplaza a una llamada a /{id_persona}/asignaciones por cada profesor,
+    que con muchos profesores agotaba el límite de peticiones por cliente
+    """
+    return AsignacionService.listar_asignaciones_con_nombres(db)
+
+
 @router.delete("/asignaciones", status_code=status.HTTP_204_NO_CONTENT)
 def eliminar_asignacion(
     id_profesor: int = Query(..., description="ID del profesor (tabla profesores)"),
     id_curso: int = Query(..., description="ID del curso"),
     id_materia: int = Query(..., description="ID de la materia"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    autor: Autor = Depends(get_autor)
 ):
     """
     Elimina una asignación específica
@@ -135,7 +252,7 @@ def eliminar_asignacion(
     - id_curso
     - id_materia
     """
-    AsignacionService.eliminar_asignacion(db, id_profesor, id_curso, id_materia)
+    AsignacionService.eliminar_asignacion(db, id_profesor, id_curso, id_materia, autor)
     return None
 
 
@@ -149,7 +266,8 @@ def listar_cargos(db: Session = Depends(get_db)):
 # ---- BLOQUES HORARIOS ----
 @router.post("/bloques", response_model=BloqueHorarioReadDTO, status_code=status.HTTP_201_CREATED, 
              tags=["Horarios"])
-def crear_bloque_horario(bloque: BloqueHorarioCreateDTO, db: Session = Depends(get_db)):
+def crear_bloque_horario(bloque: BloqueHorarioCreateDTO, db: Session = Depends(get_db),
+                         autor: Autor = Depends(get_autor)):
     """
     Crea un bloque horario para un profesor
     
@@ -180,20 +298,98 @@ def crear_bloque_horario(bloque: BloqueHorarioCreateDTO, db: Session = Depends(g
     - Que exista la asignación profesor-curso-materia
     - Que no haya conflictos de horario
     """
-    return BloqueHorarioService.crear_bloque(db, bloque)
+    return BloqueHorarioService.crear_bloque(db, bloque, autor)
 
 
-@router.get("/bloques", response_model=List[BloqueHorarioReadDTO], tags=["Horarios"])
+@router.get("/bloques", response_model=Union[List[BloqueHorarioReadDTO], DeltaDTO[BloqueHorarioReadDTO]],
+            tags=["Horarios"])
 def listar_bloques_horarios(
     gestion: Optional[str] = Query(None, description="Filtrar por gestión"),
+    include_archived: bool = Query(False, description="Incluir bloques de gestiones archivadas"),
+    since: Optional[int] = Query(None, ge=0, description="Número de secuencia de la última sincronización (0 = carga inicial)"),
     db: Session = Depends(get_db)
 ):
     """
     Lista todos los bloques horarios
     
-    Opcionalmente filtrado por gestión
+    Opcionalmente filtrado por gestión. Los bloques de gestiones archivadas
+    solo se incluyen con **include_archived=true** (marcados con `archivado`)
+    
+    Con **since=<seq>** retorna solo los bloques creados, modificados o
+    eliminados desde esa sincronización (sin archivados)
+    """
+    if since is not None:
+        return BloqueHorarioService.listar_bloques_delta(db, since, gestion)
+    return BloqueHorarioService.listar_bloques(db, gestion, include_archived)
+
+
+# ---- GESTIONES ----
+@router.post("/gestiones/rollover", tags=["Gestiones"],
+             responses={202: {"model": GestionRolloverJobDTO}, 200: {"model": GestionRolloverPreviewDTO}})
+def rollover_gestion(
+    data: GestionRolloverRequestDTO,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: Session = Depends(get_db),
+    autor: Autor = Depends(get_autor)
+):
+    """
+    Copia una gestión completa (cursos, asignaciones y bloques) a una gestión nueva
+    
+    - **preview=true**: solo retorna cuántos registros se copiarían y los conflictos
+    - **preview=false**: valida, responde 202 con el job y copia todo en la cola
+      de trabajos en una sola transacción. Consultar el estado en
+      `GET /gestiones/rollover/{id_job}`
+    - Header **Idempotency-Key** (opcional): reenviar la misma clave retorna el
+      job ya creado en lugar de lanzar otro rollover
+    
+    Ejemplo:
+    ```json
+    {"gestion_origen": "2025", "gestion_destino": "2026", "preview": true}
+    ```
+    """
+    if data.preview:
+        return GestionService.previsualizar_rollover(db, data)
+
+    job = GestionService.iniciar_rollover(db, data, idempotency_key, autor)
+    response.status_code = status.HTTP_202_ACCEPTED
+    return job
+
+
+@router.get("/gestiones/archivadas", response_model=List[GestionArchivadaDTO], tags=["Gestiones"])
+def listar_gestiones_archivadas(db: Session = Depends(get_db)):
+    """Lista las gestiones cuyos bloques están en la tabla de archivo"""
+    return GestionService.listar_gestiones_archivadas(db)
+
+
+@router.post("/gestiones/{gestion}/archivar", response_model=GestionArchivadaDTO, tags=["Gestiones"])
+def archivar_gestion(gestion: str, db: Session = Depends(get_db), autor: Autor = Depends(get_autor)):
     """
-    return BloqueHorarioService.listar_bloques(db, gestion)
+    Archiva una gestión cerrada
+    
+    Mueve sus bloques horarios a `bloques_horarios_archivo` para que los listados
+    y la verificación de conflictos trabajen solo con datos vigentes.
+    La gestión actual (GESTION_ACTUAL) no se puede archivar.
+    """
+    return GestionService.archivar_gestion(db, gestion, autor)
+
+
+@router.post("/gestiones/{gestion}/restaurar", response_model=GestionArchivadaDTO, tags=["Gestiones"])
+def restaurar_gestion(gestion: str, db: Session = Depends(get_db), autor: Autor = Depends(get_autor)):
+    """Devuelve los bloques de una gestión archivada a la tabla bloques_horarios"""
+    return GestionService.restaurar_gestion(db, gestion, autor)
+
+
+@router.get("/gestiones/rollover/{id_job}", response_model=GestionRolloverJobDTO, tags=["Gestiones"])
+def obtener_rollover_gestion(id_job: str, db: Session = Depends(get_db)):
+    """Obtiene el estado de un rollover de gestión"""
+    job = GestionService.obtener_job(db, id_job)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Rollover con ID {id_job} no encontrado"
+        )
+    return job
 
 
 # ---- VISTAS SQL ----
@@ -266,7 +462,8 @@ def obtener_profesor(id_persona: int, db: Session = Depends(get_db)):
 def actualizar_profesor(
     id_persona: int,
     data: dict,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    autor: Autor = Depends(get_autor)
 ):
     """
     Actualiza los datos de un profesor
@@ -282,7 +479,7 @@ def actualizar_profesor(
             detail=f"Datos inválidos: {str(e)}"
         )
    
-    profesor_actualizado = ProfesorService.actualizar_profesor(db, id_persona, validated_data)
+    profesor_actualizado = ProfesorService.actualizar_profesor(db, id_persona, validated_data, autor)
     if not profesor_actualizado:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -292,7 +489,8 @@ def actualizar_profesor(
 
 
 @router.delete("/{id_persona}", status_code=status.HTTP_204_NO_CONTENT)
-def eliminar_profesor(id_persona: int, db: Session = Depends(get_db)):
+def eliminar_profesor(id_persona: int, db: Session = Depends(get_db),
+                      autor: Autor = Depends(get_autor)):
     """
     Elimina un profesor y su registro de persona
     
@@ -301,7 +499,7 @@ def eliminar_profesor(id_persona: int, db: Session = Depends(get_db)):
     - Asignaciones
     - Bloques horarios
     """
-    if not ProfesorService.eliminar_profesor(db, id_persona):
+    if not ProfesorService.eliminar_profesor(db, id_persona, autor):
         raise HTTPException(status_code=404, detail="Profesor no encontrado")
     return None
 
@@ -323,10 +521,11 @@ def obtener_materia(id_materia: int, db: Session = Depends(get_db)):
 def actualizar_materia(
     id_materia: int,
     data: MateriaCreateDTO,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    autor: Autor = Depends(get_autor)
 ):
     """Actualiza una materia"""
-    materia_actualizada = MateriaService.actualizar_materia(db, id_materia, data)
+    materia_actualizada = MateriaService.actualizar_materia(db, id_materia, data, autor)
     if not materia_actualizada:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -336,13 +535,13 @@ def actualizar_materia(
 
 
 @router.delete("/materias/{id_materia}", response_model=MateriaReadDTO)
-def eliminar_materia(id_materia: int, db: Session = Depends(get_db)):
+def eliminar_materia(id_materia: int, db: Session = Depends(get_db), autor: Autor = Depends(get_autor)):
     """
     Elimina una materia
     
     NOTA: También elimina en cascada asignaciones y bloques horarios relacionados
     """
-    materia_eliminada = MateriaService.eliminar_materia(db, id_materia)
+    materia_eliminada = MateriaService.eliminar_materia(db, id_materia, autor)
     if not materia_eliminada:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -368,10 +567,11 @@ def obtener_curso(id_curso: int, db: Session = Depends(get_db)):
 def actualizar_curso(
     id_curso: int,
     data: CursoCreateDTO,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    autor: Autor = Depends(get_autor)
 ):
     """Actualiza un curso"""
-    curso_actualizado = CursoService.actualizar_curso(db, id_curso, data)
+    curso_actualizado = CursoService.actualizar_curso(db, id_curso, data, autor)
     if not curso_actualizado:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -381,13 +581,13 @@ def actualizar_curso(
 
 
 @router.delete("/cursos/{id_curso}", response_model=CursoReadDTO)
-def eliminar_curso(id_curso: int, db: Session = Depends(get_db)):
+def eliminar_curso(id_curso: int, db: Session = Depends(get_db), autor: Autor = Depends(get_autor)):
     """
     Elimina un curso
     
     NOTA: También elimina en cascada asignaciones y bloques horarios relacionados
     """
-    curso_eliminado = CursoService.eliminar_curso(db, id_curso)
+    curso_eliminado = CursoService.eliminar_curso(db, id_curso, autor)
     if not curso_eliminado:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -396,6 +596,23 @@ def eliminar_curso(id_curso: int, db: Session = Depends(get_db)):
     return curso_eliminado
 
 
+# ---- DETALLE (POR PROFESOR) ----
+@router.get("/{id_persona}/detalle", response_model=ProfesorDetalleDTO)
+def obtener_detalle_profesor(
+    id_persona: int,
+    gestion: Optional[str] = Query(None, description="Filtrar bloques por gestión"),
+    include_archived: bool = Query(False, description="Incluir bloques de gestiones archivadas"),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtiene en una sola respuesta el profesor, sus asignaciones con nombres,
+    sus bloques horarios y las horas semanales (total y por gestión)
+    
+    Reemplaza a GET /{id_persona}, /{id_persona}/asignaciones y /{id_persona}/bloques
+    """
+    return ProfesorService.obtener_detalle(db, id_persona, gestion, include_archived)
+
+
 # ---- ASIGNACIONES (POR PROFESOR) ----
 @router.get("/{id_persona}/asignaciones", response_model=List[AsignacionReadNombreDTO])
 def listar_asignaciones_profesor(id_persona: int, db: Session = Depends(get_db)):
@@ -444,14 +661,15 @@ def obtener_bloque_horario(id_bloque: int, db: Session = Depends(get_db)):
 def actualizar_bloque_horario(
     id_bloque: int,
     data: BloqueHorarioUpdateDTO,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    autor: Autor = Depends(get_autor)
 ):
     """
     Actualiza un bloque horario
     
     Valida que no se generen conflictos de horario
     """
-    bloque_actualizado = BloqueHorarioService.actualizar_bloque(db, id_bloque, data)
+    bloque_actualizado = BloqueHorarioService.actualizar_bloque(db, id_bloque, data, autor)
     if not bloque_actualizado:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -461,9 +679,10 @@ def actualizar_bloque_horario(
 
 
 @router.delete("/bloques/{id_bloque}", status_code=status.HTTP_204_NO_CONTENT, tags=["Horarios"])
-def eliminar_bloque_horario(id_bloque: int, db: Session = Depends(get_db)):
+def eliminar_bloque_horario(id_bloque: int, db: Session = Depends(get_db),
+                            autor: Autor = Depends(get_autor)):
     """Elimina un bloque horario"""
-    if not BloqueHorarioService.eliminar_bloque(db, id_bloque):
+    if not BloqueHorarioService.eliminar_bloque(db, id_bloque, autor):
         raise HTTPException(
             status_code=404, 
             detail="Bloque horario no encontrado"
@@ -475,12 +694,14 @@ def eliminar_bloque_horario(id_bloque: int, db: Session = Depends(get_db)):
 def listar_bloques_profesor(
     id_persona: int,
     gestion: Optional[str] = Query(None, description="Filtrar por gestión"),
+    include_archived: bool = Query(False, description="Incluir bloques de gestiones archivadas"),
     db: Session = Depends(get_db)
 ):
     """
     Lista todos los bloques horarios de un profesor
     
-    Opcionalmente filtrado por gestión
+    Opcionalmente filtrado por gestión; con include_archived=true agrega los
+    bloques de gestiones archivadas
     
     NOTA: Recibe id_persona pero internamente busca el id_profesor correspondiente
     """
@@ -488,4 +709,4 @@ def listar_bloques_profesor(
     if not profesor:
         raise HTTPException(status_code=404, detail="Profesor no encontrado")
     
-    return BloqueHorarioService.listar_por_profesor(db, profesor.id_profesor, gestion)
\ No newline at end of file
+    return BloqueHorarioService.listar_por_profesor(db, profesor.id_profesor, gestion, include_archived)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, field_validator
-from typing import Optional, List
+from typing import Optional, List, Dict, Generic, TypeVar
 from datetime import datetime, time, date
 
 # ============ CARGO DTOs ============
@@ -15,6 +15,10 @@ class CargoReadDTO(BaseModel):
 
 
 # ============ PERSONA/PROFESOR DTOs ============
+# Mismos valores que los Enum de personas.estado_laboral y profesores.nivel_enseñanza
+ESTADOS_LABORALES = "^(activo|retirado|licencia|suspendido)$"
+NIVELES_ENSEÑANZA = "^(foundation|primary|secondary|todos)$"
+
 class ProfesorCreateDTO(BaseModel):
     # Datos de Persona
     ci: str = Field(..., min_length=7, max_length=20)
@@ -25,7 +29,7 @@ class ProfesorCreateDTO(BaseModel):
     telefono: Optional[str] = Field(None, max_length=20)
     correo: Optional[EmailStr] = None
     id_cargo: Optional[int] = None
-    estado_laboral: Optional[str] = "activo"
+    estado_laboral: Optional[str] = Field("activo", pattern=ESTADOS_LABORALES)
     años_experiencia: Optional[int] = 0
     fecha_ingreso: Optional[date] = None
     fecha_retiro: Optional[date] = None
@@ -34,7 +38,7 @@ class ProfesorCreateDTO(BaseModel):
     # Datos de Profesor
     especialidad: Optional[str] = Field(None, max_length=100)
     titulo_academico: Optional[str] = Field(None, max_length=100)
-    nivel_enseñanza: Optional[str] = "todos"
+    nivel_enseñanza: Optional[str] = Field("todos", pattern=NIVELES_ENSEÑANZA)
     observaciones_profesor: Optional[str] = None
 
 
@@ -48,7 +52,7 @@ class ProfesorUpdateDTO(BaseModel):
     telefono: Optional[str] = None
     correo: Optional[EmailStr] = None
     id_cargo: Optional[int] = None
-    estado_laboral: Optional[str] = None
+    estado_laboral: Optional[str] = Field(None, pattern=ESTADOS_LABORALES)
     años_experiencia: Optional[int] = None
     fecha_ingreso: Optional[date] = None
     fecha_retiro: Optional[date] = None
@@ -57,7 +61,7 @@ class ProfesorUpdateDTO(BaseModel):
     # Datos de Profesor
     especialidad: Optional[str] = None
     titulo_academico: Optional[str] = None
-    nivel_enseñanza: Optional[str] = None
+    nivel_enseñanza: Optional[str] = Field(None, pattern=NIVELES_ENSEÑANZA)
     observaciones_profesor: Optional[str] = None
 
     class Config:
@@ -105,6 +109,29 @@ class ProfesorFullDTO(ProfesorReadDTO):
         from_attributes = True
 
 
+class PersonaSearchResultDTO(BaseModel):
+    id_persona: int
+    id_profesor: int
+    ci: str
+    nombre_completo: str
+    correo: Optional[str] = None
+    puntaje: float
+
+
+# ============ IMPORTACIÓN MASIVA DTOs ============
+class ProfesorImportErrorDTO(BaseModel):
+    fila: int
+    ci: Optional[str] = None
+    errores: List[str]
+
+
+class ProfesorImportResultDTO(BaseModel):
+    total_filas: int
+    insertados: int
+    rechazados: int
+    errores: List[ProfesorImportErrorDTO] = []
+
+
 # ============ MATERIA DTOs ============
 class MateriaCreateDTO(BaseModel):
     nombre_materia: str = Field(..., min_length=2, max_length=50)
@@ -247,6 +274,102 @@ class BloqueHorarioReadDTO(BaseModel):
     nombre_profesor: Optional[str] = None
     nombre_curso: Optional[str] = None
     nombre_materia: Optional[str] = None
+    archivado: bool = False
+
+    class Config:
+        from_attributes = True
+
+
+# ============ DETALLE DE PROFESOR DTOs ============
+class ProfesorDetalleDTO(BaseModel):
+    """Profesor con asignaciones, bloques y carga horaria en una sola respuesta"""
+    profesor: ProfesorReadDTO
+    asignaciones: List[AsignacionReadNombreDTO] = []
+    bloques: List[BloqueHorarioReadDTO] = []
+    total_horas_semanales: float = 0.0
+    horas_por_gestion: Dict[str, float] = {}
+
+
+# ============ BOOTSTRAP (SNAPSHOT DE CATÁLOGOS) DTOs ============
+class ProfesorResumenDTO(BaseModel):
+    id_persona: int
+    id_profesor: int
+    ci: str
+    nombre_completo: str
+    correo: Optional[str] = None
+    id_cargo: Optional[int] = None
+    nombre_cargo: Optional[str] = None
+    estado_laboral: str
+    especialidad: Optional[str] = None
+
+
+class CatalogoBootstrapDTO(BaseModel):
+    """Catálogos y resumen de profesores que el frontend carga al iniciar"""
+    version: int
+    cargos: List[CargoReadDTO] = []
+    materias: List[MateriaReadDTO] = []
+    cursos: List[CursoReadDTO] = []
+    profesores: List[ProfesorResumenDTO] = []
+
+
+# ============ SINCRONIZACIÓN INCREMENTAL DTOs ============
+T = TypeVar("T")
+
+
+class DeltaDTO(BaseModel, Generic[T]):
+    """
+    Respuesta de un listado con ?since=<seq>
+
+    - cambios: filas creadas o modificadas después de `desde`
+    - eliminados: claves de las filas eliminadas después de `desde`
+    - hasta: valor a enviar como `since` en la próxima sincronización
+    - completo: `cambios` trae la lista entera (since=0, o `desde` ya no es válido)
+    """
+    desde: int
+    hasta: int
+    completo: bool = False
+    cambios: List[T] = []
+    eliminados: List[Dict[str, int]] = []
+
+
+# ============ GESTIÓN (ROLLOVER) DTOs ============
+class GestionRolloverRequestDTO(BaseModel):
+    gestion_origen: str = Field(..., min_length=4, max_length=10)
+    gestion_destino: str = Field(..., min_length=4, max_length=10)
+    incluir_asignaciones: bool = True
+    incluir_bloques: bool = True
+    preview: bool = False
+
+
+class GestionConteoDTO(BaseModel):
+    cursos: int = 0
+    asignaciones: int = 0
+    bloques: int = 0
+
+
+class GestionRolloverPreviewDTO(BaseModel):
+    gestion_origen: str
+    gestion_destino: str
+    a_copiar: GestionConteoDTO
+    existentes_en_destino: GestionConteoDTO
+    conflictos: List[str] = []
+
+
+class GestionRolloverJobDTO(BaseModel):
+    id_job: str
+    estado: str
+    gestion_origen: str
+    gestion_destino: str
+    copiados: Optional[GestionConteoDTO] = None
+    error: Optional[str] = None
+    fecha_creacion: datetime
+    fecha_fin: Optional[datetime] = None
+
+
+class GestionArchivadaDTO(BaseModel):
+    gestion: str
+    total_bloques: int
+    fecha_archivo: datetime
 
     class Config:
         from_attributes = True
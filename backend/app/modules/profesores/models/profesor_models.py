@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Time, Text, Enum, Date
+from sqlalchemy import Column, BigInteger, Integer, String, ForeignKey, DateTime, Time, Text, Enum, Date, Index
 from sqlalchemy.orm import relationship
 from app.config.database import Base
+from app.shared.services.change_sequence import rastrear
 from datetime import datetime
 
+# Secuencia de cambios para sincronización incremental (ver change_sequence)
+SeqCambio = BigInteger().with_variant(Integer, "sqlite")
+
 class Cargo(Base):
     __tablename__ = "cargos"
 
@@ -18,6 +22,14 @@ class Cargo(Base):
 
 class Persona(Base):
     __tablename__ = "personas"
+    __table_args__ = (
+        Index("ix_personas_seq_cambio", "seq_cambio"),
+        # Búsqueda PERSONA_SEARCH_MODE=fulltext (MATCH ... AGAINST); solo existe en MySQL
+        Index(
+            "ft_personas_busqueda", "nombres", "apellido_paterno", "apellido_materno", "ci", "correo",
+            mysql_prefix="FULLTEXT"
+        ).ddl_if(dialect="mysql"),
+    )
 
     id_persona = Column(Integer, primary_key=True, autoincrement=True)
     ci = Column(String(20), nullable=False, unique=True)
@@ -35,6 +47,7 @@ class Persona(Base):
     fecha_ingreso = Column(Date, nullable=True)
     fecha_retiro = Column(Date, nullable=True)
     motivo_retiro = Column(Text, nullable=True)
+    seq_cambio = Column(SeqCambio, nullable=True)
     
     # Relaciones
     cargo = relationship("Cargo", back_populates="personas")
@@ -43,6 +56,9 @@ class Persona(Base):
 
 class Profesor(Base):
     __tablename__ = "profesores"
+    __table_args__ = (
+        Index("ix_profesores_seq_cambio", "seq_cambio"),
+    )
 
     id_profesor = Column(Integer, primary_key=True, autoincrement=True)
     id_persona = Column(Integer, ForeignKey("personas.id_persona", ondelete="CASCADE"), nullable=False, unique=True)
@@ -51,6 +67,7 @@ class Profesor(Base):
     nivel_enseñanza = Column(Enum('foundation', 'primary', 'secondary', 'todos'), 
                             nullable=False, default='todos')
     observaciones = Column(Text, nullable=True)
+    seq_cambio = Column(SeqCambio, nullable=True)
 
     # Relaciones
     persona = relationship("Persona", back_populates="profesor")
@@ -60,10 +77,14 @@ class Profesor(Base):
 
 class Materia(Base):
     __tablename__ = "materias"
+    __table_args__ = (
+        Index("ix_materias_seq_cambio", "seq_cambio"),
+    )
     
     id_materia = Column(Integer, primary_key=True, autoincrement=True)
     nombre_materia = Column(String(50), nullable=False)
     nivel = Column(Enum('inicial', 'primaria', 'secundaria'), nullable=False)
+    seq_cambio = Column(SeqCambio, nullable=True)
 
     # Relaciones
     asignaciones = relationship("ProfesorCursoMateria", back_populates="materia", cascade="all, delete-orphan")
@@ -72,11 +93,15 @@ class Materia(Base):
 
 class Curso(Base):
     __tablename__ = "cursos"
+    __table_args__ = (
+        Index("ix_cursos_seq_cambio", "seq_cambio"),
+    )
     
     id_curso = Column(Integer, primary_key=True, autoincrement=True)
     nombre_curso = Column(String(50), nullable=False)
     nivel = Column(Enum('inicial', 'primaria', 'secundaria'), nullable=False)
     gestion = Column(String(20), nullable=False)
+    seq_cambio = Column(SeqCambio, nullable=True)
 
     # Relaciones
     asignaciones = relationship("ProfesorCursoMateria", back_populates="curso", cascade="all, delete-orphan")
@@ -85,10 +110,14 @@ class Curso(Base):
 
 class ProfesorCursoMateria(Base):
     __tablename__ = "profesores_cursos_materias"
+    __table_args__ = (
+        Index("ix_asignaciones_seq_cambio", "seq_cambio"),
+    )
 
     id_profesor = Column(Integer, ForeignKey("profesores.id_profesor", ondelete="CASCADE"), primary_key=True)
     id_curso = Column(Integer, ForeignKey("cursos.id_curso", ondelete="CASCADE"), primary_key=True)
     id_materia = Column(Integer, ForeignKey("materias.id_materia", ondelete="CASCADE"), primary_key=True)
+    seq_cambio = Column(SeqCambio, nullable=True)
 
     # Relaciones
     profesor = relationship("Profesor", back_populates="asignaciones")
@@ -98,6 +127,11 @@ class ProfesorCursoMateria(Base):
 
 class BloqueHorario(Base):
     __tablename__ = "bloques_horarios"
+    __table_args__ = (
+        # Listados y verificación de conflictos filtran por profesor y gestión
+        Index("ix_bloques_profesor_gestion_dia", "id_profesor", "gestion", "dia_semana"),
+        Index("ix_bloques_seq_cambio", "seq_cambio"),
+    )
 
     id_bloque = Column(Integer, primary_key=True, autoincrement=True)
     id_profesor = Column(Integer, ForeignKey("profesores.id_profesor", ondelete="CASCADE"), nullable=False)
@@ -109,8 +143,49 @@ class BloqueHorario(Base):
     gestion = Column(String(10), nullable=False, default='2025')
     fecha_registro = Column(DateTime, default=datetime.utcnow)
     observaciones = Column(Text, nullable=True)
+    seq_cambio = Column(SeqCambio, nullable=True)
 
     # Relaciones
     profesor = relationship("Profesor", back_populates="bloques_horarios")
     curso = relationship("Curso", back_populates="bloques")
-    materia = relationship("Materia", back_populates="bloques")
\ No newline at end of file
+    materia = relationship("Materia", back_populates="bloques")
+
+class BloqueHorarioArchivo(Base):
+    """
+    Bloques de gestiones cerradas, fuera de la tabla caliente bloques_horarios
+
+    Misma estructura que BloqueHorario; conserva el id_bloque original.
+    """
+    __tablename__ = "bloques_horarios_archivo"
+    __table_args__ = (
+        Index("ix_bloques_archivo_gestion_profesor", "gestion", "id_profesor"),
+    )
+
+    id_bloque = Column(Integer, primary_key=True, autoincrement=False)
+    id_profesor = Column(Integer, ForeignKey("profesores.id_profesor", ondelete="CASCADE"), nullable=False)
+    id_curso = Column(Integer, ForeignKey("cursos.id_curso", ondelete="CASCADE"), nullable=False)
+    id_materia = Column(Integer, ForeignKey("materias.id_materia", ondelete="CASCADE"), nullable=False)
+    dia_semana = Column(Enum('lunes', 'martes', 'miercoles', 'jueves', 'viernes', 'sabado'), nullable=False)
+    hora_inicio = Column(Time, nullable=False)
+    hora_fin = Column(Time, nullable=False)
+    gestion = Column(String(10), nullable=False)
+    fecha_registro = Column(DateTime, nullable=True)
+    observaciones = Column(Text, nullable=True)
+    fecha_archivo = Column(DateTime, default=datetime.utcnow)
+
+
+class GestionArchivada(Base):
+    __tablename__ = "gestiones_archivadas"
+
+    gestion = Column(String(10), primary_key=True)
+    total_bloques = Column(Integer, nullable=False, default=0)
+    fecha_archivo = Column(DateTime, default=datetime.utcnow)
+
+
+# Personas y profesores se sincronizan juntos en GET /api/profesores?since=
+rastrear(Persona, "persona", ("id_persona",), secuencia="profesores")
+rastrear(Profesor, "profesor", ("id_profesor",), secuencia="profesores")
+rastrear(Materia, "materia", ("id_materia",))
+rastrear(Curso, "curso", ("id_curso",))
+rastrear(ProfesorCursoMateria, "asignacion", ("id_profesor", "id_curso", "id_materia"))
+rastrear(BloqueHorario, "bloque", ("id_bloque",))
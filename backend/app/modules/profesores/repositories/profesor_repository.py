@@ -1,10 +1,14 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, text
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import func, text, insert, or_, select, literal, and_
 from app.modules.profesores.models.profesor_models import (
     Persona, Profesor, Materia, Curso, ProfesorCursoMateria, 
-    Cargo, BloqueHorario
+    Cargo, BloqueHorario, BloqueHorarioArchivo, GestionArchivada
 )
-from typing import Optional, List
+from app.shared.services.change_sequence import siguiente_secuencia, registrar_eliminados
+from app.shared.services.data_version import DataVersion
+from collections import defaultdict
+from typing import Dict, Optional, List, Set, Tuple
 
 # ============ PERSONA REPOSITORY ============
 class PersonaRepository:
@@ -50,13 +54,9 @@ class PersonaRepository:
 
     @staticmethod
     def delete(db: Session, persona: Persona) -> None:
-        """Elimina una persona"""
-        try:
-            db.delete(persona)
-            db.commit()
-        except Exception as e:
-            db.rollback()
-            raise
+        """Elimina una persona (flush, sin commit: lo confirma el llamador)"""
+        db.delete(persona)
+        db.flush()
 
     @staticmethod
     def exists_by_ci(db: Session, ci: str, exclude_id: Optional[int] = None) -> bool:
@@ -76,37 +76,136 @@ class PersonaRepository:
             query = query.filter(Persona.id_persona != exclude_id)
         return query.first() is not None
 
+    @staticmethod
+    def get_ci_correo_existentes(db: Session, cis: List[str], correos: List[str]) -> Tuple[Set[str], Set[str]]:
+        """Obtiene, en una sola consulta, cuáles CI y correos de las listas ya están registrados"""
+        condiciones = []
+        if cis:
+            condiciones.append(Persona.ci.in_(cis))
+        if correos:
+            condiciones.append(Persona.correo.in_(correos))
+        if not condiciones:
+            return set(), set()
+
+        filas = db.query(Persona.ci, Persona.correo).filter(or_(*condiciones)).all()
+        cis_buscados, correos_buscados = set(cis), set(correos)
+        return (
+            {f.ci for f in filas if f.ci in cis_buscados},
+            {f.correo for f in filas if f.correo in correos_buscados}
+        )
+
+    @staticmethod
+    def get_datos_busqueda(db: Session, desde: Optional[int] = None):
+        """Campos indexables de todos los profesores (o de los modificados después de `desde`) en una sola consulta"""
+        query = (
+            db.query(
+                Persona.id_persona, Profesor.id_profesor, Persona.ci, Persona.nombres,
+                Persona.apellido_paterno, Persona.apellido_materno, Persona.correo
+            )
+            .join(Profesor, Profesor.id_persona == Persona.id_persona)
+        )
+        if desde is not None:
+            query = query.filter(or_(Persona.seq_cambio > desde, Profesor.seq_cambio > desde))
+        return query.all()
+
+    @staticmethod
+    def get_resumen_profesores(db: Session):
+        """Obtiene el resumen de todos los profesores con su cargo en una sola consulta"""
+        return (
+            db.query(
+                Persona.id_persona, Profesor.id_profesor, Persona.ci, Persona.nombres,
+                Persona.apellido_paterno, Persona.apellido_materno, Persona.correo,
+                Persona.id_cargo, Cargo.nombre_cargo, Persona.estado_laboral, Profesor.especialidad
+            )
+            .join(Profesor, Profesor.id_persona == Persona.id_persona)
+            .outerjoin(Cargo, Cargo.id_cargo == Persona.id_cargo)
+            .order_by(Persona.id_persona)
+            .all()
+        )
+
+    @staticmethod
+    def search_fulltext(db: Session, consulta_booleana: str, limite: int = 20):
+        """
+        Búsqueda MySQL FULLTEXT en modo booleano
+
+        Usa el índice ft_personas_busqueda definido en el modelo Persona. En una
+        BD creada antes de ese índice hay que agregarlo a mano (también está en
+        docs/migraciones/seq_cambio_mysql.sql):
+            ALTER TABLE personas ADD FULLTEXT INDEX ft_personas_busqueda
+                (nombres, apellido_paterno, apellido_materno, ci, correo);
+        """
+        query = text("""
+            SELECT p.id_persona, pr.id_profesor, p.ci, p.nombres, p.apellido_paterno,
+                   p.apellido_materno, p.correo,
+                   MATCH(p.nombres, p.apellido_paterno, p.apellido_materno, p.ci, p.correo)
+                       AGAINST (:consulta IN BOOLEAN MODE) AS puntaje
+            FROM personas p
+            JOIN profesores pr ON pr.id_persona = p.id_persona
+            WHERE MATCH(p.nombres, p.apellido_paterno, p.apellido_materno, p.ci, p.correo)
+                  AGAINST (:consulta IN BOOLEAN MODE)
+            ORDER BY puntaje DESC
+            LIMIT :limite
+        """)
+        return db.execute(query, {"consulta": consulta_booleana, "limite": limite}).fetchall()
+
 
 # ============ PROFESOR REPOSITORY ============
 class ProfesorRepository:
 
     @staticmethod
     def create(db: Session, persona_data: dict, profesor_data: dict) -> Profesor:
-        """Crea una persona y su registro de profesor"""
-        # Crear persona
-        nueva_persona = PersonaRepository.create(db, persona_data)
-        
-        # Crear profesor vinculado
-        nuevo_profesor = Profesor(
-            id_persona=nueva_persona.id_persona,
-            **profesor_data
-        )
+        """
+        Crea una persona y su registro de profesor en un solo flush
+
+        No hace commit ni refresh: el llamador construye la respuesta con los
+        objetos en memoria y confirma la transacción una sola vez.
+        Las violaciones de unicidad/FK se propagan como IntegrityError.
+        """
+        nueva_persona = Persona(**persona_data)
+        nuevo_profesor = Profesor(persona=nueva_persona, **profesor_data)
         db.add(nuevo_profesor)
-        db.commit()
-        db.refresh(nuevo_profesor)
+        db.flush()
+        ProfesorRepository._cargar_cargo(db, nueva_persona)
         return nuevo_profesor
 
     @staticmethod
-    def get_all(db: Session) -> List[Profesor]:
-        """Obtiene todos los profesores con sus personas y cargos"""
-        return (
+    def bulk_create(db: Session, filas: List[Tuple[dict, dict]]) -> int:
+        """
+        Inserta un lote de (persona_data, profesor_data) con sentencias set-based
+
+        Un executemany para personas, una consulta para recuperar sus IDs por CI
+        y un executemany para profesores. No hace commit.
+        """
+        if not filas:
+            return 0
+
+        seq = siguiente_secuencia(db, "persona")
+        db.execute(insert(Persona), [{**persona, "seq_cambio": seq} for persona, _ in filas])
+
+        cis = [persona["ci"] for persona, _ in filas]
+        ids_por_ci = dict(
+            db.query(Persona.ci, Persona.id_persona).filter(Persona.ci.in_(cis)).all()
+        )
+
+        db.execute(insert(Profesor), [
+            {"id_persona": ids_por_ci[persona["ci"]], **profesor, "seq_cambio": seq}
+            for persona, profesor in filas
+        ])
+        return len(filas)
+
+    @staticmethod
+    def get_all(db: Session, desde: Optional[int] = None) -> List[Profesor]:
+        """Obtiene todos los profesores con sus personas y cargos (o solo los modificados después de `desde`)"""
+        query = (
             db.query(Profesor)
             .join(Persona, Persona.id_persona == Profesor.id_persona)
             .options(
                 joinedload(Profesor.persona).joinedload(Persona.cargo)
             )
-            .all()
         )
+        if desde is not None:
+            query = query.filter(or_(Persona.seq_cambio > desde, Profesor.seq_cambio > desde))
+        return query.all()
 
     @staticmethod
     def get_by_id_persona(db: Session, id_persona: int) -> Optional[Profesor]:
@@ -135,20 +234,37 @@ class ProfesorRepository:
 
     @staticmethod
     def update(db: Session, profesor: Profesor, persona_data: dict, profesor_data: dict) -> Profesor:
-        """Actualiza persona y profesor"""
-        # Actualizar persona
-        if persona_data:
-            PersonaRepository.update(db, profesor.persona, persona_data)
-        
-        # Actualizar profesor
+        """
+        Actualiza persona y profesor en un solo flush
+
+        Igual que create, no hace commit ni refresh.
+        """
+        for key, value in persona_data.items():
+            if value is not None:
+                setattr(profesor.persona, key, value)
+
         for key, value in profesor_data.items():
             if value is not None:
                 setattr(profesor, key, value)
-        
-        db.commit()
-        db.refresh(profesor)
+
+        db.flush()
+
+        # Si cambió el cargo, la relación cargada con joinedload quedó obsoleta
+        if persona_data.get("id_cargo") is not None:
+            ProfesorRepository._cargar_cargo(db, profesor.persona)
         return profesor
 
+    @staticmethod
+    def _cargar_cargo(db: Session, persona: Persona) -> None:
+        """
+        Deja cargada la relación persona.cargo según id_cargo
+
+        Usa el identity map (sin consulta si el cargo ya está en la sesión) y
+        evita el lazy-load implícito al construir el DTO de respuesta.
+        """
+        cargo = db.get(Cargo, persona.id_cargo) if persona.id_cargo is not None else None
+        set_committed_value(persona, "cargo", cargo)
+
     @staticmethod
     def delete(db: Session, profesor: Profesor) -> None:
         """Elimina un profesor (elimina la persona, profesor se elimina en cascada)"""
@@ -160,15 +276,19 @@ class MateriaRepository:
 
     @staticmethod
     def create(db: Session, materia_data: dict) -> Materia:
+        """Inserta con un flush; el llamador hace el commit"""
         nueva_materia = Materia(**materia_data)
         db.add(nueva_materia)
-        db.commit()
-        db.refresh(nueva_materia)
+        db.flush()
         return nueva_materia
 
     @staticmethod
-    def get_all(db: Session) -> List[Materia]:
-        return db.query(Materia).all()
+    def get_all(db: Session, desde: Optional[int] = None) -> List[Materia]:
+        """Obtiene todas las materias (o solo las filas modificadas después de `desde`)"""
+        query = db.query(Materia)
+        if desde is not None:
+            query = query.filter(Materia.seq_cambio > desde)
+        return query.all()
 
     @staticmethod
     def get_by_id(db: Session, id_materia: int) -> Optional[Materia]:
@@ -180,17 +300,18 @@ class MateriaRepository:
 
     @staticmethod
     def update(db: Session, materia: Materia, data: dict) -> Materia:
+        """Actualiza con un flush; el llamador hace el commit"""
         for key, value in data.items():
             if value is not None:
                 setattr(materia, key, value)
-        db.commit()
-        db.refresh(materia)
+        db.flush()
         return materia
 
     @staticmethod
     def delete(db: Session, materia: Materia) -> Materia:
+        """Elimina con un flush; el llamador hace el commit"""
         db.delete(materia)
-        db.commit()
+        db.flush()
         return materia
 
 
@@ -199,15 +320,19 @@ class CursoRepository:
 
     @staticmethod
     def create(db: Session, curso_data: dict) -> Curso:
+        """Inserta con un flush; el llamador hace el commit"""
         nuevo_curso = Curso(**curso_data)
         db.add(nuevo_curso)
-        db.commit()
-        db.refresh(nuevo_curso)
+        db.flush()
         return nuevo_curso
 
     @staticmethod
-    def get_all(db: Session) -> List[Curso]:
-        return db.query(Curso).all()
+    def get_all(db: Session, desde: Optional[int] = None) -> List[Curso]:
+        """Obtiene todos los cursos (o solo las filas modificadas después de `desde`)"""
+        query = db.query(Curso)
+        if desde is not None:
+            query = query.filter(Curso.seq_cambio > desde)
+        return query.all()
 
     @staticmethod
     def get_by_id(db: Session, id_curso: int) -> Optional[Curso]:
@@ -219,17 +344,18 @@ class CursoRepository:
 
     @staticmethod
     def update(db: Session, curso: Curso, data: dict) -> Curso:
+        """Actualiza con un flush; el llamador hace el commit"""
         for key, value in data.items():
             if value is not None:
                 setattr(curso, key, value)
-        db.commit()
-        db.refresh(curso)
+        db.flush()
         return curso
 
     @staticmethod
     def delete(db: Session, curso: Curso) -> Curso:
+        """Elimina con un flush; el llamador hace el commit"""
         db.delete(curso)
-        db.commit()
+        db.flush()
         return curso
 
 
@@ -264,9 +390,12 @@ class AsignacionRepository:
         return asignacion
 
     @staticmethod
-    def get_all(db: Session) -> List[ProfesorCursoMateria]:
-        """Obtiene todas las asignaciones"""
-        return db.query(ProfesorCursoMateria).all()
+    def get_all(db: Session, desde: Optional[int] = None) -> List[ProfesorCursoMateria]:
+        """Obtiene todas las asignaciones (o solo las modificadas después de `desde`)"""
+        query = db.query(ProfesorCursoMateria)
+        if desde is not None:
+            query = query.filter(ProfesorCursoMateria.seq_cambio > desde)
+        return query.all()
 
     @staticmethod
     def get_by_profesor(db: Session, id_profesor: int) -> List[ProfesorCursoMateria]:
@@ -280,12 +409,17 @@ class AsignacionRepository:
     @staticmethod
     def get_by_profesor_con_nombres(db: Session, id_profesor: int):
         """Obtiene asignaciones de un profesor con los nombres"""
-        return (
+        return AsignacionRepository.get_all_con_nombres(db, id_profesor)
+
+    @staticmethod
+    def get_all_con_nombres(db: Session, id_profesor: Optional[int] = None):
+        """Asignaciones con nombres de profesor, curso y materia en una sola consulta"""
+        query = (
             db.query(
                 ProfesorCursoMateria.id_profesor,
                 ProfesorCursoMateria.id_curso,
                 ProfesorCursoMateria.id_materia,
-                func.concat(Persona.nombres, ' ', Persona.apellido_paterno).label("nombre_profesor"),
+                (Persona.nombres + ' ' + Persona.apellido_paterno).label("nombre_profesor"),
                 Curso.nombre_curso.label("nombre_curso"),
                 Materia.nombre_materia.label("nombre_materia")
             )
@@ -293,9 +427,10 @@ class AsignacionRepository:
             .join(Persona, Persona.id_persona == Profesor.id_persona)
             .join(Curso, Curso.id_curso == ProfesorCursoMateria.id_curso)
             .join(Materia, Materia.id_materia == ProfesorCursoMateria.id_materia)
-            .filter(Profesor.id_profesor == id_profesor)
-            .all()
         )
+        if id_profesor is not None:
+            query = query.filter(Profesor.id_profesor == id_profesor)
+        return query.all()
 
     @staticmethod
     def delete(db: Session, id_profesor: int, id_curso: int, id_materia: int) -> bool:
@@ -380,6 +515,62 @@ class BloqueHorarioRepository:
         
         return query.all()
 
+    @staticmethod
+    def horas_por_profesor(db: Session, gestion: Optional[str] = None) -> Dict[int, float]:
+        """Horas semanales de cada profesor (id_profesor -> horas) en una sola consulta"""
+        query = db.query(BloqueHorario.id_profesor, BloqueHorario.hora_inicio, BloqueHorario.hora_fin)
+        if gestion:
+            query = query.filter(BloqueHorario.gestion == gestion)
+        horas: Dict[int, float] = defaultdict(float)
+        for id_profesor, inicio, fin in query:
+            horas[id_profesor] += (fin.hour + fin.minute / 60) - (inicio.hour + inicio.minute / 60)
+        return horas
+
+    @staticmethod
+    def get_all_con_nombres(db: Session, gestion: Optional[str] = None, desde: Optional[int] = None):
+        """
+        Bloques con nombres de profesor, curso y materia en una sola consulta
+
+        Retorna filas (bloque, nombre_profesor, nombre_curso, nombre_materia);
+        con `desde`, solo los bloques modificados después de ese número de secuencia.
+        """
+        query = (
+            db.query(
+                BloqueHorario,
+                (Persona.nombres + ' ' + Persona.apellido_paterno).label("nombre_profesor"),
+                Curso.nombre_curso,
+                Materia.nombre_materia
+            )
+            .outerjoin(Profesor, Profesor.id_profesor == BloqueHorario.id_profesor)
+            .outerjoin(Persona, Persona.id_persona == Profesor.id_persona)
+            .outerjoin(Curso, Curso.id_curso == BloqueHorario.id_curso)
+            .outerjoin(Materia, Materia.id_materia == BloqueHorario.id_materia)
+        )
+        if gestion:
+            query = query.filter(BloqueHorario.gestion == gestion)
+        if desde is not None:
+            query = query.filter(BloqueHorario.seq_cambio > desde)
+        return query.all()
+
+    @staticmethod
+    def get_by_profesor_con_nombres(db: Session, id_profesor: int, gestion: Optional[str] = None,
+                                    modelo=BloqueHorario):
+        """
+        Bloques de un profesor con nombre de curso y materia en una sola consulta
+
+        Retorna filas (bloque, nombre_curso, nombre_materia). `modelo` permite
+        consultar la tabla de archivo con la misma forma.
+        """
+        query = (
+            db.query(modelo, Curso.nombre_curso, Materia.nombre_materia)
+            .outerjoin(Curso, Curso.id_curso == modelo.id_curso)
+            .outerjoin(Materia, Materia.id_materia == modelo.id_materia)
+            .filter(modelo.id_profesor == id_profesor)
+        )
+        if gestion:
+            query = query.filter(modelo.gestion == gestion)
+        return query.all()
+
     @staticmethod
     def get_vista_bloques_profesor(db: Session, id_persona: Optional[int] = None, gestion: Optional[str] = None):
         """Consulta la vista vista_bloques_profesor"""
@@ -449,8 +640,9 @@ class BloqueHorarioRepository:
 
     @staticmethod
     def check_conflicts(db: Session, id_profesor: int, dia_semana: str, 
-                       hora_inicio, hora_fin, exclude_id: Optional[int] = None) -> bool:
-        """Verifica si hay conflictos de horario para un profesor"""
+                       hora_inicio, hora_fin, exclude_id: Optional[int] = None,
+                       gestion: Optional[str] = None) -> bool:
+        """Verifica si hay conflictos de horario para un profesor (dentro de la gestión dada)"""
         query = (
             db.query(BloqueHorario)
             .filter(
@@ -461,7 +653,199 @@ class BloqueHorarioRepository:
             )
         )
         
+        if gestion:
+            query = query.filter(BloqueHorario.gestion == gestion)
+        
         if exclude_id:
             query = query.filter(BloqueHorario.id_bloque != exclude_id)
         
-        return query.first() is not None
\ No newline at end of file
+        return query.first() is not None
+
+# ============ GESTIÓN REPOSITORY ============
+class GestionRepository:
+    """
+    Operaciones set-based sobre una gestión completa (cursos, asignaciones y bloques)
+
+    El remapeo de cursos se hace por (nombre_curso, nivel): el curso copiado en
+    la gestión destino se une con su original por esos dos campos.
+    """
+
+    # Fila de versiones_datos que serializa rollovers, archivos y restauraciones
+    LOCK_GESTIONES = "gestiones.lock"
+
+    @staticmethod
+    def bloquear(db: Session) -> None:
+        """Lock entre procesos hasta el commit o rollback de `db` (SELECT ... FOR UPDATE)"""
+        DataVersion.bloquear(db.connection(), GestionRepository.LOCK_GESTIONES)
+
+    @staticmethod
+    def _mapa_cursos(origen: str, destino: str):
+        """Subconsulta (id_origen, id_destino) entre los cursos de ambas gestiones"""
+        co = Curso.__table__.alias("co")
+        cd = Curso.__table__.alias("cd")
+        return (
+            select(co.c.id_curso.label("id_origen"), cd.c.id_curso.label("id_destino"))
+            .select_from(co.join(cd, and_(
+                cd.c.nombre_curso == co.c.nombre_curso,
+                cd.c.nivel == co.c.nivel,
+                cd.c.gestion == destino
+            )))
+            .where(co.c.gestion == origen)
+            .subquery("mapa")
+        )
+
+    @staticmethod
+    def contar(db: Session, gestion: str) -> dict:
+        """Cantidad de cursos, asignaciones y bloques de una gestión"""
+        cursos = db.query(func.count(Curso.id_curso)).filter(Curso.gestion == gestion).scalar()
+        asignaciones = (
+            db.query(func.count())
+            .select_from(ProfesorCursoMateria)
+            .join(Curso, Curso.id_curso == ProfesorCursoMateria.id_curso)
+            .filter(Curso.gestion == gestion)
+            .scalar()
+        )
+        bloques = db.query(func.count(BloqueHorario.id_bloque)).filter(BloqueHorario.gestion == gestion).scalar()
+        return {"cursos": cursos, "asignaciones": asignaciones, "bloques": bloques}
+
+    @staticmethod
+    def get_cursos_duplicados(db: Session, gestion: str) -> List[str]:
+        """Cursos que comparten (nombre_curso, nivel) en una gestión e impiden el remapeo"""
+        filas = (
+            db.query(Curso.nombre_curso, Curso.nivel)
+            .filter(Curso.gestion == gestion)
+            .group_by(Curso.nombre_curso, Curso.nivel)
+            .having(func.count(Curso.id_curso) > 1)
+            .all()
+        )
+        return [f"{f.nombre_curso} ({f.nivel})" for f in filas]
+
+    @staticmethod
+    def copiar_cursos(db: Session, origen: str, destino: str) -> int:
+        """INSERT ... SELECT de los cursos de la gestión origen"""
+        cursos = Curso.__table__
+        consulta = (
+            select(cursos.c.nombre_curso, cursos.c.nivel, literal(destino), literal(siguiente_secuencia(db, "curso")))
+            .where(cursos.c.gestion == origen)
+        )
+        resultado = db.execute(
+            insert(cursos).from_select(["nombre_curso", "nivel", "gestion", "seq_cambio"], consulta)
+        )
+        return resultado.rowcount
+
+    @staticmethod
+    def copiar_asignaciones(db: Session, origen: str, destino: str) -> int:
+        """INSERT ... SELECT de las asignaciones, apuntando a los cursos copiados"""
+        asignaciones = ProfesorCursoMateria.__table__
+        mapa = GestionRepository._mapa_cursos(origen, destino)
+        consulta = (
+            select(asignaciones.c.id_profesor, mapa.c.id_destino, asignaciones.c.id_materia,
+                   literal(siguiente_secuencia(db, "asignacion")))
+            .select_from(asignaciones.join(mapa, mapa.c.id_origen == asignaciones.c.id_curso))
+        )
+        resultado = db.execute(
+            insert(asignaciones).from_select(["id_profesor", "id_curso", "id_materia", "seq_cambio"], consulta)
+        )
+        return resultado.rowcount
+
+    @staticmethod
+    def copiar_bloques(db: Session, origen: str, destino: str) -> int:
+        """
+        INSERT ... SELECT de los bloques de la gestión origen
+
+        Los bloques cuyo curso pertenece a la gestión origen pasan al curso
+        copiado; el resto conserva su id_curso.
+        """
+        bloques = BloqueHorario.__table__
+        mapa = GestionRepository._mapa_cursos(origen, destino)
+        consulta = (
+            select(
+                bloques.c.id_profesor,
+                func.coalesce(mapa.c.id_destino, bloques.c.id_curso),
+                bloques.c.id_materia,
+                bloques.c.dia_semana,
+                bloques.c.hora_inicio,
+                bloques.c.hora_fin,
+                literal(destino),
+                func.now(),
+                bloques.c.observaciones,
+                literal(siguiente_secuencia(db, "bloque"))
+            )
+            .select_from(bloques.outerjoin(mapa, mapa.c.id_origen == bloques.c.id_curso))
+            .where(bloques.c.gestion == origen)
+        )
+        resultado = db.execute(
+            insert(bloques).from_select(
+                ["id_profesor", "id_curso", "id_materia", "dia_semana", "hora_inicio",
+                 "hora_fin", "gestion", "fecha_registro", "observaciones", "seq_cambio"],
+                consulta
+            )
+        )
+        return resultado.rowcount
+
+
+# ============ ARCHIVO REPOSITORY ============
+class ArchivoRepository:
+    """
+    Movimiento de gestiones cerradas entre bloques_horarios y bloques_horarios_archivo
+
+    Alternativa en MySQL: particionar bloques_horarios por LIST COLUMNS(gestion);
+    las tablas de archivo funcionan igual en cualquier motor.
+    """
+
+    _COLUMNAS_BLOQUE = [
+        "id_bloque", "id_profesor", "id_curso", "id_materia", "dia_semana",
+        "hora_inicio", "hora_fin", "gestion", "fecha_registro", "observaciones"
+    ]
+
+    @staticmethod
+    def archivar_bloques(db: Session, gestion: str) -> int:
+        """INSERT ... SELECT al archivo y DELETE de la tabla caliente. No hace commit."""
+        origen = BloqueHorario.__table__
+        columnas = ArchivoRepository._COLUMNAS_BLOQUE
+        db.execute(
+            insert(BloqueHorarioArchivo.__table__).from_select(
+                columnas,
+                select(*[origen.c[c] for c in columnas]).where(origen.c.gestion == gestion)
+            )
+        )
+        registrar_eliminados(db, "bloque", origen, origen.c.gestion == gestion, siguiente_secuencia(db, "bloque"))
+        return db.execute(origen.delete().where(origen.c.gestion == gestion)).rowcount
+
+    @staticmethod
+    def restaurar_bloques(db: Session, gestion: str) -> int:
+        """Operación inversa de archivar_bloques. No hace commit."""
+        archivo = BloqueHorarioArchivo.__table__
+        columnas = ArchivoRepository._COLUMNAS_BLOQUE
+        db.execute(
+            insert(BloqueHorario.__table__).from_select(
+                columnas + ["seq_cambio"],
+                select(*[archivo.c[c] for c in columnas], literal(siguiente_secuencia(db, "bloque")))
+                .where(archivo.c.gestion == gestion)
+            )
+        )
+        return db.execute(archivo.delete().where(archivo.c.gestion == gestion)).rowcount
+
+    @staticmethod
+    def get_bloques(db: Session, gestion: Optional[str] = None,
+                    id_profesor: Optional[int] = None) -> List[BloqueHorarioArchivo]:
+        """Obtiene bloques archivados"""
+        query = db.query(BloqueHorarioArchivo)
+        if gestion:
+            query = query.filter(BloqueHorarioArchivo.gestion == gestion)
+        if id_profesor:
+            query = query.filter(BloqueHorarioArchivo.id_profesor == id_profesor)
+        return query.all()
+
+    @staticmethod
+    def get_bloques_con_nombres(db: Session, id_profesor: int, gestion: Optional[str] = None):
+        """Bloques archivados de un profesor con nombres (ver BloqueHorarioRepository.get_by_profesor_con_nombres)"""
+        return BloqueHorarioRepository.get_by_profesor_con_nombres(db, id_profesor, gestion, BloqueHorarioArchivo)
+
+    @staticmethod
+    def get_gestion(db: Session, gestion: str) -> Optional[GestionArchivada]:
+        return db.query(GestionArchivada).filter(GestionArchivada.gestion == gestion).first()
+
+    @staticmethod
+    def get_gestiones(db: Session) -> List[GestionArchivada]:
+        return db.query(GestionArchivada).order_by(GestionArchivada.gestion).all()
@@ -0,0 +1,133 @@
+"""
+Snapshot versionado de catálogos para el arranque del frontend
+
+GET /api/profesores/bootstrap devuelve en una sola respuesta cargos, materias,
+cursos y el resumen de profesores. El cuerpo JSON se serializa una vez por
+versión de datos y se guarda en memoria junto con su ETag: mientras la versión
+no cambie, cada petición cuesta una lectura por clave primaria (versiones_datos)
+y se sirve el mismo buffer (o 304 si el cliente ya lo tiene).
+
+Los servicios de escritura de profesores, materias y cursos llaman a
+BootstrapService.invalidar() antes de confirmar sus cambios, en la misma
+transacción.
+"""
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from fastapi import Response
+from sqlalchemy.orm import Session
+
+from app.modules.profesores.dto.profesor_dto import (
+    CatalogoBootstrapDTO, CargoReadDTO, MateriaReadDTO, CursoReadDTO, ProfesorResumenDTO
+)
+from app.modules.profesores.repositories.profesor_repository import (
+    PersonaRepository, MateriaRepository, CursoRepository, CargoRepository
+)
+from app.shared.services.cache_registry import cache_registry
+from app.shared.services.compression import calcular_etag
+from app.shared.services.data_version import DataVersion
+
+VERSION_CATALOGOS = "profesores.catalogos"
+
+
+# ============ SNAPSHOT EN MEMORIA ============
+class CatalogoSnapshot:
+    """
+    Último snapshot construido: (versión, ETag, cuerpo JSON)
+
+    La tupla se reemplaza completa, así que la lectura no necesita el lock;
+    el lock solo evita que varias peticiones reconstruyan a la vez.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._actual: Optional[Tuple[int, str, bytes]] = None
+        self._construcciones = 0
+        self._servidos = 0
+        self._fecha_construccion: Optional[datetime] = None
+
+    def obtener(self, db: Session) -> Tuple[int, str, bytes]:
+        # La versión se lee antes que los datos: si una escritura se cuela entre
+        # ambas lecturas, el snapshot queda con datos nuevos y versión vieja, y
+        # se reconstruye en la próxima petición (nunca al revés).
+        version = DataVersion.obtener(db, VERSION_CATALOGOS)
+        actual = self._actual
+        if actual is None or actual[0] != version:
+            with self._lock:
+                actual = self._actual
+                if actual is None or actual[0] != version:
+                    actual = self._construir(db, version)
+                    self._actual = actual
+        self._servidos += 1
+        return actual
+
+    def _construir(self, db: Session, version: int) -> Tuple[int, str, bytes]:
+        snapshot = CatalogoBootstrapDTO(
+            version=version,
+            cargos=[CargoReadDTO.from_orm(c) for c in sorted(CargoRepository.get_all(db), key=lambda c: c.id_cargo)],
+            materias=[MateriaReadDTO.from_orm(m) for m in sorted(MateriaRepository.get_all(db), key=lambda m: m.id_materia)],
+            cursos=[CursoReadDTO.from_orm(c) for c in sorted(CursoRepository.get_all(db), key=lambda c: c.id_curso)],
+            profesores=[
+                ProfesorResumenDTO(
+                    id_persona=f.id_persona,
+                    id_profesor=f.id_profesor,
+                    ci=f.ci,
+                    nombre_completo=" ".join(p for p in (f.nombres, f.apellido_paterno, f.apellido_materno) if p),
+                    correo=f.correo,
+                    id_cargo=f.id_cargo,
+                    nombre_cargo=f.nombre_cargo,
+                    estado_laboral=f.estado_laboral,
+                    especialidad=f.especialidad
+                ) for f in PersonaRepository.get_resumen_profesores(db)
+            ]
+        )
+        # Sin marcas de tiempo en el cuerpo: todos los workers generan los mismos
+        # bytes para una versión y, por lo tanto, el mismo ETag
+        cuerpo = snapshot.model_dump_json().encode("utf-8")
+        self._construcciones += 1
+        self._fecha_construccion = datetime.utcnow()
+        return version, calcular_etag(cuerpo), cuerpo
+
+    def vaciar(self) -> None:
+        with self._lock:
+            self._actual = None
+
+    def estadisticas(self) -> Dict:
+        actual = self._actual
+        return {
+            "version": actual[0] if actual else None,
+            "bytes": len(actual[2]) if actual else 0,
+            "construcciones": self._construcciones,
+            "servidos": self._servidos,
+            "fecha_construccion": self._fecha_construccion.isoformat() if self._fecha_construccion else None
+        }
+
+
+# Instancia compartida por proceso
+catalogo_snapshot = CatalogoSnapshot()
+
+cache_registry.registrar(
+    "profesores.bootstrap", catalogo_snapshot.estadisticas, catalogo_snapshot.vaciar,
+    "Snapshot JSON de catálogos para el arranque del frontend (se reconstruye en la próxima petición)"
+)
+
+
+# ============ BOOTSTRAP SERVICE ============
+class BootstrapService:
+
+    @staticmethod
+    def obtener_respuesta(db: Session, if_none_match: Optional[str] = None) -> Response:
+        """Respuesta con el snapshot prearmado, o 304 si el ETag del cliente coincide"""
+        version, etag, cuerpo = catalogo_snapshot.obtener(db)
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "X-Catalogo-Version": str(version)}
+        if if_none_match and (
+            etag in (e.strip() for e in if_none_match.split(",")) or if_none_match.strip() == "*"
+        ):
+            return Response(status_code=304, headers=headers)
+        return Response(content=cuerpo, media_type="application/json", headers=headers)
+
+    @staticmethod
+    def invalidar(db: Session) -> None:
+        """Marca los catálogos como modificados (llamar antes del commit de la escritura, sin commit propio)"""
+        DataVersion.incrementar(db.connection(), VERSION_CATALOGOS)
@@ -0,0 +1,223 @@
+import json
+import os
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.config.database import SessionLocal
+from app.modules.profesores.dto.profesor_dto import (
+    GestionRolloverRequestDTO, GestionConteoDTO, GestionRolloverPreviewDTO, GestionRolloverJobDTO,
+    GestionArchivadaDTO
+)
+from app.modules.profesores.models.profesor_models import GestionArchivada
+from app.modules.profesores.repositories.profesor_repository import GestionRepository, ArchivoRepository
+from app.modules.profesores.services.bootstrap_service import BootstrapService
+from app.shared.models.job_models import Job
+from app.modules.reportes.services.reporte_service import ReporteService
+from app.shared.services.job_queue import job_queue
+from app.shared.services.base_services import AuditService, Autor
+from app.shared.services.change_feed import change_feed
+
+# Gestión en curso: nunca se archiva
+GESTION_ACTUAL = os.getenv("GESTION_ACTUAL", str(datetime.utcnow().year))
+
+TAREA_ROLLOVER = "profesores.rollover_gestion"
+
+
+# ============ GESTIÓN SERVICE ============
+class GestionService:
+
+    @staticmethod
+    def previsualizar_rollover(db: Session, data: GestionRolloverRequestDTO) -> GestionRolloverPreviewDTO:
+        """Cuenta lo que se copiaría y detecta conflictos, sin escribir nada"""
+        origen = GestionRepository.contar(db, data.gestion_origen)
+        destino = GestionRepository.contar(db, data.gestion_destino)
+
+        if not data.incluir_asignaciones:
+            origen["asignaciones"] = 0
+        if not data.incluir_bloques:
+            origen["bloques"] = 0
+
+        return GestionRolloverPreviewDTO(
+            gestion_origen=data.gestion_origen,
+            gestion_destino=data.gestion_destino,
+            a_copiar=GestionConteoDTO(**origen),
+            existentes_en_destino=GestionConteoDTO(**destino),
+            conflictos=GestionService._conflictos(db, data, origen, destino)
+        )
+
+    @staticmethod
+    def iniciar_rollover(db: Session, data: GestionRolloverRequestDTO, idempotency_key: Optional[str] = None,
+                         autor: Optional[Autor] = None) -> GestionRolloverJobDTO:
+        """Valida el rollover y lo encola; el job lo audita a nombre de `autor` al copiar"""
+        if idempotency_key:
+            existente = db.query(Job).filter(Job.idempotency_key == f"rollover:{idempotency_key}").first()
+            if existente:
+                return GestionService._job_to_dto(existente)
+
+        preview = GestionService.previsualizar_rollover(db, data)
+        if preview.conflictos:
+            raise HTTPException(status_code=400, detail="; ".join(preview.conflictos))
+
+        # Un rollover fallido no se reintenta solo: el error suele ser de datos
+        autor = autor or Autor()
+        id_job = job_queue.encolar(
+            TAREA_ROLLOVER, {**data.model_dump(), "autor": {"usuario_id": autor.usuario_id, "ip": autor.ip}},
+            prioridad=5, max_intentos=1,
+            idempotency_key=f"rollover:{idempotency_key}" if idempotency_key else None
+        )
+        AuditService.registrar(autor, "encolar_rollover", "gestion", id_job, data.model_dump())
+        return GestionService.obtener_job(db, str(id_job))
+
+    @staticmethod
+    @job_queue.tarea(TAREA_ROLLOVER)
+    def ejecutar_rollover(payload: dict) -> dict:
+        """
+        Copia la gestión completa en una sola transacción (lo ejecuta la cola de trabajos)
+
+        Abre su propia sesión: la de la petición ya está cerrada cuando corre.
+        Las validaciones de iniciar_rollover se repiten con el lock de gestiones
+        tomado, porque entre el encolado y la ejecución otro rollover o un
+        archivo pudo cambiar las gestiones. Si el destino ya tiene datos no se
+        copia nada (un job repetido no duplica la gestión).
+        """
+        data = GestionRolloverRequestDTO(**payload)
+        autor = Autor(**payload.get("autor", {}))
+        db = SessionLocal()
+        try:
+            GestionRepository.bloquear(db)
+            origen = GestionRepository.contar(db, data.gestion_origen)
+            destino = GestionRepository.contar(db, data.gestion_destino)
+            if destino["cursos"] or destino["bloques"]:
+                db.rollback()
+                print(f"[INFO] Rollover {data.gestion_origen} -> {data.gestion_destino} omitido: "
+                      f"la gestión destino ya tiene datos")
+                return GestionConteoDTO().model_dump()
+            conflictos = GestionService._conflictos(db, data, origen, destino)
+            if conflictos:
+                raise ValueError("; ".join(conflictos))
+
+            copiados = GestionConteoDTO(
+                cursos=GestionRepository.copiar_cursos(db, data.gestion_origen, data.gestion_destino)
+            )
+            if data.incluir_asignaciones:
+                copiados.asignaciones = GestionRepository.copiar_asignaciones(
+                    db, data.gestion_origen, data.gestion_destino
+                )
+            if data.incluir_bloques:
+                copiados.bloques = GestionRepository.copiar_bloques(
+                    db, data.gestion_origen, data.gestion_destino
+                )
+            if copiados.cursos:
+                BootstrapService.invalidar(db)
+            db.commit()
+            ReporteService.programar_recalculo(data.gestion_destino)
+            for entidad in ("curso", "asignacion", "bloque"):
+                change_feed.publicar(entidad, "recargar", {"gestion": data.gestion_destino})
+            AuditService.registrar(autor, "rollover", "gestion", details={
+                **data.model_dump(), "copiados": copiados.model_dump()
+            })
+            return copiados.model_dump()
+        except Exception as e:
+            db.rollback()
+            print(f"[ERROR] Rollover {data.gestion_origen} -> {data.gestion_destino} falló: {e}")
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def obtener_job(db: Session, id_job: str) -> Optional[GestionRolloverJobDTO]:
+        if not id_job.isdigit():
+            return None
+        job = db.query(Job).filter(Job.id_job == int(id_job), Job.tipo == TAREA_ROLLOVER).first()
+        return GestionService._job_to_dto(job) if job else None
+
+    @staticmethod
+    def archivar_gestion(db: Session, gestion: str, autor: Optional[Autor] = None) -> GestionArchivadaDTO:
+        """Mueve los bloques de una gestión cerrada a bloques_horarios_archivo en una transacción"""
+        if gestion == GESTION_ACTUAL:
+            raise HTTPException(status_code=400, detail="No se puede archivar la gestión actual")
+        GestionRepository.bloquear(db)
+        if ArchivoRepository.get_gestion(db, gestion):
+            db.rollback()
+            raise HTTPException(status_code=400, detail=f"La gestión {gestion} ya está archivada")
+
+        try:
+            total = ArchivoRepository.archivar_bloques(db, gestion)
+            if total == 0:
+                db.rollback()
+                raise HTTPException(status_code=404, detail=f"La gestión {gestion} no tiene bloques")
+
+            archivada = GestionArchivada(gestion=gestion, total_bloques=total, fecha_archivo=datetime.utcnow())
+            db.add(archivada)
+            resultado = GestionArchivadaDTO.from_orm(archivada)
+            db.commit()
+            change_feed.publicar("bloque", "recargar", {"gestion": gestion})
+            AuditService.registrar(autor, "archivar", "gestion", details={"gestion": gestion, "bloques": total})
+            return resultado
+        except HTTPException:
+            raise
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error al archivar la gestión: {str(e)}")
+
+    @staticmethod
+    def restaurar_gestion(db: Session, gestion: str, autor: Optional[Autor] = None) -> GestionArchivadaDTO:
+        """Devuelve una gestión archivada a la tabla bloques_horarios"""
+        GestionRepository.bloquear(db)
+        archivada = ArchivoRepository.get_gestion(db, gestion)
+        if not archivada:
+            db.rollback()
+            raise HTTPException(status_code=404, detail=f"La gestión {gestion} no está archivada")
+
+        try:
+            resultado = GestionArchivadaDTO.from_orm(archivada)
+            resultado.total_bloques = ArchivoRepository.restaurar_bloques(db, gestion)
+            db.delete(archivada)
+            db.commit()
+            ReporteService.programar_recalculo(gestion)
+            change_feed.publicar("bloque", "recargar", {"gestion": gestion})
+            AuditService.registrar(autor, "restaurar", "gestion", details={
+                "gestion": gestion, "bloques": resultado.total_bloques
+            })
+            return resultado
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error al restaurar la gestión: {str(e)}")
+
+    @staticmethod
+    def listar_gestiones_archivadas(db: Session) -> List[GestionArchivadaDTO]:
+        return [GestionArchivadaDTO.from_orm(g) for g in ArchivoRepository.get_gestiones(db)]
+
+    @staticmethod
+    def _job_to_dto(job: Job) -> GestionRolloverJobDTO:
+        payload = json.loads(job.payload or "{}")
+        return GestionRolloverJobDTO(
+            id_job=str(job.id_job),
+            estado=job.estado,
+            gestion_origen=payload.get("gestion_origen", ""),
+            gestion_destino=payload.get("gestion_destino", ""),
+            copiados=GestionConteoDTO(**json.loads(job.resultado)) if job.resultado else None,
+            error=job.error,
+            fecha_creacion=job.fecha_creacion,
+            fecha_fin=job.fecha_fin
+        )
+
+    @staticmethod
+    def _conflictos(db: Session, data: GestionRolloverRequestDTO, origen: dict, destino: dict) -> List[str]:
+        conflictos = []
+        if data.gestion_origen == data.gestion_destino:
+            conflictos.append("La gestión destino debe ser distinta de la gestión origen")
+        if origen["cursos"] == 0 and origen["bloques"] == 0:
+            conflictos.append(f"La gestión {data.gestion_origen} no tiene cursos ni bloques")
+        if destino["cursos"] or destino["bloques"]:
+            conflictos.append(f"La gestión {data.gestion_destino} ya tiene cursos o bloques registrados")
+        if ArchivoRepository.get_gestion(db, data.gestion_origen):
+            conflictos.append(f"La gestión {data.gestion_origen} está archivada; restáurela antes de copiarla")
+
+        duplicados = GestionRepository.get_cursos_duplicados(db, data.gestion_origen)
+        if duplicados:
+            conflictos.append(f"Cursos repetidos en {data.gestion_origen}: {', '.join(duplicados)}")
+        return conflictos
@@ -0,0 +1,320 @@
+import heapq
+import os
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import defaultdict
+from itertools import islice
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.modules.profesores.dto.profesor_dto import PersonaSearchResultDTO
+from app.modules.profesores.repositories.profesor_repository import PersonaRepository
+from app.shared.services.cache_registry import cache_registry
+from app.shared.services.change_sequence import DeltaSync, nombre_secuencia
+from app.shared.services.data_version import DataVersion
+
+# "memoria" (índice de trigramas en proceso) o "fulltext" (MATCH ... AGAINST en MySQL)
+MODO_BUSQUEDA = os.getenv("PERSONA_SEARCH_MODE", "memoria")
+
+# Similitud mínima de trigramas para aceptar un término aproximado
+UMBRAL_SIMILITUD = 0.5
+
+_NO_ALFANUMERICO = re.compile(r"[^a-z0-9]+")
+
+
+def normalizar(texto: Optional[str]) -> str:
+    """Minúsculas, sin tildes ni signos: 'Núñez-Peña' -> 'nunez pena'"""
+    if not texto:
+        return ""
+    sin_tildes = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    return _NO_ALFANUMERICO.sub(" ", sin_tildes.lower()).strip()
+
+
+def _trigramas(termino: str) -> Set[str]:
+    relleno = f"  {termino} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+# ============ ÍNDICE EN MEMORIA ============
+class PersonaSearchIndex:
+    """
+    Índice invertido en memoria sobre nombres, apellidos, CI y correo de profesores
+
+    - Vocabulario ordenado para búsquedas por prefijo (bisect)
+    - Trigramas sobre el vocabulario para búsquedas aproximadas (errores de tipeo)
+    - Se construye de forma perezosa en la primera búsqueda y luego se
+      actualiza de forma incremental desde los servicios de escritura
+    - Cada worker tiene su copia: antes de buscar, sincronizar() compara el
+      número de la secuencia de cambios "profesores" con el que ya aplicó y
+      trae de la BD solo los profesores modificados o eliminados desde
+      entonces (también los que escribió otro worker)
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._construido = False
+        self._seq = 0
+        self._documentos: Dict[int, dict] = {}
+        self._terminos_doc: Dict[int, Set[str]] = {}
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._trigramas: Dict[str, Set[str]] = defaultdict(set)
+        self._vocabulario: List[str] = []
+
+    @property
+    def construido(self) -> bool:
+        return self._construido
+
+    def construir(self, db: Session) -> None:
+        """Carga todos los profesores desde la BD (una consulta además de las marcas de la secuencia)"""
+        self.sincronizar(db, completo=True)
+
+    def sincronizar(self, db: Session, completo: bool = False) -> None:
+        """
+        Aplica los cambios de profesores confirmados después de la última
+        sincronización. Sin cambios cuesta una lectura por clave primaria.
+        """
+        completo = completo or not self._construido
+        desde = 0 if completo else self._seq
+        if not completo and DataVersion.obtener(db, nombre_secuencia("persona")) == desde:
+            return
+        delta = DeltaSync.respuesta(
+            db, desde, "persona", lambda seq: PersonaRepository.get_datos_busqueda(db, seq)
+        )
+        profesores_eliminados = (
+            set() if delta["completo"]
+            else {e["id_profesor"] for e in DeltaSync.eliminados(db, "profesor", desde)}
+        )
+
+        with self._lock:
+            if delta["completo"]:
+                self._limpiar()
+                for fila in delta["cambios"]:
+                    self._agregar(fila, ordenar=False)
+                self._vocabulario.sort()
+                self._construido = True
+                self._seq = delta["hasta"]
+                return
+            if not self._construido:
+                # Se invalidó mientras se leía el delta: lo reconstruye la próxima búsqueda
+                return
+            for eliminado in delta["eliminados"]:
+                self._quitar(eliminado["id_persona"])
+            if profesores_eliminados:
+                for id_persona in [i for i, d in self._documentos.items() if d["id_profesor"] in profesores_eliminados]:
+                    self._quitar(id_persona)
+            for fila in delta["cambios"]:
+                self._quitar(fila.id_persona)
+                self._agregar(fila)
+            self._seq = max(self._seq, delta["hasta"])
+
+    def invalidar(self) -> None:
+        """Marca el índice para reconstruirse en la próxima búsqueda"""
+        with self._lock:
+            self._limpiar()
+            self._construido = False
+
+    def estadisticas(self) -> Dict:
+        with self._lock:
+            return {
+                "construido": self._construido,
+                "secuencia": self._seq,
+                "documentos": len(self._documentos),
+                "terminos": len(self._vocabulario),
+                "trigramas": len(self._trigramas)
+            }
+
+    def indexar(self, profesor) -> None:
+        """Inserta o reemplaza un profesor (acepta ProfesorReadDTO o una fila con los mismos campos)"""
+        with self._lock:
+            if not self._construido:
+                return
+            self._quitar(profesor.id_persona)
+            self._agregar(profesor)
+
+    def quitar(self, id_persona: int) -> None:
+        with self._lock:
+            if self._construido:
+                self._quitar(id_persona)
+
+    def buscar(self, consulta: str, limite: int = 20) -> List[PersonaSearchResultDTO]:
+        """
+        Retorna los profesores ordenados por relevancia
+
+        Con varios términos se exige que todos coincidan (AND); si ningún
+        profesor los cumple a la vez, se relaja a cualquiera de ellos (OR).
+        """
+        terminos = list(dict.fromkeys(normalizar(consulta).split()))
+        if not terminos:
+            return []
+
+        with self._lock:
+            niveles = [self._niveles_termino(t) for t in terminos]
+
+            if len(niveles) == 1:
+                mejores = self._mejores_un_termino(niveles[0], limite)
+            else:
+                mejores = self._mejores_varios_terminos(niveles, limite)
+
+            return [
+                PersonaSearchResultDTO(**self._documentos[id_persona], puntaje=round(puntaje, 3))
+                for id_persona, puntaje in mejores
+            ]
+
+    # ---- Internos (requieren el lock) ----
+
+    def _niveles_termino(self, termino: str) -> List[Tuple[float, Set[int]]]:
+        """
+        Agrupa los profesores que coinciden con un término por puntaje, de mayor a menor
+
+        Exacto = 1.0, prefijo = 0.8. Solo si no hay coincidencias por prefijo se
+        intenta la búsqueda aproximada: 0.6 * similitud de trigramas.
+        """
+        puntaje_por_termino: Dict[str, float] = {}
+
+        inicio = bisect_left(self._vocabulario, termino)
+        for candidato in islice(self._vocabulario, inicio, None):
+            if not candidato.startswith(termino):
+                break
+            puntaje_por_termino[candidato] = 1.0 if candidato == termino else 0.8
+
+        if not puntaje_por_termino and len(termino) >= 3 and not termino.isdigit():
+            trigramas_consulta = _trigramas(termino)
+            coincidencias: Dict[str, int] = defaultdict(int)
+            for trigrama in trigramas_consulta:
+                for candidato in self._trigramas.get(trigrama, ()):
+                    coincidencias[candidato] += 1
+            for candidato, comunes in coincidencias.items():
+                similitud = comunes / len(trigramas_consulta | _trigramas(candidato))
+                if similitud >= UMBRAL_SIMILITUD:
+                    puntaje_por_termino[candidato] = round(0.6 * similitud, 3)
+
+        terminos_por_puntaje: Dict[float, List[str]] = defaultdict(list)
+        for candidato, puntaje in puntaje_por_termino.items():
+            terminos_por_puntaje[puntaje].append(candidato)
+
+        niveles, vistos = [], set()
+        for puntaje in sorted(terminos_por_puntaje, reverse=True):
+            ids = set().union(*(self._postings[t] for t in terminos_por_puntaje[puntaje])) - vistos
+            if ids:
+                niveles.append((puntaje, ids))
+                vistos |= ids
+        return niveles
+
+    @staticmethod
+    def _mejores_un_termino(niveles, limite: int) -> List[Tuple[int, float]]:
+        """Recorre los niveles en orden; dentro de un nivel desempata por id_persona"""
+        mejores = []
+        for puntaje, ids in niveles:
+            faltan = limite - len(mejores)
+            if faltan <= 0:
+                break
+            mejores.extend((id_persona, puntaje) for id_persona in heapq.nsmallest(faltan, ids))
+        return mejores
+
+    @staticmethod
+    def _mejores_varios_terminos(niveles_por_termino, limite: int) -> List[Tuple[int, float]]:
+        conjuntos = [set().union(*(ids for _, ids in niveles)) for niveles in niveles_por_termino]
+        candidatos = set.intersection(*conjuntos) or set.union(*conjuntos)
+
+        puntajes = []
+        for id_persona in candidatos:
+            total = 0.0
+            for niveles in niveles_por_termino:
+                for puntaje, ids in niveles:
+                    if id_persona in ids:
+                        total += puntaje
+                        break
+            puntajes.append((id_persona, total))
+
+        return heapq.nsmallest(limite, puntajes, key=lambda item: (-item[1], item[0]))
+
+    def _agregar(self, fila, ordenar: bool = True) -> None:
+        nombre_completo = " ".join(
+            p for p in (fila.nombres, fila.apellido_paterno, fila.apellido_materno) if p
+        )
+        self._documentos[fila.id_persona] = {
+            "id_persona": fila.id_persona,
+            "id_profesor": fila.id_profesor,
+            "ci": fila.ci,
+            "nombre_completo": nombre_completo,
+            "correo": fila.correo
+        }
+
+        terminos = set(normalizar(f"{nombre_completo} {fila.ci} {fila.correo or ''}").split())
+        if fila.correo:
+            terminos.add(normalizar(fila.correo.split("@")[0]).replace(" ", ""))
+        self._terminos_doc[fila.id_persona] = terminos
+
+        for termino in terminos:
+            if termino not in self._postings:
+                if ordenar:
+                    insort(self._vocabulario, termino)
+                else:
+                    self._vocabulario.append(termino)
+                for trigrama in _trigramas(termino):
+                    self._trigramas[trigrama].add(termino)
+            self._postings[termino].add(fila.id_persona)
+
+    def _quitar(self, id_persona: int) -> None:
+        self._documentos.pop(id_persona, None)
+        for termino in self._terminos_doc.pop(id_persona, ()):
+            ids = self._postings.get(termino)
+            if ids is None:
+                continue
+            ids.discard(id_persona)
+            if not ids:
+                del self._postings[termino]
+                del self._vocabulario[bisect_left(self._vocabulario, termino)]
+                for trigrama in _trigramas(termino):
+                    self._trigramas[trigrama].discard(termino)
+
+    def _limpiar(self) -> None:
+        self._documentos.clear()
+        self._terminos_doc.clear()
+        self._postings.clear()
+        self._trigramas.clear()
+        self._vocabulario.clear()
+
+
+# Instancia compartida por proceso
+persona_search_index = PersonaSearchIndex()
+cache_registry.registrar(
+    "profesores.busqueda", persona_search_index.estadisticas, persona_search_index.invalidar,
+    "Índice de búsqueda de profesores (se reconstruye en la próxima búsqueda)"
+)
+
+
+# ============ PERSONA SEARCH SERVICE ============
+class PersonaSearchService:
+
+    @staticmethod
+    def buscar(db: Session, consulta: str, limite: int = 20,
+               modo: Optional[str] = None) -> List[PersonaSearchResultDTO]:
+        """Busca profesores por nombre, apellidos, CI o correo"""
+        modo = modo or MODO_BUSQUEDA
+
+        if modo == "memoria":
+            persona_search_index.sincronizar(db)
+            return persona_search_index.buscar(consulta, limite)
+
+        if modo == "fulltext":
+            terminos = normalizar(consulta).split()
+            if not terminos:
+                return []
+            filas = PersonaRepository.search_fulltext(db, " ".join(f"+{t}*" for t in terminos), limite)
+            return [
+                PersonaSearchResultDTO(
+                    id_persona=f.id_persona,
+                    id_profesor=f.id_profesor,
+                    ci=f.ci,
+                    nombre_completo=" ".join(p for p in (f.nombres, f.apellido_paterno, f.apellido_materno) if p),
+                    correo=f.correo,
+                    puntaje=round(float(f.puntaje), 3)
+                ) for f in filas
+            ]
+
+        raise HTTPException(status_code=400, detail="Modo de búsqueda inválido. Use 'memoria' o 'fulltext'")
@@ -0,0 +1,215 @@
+import csv
+import io
+from datetime import date, datetime
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.modules.profesores.dto.profesor_dto import (
+    ProfesorCreateDTO, ProfesorImportErrorDTO, ProfesorImportResultDTO
+)
+from app.modules.profesores.repositories.profesor_repository import (
+    PersonaRepository, ProfesorRepository, CargoRepository
+)
+from app.modules.profesores.services.persona_search_service import persona_search_index
+from app.modules.profesores.services.profesor_service import ProfesorService
+from app.modules.profesores.services.bootstrap_service import BootstrapService
+from app.shared.services.base_services import AuditService, Autor
+from app.shared.services.change_feed import change_feed
+
+# Filas validadas, verificadas e insertadas por transacción
+TAMANO_LOTE = 500
+
+
+# ============ PROFESOR IMPORT SERVICE ============
+class ProfesorImportService:
+    """
+    Importación masiva de profesores desde CSV/XLSX
+
+    El archivo se lee en streaming y se procesa por lotes: cada lote se valida
+    contra ProfesorCreateDTO, verifica CI/correo con una sola consulta y se
+    inserta con sentencias set-based en su propia transacción.
+    """
+
+    @staticmethod
+    def importar(db: Session, archivo, nombre_archivo: str, autor: Optional[Autor] = None) -> ProfesorImportResultDTO:
+        """Importa profesores desde un archivo CSV o XLSX"""
+        filas = ProfesorImportService._leer_filas(archivo, nombre_archivo)
+        ids_cargo = {c.id_cargo for c in CargoRepository.get_all(db)}
+
+        total, insertados = 0, 0
+        errores: List[ProfesorImportErrorDTO] = []
+        vistos_ci, vistos_correo = set(), set()
+
+        while True:
+            lote = list(islice(filas, TAMANO_LOTE))
+            if not lote:
+                break
+            total += len(lote)
+
+            validos, errores_lote = ProfesorImportService._validar_lote(
+                db, lote, ids_cargo, vistos_ci, vistos_correo
+            )
+            errores.extend(errores_lote)
+
+            try:
+                lote_insertado = ProfesorRepository.bulk_create(
+                    db, [ProfesorService.separar_datos(dto) for _, dto in validos]
+                )
+                if lote_insertado:
+                    BootstrapService.invalidar(db)
+                db.commit()
+                insertados += lote_insertado
+            except IntegrityError as e:
+                # Otra escritura concurrente ganó la carrera: se rechaza el lote completo
+                db.rollback()
+                errores.extend(
+                    ProfesorImportErrorDTO(fila=fila, ci=dto.ci, errores=[f"Error al insertar el lote: {e.orig}"])
+                    for fila, dto in validos
+                )
+            except SQLAlchemyError as e:
+                # Error de BD en este lote (datos fuera de rango, conexión caída...):
+                # se rechaza el lote y se sigue con el resto del archivo
+                db.rollback()
+                print(f"[ERROR] No se pudo insertar el lote de profesores: {e}")
+                errores.extend(
+                    ProfesorImportErrorDTO(fila=fila, ci=dto.ci, errores=["Error de base de datos al insertar el lote"])
+                    for fila, dto in validos
+                )
+
+        if insertados:
+            # Los IDs del lote no se cargan en memoria: el índice se reconstruye en la próxima búsqueda
+            persona_search_index.invalidar()
+            change_feed.publicar("profesor", "recargar", {})
+
+        errores.sort(key=lambda e: e.fila)
+        AuditService.registrar(autor, "importar", "profesor", details={
+            "archivo": nombre_archivo, "total_filas": total, "insertados": insertados
+        })
+        return ProfesorImportResultDTO(
+            total_filas=total,
+            insertados=insertados,
+            rechazados=total - insertados,
+            errores=errores
+        )
+
+    @staticmethod
+    def _validar_lote(db: Session, lote: List[Tuple[int, Dict]], ids_cargo: set,
+                      vistos_ci: set, vistos_correo: set):
+        """Valida un lote y descarta CI/correos repetidos en el archivo o ya registrados"""
+        candidatos: List[Tuple[int, ProfesorCreateDTO]] = []
+        errores: List[ProfesorImportErrorDTO] = []
+
+        for fila, datos in lote:
+            try:
+                candidatos.append((fila, ProfesorCreateDTO(**datos)))
+            except ValidationError as e:
+                errores.append(ProfesorImportErrorDTO(
+                    fila=fila,
+                    ci=datos.get("ci"),
+                    errores=[f"{'.'.join(str(l) for l in err['loc'])}: {err['msg']}" for err in e.errors()]
+                ))
+
+        cis_existentes, correos_existentes = PersonaRepository.get_ci_correo_existentes(
+            db,
+            [dto.ci for _, dto in candidatos],
+            [dto.correo for _, dto in candidatos if dto.correo]
+        )
+
+        validos: List[Tuple[int, ProfesorCreateDTO]] = []
+        for fila, dto in candidatos:
+            motivos = []
+            if dto.ci in cis_existentes:
+                motivos.append("Ya existe una persona con este CI")
+            elif dto.ci in vistos_ci:
+                motivos.append("CI repetido en el archivo")
+            if dto.correo:
+                if dto.correo in correos_existentes:
+                    motivos.append("Ya existe una persona con este correo")
+                elif dto.correo in vistos_correo:
+                    motivos.append("Correo repetido en el archivo")
+            if dto.id_cargo and dto.id_cargo not in ids_cargo:
+                motivos.append("El cargo especificado no existe")
+
+            if motivos:
+                errores.append(ProfesorImportErrorDTO(fila=fila, ci=dto.ci, errores=motivos))
+                continue
+
+            vistos_ci.add(dto.ci)
+            if dto.correo:
+                vistos_correo.add(dto.correo)
+            validos.append((fila, dto))
+
+        return validos, errores
+
+    # ---- Lectura en streaming ----
+
+    @staticmethod
+    def _leer_filas(archivo, nombre_archivo: str) -> Iterator[Tuple[int, Dict]]:
+        """Genera (número de fila, datos) según la extensión del archivo"""
+        nombre = (nombre_archivo or "").lower()
+        if nombre.endswith(".csv"):
+            return ProfesorImportService._leer_csv(archivo)
+        if nombre.endswith(".xlsx"):
+            return ProfesorImportService._leer_xlsx(archivo)
+        raise HTTPException(status_code=400, detail="Formato no soportado. Use un archivo .csv o .xlsx")
+
+    @staticmethod
+    def _leer_csv(archivo) -> Iterator[Tuple[int, Dict]]:
+        """Lee un CSV (separado por ',' o ';') sin cargarlo completo en memoria"""
+        texto = io.TextIOWrapper(archivo, encoding="utf-8-sig", newline="")
+        encabezado = texto.readline()
+        delimitador = ";" if encabezado.count(";") > encabezado.count(",") else ","
+        columnas = ProfesorImportService._normalizar_columnas(
+            next(csv.reader([encabezado], delimiter=delimitador), [])
+        )
+
+        for numero, valores in enumerate(csv.reader(texto, delimiter=delimitador), start=2):
+            if not any(v.strip() for v in valores):
+                continue
+            yield numero, ProfesorImportService._construir_fila(columnas, valores)
+
+    @staticmethod
+    def _leer_xlsx(archivo) -> Iterator[Tuple[int, Dict]]:
+        """Lee la primera hoja de un XLSX en modo read-only (streaming)"""
+        try:
+            from openpyxl import load_workbook
+        except ModuleNotFoundError:
+            raise HTTPException(status_code=400, detail="Importación XLSX no disponible: instale openpyxl")
+
+        libro = load_workbook(archivo, read_only=True, data_only=True)
+        try:
+            filas = libro.worksheets[0].iter_rows(values_only=True)
+            columnas = ProfesorImportService._normalizar_columnas(next(filas, ()) or ())
+            for numero, valores in enumerate(filas, start=2):
+                if not any(v not in (None, "") for v in valores):
+                    continue
+                yield numero, ProfesorImportService._construir_fila(columnas, valores)
+        finally:
+            libro.close()
+
+    @staticmethod
+    def _normalizar_columnas(encabezados) -> List[Optional[str]]:
+        return [str(h).strip().lower() if h is not None else None for h in encabezados]
+
+    @staticmethod
+    def _construir_fila(columnas: List[Optional[str]], valores) -> Dict:
+        """Arma el dict de la fila; celdas vacías se omiten para que apliquen los defaults del DTO"""
+        fila = {}
+        for columna, valor in zip(columnas, valores):
+            if not columna or valor is None:
+                continue
+            if isinstance(valor, datetime):
+                valor = valor.date()
+            elif isinstance(valor, float) and valor.is_integer():
+                valor = str(int(valor))
+            elif not isinstance(valor, date):
+                valor = str(valor).strip()
+                if valor == "":
+                    continue
+            fila[columna] = valor
+        return fila
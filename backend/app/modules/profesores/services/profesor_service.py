@@ -1,75 +1,62 @@
+import re
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from collections import defaultdict
 from fastapi import HTTPException
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from app.modules.profesores.dto.profesor_dto import (
-    ProfesorCreateDTO, ProfesorReadDTO, ProfesorFullDTO, ProfesorUpdateDTO,
+    ProfesorCreateDTO, ProfesorReadDTO, ProfesorFullDTO, ProfesorUpdateDTO, ProfesorDetalleDTO,
     MateriaReadDTO, MateriaCreateDTO,
     CursoReadDTO, CursoCreateDTO,
     AsignacionCreateDTO, AsignacionReadDTO, AsignacionReadNombreDTO,
     CargoReadDTO,
     BloqueHorarioCreateDTO, BloqueHorarioReadDTO, BloqueHorarioUpdateDTO,
-    VistaBloqueProfesorDTO, VistaCargaHorariaDTO, VistaHorarioSemanalDTO
+    VistaBloqueProfesorDTO, VistaCargaHorariaDTO, VistaHorarioSemanalDTO, DeltaDTO
 )
 from app.modules.profesores.repositories.profesor_repository import (
     PersonaRepository, ProfesorRepository, MateriaRepository, CursoRepository, 
-    AsignacionRepository, CargoRepository, BloqueHorarioRepository
+    AsignacionRepository, CargoRepository, BloqueHorarioRepository, ArchivoRepository
 )
-from app.modules.profesores.models.profesor_models import BloqueHorario
+from app.modules.profesores.models.profesor_models import BloqueHorario, BloqueHorarioArchivo
+from app.modules.profesores.services.persona_search_service import persona_search_index
+from app.modules.profesores.services.bootstrap_service import BootstrapService
+from app.modules.reportes.services.reporte_service import ReporteService
+from app.shared.services.base_services import AuditService, Autor
+from app.shared.services.change_feed import change_feed
+from app.shared.services.change_sequence import DeltaSync
+
+DIAS_SEMANA = ('lunes', 'martes', 'miercoles', 'jueves', 'viernes', 'sabado')
 
 # ============ PROFESOR SERVICE ============
 class ProfesorService:
 
     @staticmethod
-    def crear_profesor(db: Session, data: ProfesorCreateDTO) -> ProfesorReadDTO:
-        """Crea un nuevo profesor con su persona"""
-        # Validar CI único
-        if PersonaRepository.exists_by_ci(db, data.ci):
-            raise HTTPException(status_code=400, detail="Ya existe una persona con este CI")
-        
-        # Validar correo único si se proporciona
-        if data.correo and PersonaRepository.exists_by_correo(db, data.correo):
-            raise HTTPException(status_code=400, detail="Ya existe una persona con este correo")
-        
-        # Validar cargo si se proporciona
-        if data.id_cargo:
-            cargo = CargoRepository.get_by_id(db, data.id_cargo)
-            if not cargo:
-                raise HTTPException(status_code=404, detail="El cargo especificado no existe")
-        
+    def crear_profesor(db: Session, data: ProfesorCreateDTO, autor: Optional[Autor] = None) -> ProfesorReadDTO:
+        """
+        Crea un nuevo profesor con su persona
+
+        Persona y Profesor se escriben en un solo flush y un solo commit.
+        La unicidad de CI/correo y la existencia del cargo las valida la BD:
+        el IntegrityError se traduce a los mismos mensajes de error.
+        El alta queda en audit_log a nombre de `autor` (usuario del token e IP).
+        """
+        persona_data, profesor_data = ProfesorService.separar_datos(data)
+
         try:
-            # Separar datos de persona y profesor
-            persona_data = {
-                "ci": data.ci,
-                "nombres": data.nombres,
-                "apellido_paterno": data.apellido_paterno,
-                "apellido_materno": data.apellido_materno,
-                "direccion": data.direccion,
-                "telefono": data.telefono,
-                "correo": data.correo,
-                "tipo_persona": "profesor",
-                "id_cargo": data.id_cargo,
-                "estado_laboral": data.estado_laboral or "activo",
-                "años_experiencia": data.años_experiencia or 0,
-                "fecha_ingreso": data.fecha_ingreso,
-                "fecha_retiro": data.fecha_retiro,
-                "motivo_retiro": data.motivo_retiro
-            }
-            
-            profesor_data = {
-                "especialidad": data.especialidad,
-                "titulo_academico": data.titulo_academico,
-                "nivel_enseñanza": data.nivel_enseñanza or "todos",
-                "observaciones": data.observaciones_profesor
-            }
-            
             profesor = ProfesorRepository.create(db, persona_data, profesor_data)
-            return ProfesorService._build_profesor_read_dto(profesor)
+            # Construir la respuesta antes del commit evita el refresh posterior
+            resultado = ProfesorService._build_profesor_read_dto(profesor)
+            BootstrapService.invalidar(db)
+            db.commit()
         except IntegrityError as e:
             db.rollback()
-            raise HTTPException(status_code=400, detail=f"Error al crear el profesor: {str(e)}")
+            raise ProfesorService._integrity_error_to_http(e, f"Error al crear el profesor: {str(e)}")
+
+        persona_search_index.indexar(resultado)
+        change_feed.publicar("profesor", "creado", {"id_persona": resultado.id_persona}, resultado)
+        AuditService.registrar(autor, "crear", "profesor", resultado.id_persona, {"ci": resultado.ci})
+        return resultado
 
     @staticmethod
     def listar_profesores(db: Session) -> List[ProfesorReadDTO]:
@@ -77,6 +64,14 @@ class ProfesorService:
         profesores = ProfesorRepository.get_all(db)
         return [ProfesorService._build_profesor_read_dto(p) for p in profesores]
     
+    @staticmethod
+    def listar_profesores_delta(db: Session, desde: int) -> DeltaDTO[ProfesorReadDTO]:
+        """Profesores cuya persona o datos de profesor cambiaron después de `desde`"""
+        return DeltaDTO[ProfesorReadDTO](**DeltaSync.respuesta(
+            db, desde, "persona",
+            lambda seq: [ProfesorService._build_profesor_read_dto(p) for p in ProfesorRepository.get_all(db, seq)]
+        ))
+
     @staticmethod
     def listar_profesores_completo(db: Session) -> List[ProfesorFullDTO]:
         """Lista profesores con materias, cursos y carga horaria"""
@@ -89,16 +84,13 @@ class ProfesorService:
             prof_map[a.id_profesor]["cursos"].add(a.id_curso)
             prof_map[a.id_profesor]["materias"].add(a.id_materia)
 
+        # Horas semanales de todos los profesores en una sola consulta
+        horas = BloqueHorarioRepository.horas_por_profesor(db)
+
         resultado = []
         for p in profesores:
-            # Calcular horas semanales desde bloques
-            bloques = BloqueHorarioRepository.get_by_profesor(db, p.id_profesor)
-            total_horas = sum([
-                (b.hora_fin.hour + b.hora_fin.minute/60) - 
-                (b.hora_inicio.hour + b.hora_inicio.minute/60) 
-                for b in bloques
-            ])
-            
+            total_horas = horas.get(p.id_profesor, 0.0)
+
             dto_data = {
                 "id_persona": p.persona.id_persona,
                 "id_profesor": p.id_profesor,
@@ -148,53 +140,95 @@ class ProfesorService:
         return ProfesorService._build_profesor_read_dto(profesor)
 
     @staticmethod
-    def actualizar_profesor(db: Session, id_persona: int, data: ProfesorUpdateDTO) -> Optional[ProfesorReadDTO]:
-        """Actualiza un profesor"""
+    def obtener_detalle(db: Session, id_persona: int, gestion: Optional[str] = None,
+                        include_archived: bool = False) -> ProfesorDetalleDTO:
+        """
+        Profesor, asignaciones con nombres, bloques y horas semanales
+
+        Usa un número fijo de consultas (profesor, asignaciones, bloques y, con
+        include_archived, bloques archivados) sin importar cuántos bloques tenga.
+        Las horas se calculan solo sobre bloques no archivados.
+        """
+        profesor = ProfesorRepository.get_by_id_persona(db, id_persona)
+        if not profesor:
+            raise HTTPException(status_code=404, detail=f"Profesor con ID {id_persona} no encontrado")
+
+        asignaciones = AsignacionRepository.get_by_profesor_con_nombres(db, profesor.id_profesor)
+        filas = BloqueHorarioRepository.get_by_profesor_con_nombres(db, profesor.id_profesor, gestion)
+        if include_archived:
+            filas = filas + ArchivoRepository.get_bloques_con_nombres(db, profesor.id_profesor, gestion)
+
+        nombre_profesor = f"{profesor.persona.nombres} {profesor.persona.apellido_paterno}"
+        bloques = [
+            BloqueHorarioService._build_bloque_dto_con_nombres(bloque, nombre_profesor, nombre_curso, nombre_materia)
+            for bloque, nombre_curso, nombre_materia in filas
+        ]
+        bloques.sort(key=lambda b: (b.gestion, DIAS_SEMANA.index(b.dia_semana), b.hora_inicio))
+
+        horas_por_gestion: Dict[str, float] = defaultdict(float)
+        for b in bloques:
+            if not b.archivado:
+                horas_por_gestion[b.gestion] += (
+                    (b.hora_fin.hour + b.hora_fin.minute/60) - (b.hora_inicio.hour + b.hora_inicio.minute/60)
+                )
+
+        return ProfesorDetalleDTO(
+            profesor=ProfesorService._build_profesor_read_dto(profesor),
+            asignaciones=[AsignacionReadNombreDTO.from_orm(a) for a in asignaciones],
+            bloques=bloques,
+            total_horas_semanales=round(sum(horas_por_gestion.values()), 2),
+            horas_por_gestion={g: round(h, 2) for g, h in sorted(horas_por_gestion.items())}
+        )
+
+    @staticmethod
+    def actualizar_profesor(db: Session, id_persona: int, data: ProfesorUpdateDTO,
+                            autor: Optional[Autor] = None) -> Optional[ProfesorReadDTO]:
+        """
+        Actualiza un profesor
+
+        Una lectura del profesor y un solo flush/commit; CI, correo y cargo
+        se validan con las restricciones de la BD.
+        """
         profesor = ProfesorRepository.get_by_id_persona(db, id_persona)
         if not profesor:
             return None
         
-        # Validar CI único
-        if data.ci and data.ci != profesor.persona.ci:
-            if PersonaRepository.exists_by_ci(db, data.ci, exclude_id=id_persona):
-                raise HTTPException(status_code=400, detail="Ya existe una persona con este CI")
-        
-        # Validar correo único
-        if data.correo and data.correo != profesor.persona.correo:
-            if PersonaRepository.exists_by_correo(db, data.correo, exclude_id=id_persona):
-                raise HTTPException(status_code=400, detail="Ya existe una persona con este correo")
-        
-        # Validar cargo
-        if data.id_cargo:
-            cargo = CargoRepository.get_by_id(db, data.id_cargo)
-            if not cargo:
-                raise HTTPException(status_code=404, detail="El cargo especificado no existe")
+        # Separar datos
+        persona_data = {
+            k: v for k, v in data.dict(exclude_unset=True).items()
+            if k in ["ci", "nombres", "apellido_paterno", "apellido_materno", 
+                    "direccion", "telefono", "correo", "id_cargo", "estado_laboral",
+                    "años_experiencia", "fecha_ingreso", "fecha_retiro", "motivo_retiro"]
+        }
+        
+        profesor_data = {
+            "especialidad": data.especialidad,
+            "titulo_academico": data.titulo_academico,
+            "nivel_enseñanza": data.nivel_enseñanza,
+            "observaciones": data.observaciones_profesor
+        }
+        profesor_data = {k: v for k, v in profesor_data.items() if v is not None}
         
         try:
-            # Separar datos
-            persona_data = {
-                k: v for k, v in data.dict(exclude_unset=True).items()
-                if k in ["ci", "nombres", "apellido_paterno", "apellido_materno", 
-                        "direccion", "telefono", "correo", "id_cargo", "estado_laboral",
-                        "años_experiencia", "fecha_ingreso", "fecha_retiro", "motivo_retiro"]
-            }
-            
-            profesor_data = {
-                "especialidad": data.especialidad,
-                "titulo_academico": data.titulo_academico,
-                "nivel_enseñanza": data.nivel_enseñanza,
-                "observaciones": data.observaciones_profesor
-            }
-            profesor_data = {k: v for k, v in profesor_data.items() if v is not None}
-            
             profesor_actualizado = ProfesorRepository.update(db, profesor, persona_data, profesor_data)
-            return ProfesorService._build_profesor_read_dto(profesor_actualizado)
-        except IntegrityError:
+            resultado = ProfesorService._build_profesor_read_dto(profesor_actualizado)
+            BootstrapService.invalidar(db)
+            db.commit()
+        except IntegrityError as e:
             db.rollback()
-            raise HTTPException(status_code=400, detail="Error al actualizar el profesor")
+            raise ProfesorService._integrity_error_to_http(e, "Error al actualizar el profesor")
+
+        persona_search_index.indexar(resultado)
+        change_feed.publicar("profesor", "actualizado", {"id_persona": resultado.id_persona}, resultado)
+        AuditService.registrar(autor, "actualizar", "profesor", id_persona,
+                                     {"campos": sorted(persona_data) + sorted(profesor_data)})
+        if "id_cargo" in persona_data:
+            # La carga por cargo de todas las gestiones depende del cargo actual
+            ReporteService.programar_recalculo()
+        return resultado
 
     @staticmethod
-    def eliminar_profesor(db: Session, id_persona: int) -> bool:
+    def eliminar_profesor(db: Session, id_persona: int, autor: Optional[Autor] = None) -> bool:
         """Elimina un profesor y su persona"""
         profesor = ProfesorRepository.get_by_id_persona(db, id_persona)
         if not profesor:
@@ -202,11 +236,66 @@ class ProfesorService:
 
         try:
             ProfesorRepository.delete(db, profesor)
-            return True
+            BootstrapService.invalidar(db)
+            db.commit()
         except Exception as e:
+            db.rollback()
             print(f"[ERROR] No se pudo eliminar profesor {id_persona}: {e}")
             raise HTTPException(status_code=400, detail=f"No se puede eliminar el profesor: {str(e)}")
 
+        persona_search_index.quitar(id_persona)
+        change_feed.publicar("profesor", "eliminado", {"id_persona": id_persona})
+        ReporteService.programar_recalculo()
+        AuditService.registrar(autor, "eliminar", "profesor", id_persona)
+        return True
+
+    @staticmethod
+    def separar_datos(data: ProfesorCreateDTO) -> Tuple[dict, dict]:
+        """Separa un ProfesorCreateDTO en datos de persona y de profesor (alta individual e importación)"""
+        persona_data = {
+            "ci": data.ci,
+            "nombres": data.nombres,
+            "apellido_paterno": data.apellido_paterno,
+            "apellido_materno": data.apellido_materno,
+            "direccion": data.direccion,
+            "telefono": data.telefono,
+            "correo": data.correo,
+            "tipo_persona": "profesor",
+            "id_cargo": data.id_cargo,
+            "estado_laboral": data.estado_laboral or "activo",
+            "años_experiencia": data.años_experiencia or 0,
+            "fecha_ingreso": data.fecha_ingreso,
+            "fecha_retiro": data.fecha_retiro,
+            "motivo_retiro": data.motivo_retiro
+        }
+        profesor_data = {
+            "especialidad": data.especialidad,
+            "titulo_academico": data.titulo_academico,
+            "nivel_enseñanza": data.nivel_enseñanza or "todos",
+            "observaciones": data.observaciones_profesor
+        }
+        return persona_data, profesor_data
+
+    @staticmethod
+    def _integrity_error_to_http(error: IntegrityError, default_detail: str) -> HTTPException:
+        """
+        Traduce un IntegrityError de personas/profesores al HTTPException equivalente
+
+        Reconoce los mensajes de MySQL ("Duplicate entry ... for key 'personas.ci'",
+        "a foreign key constraint fails") y de SQLite ("UNIQUE constraint failed: personas.ci").
+        """
+        mensaje = str(error.orig).lower()
+        clave = re.search(r"for key '([^']+)'|unique constraint failed: (\S+)", mensaje)
+        clave = (clave.group(1) or clave.group(2)) if clave else mensaje
+
+        if "foreign key" in mensaje:
+            return HTTPException(status_code=404, detail="El cargo especificado no existe")
+        if "correo" in clave:
+            return HTTPException(status_code=400, detail="Ya existe una persona con este correo")
+        if re.search(r"(^|[^a-z])ci([^a-z]|$)", clave):
+            return HTTPException(status_code=400, detail="Ya existe una persona con este CI")
+        return HTTPException(status_code=400, detail=default_detail)
+
     @staticmethod
     def _build_profesor_read_dto(profesor) -> ProfesorReadDTO:
         """Construye un ProfesorReadDTO"""
@@ -239,19 +328,31 @@ class ProfesorService:
 class MateriaService:
 
     @staticmethod
-    def crear_materia(db: Session, data: MateriaCreateDTO) -> MateriaReadDTO:
+    def crear_materia(db: Session, data: MateriaCreateDTO, autor: Optional[Autor] = None) -> MateriaReadDTO:
         try:
             materia = MateriaRepository.create(db, data.dict())
-            return MateriaReadDTO.from_orm(materia)
+            resultado = MateriaReadDTO.from_orm(materia)
+            BootstrapService.invalidar(db)
+            db.commit()
         except IntegrityError:
             db.rollback()
             raise HTTPException(status_code=400, detail="Error al crear la materia")
+        change_feed.publicar("materia", "creado", {"id_materia": resultado.id_materia}, resultado)
+        AuditService.registrar(autor, "crear", "materia", resultado.id_materia, {"nombre": resultado.nombre_materia})
+        return resultado
 
     @staticmethod
     def listar_materias(db: Session) -> List[MateriaReadDTO]:
         materias = MateriaRepository.get_all(db)
         return [MateriaReadDTO.from_orm(m) for m in materias]
 
+    @staticmethod
+    def listar_materias_delta(db: Session, desde: int) -> DeltaDTO[MateriaReadDTO]:
+        return DeltaDTO[MateriaReadDTO](**DeltaSync.respuesta(
+            db, desde, "materia",
+            lambda seq: [MateriaReadDTO.from_orm(m) for m in MateriaRepository.get_all(db, seq)]
+        ))
+
     @staticmethod
     def obtener_materia(db: Session, id_materia: int) -> Optional[MateriaReadDTO]:
         materia = MateriaRepository.get_by_id(db, id_materia)
@@ -260,49 +361,71 @@ class MateriaService:
         return MateriaReadDTO.from_orm(materia)
 
     @staticmethod
-    def actualizar_materia(db: Session, id_materia: int, data: MateriaCreateDTO) -> Optional[MateriaReadDTO]:
+    def actualizar_materia(db: Session, id_materia: int, data: MateriaCreateDTO,
+                           autor: Optional[Autor] = None) -> Optional[MateriaReadDTO]:
         materia = MateriaRepository.get_by_id(db, id_materia)
         if not materia:
             return None
         
         try:
             materia_actualizada = MateriaRepository.update(db, materia, data.dict())
-            return MateriaReadDTO.from_orm(materia_actualizada)
+            resultado = MateriaReadDTO.from_orm(materia_actualizada)
+            BootstrapService.invalidar(db)
+            db.commit()
         except IntegrityError:
             db.rollback()
             raise HTTPException(status_code=400, detail="Error al actualizar la materia")
+        change_feed.publicar("materia", "actualizado", {"id_materia": id_materia}, resultado)
+        AuditService.registrar(autor, "actualizar", "materia", id_materia, {"nombre": resultado.nombre_materia})
+        return resultado
 
     @staticmethod
-    def eliminar_materia(db: Session, id_materia: int) -> Optional[MateriaReadDTO]:
+    def eliminar_materia(db: Session, id_materia: int, autor: Optional[Autor] = None) -> Optional[MateriaReadDTO]:
         materia = MateriaRepository.get_by_id(db, id_materia)
         if not materia:
             return None
         
         try:
-            materia_eliminada = MateriaRepository.delete(db, materia)
-            return MateriaReadDTO.from_orm(materia_eliminada)
+            resultado = MateriaReadDTO.from_orm(MateriaRepository.delete(db, materia))
+            BootstrapService.invalidar(db)
+            db.commit()
         except Exception as e:
             db.rollback()
             raise HTTPException(status_code=400, detail=f"No se puede eliminar la materia: {str(e)}")
+        change_feed.publicar("materia", "eliminado", {"id_materia": id_materia})
+        AuditService.registrar(autor, "eliminar", "materia", id_materia, {"nombre": resultado.nombre_materia})
+        return resultado
 
 
 # ============ CURSO SERVICE ============
 class CursoService:
 
     @staticmethod
-    def crear_curso(db: Session, data: CursoCreateDTO) -> CursoReadDTO:
+    def crear_curso(db: Session, data: CursoCreateDTO, autor: Optional[Autor] = None) -> CursoReadDTO:
         try:
             curso = CursoRepository.create(db, data.dict())
-            return CursoReadDTO.from_orm(curso)
+            resultado = CursoReadDTO.from_orm(curso)
+            BootstrapService.invalidar(db)
+            db.commit()
         except IntegrityError:
             db.rollback()
             raise HTTPException(status_code=400, detail="Error al crear el curso")
+        change_feed.publicar("curso", "creado", {"id_curso": resultado.id_curso}, resultado)
+        AuditService.registrar(autor, "crear", "curso", resultado.id_curso, {"nombre": resultado.nombre_curso})
+        return resultado
 
     @staticmethod
     def listar_cursos(db: Session) -> List[CursoReadDTO]:
         cursos = CursoRepository.get_all(db)
         return [CursoReadDTO.from_orm(c) for c in cursos]
 
+    @staticmethod
+    def listar_cursos_delta(db: Session, desde: int) -> DeltaDTO[CursoReadDTO]:
+        return DeltaDTO[CursoReadDTO](**DeltaSync.respuesta(
+            db, desde, "curso",
+            lambda seq: [CursoReadDTO.from_orm(c) for c in CursoRepository.get_all(db, seq)]
+        ))
+
     @staticmethod
     def obtener_curso(db: Session, id_curso: int) -> Optional[CursoReadDTO]:
         curso = CursoRepository.get_by_id(db, id_curso)
@@ -311,37 +434,47 @@ class CursoService:
         return CursoReadDTO.from_orm(curso)
 
     @staticmethod
-    def actualizar_curso(db: Session, id_curso: int, data: CursoCreateDTO) -> Optional[CursoReadDTO]:
+    def actualizar_curso(db: Session, id_curso: int, data: CursoCreateDTO,
+                         autor: Optional[Autor] = None) -> Optional[CursoReadDTO]:
         curso = CursoRepository.get_by_id(db, id_curso)
         if not curso:
             return None
         
         try:
             curso_actualizado = CursoRepository.update(db, curso, data.dict())
-            return CursoReadDTO.from_orm(curso_actualizado)
+            resultado = CursoReadDTO.from_orm(curso_actualizado)
+            BootstrapService.invalidar(db)
+            db.commit()
         except IntegrityError:
             db.rollback()
             raise HTTPException(status_code=400, detail="Error al actualizar el curso")
+        change_feed.publicar("curso", "actualizado", {"id_curso": id_curso}, resultado)
+        AuditService.registrar(autor, "actualizar", "curso", id_curso, {"nombre": resultado.nombre_curso})
+        return resultado
 
     @staticmethod
-    def eliminar_curso(db: Session, id_curso: int) -> Optional[CursoReadDTO]:
+    def eliminar_curso(db: Session, id_curso: int, autor: Optional[Autor] = None) -> Optional[CursoReadDTO]:
         curso = CursoRepository.get_by_id(db, id_curso)
         if not curso:
             return None
         
         try:
-            curso_eliminado = CursoRepository.delete(db, curso)
-            return CursoReadDTO.from_orm(curso_eliminado)
+            resultado = CursoReadDTO.from_orm(CursoRepository.delete(db, curso))
+            BootstrapService.invalidar(db)
+            db.commit()
         except Exception as e:
             db.rollback()
             raise HTTPException(status_code=400, detail=f"No se puede eliminar el curso: {str(e)}")
+        change_feed.publicar("curso", "eliminado", {"id_curso": id_curso})
+        AuditService.registrar(autor, "eliminar", "curso", id_curso, {"nombre": resultado.nombre_curso})
+        return resultado
 
 
 # ============ ASIGNACIÓN SERVICE ============
 class AsignacionService:
 
     @staticmethod
-    def asignar_materia(db: Session, data: AsignacionCreateDTO) -> AsignacionReadDTO:
+    def asignar_materia(db: Session, data: AsignacionCreateDTO, autor: Optional[Autor] = None) -> AsignacionReadDTO:
         # Validar profesor
         profesor = ProfesorRepository.get_by_id_profesor(db, data.id_profesor)
         if not profesor:
@@ -359,7 +492,11 @@ class AsignacionService:
         
         try:
             asignacion = AsignacionRepository.create(db, data.dict())
-            return AsignacionReadDTO.from_orm(asignacion)
+            ReporteService.programar_recalculo(curso.gestion)
+            resultado = AsignacionReadDTO.from_orm(asignacion)
+            change_feed.publicar("asignacion", "creado", resultado.model_dump(), resultado)
+            AuditService.registrar(autor, "crear", "asignacion", details=resultado.model_dump())
+            return resultado
         except IntegrityError:
             db.rollback()
             raise HTTPException(status_code=400, detail="Error al crear la asignación")
@@ -369,6 +506,18 @@ class AsignacionService:
         asignaciones = AsignacionRepository.get_all(db)
         return [AsignacionReadDTO.from_orm(a) for a in asignaciones]
 
+    @staticmethod
+    def listar_asignaciones_delta(db: Session, desde: int) -> DeltaDTO[AsignacionReadDTO]:
+        return DeltaDTO[AsignacionReadDTO](**DeltaSync.respuesta(
+            db, desde, "asignacion",
+            lambda seq: [AsignacionReadDTO.from_orm(a) for a in AsignacionRepository.get_all(db, seq)]
+        ))
+
+    @staticmethod
+    def listar_asignaciones_con_nombres(db: Session) -> List[AsignacionReadNombreDTO]:
+        """Todas las asignaciones con nombres, para las pantallas que las cruzan con cursos"""
+        return [AsignacionReadNombreDTO.from_orm(a) for a in AsignacionRepository.get_all_con_nombres(db)]
+
     @staticmethod
     def listar_por_profesor(db: Session, id_profesor: int) -> List[AsignacionReadNombreDTO]:
         profesor = ProfesorRepository.get_by_id_profesor(db, id_profesor)
@@ -379,9 +528,11 @@ class AsignacionService:
         return [AsignacionReadNombreDTO.from_orm(a) for a in asignaciones]
 
     @staticmethod
-    def eliminar_asignacion(db: Session, id_profesor: int, id_curso: int, id_materia: int) -> bool:
+    def eliminar_asignacion(db: Session, id_profesor: int, id_curso: int, id_materia: int,
+                           autor: Optional[Autor] = None) -> bool:
         if not AsignacionRepository.exists(db, id_profesor, id_curso, id_materia):
             raise HTTPException(status_code=404, detail="La asignación no existe")
+        gestion = CursoRepository.get_by_id(db, id_curso).gestion
         
         # Eliminar primero los bloques horarios asociados
         bloques = db.query(BloqueHorario).filter(
@@ -390,13 +541,21 @@ class AsignacionService:
             BloqueHorario.id_materia == id_materia
         ).all()
         
+        ids_bloques = [bloque.id_bloque for bloque in bloques]
         for bloque in bloques:
             db.delete(bloque)
         
         db.commit()
         
         # Ahora eliminar la asignación
-        return AsignacionRepository.delete(db, id_profesor, id_curso, id_materia)
+        eliminada = AsignacionRepository.delete(db, id_profesor, id_curso, id_materia)
+        ReporteService.programar_recalculo(gestion)
+        for id_bloque in ids_bloques:
+            change_feed.publicar("bloque", "eliminado", {"id_bloque": id_bloque})
+        clave = {"id_profesor": id_profesor, "id_curso": id_curso, "id_materia": id_materia}
+        change_feed.publicar("asignacion", "eliminado", clave)
+        AuditService.registrar(autor, "eliminar", "asignacion", details={**clave, "bloques": ids_bloques})
+        return eliminada
 
 
 # ============ CARGO SERVICE ============
@@ -419,7 +578,9 @@ class CargoService:
 class BloqueHorarioService:
 
     @staticmethod
-    def crear_bloque(db: Session, data: BloqueHorarioCreateDTO) -> BloqueHorarioReadDTO:
+    def crear_bloque(db: Session, data: BloqueHorarioCreateDTO, autor: Optional[Autor] = None) -> BloqueHorarioReadDTO:
+        BloqueHorarioService._validar_gestion_editable(db, data.gestion)
+
         # Validar profesor
         profesor = ProfesorRepository.get_by_id_profesor(db, data.id_profesor)
         if not profesor:
@@ -453,10 +614,10 @@ class BloqueHorarioService:
                 detail="Formato de hora inválido. Use HH:MM:SS"
             )
         
-        # Verificar conflictos
+        # Verificar conflictos (solo contra bloques de la misma gestión)
         if BloqueHorarioRepository.check_conflicts(
             db, data.id_profesor, data.dia_semana, 
-            hora_inicio, hora_fin
+            hora_inicio, hora_fin, gestion=data.gestion
         ):
             raise HTTPException(
                 status_code=400, 
@@ -468,16 +629,41 @@ class BloqueHorarioService:
             bloque_data['hora_inicio'] = hora_inicio
             bloque_data['hora_fin'] = hora_fin
             bloque = BloqueHorarioRepository.create(db, bloque_data)
-            return BloqueHorarioService._build_bloque_dto(db, bloque)
+            ReporteService.programar_recalculo(bloque.gestion)
+            resultado = BloqueHorarioService._build_bloque_dto(db, bloque)
+            change_feed.publicar("bloque", "creado", {"id_bloque": resultado.id_bloque}, resultado)
+            AuditService.registrar(autor, "crear", "bloque", resultado.id_bloque,
+                                         {"id_profesor": resultado.id_profesor, "gestion": resultado.gestion})
+            return resultado
         except IntegrityError:
             db.rollback()
             raise HTTPException(status_code=400, detail="Error al crear el bloque horario")
 
     @staticmethod
-    def listar_bloques(db: Session, gestion: Optional[str] = None) -> List[BloqueHorarioReadDTO]:
+    def listar_bloques(db: Session, gestion: Optional[str] = None,
+                       include_archived: bool = False) -> List[BloqueHorarioReadDTO]:
         bloques = BloqueHorarioRepository.get_all(db, gestion)
+        if include_archived:
+            bloques = bloques + ArchivoRepository.get_bloques(db, gestion)
         return [BloqueHorarioService._build_bloque_dto(db, b) for b in bloques]
 
+    @staticmethod
+    def listar_bloques_delta(db: Session, desde: int, gestion: Optional[str] = None) -> DeltaDTO[BloqueHorarioReadDTO]:
+        """
+        Bloques modificados después de `desde`, con nombres en una sola consulta
+
+        Las bajas no se filtran por gestión: el cliente ignora las claves que no tiene.
+        Los bloques archivados llegan como bajas; al restaurar la gestión vuelven como cambios.
+        """
+        return DeltaDTO[BloqueHorarioReadDTO](**DeltaSync.respuesta(
+            db, desde, "bloque",
+            lambda seq: [
+                BloqueHorarioService._build_bloque_dto_con_nombres(b, nombre_profesor, nombre_curso, nombre_materia)
+                for b, nombre_profesor, nombre_curso, nombre_materia
+                in BloqueHorarioRepository.get_all_con_nombres(db, gestion, seq)
+            ]
+        ))
+
     @staticmethod
     def obtener_bloque(db: Session, id_bloque: int) -> Optional[BloqueHorarioReadDTO]:
         bloque = BloqueHorarioRepository.get_by_id(db, id_bloque)
@@ -486,16 +672,20 @@ class BloqueHorarioService:
         return BloqueHorarioService._build_bloque_dto(db, bloque)
 
     @staticmethod
-    def listar_por_profesor(db: Session, id_profesor: int, gestion: Optional[str] = None) -> List[BloqueHorarioReadDTO]:
+    def listar_por_profesor(db: Session, id_profesor: int, gestion: Optional[str] = None,
+                            include_archived: bool = False) -> List[BloqueHorarioReadDTO]:
         profesor = ProfesorRepository.get_by_id_profesor(db, id_profesor)
         if not profesor:
             raise HTTPException(status_code=404, detail="El profesor no existe")
         
         bloques = BloqueHorarioRepository.get_by_profesor(db, id_profesor, gestion)
+        if include_archived:
+            bloques = bloques + ArchivoRepository.get_bloques(db, gestion, id_profesor)
         return [BloqueHorarioService._build_bloque_dto(db, b) for b in bloques]
 
     @staticmethod
-    def actualizar_bloque(db: Session, id_bloque: int, data: BloqueHorarioUpdateDTO) -> Optional[BloqueHorarioReadDTO]:
+    def actualizar_bloque(db: Session, id_bloque: int, data: BloqueHorarioUpdateDTO,
+                          autor: Optional[Autor] = None) -> Optional[BloqueHorarioReadDTO]:
         bloque = BloqueHorarioRepository.get_by_id(db, id_bloque)
         if not bloque:
             return None
@@ -503,6 +693,9 @@ class BloqueHorarioService:
         # Convertir strings de hora a objetos time si se proporcionan
         from datetime import datetime
         update_data = data.dict(exclude_unset=True)
+        BloqueHorarioService._validar_gestion_editable(db, bloque.gestion)
+        if update_data.get('gestion'):
+            BloqueHorarioService._validar_gestion_editable(db, update_data['gestion'])
         
         if 'hora_inicio' in update_data and update_data['hora_inicio']:
             try:
@@ -517,13 +710,14 @@ class BloqueHorarioService:
                 raise HTTPException(status_code=400, detail="Formato de hora_fin inválido")
         
         # Verificar conflictos si se cambia el horario
-        if any(k in update_data for k in ['dia_semana', 'hora_inicio', 'hora_fin']):
+        if any(k in update_data for k in ['dia_semana', 'hora_inicio', 'hora_fin', 'gestion']):
             dia = update_data.get('dia_semana', bloque.dia_semana)
             inicio = update_data.get('hora_inicio', bloque.hora_inicio)
             fin = update_data.get('hora_fin', bloque.hora_fin)
+            gestion = update_data.get('gestion') or bloque.gestion
             
             if BloqueHorarioRepository.check_conflicts(
-                db, bloque.id_profesor, dia, inicio, fin, exclude_id=id_bloque
+                db, bloque.id_profesor, dia, inicio, fin, exclude_id=id_bloque, gestion=gestion
             ):
                 raise HTTPException(
                     status_code=400, 
@@ -531,20 +725,30 @@ class BloqueHorarioService:
                 )
         
         try:
+            gestion_anterior = bloque.gestion
             bloque_actualizado = BloqueHorarioRepository.update(db, bloque, update_data)
-            return BloqueHorarioService._build_bloque_dto(db, bloque_actualizado)
+            for gestion in {gestion_anterior, bloque_actualizado.gestion}:
+                ReporteService.programar_recalculo(gestion)
+            resultado = BloqueHorarioService._build_bloque_dto(db, bloque_actualizado)
+            change_feed.publicar("bloque", "actualizado", {"id_bloque": id_bloque}, resultado)
+            AuditService.registrar(autor, "actualizar", "bloque", id_bloque, {"campos": sorted(update_data)})
+            return resultado
         except IntegrityError:
             db.rollback()
             raise HTTPException(status_code=400, detail="Error al actualizar el bloque horario")
 
     @staticmethod
-    def eliminar_bloque(db: Session, id_bloque: int) -> bool:
+    def eliminar_bloque(db: Session, id_bloque: int, autor: Optional[Autor] = None) -> bool:
         bloque = BloqueHorarioRepository.get_by_id(db, id_bloque)
         if not bloque:
             return False
         
         try:
+            gestion = bloque.gestion
             BloqueHorarioRepository.delete(db, bloque)
+            ReporteService.programar_recalculo(gestion)
+            change_feed.publicar("bloque", "eliminado", {"id_bloque": id_bloque})
+            AuditService.registrar(autor, "eliminar", "bloque", id_bloque, {"gestion": gestion})
             return True
         except Exception as e:
             print(f"[ERROR] No se pudo eliminar bloque {id_bloque}: {e}")
@@ -625,6 +829,15 @@ class BloqueHorarioService:
             print(f"Error en vista_horario_semanal: {e}")
             raise HTTPException(status_code=500, detail=f"Error al consultar la vista: {str(e)}")
 
+    @staticmethod
+    def _validar_gestion_editable(db: Session, gestion: Optional[str]) -> None:
+        """Los bloques de una gestión archivada son de solo lectura hasta restaurarla"""
+        if gestion and ArchivoRepository.get_gestion(db, gestion):
+            raise HTTPException(
+                status_code=400,
+                detail=f"La gestión {gestion} está archivada; restáurela para modificar sus bloques"
+            )
+
     @staticmethod
     def _build_bloque_dto(db: Session, bloque) -> BloqueHorarioReadDTO:
         """Construye BloqueHorarioReadDTO con nombres"""
@@ -632,6 +845,17 @@ class BloqueHorarioService:
         curso = CursoRepository.get_by_id(db, bloque.id_curso)
         materia = MateriaRepository.get_by_id(db, bloque.id_materia)
         
+        return BloqueHorarioService._build_bloque_dto_con_nombres(
+            bloque,
+            f"{profesor.persona.nombres} {profesor.persona.apellido_paterno}" if profesor else None,
+            curso.nombre_curso if curso else None,
+            materia.nombre_materia if materia else None
+        )
+
+    @staticmethod
+    def _build_bloque_dto_con_nombres(bloque, nombre_profesor: Optional[str], nombre_curso: Optional[str],
+                                      nombre_materia: Optional[str]) -> BloqueHorarioReadDTO:
+        """Construye BloqueHorarioReadDTO con nombres ya resueltos (sin consultas)"""
         return BloqueHorarioReadDTO(
             id_bloque=bloque.id_bloque,
             id_profesor=bloque.id_profesor,
@@ -643,7 +867,8 @@ class BloqueHorarioService:
             gestion=bloque.gestion,
             fecha_registro=bloque.fecha_registro,
             observaciones=bloque.observaciones,
-            nombre_profesor=f"{profesor.persona.nombres} {profesor.persona.apellido_paterno}" if profesor else None,
-            nombre_curso=curso.nombre_curso if curso else None,
-            nombre_materia=materia.nombre_materia if materia else None
+            nombre_profesor=nombre_profesor,
+            nombre_curso=nombre_curso,
+            nombre_materia=nombre_materia,
+            archivado=isinstance(bloque, BloqueHorarioArchivo)
         )
\ No newline at end of file
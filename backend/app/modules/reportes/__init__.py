@@ -1 +1,10 @@
 # Integración general y reportes
+
+
+def __getattr__(nombre):
+    # El router se importa al pedirlo: importar un modelo o servicio del
+    # módulo no debe cargar sus controladores (ver app/core/routers.py)
+    if nombre == "reportes_router":
+        from .controllers.reporte_controller import router
+        return router
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
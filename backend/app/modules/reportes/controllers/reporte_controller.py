@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.config.database import get_db
+from app.modules.reportes.dto.reporte_dto import (
+    HorasNivelDTO, ProfesoresMateriaDTO, CargaCargoDTO, ReporteResumenDTO, ReporteRecalculoDTO
+)
+from app.modules.reportes.services.reporte_service import ReporteService
+
+router = APIRouter(prefix="/api/reportes", tags=["Reportes"])
+
+# Los reportes se leen de tablas precalculadas por gestión; se actualizan
+# unos segundos después de cada cambio en bloques, asignaciones o profesores.
+
+
+@router.get("/horas-por-nivel", response_model=List[HorasNivelDTO])
+def horas_por_nivel(gestion: Optional[str] = Query(None), db: Session = Depends(get_db)):
+    """Bloques, profesores y horas semanales por nivel"""
+    return ReporteService.horas_por_nivel(db, gestion)
+
+
+@router.get("/profesores-por-materia", response_model=List[ProfesoresMateriaDTO])
+def profesores_por_materia(gestion: Optional[str] = Query(None), db: Session = Depends(get_db)):
+    """Profesores, cursos y horas semanales asignados por materia"""
+    return ReporteService.profesores_por_materia(db, gestion)
+
+
+@router.get("/carga-por-cargo", response_model=List[CargaCargoDTO])
+def carga_por_cargo(gestion: Optional[str] = Query(None), db: Session = Depends(get_db)):
+    """Horas semanales totales y promedio por profesor, agrupadas por cargo"""
+    return ReporteService.carga_por_cargo(db, gestion)
+
+
+@router.get("/resumen", response_model=ReporteResumenDTO)
+def resumen(gestion: Optional[str] = Query(None), db: Session = Depends(get_db)):
+    """Los tres reportes en una sola respuesta (dashboard)"""
+    return ReporteService.resumen(db, gestion)
+
+
+@router.post("/recalcular", response_model=ReporteRecalculoDTO)
+def recalcular(
+    gestion: Optional[str] = Query(None, description="Sin gestión se recalculan todas las no archivadas"),
+    db: Session = Depends(get_db)
+):
+    """Recalcula los reportes de inmediato (normalmente lo hace la cola de trabajos)"""
+    return ReporteService.recalcular(db, gestion)
@@ -0,0 +1,50 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+
+# ============ ROLLUP DTOs ============
+class HorasNivelDTO(BaseModel):
+    gestion: str
+    nivel: str
+    total_bloques: int
+    total_profesores: int
+    total_horas: float
+    fecha_calculo: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ProfesoresMateriaDTO(BaseModel):
+    gestion: str
+    id_materia: int
+    nombre_materia: Optional[str] = None
+    total_profesores: int
+    total_cursos: int
+    total_horas: float
+    fecha_calculo: datetime
+
+
+class CargaCargoDTO(BaseModel):
+    gestion: str
+    id_cargo: Optional[int] = None
+    nombre_cargo: Optional[str] = None
+    total_profesores: int
+    total_horas: float
+    promedio_horas: float
+    fecha_calculo: datetime
+
+
+class ReporteResumenDTO(BaseModel):
+    gestion: Optional[str] = None
+    horas_por_nivel: List[HorasNivelDTO] = []
+    profesores_por_materia: List[ProfesoresMateriaDTO] = []
+    carga_por_cargo: List[CargaCargoDTO] = []
+
+
+class ReporteRecalculoDTO(BaseModel):
+    gestion: Optional[str] = None
+    horas_nivel: int
+    materias: int
+    cargos: int
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, Enum
+from app.config.database import Base
+from datetime import datetime
+
+# Rollups precalculados de profesores/bloques, particionados por gestión.
+# Se recalculan por gestión al escribir (ver ReporteService) y por completo
+# periódicamente; los nombres de materia y cargo se unen al leer.
+
+
+class ReporteHorasNivel(Base):
+    __tablename__ = "reportes_horas_nivel"
+
+    gestion = Column(String(10), primary_key=True)
+    nivel = Column(Enum('inicial', 'primaria', 'secundaria'), primary_key=True)
+    total_bloques = Column(Integer, nullable=False, default=0)
+    total_profesores = Column(Integer, nullable=False, default=0)
+    total_horas = Column(Float, nullable=False, default=0.0)
+    fecha_calculo = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class ReporteMateria(Base):
+    __tablename__ = "reportes_profesores_materia"
+
+    gestion = Column(String(10), primary_key=True)
+    id_materia = Column(Integer, primary_key=True)
+    total_profesores = Column(Integer, nullable=False, default=0)
+    total_cursos = Column(Integer, nullable=False, default=0)
+    total_horas = Column(Float, nullable=False, default=0.0)
+    fecha_calculo = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class ReporteCargo(Base):
+    __tablename__ = "reportes_carga_cargo"
+
+    gestion = Column(String(10), primary_key=True)
+    # 0 = profesores sin cargo asignado
+    id_cargo = Column(Integer, primary_key=True)
+    total_profesores = Column(Integer, nullable=False, default=0)
+    total_horas = Column(Float, nullable=False, default=0.0)
+    fecha_calculo = Column(DateTime, nullable=False, default=datetime.utcnow)
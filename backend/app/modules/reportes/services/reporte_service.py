@@ -0,0 +1,121 @@
+import os
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.modules.reportes.dto.reporte_dto import (
+    HorasNivelDTO, ProfesoresMateriaDTO, CargaCargoDTO, ReporteResumenDTO, ReporteRecalculoDTO
+)
+from app.modules.reportes.repositories.reporte_repository import ReporteRepository
+from app.shared.services.job_queue import job_queue
+
+# Ventana en segundos para agrupar escrituras: una ráfaga de cambios sobre la
+# misma gestión produce un solo recálculo al final de la ventana
+REPORTES_DEBOUNCE = int(os.getenv("REPORTES_DEBOUNCE", 10))
+# Reconstrucción completa periódica (corrige cualquier cambio hecho fuera de la API)
+REPORTES_REBUILD_INTERVAL = int(os.getenv("REPORTES_REBUILD_INTERVAL", 3600))
+
+TAREA_RECALCULAR = "reportes.recalcular"
+
+
+# ============ REPORTE SERVICE ============
+class ReporteService:
+
+    @staticmethod
+    def recalcular(db: Session, gestion: Optional[str] = None) -> ReporteRecalculoDTO:
+        """Recalcula los rollups de una gestión (o de todas) en una sola transacción"""
+        if gestion and ReporteRepository.gestion_archivada(db, gestion):
+            raise HTTPException(
+                status_code=400,
+                detail=f"La gestión {gestion} está archivada; sus reportes se conservan tal como se archivaron"
+            )
+        try:
+            resultado = ReporteRecalculoDTO(
+                gestion=gestion,
+                horas_nivel=ReporteRepository.recalcular_horas_nivel(db, gestion),
+                materias=ReporteRepository.recalcular_materias(db, gestion),
+                cargos=ReporteRepository.recalcular_cargos(db, gestion)
+            )
+            db.commit()
+            return resultado
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error al recalcular reportes: {str(e)}")
+
+    @staticmethod
+    def programar_recalculo(gestion: Optional[str] = None) -> None:
+        """
+        Encola el recálculo de una gestión al final de la ventana actual
+
+        Se llama después de cada escritura que afecta los rollups. La clave de
+        idempotencia por ventana hace que las escrituras siguientes de la misma
+        ventana no encolen nada. Un fallo aquí no afecta a la escritura.
+        """
+        ventana = int(time.time() // REPORTES_DEBOUNCE)
+        try:
+            job_queue.encolar(
+                TAREA_RECALCULAR, {"gestion": gestion}, prioridad=-5,
+                programar_para=datetime.utcfromtimestamp((ventana + 1) * REPORTES_DEBOUNCE),
+                idempotency_key=f"reportes:{gestion or '*'}:{ventana}"
+            )
+        except Exception as e:
+            print(f"[ERROR] No se pudo programar el recálculo de reportes ({gestion or 'todas'}): {e}")
+
+    @staticmethod
+    def horas_por_nivel(db: Session, gestion: Optional[str]) -> List[HorasNivelDTO]:
+        return [HorasNivelDTO.from_orm(r) for r in ReporteRepository.get_horas_nivel(db, gestion)]
+
+    @staticmethod
+    def profesores_por_materia(db: Session, gestion: Optional[str]) -> List[ProfesoresMateriaDTO]:
+        return [
+            ProfesoresMateriaDTO(
+                gestion=r.gestion, id_materia=r.id_materia, nombre_materia=nombre,
+                total_profesores=r.total_profesores, total_cursos=r.total_cursos,
+                total_horas=round(r.total_horas, 2), fecha_calculo=r.fecha_calculo
+            )
+            for r, nombre in ReporteRepository.get_materias(db, gestion)
+        ]
+
+    @staticmethod
+    def carga_por_cargo(db: Session, gestion: Optional[str]) -> List[CargaCargoDTO]:
+        return [
+            CargaCargoDTO(
+                gestion=r.gestion, id_cargo=r.id_cargo or None,
+                nombre_cargo=nombre if r.id_cargo else "Sin cargo",
+                total_profesores=r.total_profesores, total_horas=round(r.total_horas, 2),
+                promedio_horas=round(r.total_horas / r.total_profesores, 2) if r.total_profesores else 0.0,
+                fecha_calculo=r.fecha_calculo
+            )
+            for r, nombre in ReporteRepository.get_cargos(db, gestion)
+        ]
+
+    @staticmethod
+    def resumen(db: Session, gestion: Optional[str]) -> ReporteResumenDTO:
+        return ReporteResumenDTO(
+            gestion=gestion,
+            horas_por_nivel=ReporteService.horas_por_nivel(db, gestion),
+            profesores_por_materia=ReporteService.profesores_por_materia(db, gestion),
+            carga_por_cargo=ReporteService.carga_por_cargo(db, gestion)
+        )
+
+
+# ============ TAREAS EN SEGUNDO PLANO ============
+@job_queue.tarea(TAREA_RECALCULAR)
+def recalcular_reportes(payload: dict) -> dict:
+    from app.config.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if payload.get("gestion") and ReporteRepository.gestion_archivada(db, payload["gestion"]):
+            return {"omitido": "gestión archivada"}
+        return ReporteService.recalcular(db, payload.get("gestion")).model_dump()
+    finally:
+        db.close()
+
+
+@job_queue.periodica("reportes.reconstruir", cada=timedelta(seconds=REPORTES_REBUILD_INTERVAL), prioridad=-10)
+def reconstruir_reportes(payload: dict) -> dict:
+    return recalcular_reportes({"gestion": None})
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.config.database import get_db
+from app.modules.retiros_tempranos.dto.retiro_dto import (
+    AutorizacionCreateDTO, AutorizacionReadDTO, RetiroCreateDTO, RetiroReadDTO, RetiroIndexStatsDTO
+)
+from app.modules.retiros_tempranos.services.retiro_service import AutorizacionService, RetiroService
+
+router = APIRouter(prefix="/api/retiros", tags=["Retiros Tempranos"])
+
+
+# ============ ENDPOINTS ESTÁTICOS (PRIMERO) ============
+
+# ---- PORTERÍA ----
+@router.post("/salida", response_model=RetiroReadDTO, status_code=status.HTTP_201_CREATED)
+def registrar_salida(retiro: RetiroCreateDTO, db: Session = Depends(get_db)):
+    """
+    Registra la salida anticipada de un estudiante en portería
+    
+    Se valida que el apoderado (por CI) esté autorizado y que el estudiante no
+    haya sido retirado hoy. La respuesta llega cuando la salida ya está
+    guardada en la BD; `codigo` identifica el retiro.
+    
+    - **403**: el apoderado no está autorizado
+    - **409**: el estudiante ya fue retirado hoy (en esta u otra portería)
+    """
+    return RetiroService.registrar_retiro(db, retiro)
+
+
+@router.get("/hoy", response_model=List[RetiroReadDTO])
+def listar_retirados_hoy(id_curso: Optional[int] = Query(None, description="Filtrar por curso")):
+    """Estudiantes retirados hoy, del más reciente al más antiguo"""
+    return RetiroService.listar_retirados_hoy(id_curso)
+
+
+@router.get("/apoderado/{ci_apoderado}", response_model=List[AutorizacionReadDTO])
+def listar_por_apoderado(ci_apoderado: str):
+    """Estudiantes que el apoderado con este CI puede retirar"""
+    return AutorizacionService.listar_por_apoderado(ci_apoderado)
+
+
+@router.get("/estudiante/{ci_estudiante}", response_model=List[AutorizacionReadDTO])
+def listar_por_estudiante(ci_estudiante: str):
+    """Apoderados autorizados del estudiante con este CI"""
+    return AutorizacionService.listar_por_estudiante(ci_estudiante)
+
+
+@router.get("/stats", response_model=RetiroIndexStatsDTO)
+def obtener_estadisticas():
+    """Tamaño del índice en memoria"""
+    return RetiroService.obtener_estadisticas()
+
+
+# ---- AUTORIZACIONES ----
+@router.post("/autorizaciones", response_model=AutorizacionReadDTO, status_code=status.HTTP_201_CREATED)
+def crear_autorizacion(autorizacion: AutorizacionCreateDTO, db: Session = Depends(get_db)):
+    """Autoriza a un apoderado a retirar a un estudiante"""
+    return AutorizacionService.crear_autorizacion(db, autorizacion)
+
+
+@router.delete("/autorizaciones/{id_autorizacion}", response_model=AutorizacionReadDTO)
+def desactivar_autorizacion(id_autorizacion: int, db: Session = Depends(get_db)):
+    """Revoca una autorización (queda inactiva, no se elimina)"""
+    autorizacion = AutorizacionService.desactivar_autorizacion(db, id_autorizacion)
+    if not autorizacion:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Autorización con ID {id_autorizacion} no encontrada"
+        )
+    return autorizacion
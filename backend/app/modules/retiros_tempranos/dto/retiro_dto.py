@@ -0,0 +1,61 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime, date
+
+
+# ============ AUTORIZACIÓN DTOs ============
+class AutorizacionCreateDTO(BaseModel):
+    id_estudiante: int = Field(..., gt=0)
+    ci_estudiante: Optional[str] = Field(None, max_length=20)
+    nombre_estudiante: str = Field(..., min_length=3, max_length=150)
+    id_curso: Optional[int] = None
+    ci_apoderado: str = Field(..., min_length=5, max_length=20)
+    nombre_apoderado: str = Field(..., min_length=3, max_length=150)
+    parentesco: Optional[str] = Field(None, max_length=50)
+    telefono: Optional[str] = Field(None, max_length=20)
+
+
+class AutorizacionReadDTO(BaseModel):
+    id_autorizacion: int
+    id_estudiante: int
+    ci_estudiante: Optional[str] = None
+    nombre_estudiante: str
+    id_curso: Optional[int] = None
+    ci_apoderado: str
+    nombre_apoderado: str
+    parentesco: Optional[str] = None
+    telefono: Optional[str] = None
+    estado: str
+    fecha_actualizacion: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# ============ RETIRO DTOs ============
+class RetiroCreateDTO(BaseModel):
+    ci_apoderado: str = Field(..., min_length=5, max_length=20)
+    id_estudiante: int = Field(..., gt=0)
+    motivo: Optional[str] = None
+    registrado_por: Optional[int] = None
+
+
+class RetiroReadDTO(BaseModel):
+    codigo: str
+    id_estudiante: int
+    nombre_estudiante: str
+    id_curso: Optional[int] = None
+    ci_apoderado: str
+    nombre_apoderado: str
+    motivo: Optional[str] = None
+    fecha: date
+    fecha_hora_salida: datetime
+
+
+class RetiroIndexStatsDTO(BaseModel):
+    apoderados: int
+    estudiantes: int
+    autorizaciones: int
+    retirados_hoy: int
+    ultima_actualizacion: Optional[datetime] = None
+    refrescos: int
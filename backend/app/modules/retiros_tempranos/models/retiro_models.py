@@ -0,0 +1,57 @@
+from sqlalchemy import Column, BigInteger, Integer, String, ForeignKey, DateTime, Date, Text, Enum, Index
+from app.config.database import Base
+from datetime import datetime
+
+
+class AutorizacionRetiro(Base):
+    """
+    Apoderado autorizado a retirar a un estudiante
+
+    Las autorizaciones no se eliminan, se desactivan: así el índice en memoria
+    se puede refrescar de forma incremental leyendo solo las filas con
+    fecha_actualizacion posterior a la última lectura.
+    """
+    __tablename__ = "retiros_autorizaciones"
+    __table_args__ = (
+        Index("ix_retiros_aut_ci_apoderado", "ci_apoderado"),
+        Index("ix_retiros_aut_estudiante", "id_estudiante"),
+        Index("ix_retiros_aut_actualizacion", "fecha_actualizacion"),
+    )
+
+    id_autorizacion = Column(Integer, primary_key=True, autoincrement=True)
+    # El módulo de estudiantes todavía no tiene tabla: se guardan sus datos sin FK
+    id_estudiante = Column(Integer, nullable=False)
+    ci_estudiante = Column(String(20), nullable=True)
+    nombre_estudiante = Column(String(150), nullable=False)
+    id_curso = Column(Integer, ForeignKey("cursos.id_curso"), nullable=True)
+    ci_apoderado = Column(String(20), nullable=False)
+    nombre_apoderado = Column(String(150), nullable=False)
+    parentesco = Column(String(50), nullable=True)
+    telefono = Column(String(20), nullable=True)
+    estado = Column(Enum('activo', 'inactivo'), nullable=False, default='activo')
+    fecha_actualizacion = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class RegistroRetiro(Base):
+    """
+    Salida anticipada registrada en portería (solo inserción)
+
+    Se escribe por lotes desde una cola en memoria; `codigo` se genera al
+    registrar la salida para poder referenciarla antes de que llegue a la BD.
+    El "ya retirado hoy" del índice es por proceso: la unicidad de
+    (fecha, id_estudiante) la garantiza la BD entre varios workers.
+    """
+    __tablename__ = "retiros_registro"
+    __table_args__ = (
+        Index("ux_retiros_reg_fecha_estudiante", "fecha", "id_estudiante", unique=True),
+    )
+
+    id_retiro = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    codigo = Column(String(32), nullable=False, unique=True)
+    id_estudiante = Column(Integer, nullable=False)
+    id_autorizacion = Column(Integer, ForeignKey("retiros_autorizaciones.id_autorizacion"), nullable=False)
+    ci_apoderado = Column(String(20), nullable=False)
+    motivo = Column(Text, nullable=True)
+    registrado_por = Column(Integer, ForeignKey("personas.id_persona"), nullable=True)
+    fecha = Column(Date, nullable=False)
+    fecha_hora_salida = Column(DateTime, nullable=False)
@@ -0,0 +1,86 @@
+from datetime import date, datetime
+from typing import List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.modules.retiros_tempranos.models.retiro_models import AutorizacionRetiro, RegistroRetiro
+
+
+# ============ AUTORIZACIÓN REPOSITORY ============
+class AutorizacionRepository:
+
+    @staticmethod
+    def create(db: Session, autorizacion_data: dict) -> AutorizacionRetiro:
+        autorizacion = AutorizacionRetiro(**autorizacion_data, estado="activo", fecha_actualizacion=datetime.utcnow())
+        db.add(autorizacion)
+        db.commit()
+        db.refresh(autorizacion)
+        return autorizacion
+
+    @staticmethod
+    def get_by_id(db: Session, id_autorizacion: int) -> Optional[AutorizacionRetiro]:
+        return db.query(AutorizacionRetiro).filter(AutorizacionRetiro.id_autorizacion == id_autorizacion).first()
+
+    @staticmethod
+    def get_activa(db: Session, id_estudiante: int, ci_apoderado: str) -> Optional[AutorizacionRetiro]:
+        return (
+            db.query(AutorizacionRetiro)
+            .filter(
+                AutorizacionRetiro.id_estudiante == id_estudiante,
+                AutorizacionRetiro.ci_apoderado == ci_apoderado,
+                AutorizacionRetiro.estado == "activo"
+            )
+            .first()
+        )
+
+    @staticmethod
+    def desactivar(db: Session, autorizacion: AutorizacionRetiro) -> AutorizacionRetiro:
+        autorizacion.estado = "inactivo"
+        autorizacion.fecha_actualizacion = datetime.utcnow()
+        db.commit()
+        db.refresh(autorizacion)
+        return autorizacion
+
+    @staticmethod
+    def get_cambios_desde(db: Session, marca: Optional[datetime]) -> List[AutorizacionRetiro]:
+        """Autorizaciones creadas o modificadas desde `marca` (todas si es None). Usa ix_retiros_aut_actualizacion."""
+        query = db.query(AutorizacionRetiro)
+        if marca is not None:
+            query = query.filter(AutorizacionRetiro.fecha_actualizacion >= marca)
+        else:
+            query = query.filter(AutorizacionRetiro.estado == "activo")
+        return query.order_by(AutorizacionRetiro.fecha_actualizacion).all()
+
+
+# ============ RETIRO REPOSITORY ============
+class RetiroRepository:
+
+    @staticmethod
+    def create(db: Session, retiro_data: dict) -> None:
+        """
+        Inserta y confirma una salida
+
+        Una segunda salida del mismo estudiante en el mismo día viola
+        ux_retiros_reg_fecha_estudiante y se propaga como IntegrityError.
+        """
+        db.execute(insert(RegistroRetiro), [retiro_data])
+        db.commit()
+
+    @staticmethod
+    def get_de_estudiante(db: Session, fecha: date, id_estudiante: int) -> Optional[RegistroRetiro]:
+        return (
+            db.query(RegistroRetiro)
+            .filter(RegistroRetiro.fecha == fecha, RegistroRetiro.id_estudiante == id_estudiante)
+            .first()
+        )
+
+    @staticmethod
+    def get_del_dia(db: Session, fecha: date, desde_id: int = 0) -> List[RegistroRetiro]:
+        """Retiros de un día con id mayor a `desde_id` (los escritos por otros procesos)"""
+        return (
+            db.query(RegistroRetiro)
+            .filter(RegistroRetiro.fecha == fecha, RegistroRetiro.id_retiro > desde_id)
+            .order_by(RegistroRetiro.id_retiro)
+            .all()
+        )
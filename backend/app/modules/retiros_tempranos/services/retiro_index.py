@@ -0,0 +1,249 @@
+"""
+Índice en memoria para la portería de retiros tempranos
+
+La portería consulta apoderados y estudiantes por CI sin tocar la BD:
+
+- Las autorizaciones se cargan una vez y luego se refrescan de forma
+  incremental (solo filas con fecha_actualizacion reciente) cada
+  RETIROS_REFRESH_INTERVAL segundos, como máximo, al consultar el índice.
+- Los retiros del día se mantienen en memoria ("retirados hoy") para la vista
+  en vivo; los de otros procesos se incorporan en el mismo refresco.
+
+El índice no decide si una salida se acepta: RetiroService la inserta en la
+BD antes de responder y el índice único de retiros_registro rechaza la
+segunda salida del día aunque venga de otro worker.
+"""
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from app.modules.retiros_tempranos.models.retiro_models import RegistroRetiro
+from app.modules.retiros_tempranos.repositories.retiro_repository import AutorizacionRepository, RetiroRepository
+from app.shared.services.cache_registry import cache_registry
+
+RETIROS_REFRESH_INTERVAL = float(os.getenv("RETIROS_REFRESH_INTERVAL", 5.0))
+
+# Margen al releer cambios: cubre transacciones que confirmaron con una
+# fecha_actualizacion anterior a la última leída
+_SOLAPAMIENTO = timedelta(seconds=5)
+
+_CAMPOS_AUTORIZACION = (
+    "id_autorizacion", "id_estudiante", "ci_estudiante", "nombre_estudiante", "id_curso",
+    "ci_apoderado", "nombre_apoderado", "parentesco", "telefono", "estado", "fecha_actualizacion"
+)
+
+
+class RetiroIndex:
+
+    def __init__(self, session_factory=None, intervalo: float = RETIROS_REFRESH_INTERVAL):
+        self._session_factory = session_factory
+        self._intervalo = intervalo
+        self._lock = threading.RLock()
+        self._refresco_lock = threading.Lock()
+        self._autorizaciones: Dict[int, dict] = {}
+        # ci_apoderado -> {id_estudiante: autorización}
+        self._por_apoderado: Dict[str, Dict[int, dict]] = {}
+        # id_estudiante -> {id_autorizacion: autorización}
+        self._por_estudiante: Dict[int, Dict[int, dict]] = {}
+        # ci_estudiante -> id_estudiante
+        self._estudiante_por_ci: Dict[str, int] = {}
+        # id_estudiante -> retiro de hoy
+        self._retirados: Dict[int, dict] = {}
+        self._dia: date = datetime.now().date()
+        self._marca: Optional[datetime] = None
+        self._ultimo_id_retiro = 0
+        self._ultima_revision = 0.0
+        self._construido = False
+        self._refrescos = 0
+
+    # ---- Consultas (memoria) ----
+
+    def autorizacion(self, ci_apoderado: str, id_estudiante: int) -> Optional[dict]:
+        self.asegurar_actualizado()
+        return self._por_apoderado.get(ci_apoderado, {}).get(id_estudiante)
+
+    def por_apoderado(self, ci_apoderado: str) -> List[dict]:
+        self.asegurar_actualizado()
+        return list(self._por_apoderado.get(ci_apoderado, {}).values())
+
+    def por_estudiante_ci(self, ci_estudiante: str) -> List[dict]:
+        self.asegurar_actualizado()
+        id_estudiante = self._estudiante_por_ci.get(ci_estudiante)
+        return list(self._por_estudiante.get(id_estudiante, {}).values()) if id_estudiante else []
+
+    def retiro_de_hoy(self, id_estudiante: int) -> Optional[dict]:
+        with self._lock:
+            self._cambiar_dia_si_corresponde()
+            return self._retirados.get(id_estudiante)
+
+    def retirados_hoy(self) -> List[dict]:
+        self.asegurar_actualizado()
+        with self._lock:
+            self._cambiar_dia_si_corresponde()
+            return sorted(self._retirados.values(), key=lambda r: r["fecha_hora_salida"], reverse=True)
+
+    def estadisticas(self) -> Dict:
+        with self._lock:
+            return {
+                "apoderados": len(self._por_apoderado),
+                "estudiantes": len(self._por_estudiante),
+                "autorizaciones": len(self._autorizaciones),
+                "retirados_hoy": len(self._retirados),
+                "ultima_actualizacion": self._marca,
+                "refrescos": self._refrescos
+            }
+
+    # ---- Escrituras ----
+
+    def marcar_retirado(self, retiro: dict) -> Optional[dict]:
+        """
+        Registra una salida ya confirmada en la BD en la vista de hoy
+
+        Retorna el retiro existente si el estudiante ya figuraba hoy (y no registra nada).
+        """
+        with self._lock:
+            self._cambiar_dia_si_corresponde()
+            existente = self._retirados.get(retiro["id_estudiante"])
+            if existente:
+                return existente
+            self._retirados[retiro["id_estudiante"]] = retiro
+            return None
+
+    def adoptar(self, retiro: RegistroRetiro) -> dict:
+        """Incorpora a la vista de hoy una salida leída de la BD (p. ej. registrada por otro worker)"""
+        with self._lock:
+            self._cambiar_dia_si_corresponde()
+            dict_retiro = self._retiro_a_dict(retiro)
+            if retiro.fecha == self._dia:
+                self._retirados[retiro.id_estudiante] = dict_retiro
+            return dict_retiro
+
+    def aplicar(self, autorizacion) -> None:
+        """Aplica una autorización creada o modificada (fila ORM) sin esperar al refresco"""
+        with self._lock:
+            self._aplicar(self._a_dict(autorizacion))
+
+    def reiniciar(self) -> None:
+        """
+        Descarta las autorizaciones y fuerza una carga completa en el próximo acceso
+
+        Los retiros de hoy se conservan: ya están en la BD y el refresco
+        incremental solo trae los nuevos.
+        """
+        with self._lock:
+            self._autorizaciones.clear()
+            self._por_apoderado.clear()
+            self._por_estudiante.clear()
+            self._estudiante_por_ci.clear()
+            self._marca = None
+            self._ultimo_id_retiro = 0
+            self._construido = False
+
+    # ---- Refresco ----
+
+    def asegurar_actualizado(self) -> None:
+        """
+        Refresca el índice si pasó el intervalo
+
+        Solo un hilo refresca a la vez; los demás siguen respondiendo con el
+        índice actual en lugar de esperar (salvo en la primera carga).
+        """
+        if self._construido and time.monotonic() - self._ultima_revision < self._intervalo:
+            return
+        if not self._refresco_lock.acquire(blocking=not self._construido):
+            return
+        try:
+            if self._construido and time.monotonic() - self._ultima_revision < self._intervalo:
+                return
+            self.refrescar()
+        finally:
+            self._refresco_lock.release()
+
+    def refrescar(self) -> None:
+        db = self._sesion()
+        try:
+            desde = self._marca - _SOLAPAMIENTO if self._marca else None
+            cambios = [self._a_dict(a) for a in AutorizacionRepository.get_cambios_desde(db, desde)]
+            with self._lock:
+                self._cambiar_dia_si_corresponde()
+                dia, ultimo_id = self._dia, self._ultimo_id_retiro
+            retiros = RetiroRepository.get_del_dia(db, dia, ultimo_id)
+        finally:
+            db.close()
+
+        with self._lock:
+            for autorizacion in cambios:
+                self._aplicar(autorizacion)
+            if self._dia == dia:
+                for retiro in retiros:
+                    self._ultimo_id_retiro = max(self._ultimo_id_retiro, retiro.id_retiro)
+                    # La fila de la BD manda: si otro worker ganó, reemplaza a la local
+                    if self._retirados.get(retiro.id_estudiante, {}).get("codigo") != retiro.codigo:
+                        self._retirados[retiro.id_estudiante] = self._retiro_a_dict(retiro)
+            self._construido = True
+            self._refrescos += 1
+            self._ultima_revision = time.monotonic()
+
+    # ---- Internos ----
+
+    def _aplicar(self, autorizacion: dict) -> None:
+        anterior = self._autorizaciones.pop(autorizacion["id_autorizacion"], None)
+        if anterior:
+            self._por_apoderado.get(anterior["ci_apoderado"], {}).pop(anterior["id_estudiante"], None)
+            if not self._por_apoderado.get(anterior["ci_apoderado"], True):
+                del self._por_apoderado[anterior["ci_apoderado"]]
+            self._por_estudiante.get(anterior["id_estudiante"], {}).pop(anterior["id_autorizacion"], None)
+            if not self._por_estudiante.get(anterior["id_estudiante"], True):
+                del self._por_estudiante[anterior["id_estudiante"]]
+
+        if self._marca is None or autorizacion["fecha_actualizacion"] > self._marca:
+            self._marca = autorizacion["fecha_actualizacion"]
+        if autorizacion["estado"] != "activo":
+            return
+
+        self._autorizaciones[autorizacion["id_autorizacion"]] = autorizacion
+        self._por_apoderado.setdefault(autorizacion["ci_apoderado"], {})[autorizacion["id_estudiante"]] = autorizacion
+        self._por_estudiante.setdefault(autorizacion["id_estudiante"], {})[autorizacion["id_autorizacion"]] = autorizacion
+        if autorizacion["ci_estudiante"]:
+            self._estudiante_por_ci[autorizacion["ci_estudiante"]] = autorizacion["id_estudiante"]
+
+    def _cambiar_dia_si_corresponde(self) -> None:
+        hoy = datetime.now().date()
+        if hoy != self._dia:
+            self._dia = hoy
+            self._retirados.clear()
+            self._ultimo_id_retiro = 0
+
+    def _retiro_a_dict(self, retiro: RegistroRetiro) -> dict:
+        autorizacion = self._autorizaciones.get(retiro.id_autorizacion, {})
+        return {
+            "codigo": retiro.codigo,
+            "id_estudiante": retiro.id_estudiante,
+            "nombre_estudiante": autorizacion.get("nombre_estudiante", ""),
+            "id_curso": autorizacion.get("id_curso"),
+            "ci_apoderado": retiro.ci_apoderado,
+            "nombre_apoderado": autorizacion.get("nombre_apoderado", ""),
+            "motivo": retiro.motivo,
+            "fecha": retiro.fecha,
+            "fecha_hora_salida": retiro.fecha_hora_salida
+        }
+
+    @staticmethod
+    def _a_dict(autorizacion) -> dict:
+        return {campo: getattr(autorizacion, campo) for campo in _CAMPOS_AUTORIZACION}
+
+    def _sesion(self):
+        if self._session_factory is None:
+            from app.config.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+
+# Instancia compartida por proceso
+retiro_index = RetiroIndex()
+cache_registry.registrar(
+    "retiros.indice", retiro_index.estadisticas, retiro_index.reiniciar,
+    "Autorizaciones de retiro y salidas del día (se recarga en el próximo acceso)"
+)
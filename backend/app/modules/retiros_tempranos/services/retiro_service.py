@@ -0,0 +1,131 @@
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.modules.retiros_tempranos.dto.retiro_dto import (
+    AutorizacionCreateDTO, AutorizacionReadDTO, RetiroCreateDTO, RetiroReadDTO, RetiroIndexStatsDTO
+)
+from app.modules.retiros_tempranos.repositories.retiro_repository import AutorizacionRepository, RetiroRepository
+from app.modules.retiros_tempranos.services.retiro_index import retiro_index
+
+
+# ============ AUTORIZACIÓN SERVICE ============
+class AutorizacionService:
+
+    @staticmethod
+    def crear_autorizacion(db: Session, data: AutorizacionCreateDTO) -> AutorizacionReadDTO:
+        if AutorizacionRepository.get_activa(db, data.id_estudiante, data.ci_apoderado):
+            raise HTTPException(
+                status_code=400,
+                detail=f"El apoderado {data.ci_apoderado} ya está autorizado para el estudiante {data.id_estudiante}"
+            )
+        try:
+            autorizacion = AutorizacionRepository.create(db, data.model_dump())
+        except IntegrityError as e:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error al crear la autorización: {str(e.orig)}")
+        retiro_index.aplicar(autorizacion)
+        return AutorizacionReadDTO.from_orm(autorizacion)
+
+    @staticmethod
+    def desactivar_autorizacion(db: Session, id_autorizacion: int) -> Optional[AutorizacionReadDTO]:
+        autorizacion = AutorizacionRepository.get_by_id(db, id_autorizacion)
+        if not autorizacion:
+            return None
+        autorizacion = AutorizacionRepository.desactivar(db, autorizacion)
+        retiro_index.aplicar(autorizacion)
+        return AutorizacionReadDTO.from_orm(autorizacion)
+
+    @staticmethod
+    def listar_por_apoderado(ci_apoderado: str) -> List[AutorizacionReadDTO]:
+        """Estudiantes que el apoderado puede retirar (desde memoria)"""
+        return [AutorizacionReadDTO(**a) for a in retiro_index.por_apoderado(ci_apoderado)]
+
+    @staticmethod
+    def listar_por_estudiante(ci_estudiante: str) -> List[AutorizacionReadDTO]:
+        """Apoderados autorizados de un estudiante (desde memoria)"""
+        return [AutorizacionReadDTO(**a) for a in retiro_index.por_estudiante_ci(ci_estudiante)]
+
+
+# ============ RETIRO SERVICE ============
+class RetiroService:
+
+    @staticmethod
+    def registrar_retiro(db: Session, data: RetiroCreateDTO) -> RetiroReadDTO:
+        """
+        Registra una salida en portería
+
+        La autorización se valida contra el índice en memoria, pero la salida
+        se confirma con un INSERT de una fila antes de responder: el índice
+        único ux_retiros_reg_fecha_estudiante decide entre porterías de
+        distintos workers (409 para la que llega segunda). Solo después de
+        confirmar se agrega a la vista de "retirados hoy".
+        """
+        autorizacion = retiro_index.autorizacion(data.ci_apoderado, data.id_estudiante)
+        if not autorizacion:
+            raise HTTPException(
+                status_code=403,
+                detail=f"El apoderado {data.ci_apoderado} no está autorizado para retirar al estudiante {data.id_estudiante}"
+            )
+        # Atajo: una salida ya confirmada en este proceso (o vista en el refresco)
+        existente = retiro_index.retiro_de_hoy(data.id_estudiante)
+        if existente:
+            raise RetiroService._ya_retirado(existente)
+
+        ahora = datetime.now()
+        fila = {
+            "codigo": uuid.uuid4().hex,
+            "id_estudiante": data.id_estudiante,
+            "id_autorizacion": autorizacion["id_autorizacion"],
+            "ci_apoderado": data.ci_apoderado,
+            "motivo": data.motivo,
+            "registrado_por": data.registrado_por,
+            "fecha": ahora.date(),
+            "fecha_hora_salida": ahora
+        }
+        try:
+            RetiroRepository.create(db, fila)
+        except IntegrityError:
+            db.rollback()
+            existente = RetiroRepository.get_de_estudiante(db, fila["fecha"], data.id_estudiante)
+            if existente:
+                raise RetiroService._ya_retirado(retiro_index.adoptar(existente))
+            raise HTTPException(status_code=409, detail="El estudiante ya fue retirado hoy desde otra portería")
+
+        retiro = {
+            "codigo": fila["codigo"],
+            "id_estudiante": data.id_estudiante,
+            "nombre_estudiante": autorizacion["nombre_estudiante"],
+            "id_curso": autorizacion["id_curso"],
+            "ci_apoderado": data.ci_apoderado,
+            "nombre_apoderado": autorizacion["nombre_apoderado"],
+            "motivo": data.motivo,
+            "fecha": fila["fecha"],
+            "fecha_hora_salida": ahora
+        }
+        retiro_index.marcar_retirado(retiro)
+        return RetiroReadDTO(**retiro)
+
+    @staticmethod
+    def listar_retirados_hoy(id_curso: Optional[int] = None) -> List[RetiroReadDTO]:
+        """Vista en vivo de los estudiantes retirados hoy (desde memoria)"""
+        return [
+            RetiroReadDTO(**r) for r in retiro_index.retirados_hoy()
+            if id_curso is None or r["id_curso"] == id_curso
+        ]
+
+    @staticmethod
+    def obtener_estadisticas() -> RetiroIndexStatsDTO:
+        return RetiroIndexStatsDTO(**retiro_index.estadisticas())
+
+    @staticmethod
+    def _ya_retirado(existente: dict) -> HTTPException:
+        return HTTPException(
+            status_code=409,
+            detail=f"El estudiante ya fue retirado hoy a las {existente['fecha_hora_salida']:%H:%M} "
+                   f"por {existente['nombre_apoderado'] or existente['ci_apoderado']}"
+        )
@@ -1 +1,10 @@
-# Módulo de Usuarios, Roles y Permisos
\ No newline at end of file
+# Módulo de Usuarios, Roles y Permisos
+
+
+def __getattr__(nombre):
+    # El router se importa al pedirlo: importar un modelo o servicio del
+    # módulo no debe cargar sus controladores (ver app/core/routers.py)
+    if nombre == "usuarios_router":
+        from .controllers.usuario_controller import router
+        return router
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
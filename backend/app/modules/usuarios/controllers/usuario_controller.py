@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from typing import List
+from app.config.database import get_db
+from app.modules.usuarios.dto.usuario_dto import (
+    UsuarioCreateDTO, UsuarioReadDTO, PasswordUpdateDTO, LoginDTO, TokenDTO
+)
+from app.modules.usuarios.services.usuario_service import UsuarioService, AuthService
+from app.shared.decorators.auth_decorators import get_current_user, require_roles
+
+router = APIRouter(prefix="/api/usuarios", tags=["Usuarios"])
+
+
+# ============ ENDPOINTS ESTÁTICOS (PRIMERO) ============
+
+@router.post("/auth/login", response_model=TokenDTO)
+async def login(data: LoginDTO, db: Session = Depends(get_db)):
+    """
+    Inicia sesión y retorna un token de acceso (Bearer)
+
+    Responde 503 con Retry-After si hay demasiados inicios de sesión en curso.
+    """
+    return await AuthService.login(db, data)
+
+
+@router.get("/me", response_model=UsuarioReadDTO)
+def obtener_usuario_actual(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+    return UsuarioService.obtener_usuario(db, current_user["id"])
+
+
+@router.put("/me/password", response_model=UsuarioReadDTO)
+async def cambiar_password(data: PasswordUpdateDTO, current_user: dict = Depends(get_current_user),
+                           db: Session = Depends(get_db)):
+    return await UsuarioService.cambiar_password(db, current_user["id"], data)
+
+
+@router.get("/", response_model=List[UsuarioReadDTO], dependencies=[Depends(require_roles("admin"))])
+def listar_usuarios(db: Session = Depends(get_db)):
+    return UsuarioService.listar_usuarios(db)
+
+
+@router.post("/", response_model=UsuarioReadDTO, status_code=201, dependencies=[Depends(require_roles("admin"))])
+async def crear_usuario(data: UsuarioCreateDTO, db: Session = Depends(get_db)):
+    return await UsuarioService.crear_usuario(db, data)
+
+
+# ============ ENDPOINTS DINÁMICOS (DESPUÉS) ============
+
+@router.get("/{id_usuario}", response_model=UsuarioReadDTO, dependencies=[Depends(require_roles("admin"))])
+def obtener_usuario(id_usuario: int, db: Session = Depends(get_db)):
+    return UsuarioService.obtener_usuario(db, id_usuario)
@@ -0,0 +1,64 @@
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from typing import Optional
+from datetime import datetime
+
+from app.modules.usuarios.services.password_hasher import MAX_BYTES_PASSWORD
+
+
+def _validar_bytes(v: str) -> str:
+    if len(v.encode("utf-8")) > MAX_BYTES_PASSWORD:
+        raise ValueError(f"La contraseña no puede superar {MAX_BYTES_PASSWORD} bytes")
+    return v
+
+
+# ============ USUARIO DTOs ============
+class UsuarioCreateDTO(BaseModel):
+    username: str = Field(..., min_length=3, max_length=50, pattern=r"^[A-Za-z0-9_.-]+$")
+    password: str = Field(..., min_length=8)
+    correo: Optional[EmailStr] = None
+    rol: str = Field("profesor", pattern="^(admin|director|secretaria|regente|profesor)$")
+    id_persona: Optional[int] = Field(None, gt=0)
+
+    @field_validator("password")
+    def validar_password(cls, v):
+        return _validar_bytes(v)
+
+
+class UsuarioReadDTO(BaseModel):
+    id_usuario: int
+    username: str
+    correo: Optional[str] = None
+    rol: str
+    id_persona: Optional[int] = None
+    estado: str
+    ultimo_acceso: Optional[datetime] = None
+    fecha_creacion: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class PasswordUpdateDTO(BaseModel):
+    password_actual: str = Field(..., min_length=1)
+    password_nueva: str = Field(..., min_length=8)
+
+    @field_validator("password_actual", "password_nueva")
+    def validar_password(cls, v):
+        return _validar_bytes(v)
+
+
+# ============ AUTENTICACIÓN DTOs ============
+class LoginDTO(BaseModel):
+    username: str = Field(..., min_length=1, max_length=50)
+    password: str = Field(..., min_length=1)
+
+    @field_validator("password")
+    def validar_password(cls, v):
+        return _validar_bytes(v)
+
+
+class TokenDTO(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+    usuario: UsuarioReadDTO
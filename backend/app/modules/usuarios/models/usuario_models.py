@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum
+from app.config.database import Base
+from datetime import datetime
+
+
+class Usuario(Base):
+    __tablename__ = "usuarios"
+
+    id_usuario = Column(Integer, primary_key=True, autoincrement=True)
+    username = Column(String(50), nullable=False, unique=True)
+    correo = Column(String(100), nullable=True, unique=True)
+    # Hash bcrypt ($2b$<costo>$...); el costo se sube al iniciar sesión si quedó bajo
+    password_hash = Column(String(100), nullable=False)
+    rol = Column(Enum('admin', 'director', 'secretaria', 'regente', 'profesor'), nullable=False, default='profesor')
+    id_persona = Column(Integer, ForeignKey("personas.id_persona", ondelete="SET NULL"), nullable=True)
+    estado = Column(Enum('activo', 'inactivo'), nullable=False, default='activo')
+    ultimo_acceso = Column(DateTime, nullable=True)
+    fecha_creacion = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,51 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.modules.usuarios.models.usuario_models import Usuario
+
+
+# ============ USUARIO REPOSITORY ============
+class UsuarioRepository:
+
+    @staticmethod
+    def get_by_id(db: Session, id_usuario: int) -> Optional[Usuario]:
+        return db.query(Usuario).filter(Usuario.id_usuario == id_usuario).first()
+
+    @staticmethod
+    def get_by_username(db: Session, username: str) -> Optional[Usuario]:
+        return db.query(Usuario).filter(Usuario.username == username).first()
+
+    @staticmethod
+    def get_by_correo(db: Session, correo: str) -> Optional[Usuario]:
+        return db.query(Usuario).filter(Usuario.correo == correo).first()
+
+    @staticmethod
+    def get_all(db: Session) -> List[Usuario]:
+        return db.query(Usuario).order_by(Usuario.username).all()
+
+    @staticmethod
+    def create(db: Session, data: dict) -> Usuario:
+        usuario = Usuario(**data)
+        db.add(usuario)
+        db.commit()
+        db.refresh(usuario)
+        return usuario
+
+    @staticmethod
+    def registrar_acceso(db: Session, usuario: Usuario, nuevo_hash: Optional[str] = None) -> Usuario:
+        """Actualiza el último acceso y, si se indica, reemplaza el hash (costo actualizado)"""
+        usuario.ultimo_acceso = datetime.utcnow()
+        if nuevo_hash:
+            usuario.password_hash = nuevo_hash
+        db.commit()
+        db.refresh(usuario)
+        return usuario
+
+    @staticmethod
+    def update_password_hash(db: Session, usuario: Usuario, password_hash: str) -> Usuario:
+        usuario.password_hash = password_hash
+        db.commit()
+        db.refresh(usuario)
+        return usuario
@@ -0,0 +1,189 @@
+"""
+Hash y verificación de contraseñas con bcrypt fuera del event loop
+
+bcrypt consume CPU a propósito (~100-300 ms por operación). Ejecutado en el
+event loop detiene todas las demás peticiones mientras dura; aquí corre en un
+pool acotado (hilos por defecto: bcrypt libera el GIL) y la cantidad de
+operaciones en espera también está acotada. Si la cola está llena por más de
+AUTH_HASH_TIMEOUT segundos se responde 503 con Retry-After en lugar de
+acumular logins que el cliente ya abandonó.
+
+El costo se calibra una vez por proceso: el mayor costo entre BCRYPT_MIN_ROUNDS
+y BCRYPT_MAX_ROUNDS cuyo hash tarde como máximo BCRYPT_TARGET_MS en este
+servidor (o BCRYPT_ROUNDS fijo si está definido). Los hashes con un costo
+menor se regeneran al iniciar sesión.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional
+
+import bcrypt
+from fastapi import HTTPException
+
+AUTH_HASH_POOL = os.getenv("AUTH_HASH_POOL", "hilos")
+AUTH_HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+AUTH_HASH_MAX_COLA = int(os.getenv("AUTH_HASH_MAX_COLA", AUTH_HASH_WORKERS * 16))
+AUTH_HASH_TIMEOUT = float(os.getenv("AUTH_HASH_TIMEOUT", 5.0))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 0)) or None
+BCRYPT_MIN_ROUNDS = int(os.getenv("BCRYPT_MIN_ROUNDS", 10))
+BCRYPT_MAX_ROUNDS = int(os.getenv("BCRYPT_MAX_ROUNDS", 14))
+BCRYPT_TARGET_MS = float(os.getenv("BCRYPT_TARGET_MS", 250))
+
+# bcrypt solo usa los primeros 72 bytes
+MAX_BYTES_PASSWORD = 72
+
+
+# ---- Funciones que corren en el pool (deben poder serializarse para procesos) ----
+
+def _hash(password: str, costo: int) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(costo)).decode("ascii")
+
+
+def _verificar(password: str, password_hash: str) -> bool:
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("ascii"))
+    except ValueError:
+        # Hash con formato inválido
+        return False
+
+
+def costo_de(password_hash: str) -> Optional[int]:
+    """Costo de un hash $2b$12$...; None si el formato no es bcrypt"""
+    partes = password_hash.split("$")
+    return int(partes[2]) if len(partes) > 3 and partes[2].isdigit() else None
+
+
+def calibrar_costo(objetivo_ms: float = BCRYPT_TARGET_MS, minimo: int = BCRYPT_MIN_ROUNDS,
+                   maximo: int = BCRYPT_MAX_ROUNDS) -> int:
+    """
+    Mayor costo cuyo hash tarda como máximo objetivo_ms
+
+    Mide el costo mínimo y extrapola (cada punto de costo duplica el tiempo).
+    """
+    inicio = time.perf_counter()
+    _hash("calibracion", minimo)
+    ms = (time.perf_counter() - inicio) * 1000
+    costo = minimo
+    while costo < maximo and ms * 2 <= objetivo_ms:
+        costo += 1
+        ms *= 2
+    return costo
+
+
+class PasswordHasher:
+
+    def __init__(self, pool: str = AUTH_HASH_POOL, workers: int = AUTH_HASH_WORKERS,
+                 max_cola: int = AUTH_HASH_MAX_COLA, timeout: float = AUTH_HASH_TIMEOUT,
+                 costo: Optional[int] = BCRYPT_ROUNDS):
+        self._tipo_pool = pool
+        self._workers = workers
+        self._max_cola = max_cola
+        self._timeout = timeout
+        self._costo = costo
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        # Un semáforo por event loop (los tests y benchmarks crean varios)
+        self._semaforos: Dict[int, asyncio.Semaphore] = {}
+        self._en_cola = 0
+        self._metricas = {"hashes": 0, "verificaciones": 0, "rechazados": 0, "segundos": 0.0}
+        # Hash de referencia para verificar cuando el usuario no existe: el
+        # tiempo de respuesta no revela si el username es válido
+        self._hash_ficticio: Optional[str] = None
+
+    async def obtener_costo(self) -> int:
+        """Costo actual; la primera vez lo calibra en un hilo aparte"""
+        if self._costo is None:
+            await asyncio.to_thread(self._calibrar)
+        return self._costo
+
+    async def necesita_rehash(self, password_hash: str) -> bool:
+        costo = costo_de(password_hash)
+        return costo is None or costo < await self.obtener_costo()
+
+    async def hash(self, password: str) -> str:
+        resultado = await self._ejecutar(_hash, password, await self.obtener_costo())
+        self._metricas["hashes"] += 1
+        return resultado
+
+    async def verificar(self, password: str, password_hash: Optional[str]) -> bool:
+        """Verifica la contraseña; sin hash (usuario inexistente) verifica contra uno ficticio y retorna False"""
+        if password_hash is None:
+            if self._hash_ficticio is None:
+                self._hash_ficticio = await self.hash("usuario-inexistente")
+            await self._ejecutar(_verificar, password, self._hash_ficticio)
+            return False
+        resultado = await self._ejecutar(_verificar, password, password_hash)
+        self._metricas["verificaciones"] += 1
+        return resultado
+
+    def estadisticas(self) -> Dict:
+        return {
+            "pool": self._tipo_pool,
+            "workers": self._workers,
+            "costo": self._costo,
+            "en_cola": self._en_cola,
+            "max_cola": self._max_cola,
+            "hashes": self._metricas["hashes"],
+            "verificaciones": self._metricas["verificaciones"],
+            "rechazados": self._metricas["rechazados"],
+            "ms_promedio": round(
+                1000 * self._metricas["segundos"] / max(self._metricas["hashes"] + self._metricas["verificaciones"], 1), 2
+            )
+        }
+
+    def cerrar(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    # ---- Internos ----
+
+    def _calibrar(self) -> None:
+        with self._lock:
+            if self._costo is None:
+                self._costo = calibrar_costo()
+                print(f"[INFO] Costo bcrypt calibrado: {self._costo}")
+
+    async def _ejecutar(self, funcion, *args):
+        semaforo = self._semaforo()
+        try:
+            await asyncio.wait_for(semaforo.acquire(), timeout=self._timeout)
+        except asyncio.TimeoutError:
+            self._metricas["rechazados"] += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Demasiados inicios de sesión simultáneos, intente nuevamente",
+                headers={"Retry-After": str(max(1, round(self._timeout)))}
+            )
+        self._en_cola += 1
+        inicio = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._obtener_executor(), funcion, *args)
+        finally:
+            self._metricas["segundos"] += time.perf_counter() - inicio
+            self._en_cola -= 1
+            semaforo.release()
+
+    def _semaforo(self) -> asyncio.Semaphore:
+        loop = id(asyncio.get_running_loop())
+        semaforo = self._semaforos.get(loop)
+        if semaforo is None:
+            semaforo = self._semaforos[loop] = asyncio.Semaphore(self._max_cola)
+        return semaforo
+
+    def _obtener_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self._tipo_pool == "procesos":
+                    self._executor = ProcessPoolExecutor(max_workers=self._workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="bcrypt")
+            return self._executor
+
+
+# Instancia compartida por proceso
+password_hasher = PasswordHasher()
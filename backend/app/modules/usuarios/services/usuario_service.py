@@ -0,0 +1,92 @@
+from typing import List
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config.config import Config
+from app.modules.usuarios.dto.usuario_dto import (
+    UsuarioCreateDTO, UsuarioReadDTO, PasswordUpdateDTO, LoginDTO, TokenDTO
+)
+from app.modules.usuarios.repositories.usuario_repository import UsuarioRepository
+from app.modules.usuarios.services.password_hasher import password_hasher
+from app.shared.decorators.auth_decorators import create_access_token
+
+
+# ============ USUARIO SERVICE ============
+class UsuarioService:
+    """
+    Los métodos que hashean son async: bcrypt corre en el pool de
+    password_hasher y las consultas a la BD en el threadpool, de modo que el
+    event loop nunca queda bloqueado durante un login.
+    """
+
+    @staticmethod
+    async def crear_usuario(db: Session, data: UsuarioCreateDTO) -> UsuarioReadDTO:
+        if await run_in_threadpool(UsuarioRepository.get_by_username, db, data.username):
+            raise HTTPException(status_code=400, detail=f"El usuario '{data.username}' ya existe")
+        if data.correo and await run_in_threadpool(UsuarioRepository.get_by_correo, db, data.correo):
+            raise HTTPException(status_code=400, detail=f"El correo {data.correo} ya está registrado")
+
+        datos = data.model_dump(exclude={"password"})
+        datos["password_hash"] = await password_hasher.hash(data.password)
+        usuario = await run_in_threadpool(UsuarioRepository.create, db, datos)
+        return UsuarioReadDTO.from_orm(usuario)
+
+    @staticmethod
+    def listar_usuarios(db: Session) -> List[UsuarioReadDTO]:
+        return [UsuarioReadDTO.from_orm(u) for u in UsuarioRepository.get_all(db)]
+
+    @staticmethod
+    def obtener_usuario(db: Session, id_usuario: int) -> UsuarioReadDTO:
+        usuario = UsuarioRepository.get_by_id(db, id_usuario)
+        if not usuario:
+            raise HTTPException(status_code=404, detail=f"Usuario con ID {id_usuario} no encontrado")
+        return UsuarioReadDTO.from_orm(usuario)
+
+    @staticmethod
+    async def cambiar_password(db: Session, id_usuario: int, data: PasswordUpdateDTO) -> UsuarioReadDTO:
+        usuario = await run_in_threadpool(UsuarioRepository.get_by_id, db, id_usuario)
+        if not usuario:
+            raise HTTPException(status_code=404, detail=f"Usuario con ID {id_usuario} no encontrado")
+        if not await password_hasher.verificar(data.password_actual, usuario.password_hash):
+            raise HTTPException(status_code=400, detail="La contraseña actual es incorrecta")
+
+        nuevo_hash = await password_hasher.hash(data.password_nueva)
+        usuario = await run_in_threadpool(UsuarioRepository.update_password_hash, db, usuario, nuevo_hash)
+        return UsuarioReadDTO.from_orm(usuario)
+
+
+# ============ AUTH SERVICE ============
+class AuthService:
+
+    @staticmethod
+    async def login(db: Session, data: LoginDTO) -> TokenDTO:
+        """
+        Verifica credenciales y emite un token de acceso
+
+        Con usuario inexistente también se ejecuta una verificación bcrypt
+        (contra un hash ficticio) para no revelar qué usernames existen.
+        """
+        usuario = await run_in_threadpool(UsuarioRepository.get_by_username, db, data.username)
+        valido = await password_hasher.verificar(data.password, usuario.password_hash if usuario else None)
+        if not valido or usuario.estado != "activo":
+            raise HTTPException(
+                status_code=401,
+                detail="Usuario o contraseña incorrectos",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+
+        # El costo calibrado subió desde que se creó el hash: se regenera ahora
+        # que se conoce la contraseña
+        nuevo_hash = None
+        if await password_hasher.necesita_rehash(usuario.password_hash):
+            nuevo_hash = await password_hasher.hash(data.password)
+        usuario = await run_in_threadpool(UsuarioRepository.registrar_acceso, db, usuario, nuevo_hash)
+
+        token = create_access_token({"sub": str(usuario.id_usuario), "username": usuario.username, "rol": usuario.rol})
+        return TokenDTO(
+            access_token=token,
+            expires_in=Config.JWT_ACCESS_TOKEN_EXPIRES,
+            usuario=UsuarioReadDTO.from_orm(usuario)
+        )
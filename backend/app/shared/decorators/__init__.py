@@ -10,7 +10,9 @@ from app.shared.decorators.auth_decorators import (
     require_roles,
     get_current_user,
     require_auth,
-    get_token_from_request
+    get_token_from_request,
+    create_access_token,
+    verify_token
 )
 
 __all__ = [
@@ -18,5 +20,7 @@ __all__ = [
     "require_roles",
     "get_current_user",
     "require_auth",
-    "get_token_from_request"
+    "get_token_from_request",
+    "create_access_token",
+    "verify_token"
 ]
\ No newline at end of file
@@ -8,10 +8,17 @@ Nota: El equipo del Módulo 1 (Usuarios) implementará la lógica completa
       de autenticación JWT y verificación de permisos/roles.
 """
 
+from datetime import datetime, timedelta, timezone
 from functools import wraps
 from typing import Callable, List, Optional
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from jose import JWTError, jwt
+from app.config.config import Config
+from app.shared.services.admission_control import identificar_cliente
+from app.shared.services.base_services import Autor
+
+JWT_ALGORITHM = "HS256"
 
 
 # ============================================================================
@@ -76,36 +83,27 @@ def require_roles(*roles: str):
     Args:
         roles: Lista de roles permitidos (el usuario debe tener AL MENOS UNO)
     
-    Note:
-        El equipo del Módulo 1 implementará la lógica de verificación de roles.
-        Por ahora es un stub que siempre permite el acceso.
+    Returns:
+        Claims del token (el rol se toma del claim "rol", sin consultar la BD)
     
-    TODO (Módulo 1):
-        - Extraer y validar token JWT
-        - Obtener roles del usuario desde BD
-        - Verificar que el usuario tenga al menos uno de los roles
-        - Lanzar HTTPException(403) si no tiene ningún rol válido
+    Raises:
+        HTTPException 401: Si no hay token o el token es inválido
+        HTTPException 403: Si el rol del token no está entre los permitidos
     """
-    async def dependency():
-        # TODO: Implementar verificación real de roles
-        # Ejemplo de implementación:
-        # token = await get_token_from_request()
-        # user = await get_user_from_token(token)
-        # user_roles = await get_user_roles(user.id)
-        # 
-        # if not any(role in user_roles for role in roles):
-        #     raise HTTPException(
-        #         status_code=status.HTTP_403_FORBIDDEN,
-        #         detail=f"Role required: {' or '.join(roles)}"
-        #     )
-        
-        # Por ahora, stub que permite todo
-        pass
+    async def dependency(request: Request) -> dict:
+        token = await get_token_from_request(request)
+        payload = verify_token(token)
+        if payload.get("rol") not in roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Role required: {' or '.join(roles)}"
+            )
+        return payload
     
     return dependency
 
 
-async def get_current_user():
+async def get_current_user(request: Request):
     """
     Dependency para obtener el usuario actual autenticado.
     
@@ -117,47 +115,44 @@ async def get_current_user():
             return {"user": current_user}
     
     Returns:
-        Usuario actual autenticado
+        dict con id, username y roles tomados del token (sin consultar la BD)
     
     Raises:
         HTTPException 401: Si no hay token o token inválido
-    
-    Note:
-        El equipo del Módulo 1 implementará esta función.
-        Por ahora retorna un usuario de prueba.
-    
-    TODO (Módulo 1):
-        - Extraer token del header Authorization
-        - Validar token JWT
-        - Obtener usuario desde BD
-        - Retornar objeto usuario
-        - Lanzar HTTPException(401) si falla la autenticación
     """
-    # TODO: Implementar obtención real del usuario
-    # Ejemplo de implementación:
-    # token = await get_token_from_request()
-    # 
-    # try:
-    #     payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-    #     user_id = payload.get("sub")
-    #     user = await get_user_by_id(user_id)
-    #     
-    #     if not user:
-    #         raise HTTPException(status_code=401, detail="User not found")
-    #     
-    #     return user
-    # except JWTError:
-    #     raise HTTPException(status_code=401, detail="Invalid token")
-    
-    # Por ahora, stub que retorna usuario de prueba
+    token = await get_token_from_request(request)
+    payload = verify_token(token)
     return {
-        "id": 1,
-        "nombre": "Usuario de Prueba",
-        "email": "test@example.com",
-        "roles": ["user"]
+        "id": int(payload["sub"]),
+        "username": payload.get("username"),
+        "roles": [payload["rol"]] if payload.get("rol") else []
     }
 
 
+async def get_usuario_opcional(request: Request) -> Optional[int]:
+    """
+    Dependency con el id del usuario del token, o None si no hay token válido.
+    
+    Para endpoints que no exigen autenticación pero registran quién hizo el
+    cambio (p. ej. en audit_log).
+    """
+    try:
+        payload = verify_token(await get_token_from_request(request))
+        return int(payload["sub"])
+    except (HTTPException, ValueError):
+        return None
+
+
+async def get_autor(request: Request) -> Autor:
+    """
+    Dependency con el usuario (o None) y la IP del cliente, para audit_log.
+    
+    La IP sale de X-Forwarded-For solo si RATE_LIMIT_CONFIAR_PROXY=true, igual
+    que en el control de admisión.
+    """
+    return Autor(usuario_id=await get_usuario_opcional(request), ip=identificar_cliente(request.scope))
+
+
 async def require_auth():
     """
     Dependency simple para verificar que el usuario esté autenticado.
@@ -197,9 +192,48 @@ async def require_auth():
 
 
 # ============================================================================
-# UTILIDADES PARA TOKENS JWT (A implementar por Módulo 1)
+# UTILIDADES PARA TOKENS JWT
 # ============================================================================
 
+def create_access_token(data: dict, expires_in: Optional[int] = None) -> str:
+    """
+    Crea un token JWT firmado (HS256) con los datos dados y su expiración.
+    
+    Args:
+        data: Claims del token; "sub" debe ser el id del usuario
+        expires_in: Segundos de validez (por defecto JWT_ACCESS_TOKEN_EXPIRES)
+    """
+    ahora = datetime.now(timezone.utc)
+    claims = dict(data)
+    claims["iat"] = ahora
+    claims["exp"] = ahora + timedelta(seconds=expires_in or Config.JWT_ACCESS_TOKEN_EXPIRES)
+    return jwt.encode(claims, Config.JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+
+
+def verify_token(token: str) -> dict:
+    """
+    Valida firma y expiración del token y retorna sus claims.
+    
+    Raises:
+        HTTPException 401: Si el token es inválido o expiró
+    """
+    try:
+        payload = jwt.decode(token, Config.JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if "sub" not in payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
+
 async def get_token_from_request(request: Request) -> str:
     """
     Extrae el token JWT del header Authorization.
@@ -213,7 +247,6 @@ async def get_token_from_request(request: Request) -> str:
     Raises:
         HTTPException 401: Si no hay token
     
-    TODO (Módulo 1): Implementar extracción de token
     """
     authorization = request.headers.get("Authorization")
     
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, Text, Index
+from app.config.database import Base
+from datetime import datetime
+
+
+class AuditLog(Base):
+    """Registro de auditoría de acciones de usuario (solo inserción)"""
+    __tablename__ = "audit_log"
+    __table_args__ = (
+        Index("ix_audit_log_entidad", "entity_type", "entity_id"),
+        Index("ix_audit_log_fecha", "fecha"),
+    )
+
+    id_audit = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    user_id = Column(Integer, nullable=True)
+    action = Column(String(50), nullable=False)
+    entity_type = Column(String(50), nullable=False)
+    entity_id = Column(Integer, nullable=True)
+    details = Column(Text, nullable=True)
+    ip_address = Column(String(45), nullable=True)
+    fecha = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, Text, Index
+from app.config.database import Base
+from datetime import datetime
+
+
+class EventoCambio(Base):
+    """Evento del feed de cambios para el fanout entre procesos (ver app/shared/services/change_feed.py)"""
+    __tablename__ = "eventos_cambio"
+    __table_args__ = (
+        Index("ix_eventos_cambio_fecha", "fecha"),
+    )
+
+    id_evento = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    payload = Column(Text, nullable=False)
+    fecha = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class RegistroEliminado(Base):
+    """Lápida de una fila eliminada, para sincronización incremental (ver app/shared/services/change_sequence.py)"""
+    __tablename__ = "registros_eliminados"
+    __table_args__ = (
+        Index("ix_registros_eliminados_entidad_seq", "entidad", "seq_cambio"),
+        Index("ix_registros_eliminados_fecha", "fecha"),
+    )
+
+    id_registro = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    entidad = Column(String(50), nullable=False)
+    clave = Column(String(100), nullable=False)
+    seq_cambio = Column(BigInteger().with_variant(Integer, "sqlite"), nullable=False)
+    fecha = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, Text, Enum, Index
+from app.config.database import Base
+from datetime import datetime
+
+
+class Job(Base):
+    """Trabajo en segundo plano persistido en BD (ver app/shared/services/job_queue.py)"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Reclamo de trabajos: pendientes vencidos por prioridad
+        Index("ix_jobs_estado_prioridad", "estado", "prioridad", "programado_para"),
+    )
+
+    id_job = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    tipo = Column(String(100), nullable=False)
+    payload = Column(Text, nullable=True)
+    estado = Column(Enum('pendiente', 'en_proceso', 'completado', 'error', 'cancelado'),
+                    nullable=False, default='pendiente')
+    prioridad = Column(Integer, nullable=False, default=0)
+    idempotency_key = Column(String(150), nullable=True, unique=True)
+    intentos = Column(Integer, nullable=False, default=0)
+    max_intentos = Column(Integer, nullable=False, default=3)
+    programado_para = Column(DateTime, nullable=False, default=datetime.utcnow)
+    reservado_hasta = Column(DateTime, nullable=True)
+    resultado = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    fecha_creacion = Column(DateTime, nullable=False, default=datetime.utcnow)
+    fecha_inicio = Column(DateTime, nullable=True)
+    fecha_fin = Column(DateTime, nullable=True)
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, Text, Enum, Index
+from app.config.database import Base
+from datetime import datetime
+
+
+class NotificacionOutbox(Base):
+    """
+    Outbox transaccional de notificaciones
+
+    Se inserta en la misma transacción que el cambio de negocio; el
+    despachador en segundo plano la vacía y registra el resultado.
+    """
+    __tablename__ = "notificaciones_outbox"
+    __table_args__ = (
+        Index("ix_outbox_estado_proximo", "estado", "proximo_intento"),
+    )
+
+    id_notificacion = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    canal = Column(Enum('email', 'sms'), nullable=False)
+    destinatario = Column(String(255), nullable=False)
+    asunto = Column(String(255), nullable=True)
+    cuerpo = Column(Text, nullable=False)
+    cuerpo_html = Column(Text, nullable=True)
+    # pendiente -> enviando -> enviado | pendiente (reintento) | fallido (dead-letter)
+    estado = Column(Enum('pendiente', 'enviando', 'enviado', 'fallido'), nullable=False, default='pendiente')
+    intentos = Column(Integer, nullable=False, default=0)
+    proximo_intento = Column(DateTime, nullable=False, default=datetime.utcnow)
+    ultimo_error = Column(Text, nullable=True)
+    fecha_creacion = Column(DateTime, nullable=False, default=datetime.utcnow)
+    fecha_envio = Column(DateTime, nullable=True)
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime
+from app.config.database import Base
+from datetime import datetime
+
+
+class VersionDatos(Base):
+    """Contador de versión por conjunto de datos (ver app/shared/services/data_version.py)"""
+    __tablename__ = "versiones_datos"
+
+    nombre = Column(String(100), primary_key=True)
+    version = Column(BigInteger().with_variant(Integer, "sqlite"), nullable=False, default=0)
+    fecha_actualizacion = Column(DateTime, nullable=False, default=datetime.utcnow)
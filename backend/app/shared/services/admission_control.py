@@ -0,0 +1,213 @@
+"""
+Limitación de tasa y control de admisión
+
+- Token bucket por cliente (IP) para todas las rutas y buckets adicionales
+  por cliente para rutas caras (RATE_LIMIT_RUTAS). Sin tokens se responde
+  429 de inmediato con el Retry-After exacto.
+- Límite global de peticiones simultáneas, del tamaño del pool de la BD: una
+  petición sin lugar espera como máximo ADMISSION_TIMEOUT segundos en una
+  cola corta y si no entra recibe 503. Bajo sobrecarga el servidor responde
+  rápido que no puede atender en lugar de encolar hasta que vence el timeout
+  del pool de conexiones.
+"""
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_RAFAGA = float(os.getenv("RATE_LIMIT_RAFAGA", 100))
+RATE_LIMIT_POR_SEGUNDO = float(os.getenv("RATE_LIMIT_POR_SEGUNDO", 20))
+# prefijo=ráfaga:por_segundo separados por ";"
+RATE_LIMIT_RUTAS = os.getenv("RATE_LIMIT_RUTAS", "/api/usuarios/auth/login=10:0.5")
+RATE_LIMIT_MAX_CLIENTES = int(os.getenv("RATE_LIMIT_MAX_CLIENTES", 10000))
+RATE_LIMIT_CONFIAR_PROXY = os.getenv("RATE_LIMIT_CONFIAR_PROXY", "false").lower() == "true"
+# 0 = tamaño del pool de la BD (pool_size + max_overflow)
+ADMISSION_MAX_CONCURRENCIA = int(os.getenv("ADMISSION_MAX_CONCURRENCIA", 0))
+ADMISSION_MAX_ESPERA = int(os.getenv("ADMISSION_MAX_ESPERA", 50))
+ADMISSION_TIMEOUT = float(os.getenv("ADMISSION_TIMEOUT", 0.5))
+# Rutas fuera del control (health checks, documentación, el panel de control y
+# el feed SSE, cuyas conexiones duran minutos y agotarían los cupos de concurrencia)
+ADMISSION_EXENTOS = os.getenv("ADMISSION_EXENTOS", "/api/health,/docs,/redoc,/openapi.json,/api/admin,/api/profesores/cambios")
+
+
+class TokenBucket:
+
+    __slots__ = ("capacidad", "tasa", "tokens", "ultimo")
+
+    def __init__(self, capacidad: float, tasa: float):
+        self.capacidad = capacidad
+        self.tasa = tasa
+        self.tokens = capacidad
+        self.ultimo = time.monotonic()
+
+    def consumir(self, ahora: float) -> float:
+        """Consume un token. Retorna 0 si lo había o los segundos hasta el próximo token."""
+        if ahora > self.ultimo:
+            self.tokens = min(self.capacidad, self.tokens + (ahora - self.ultimo) * self.tasa)
+            self.ultimo = ahora
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.tasa
+
+
+def parsear_reglas(texto: str) -> List[Tuple[str, float, float]]:
+    """"/api/x=10:0.5;/api/y=5:1" -> [("/api/x", 10, 0.5), ...] (prefijos más largos primero)"""
+    reglas = []
+    for regla in filter(None, (r.strip() for r in texto.split(";"))):
+        prefijo, limites = regla.split("=")
+        rafaga, tasa = limites.split(":")
+        reglas.append((prefijo.strip(), float(rafaga), float(tasa)))
+    return sorted(reglas, key=lambda r: len(r[0]), reverse=True)
+
+
+def tamano_pool_bd() -> int:
+    from app.config.database import engine
+    pool = engine.pool
+    if hasattr(pool, "size"):
+        return pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+    return 10
+
+
+class Rechazo(Exception):
+
+    def __init__(self, estado: int, detalle: str, reintentar_en: float):
+        self.estado = estado
+        self.detalle = detalle
+        self.reintentar_en = max(1, math.ceil(reintentar_en))
+
+
+class AdmissionController:
+
+    def __init__(self, activo: bool = RATE_LIMIT_ENABLED, rafaga: float = RATE_LIMIT_RAFAGA,
+                 tasa: float = RATE_LIMIT_POR_SEGUNDO, reglas: str = RATE_LIMIT_RUTAS,
+                 max_concurrencia: int = ADMISSION_MAX_CONCURRENCIA, max_espera: int = ADMISSION_MAX_ESPERA,
+                 timeout: float = ADMISSION_TIMEOUT, exentos: str = ADMISSION_EXENTOS,
+                 max_clientes: int = RATE_LIMIT_MAX_CLIENTES):
+        self.activo = activo
+        self.rafaga = rafaga
+        self.tasa = tasa
+        self.reglas = parsear_reglas(reglas)
+        self._max_concurrencia = max_concurrencia or None
+        self.max_espera = max_espera
+        self.timeout = timeout
+        self.exentos = tuple(p.strip() for p in exentos.split(",") if p.strip())
+        self._max_clientes = max_clientes
+        # (cliente, prefijo o "") -> bucket; LRU para acotar la memoria
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self._semaforos: Dict[int, asyncio.Semaphore] = {}
+        self.en_curso = 0
+        self.en_espera = 0
+        self._metricas = {"admitidos": 0, "limitados_429": 0, "rechazados_503": 0, "esperas": 0, "max_en_curso": 0}
+
+    @property
+    def max_concurrencia(self) -> int:
+        if self._max_concurrencia is None:
+            self._max_concurrencia = tamano_pool_bd()
+        return self._max_concurrencia
+
+    def exento(self, ruta: str) -> bool:
+        return not self.activo or ruta.startswith(self.exentos)
+
+    def verificar_tasa(self, cliente: str, ruta: str) -> None:
+        """Lanza Rechazo(429) si el cliente agotó su bucket general o el de la ruta"""
+        ahora = time.monotonic()
+        espera = self._bucket(cliente, "", self.rafaga, self.tasa).consumir(ahora)
+        for prefijo, rafaga, tasa in self.reglas:
+            if ruta.startswith(prefijo):
+                espera = max(espera, self._bucket(cliente, prefijo, rafaga, tasa).consumir(ahora))
+                break
+        if espera:
+            self._metricas["limitados_429"] += 1
+            raise Rechazo(429, "Demasiadas peticiones, intente nuevamente en unos segundos", espera)
+
+    async def admitir(self) -> None:
+        """Reserva un lugar de concurrencia o lanza Rechazo(503). Liberar con liberar()."""
+        semaforo = self._semaforo()
+        if semaforo.locked():
+            if self.en_espera >= self.max_espera:
+                self._metricas["rechazados_503"] += 1
+                raise Rechazo(503, "Servidor ocupado, intente nuevamente", 1)
+            self.en_espera += 1
+            self._metricas["esperas"] += 1
+            try:
+                await asyncio.wait_for(semaforo.acquire(), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                self._metricas["rechazados_503"] += 1
+                raise Rechazo(503, "Servidor ocupado, intente nuevamente", 1)
+            finally:
+                self.en_espera -= 1
+        else:
+            await semaforo.acquire()
+        self.en_curso += 1
+        self._metricas["admitidos"] += 1
+        self._metricas["max_en_curso"] = max(self._metricas["max_en_curso"], self.en_curso)
+
+    def liberar(self) -> None:
+        self.en_curso -= 1
+        self._semaforo().release()
+
+    def configurar(self, activo: Optional[bool] = None, rafaga: Optional[float] = None,
+                   tasa: Optional[float] = None, max_concurrencia: Optional[int] = None) -> None:
+        if activo is not None:
+            self.activo = activo
+        if rafaga is not None or tasa is not None:
+            self.rafaga = rafaga if rafaga is not None else self.rafaga
+            self.tasa = tasa if tasa is not None else self.tasa
+            self._buckets.clear()
+        if max_concurrencia is not None and max_concurrencia != self._max_concurrencia:
+            if self.en_curso or self.en_espera:
+                raise ValueError("No se puede cambiar la concurrencia con peticiones en curso")
+            self._max_concurrencia = max_concurrencia
+            self._semaforos.clear()
+
+    def estadisticas(self) -> Dict:
+        return {
+            "activo": self.activo,
+            "rafaga": self.rafaga,
+            "por_segundo": self.tasa,
+            "reglas": {prefijo: f"{rafaga:g}:{tasa:g}" for prefijo, rafaga, tasa in self.reglas},
+            "max_concurrencia": self.max_concurrencia,
+            "max_espera": self.max_espera,
+            "en_curso": self.en_curso,
+            "en_espera": self.en_espera,
+            "clientes": len(self._buckets),
+            **self._metricas
+        }
+
+    # ---- Internos ----
+
+    def _bucket(self, cliente: str, prefijo: str, rafaga: float, tasa: float) -> TokenBucket:
+        clave = (cliente, prefijo)
+        bucket = self._buckets.get(clave)
+        if bucket is None:
+            bucket = self._buckets[clave] = TokenBucket(rafaga, tasa)
+            if len(self._buckets) > self._max_clientes:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(clave)
+        return bucket
+
+    def _semaforo(self) -> asyncio.Semaphore:
+        # Un semáforo por event loop (los tests y benchmarks crean varios)
+        loop = id(asyncio.get_running_loop())
+        semaforo = self._semaforos.get(loop)
+        if semaforo is None:
+            semaforo = self._semaforos[loop] = asyncio.Semaphore(self.max_concurrencia)
+        return semaforo
+
+
+def identificar_cliente(scope) -> str:
+    if RATE_LIMIT_CONFIAR_PROXY:
+        for nombre, valor in scope.get("headers", []):
+            if nombre == b"x-forwarded-for":
+                return valor.decode("latin-1").split(",")[0].strip()
+    cliente = scope.get("client")
+    return cliente[0] if cliente else "desconocido"
+
+
+# Instancia compartida por proceso
+admission_controller = AdmissionController()
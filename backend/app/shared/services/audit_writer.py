@@ -0,0 +1,28 @@
+"""
+Escritor de auditoría en segundo plano
+
+Las peticiones solo encolan el registro en memoria (cola acotada, sin bloquear).
+Un hilo escritor vacía la cola por lotes con executemany cuando se junta
+AUDIT_BATCH_SIZE registros o pasan AUDIT_FLUSH_INTERVAL segundos, lo que
+ocurra primero. Si la cola está llena el registro se descarta y se cuenta.
+"""
+import os
+
+from app.shared.models.audit_models import AuditLog
+from app.shared.services.batch_writer import BatchWriter
+
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", 10000))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 200))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", 1.0))
+
+
+class AuditWriter(BatchWriter):
+
+    def __init__(self, engine=None, queue_size: int = AUDIT_QUEUE_SIZE,
+                 batch_size: int = AUDIT_BATCH_SIZE, flush_interval: float = AUDIT_FLUSH_INTERVAL):
+        super().__init__(AuditLog.__table__, "audit-writer", engine=engine, queue_size=queue_size,
+                         batch_size=batch_size, flush_interval=flush_interval)
+
+
+# Instancia compartida por proceso
+audit_writer = AuditWriter()
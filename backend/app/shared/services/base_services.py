@@ -1,159 +1,107 @@
 """
 Servicios compartidos del sistema BRISA
 """
-from datetime import datetime, timedelta
+import json
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Optional, List, Dict, Any
-from app.core.extensions import db
-from app.shared.exceptions.custom_exceptions import NotFound, DatabaseException
+from app.shared.exceptions.custom_exceptions import DatabaseException
+from sqlalchemy.orm import Session
+from app.shared.models.notification_models import NotificacionOutbox
+from app.shared.services.audit_writer import audit_writer
+from app.shared.services.notification_dispatcher import notification_dispatcher
 
-class BaseService:
-    """Servicio base con operaciones CRUD comunes"""
-    
-    model_class = None
-    
-    @classmethod
-    def get_all(cls, filters: Dict[str, Any] = None, page: int = 1, per_page: int = 10):
-        """Obtener todos los registros con paginación y filtros"""
-        try:
-            query = cls.model_class.query.filter_by(is_active=True)
-            
-            # Aplicar filtros
-            if filters:
-                for key, value in filters.items():
-                    if hasattr(cls.model_class, key) and value is not None:
-                        query = query.filter(getattr(cls.model_class, key) == value)
-            
-            # Paginar
-            pagination = query.paginate(
-                page=page,
-                per_page=per_page,
-                error_out=False
-            )
-            
-            return {
-                'items': [item.to_dict() for item in pagination.items],
-                'total': pagination.total,
-                'pages': pagination.pages,
-                'current_page': page,
-                'per_page': per_page,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
-            }
-        except Exception as e:
-            raise DatabaseException(f"Error retrieving records: {str(e)}")
-    
-    @classmethod
-    def get_by_id(cls, entity_id: int):
-        """Obtener registro por ID"""
-        try:
-            entity = cls.model_class.query.filter_by(
-                id=entity_id, 
-                is_active=True
-            ).first()
-            
-            if not entity:
-                raise NotFound(cls.model_class.__name__, entity_id)
-            
-            return entity
-        except NotFound:
-            raise
-        except Exception as e:
-            raise DatabaseException(f"Error retrieving record: {str(e)}")
-    
-    @classmethod
-    def create(cls, data: Dict[str, Any], user_id: Optional[int] = None):
-        """Crear nuevo registro"""
-        try:
-            # Añadir metadatos
-            if user_id:
-                data['created_by'] = user_id
-            
-            entity = cls.model_class(**data)
-            db.session.add(entity)
-            db.session.commit()
-            
-            return entity
-        except Exception as e:
-            db.session.rollback()
-            raise DatabaseException(f"Error creating record: {str(e)}")
-    
-    @classmethod
-    def update(cls, entity_id: int, data: Dict[str, Any], user_id: Optional[int] = None):
-        """Actualizar registro"""
-        try:
-            entity = cls.get_by_id(entity_id)
-            
-            # Actualizar campos
-            entity.update_from_dict(data)
-            
-            if user_id:
-                entity.updated_by = user_id
-            
-            entity.updated_at = datetime.utcnow()
-            
-            db.session.commit()
-            return entity
-            
-        except Exception as e:
-            db.session.rollback()
-            raise DatabaseException(f"Error updating record: {str(e)}")
-    
-    @classmethod
-    def delete(cls, entity_id: int, soft_delete: bool = True):
-        """Eliminar registro (lógica o física)"""
-        try:
-            entity = cls.get_by_id(entity_id)
-            
-            if soft_delete:
-                entity.soft_delete()
-                db.session.commit()
-            else:
-                db.session.delete(entity)
-                db.session.commit()
-            
-            return True
-            
-        except Exception as e:
-            db.session.rollback()
-            raise DatabaseException(f"Error deleting record: {str(e)}")
+@dataclass(frozen=True)
+class Autor:
+    """Quién hizo un cambio: usuario del token (None sin token válido) e IP de la petición"""
+    usuario_id: Optional[int] = None
+    ip: Optional[str] = None
 
 class AuditService:
     """Servicio para auditoría y logs"""
     
     @staticmethod
-    def log_user_action(user_id: int, action: str, entity_type: str, 
-                       entity_id: Optional[int] = None, details: Optional[Dict] = None):
-        """Registrar acción del usuario"""
-        # TODO: Implementar logging en base de datos o archivo
+    def log_user_action(user_id: Optional[int], action: str, entity_type: str, 
+                       entity_id: Optional[int] = None, details: Optional[Dict] = None,
+                       ip_address: Optional[str] = None) -> bool:
+        """
+        Registrar acción del usuario
+        
+        Solo encola el registro: la escritura en la tabla audit_log la hace el
+        hilo de audit_writer por lotes, fuera del camino de la petición.
+        user_id es None cuando la petición no traía un token válido.
+        Retorna False si el registro se descartó porque la cola estaba llena.
+        """
         log_entry = {
             'user_id': user_id,
             'action': action,
             'entity_type': entity_type,
             'entity_id': entity_id,
-            'details': details,
-            'timestamp': datetime.utcnow().isoformat(),
-            'ip_address': None  # TODO: obtener de request
+            'details': json.dumps(details, default=str, ensure_ascii=False) if details is not None else None,
+            'ip_address': ip_address,
+            'fecha': datetime.utcnow()
         }
-        
-        # Por ahora solo imprimir, luego guardar en BD
-        print(f"AUDIT LOG: {log_entry}")
+        return audit_writer.registrar(log_entry)
+
+    @staticmethod
+    def registrar(autor: Optional[Autor], action: str, entity_type: str,
+                  entity_id: Optional[int] = None, details: Optional[Dict] = None) -> bool:
+        """log_user_action con el usuario y la IP que vienen en `autor` (ver get_autor)"""
+        autor = autor or Autor()
+        return AuditService.log_user_action(autor.usuario_id, action, entity_type, entity_id, details, autor.ip)
+
+    @staticmethod
+    def get_stats() -> Dict:
+        """Contadores del escritor de auditoría (encolados, escritos, descartados, ...)"""
+        return audit_writer.estadisticas()
 
 class NotificationService:
-    """Servicio para notificaciones"""
+    """
+    Servicio para notificaciones
+    
+    Los envíos se escriben en el outbox (notificaciones_outbox). Si se pasa la
+    sesión `db` del caso de uso, la notificación queda en la misma transacción
+    que el cambio de negocio y solo se envía si ese commit se confirma.
+    El envío real lo hace notification_dispatcher en segundo plano.
+    """
+    
+    @staticmethod
+    def send_email(to: str, subject: str, body: str, html_body: Optional[str] = None,
+                   db: Optional[Session] = None):
+        """Encolar notificación por email"""
+        return NotificationService._encolar(db, canal='email', destinatario=to,
+                                            asunto=subject, cuerpo=body, cuerpo_html=html_body)
+    
+    @staticmethod
+    def send_sms(to: str, message: str, db: Optional[Session] = None):
+        """Encolar notificación por SMS"""
+        return NotificationService._encolar(db, canal='sms', destinatario=to, cuerpo=message)
     
     @staticmethod
-    def send_email(to: str, subject: str, body: str, html_body: Optional[str] = None):
-        """Enviar notificación por email"""
-        # TODO: Implementar envío real de emails
-        print(f"EMAIL TO: {to}, SUBJECT: {subject}")
-        return True
+    def get_stats() -> Dict:
+        """Métricas del despachador (enviados, reintentos, fallidos, throughput)"""
+        return notification_dispatcher.estadisticas()
     
     @staticmethod
-    def send_sms(to: str, message: str):
-        """Enviar notificación por SMS"""
-        # TODO: Implementar envío real de SMS
-        print(f"SMS TO: {to}, MESSAGE: {message}")
-        return True
+    def _encolar(db: Optional[Session], **datos) -> bool:
+        notificacion = NotificacionOutbox(estado='pendiente', intentos=0,
+                                          proximo_intento=datetime.utcnow(), **datos)
+        if db is not None:
+            # El commit lo hace el caso de uso junto con su propio cambio
+            db.add(notificacion)
+            return True
+        
+        from app.config.database import SessionLocal
+        sesion = SessionLocal()
+        try:
+            sesion.add(notificacion)
+            sesion.commit()
+            return True
+        except Exception as e:
+            sesion.rollback()
+            raise DatabaseException(f"Error queuing notification: {str(e)}")
+        finally:
+            sesion.close()
 
 class ReportService:
     """Servicio para generación de reportes"""
@@ -0,0 +1,197 @@
+"""
+Escritor por lotes en segundo plano
+
+Las peticiones solo encolan la fila en memoria (cola acotada, sin bloquear).
+Un hilo escritor vacía la cola con executemany cuando se juntan batch_size
+filas o pasan flush_interval segundos, lo que ocurra primero.
+
+Si la BD no responde (OperationalError, DisconnectionError), el lote se
+descarta y se cuenta (reintentar=False) o se conserva y se reintenta hasta que
+la BD vuelva (reintentar=True), en cuyo caso la cola hace de buffer mientras
+tanto. Si lo que falla son los datos (IntegrityError, DataError), reintentar
+no sirve: el lote se reescribe fila por fila y las filas que fallan pasan a
+la lista de rechazadas (las últimas _MAX_RECHAZADAS, con su error) en lugar
+de bloquear al resto.
+"""
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import Table, insert
+from sqlalchemy.exc import DataError, DisconnectionError, IntegrityError, OperationalError
+
+_ESPERA_MAXIMA_REINTENTO = 30.0
+_MAX_RECHAZADAS = 100
+
+
+class BatchWriter:
+
+    def __init__(self, tabla: Table, nombre: str, engine=None, queue_size: int = 10000,
+                 batch_size: int = 200, flush_interval: float = 1.0, reintentar: bool = False):
+        self._tabla = tabla
+        self._nombre = nombre
+        self._engine = engine
+        self._cola: "queue.Queue[dict]" = queue.Queue(maxsize=queue_size)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._reintentar = reintentar
+        self._hilo: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+        self._lock = threading.Lock()
+        self._rechazadas: deque = deque(maxlen=_MAX_RECHAZADAS)
+        self._contadores = {
+            "encolados": 0,
+            "escritos": 0,
+            "descartados": 0,
+            "rechazados": 0,
+            "lotes": 0,
+            "errores": 0
+        }
+
+    # ---- API pública ----
+
+    def registrar(self, entrada: Dict) -> bool:
+        """Encola una fila sin bloquear. Retorna False si se descartó por cola llena."""
+        self._asegurar_iniciado()
+        try:
+            self._cola.put_nowait(entrada)
+        except queue.Full:
+            self._incrementar("descartados")
+            return False
+        self._incrementar("encolados")
+        return True
+
+    def iniciar(self) -> None:
+        with self._lock:
+            if self._hilo and self._hilo.is_alive():
+                return
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._ejecutar, name=self._nombre, daemon=True)
+            self._hilo.start()
+
+    def detener(self, timeout: float = 10.0) -> None:
+        """Detiene el hilo escritor después de vaciar lo pendiente (apagado ordenado)"""
+        with self._lock:
+            hilo = self._hilo
+            self._hilo = None
+        if not hilo:
+            return
+        self._detener.set()
+        hilo.join(timeout)
+
+    def rechazadas(self) -> List[Dict]:
+        """Filas que la BD no aceptó (más recientes primero) con el error de cada una"""
+        with self._lock:
+            return list(reversed(self._rechazadas))
+
+    def estadisticas(self) -> Dict:
+        with self._lock:
+            datos = dict(self._contadores)
+        datos["pendientes"] = self._cola.qsize()
+        datos["capacidad"] = self._cola.maxsize
+        datos["activo"] = bool(self._hilo and self._hilo.is_alive())
+        return datos
+
+    # ---- Internos ----
+
+    def _asegurar_iniciado(self) -> None:
+        if self._hilo is None:
+            self.iniciar()
+
+    def _incrementar(self, contador: str, cantidad: int = 1) -> None:
+        with self._lock:
+            self._contadores[contador] += cantidad
+
+    def _ejecutar(self) -> None:
+        espera = self._flush_interval
+        lote: List[Dict] = []
+        while not self._detener.is_set():
+            lote = lote or self._tomar_lote()
+            if not lote:
+                continue
+            if self._escribir(lote):
+                lote, espera = [], self._flush_interval
+            else:
+                # Se conserva el lote (y el orden) hasta que la BD vuelva
+                self._detener.wait(espera)
+                espera = min(espera * 2, _ESPERA_MAXIMA_REINTENTO)
+
+        # Apagado: vaciar todo lo que quede en la cola (un intento por lote)
+        if lote:
+            self._escribir(lote)
+        while True:
+            lote = self._tomar_lote(esperar=False)
+            if not lote:
+                break
+            self._escribir(lote)
+
+    def _tomar_lote(self, esperar: bool = True) -> List[Dict]:
+        """Junta hasta batch_size filas o lo que llegue dentro de flush_interval"""
+        lote: List[Dict] = []
+        limite = time.monotonic() + self._flush_interval
+        while len(lote) < self._batch_size:
+            if esperar and not self._detener.is_set():
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    # Esperas cortas para reaccionar rápido a detener()
+                    lote.append(self._cola.get(timeout=min(restante, 0.1)))
+                except queue.Empty:
+                    continue
+            else:
+                try:
+                    lote.append(self._cola.get_nowait())
+                except queue.Empty:
+                    break
+        return lote
+
+    def _escribir(self, lote: List[Dict]) -> bool:
+        """Retorna False solo si el lote sigue pendiente (BD caída y reintentar=True)"""
+        engine = self._engine
+        if engine is None:
+            from app.config.database import engine
+        try:
+            with engine.begin() as conn:
+                conn.execute(insert(self._tabla), lote)
+        except (IntegrityError, DataError) as e:
+            self._incrementar("errores")
+            print(f"[ERROR] Lote de {self._tabla.name} rechazado ({len(lote)} registros), "
+                  f"se escribe fila por fila: {e.orig}")
+            self._escribir_filas(engine, lote)
+            return True
+        except (OperationalError, DisconnectionError) as e:
+            self._incrementar("errores")
+            if not self._reintentar:
+                self._incrementar("descartados", len(lote))
+            print(f"[ERROR] No se pudo escribir el lote de {self._tabla.name} ({len(lote)} registros): {e}")
+            return not self._reintentar
+        except Exception as e:
+            # Error que un reintento no corrige (tabla inexistente, SQL inválido...)
+            self._incrementar("errores")
+            self._incrementar("descartados", len(lote))
+            print(f"[ERROR] Lote de {self._tabla.name} descartado ({len(lote)} registros): {e}")
+            return True
+        self._incrementar("escritos", len(lote))
+        self._incrementar("lotes")
+        return True
+
+    def _escribir_filas(self, engine, lote: List[Dict]) -> None:
+        """Escribe cada fila en su transacción; las que fallan van a rechazadas"""
+        escritas = 0
+        for fila in lote:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(self._tabla), [fila])
+                escritas += 1
+            except Exception as e:
+                error = str(getattr(e, "orig", None) or e)
+                print(f"[ERROR] Fila de {self._tabla.name} rechazada: {error}")
+                with self._lock:
+                    self._contadores["rechazados"] += 1
+                    self._rechazadas.append({"fila": fila, "error": error, "fecha": datetime.utcnow()})
+        self._incrementar("escritos", escritas)
+        self._incrementar("lotes")
@@ -0,0 +1,49 @@
+"""
+Registro de cachés en memoria del proceso
+
+Cada caché se registra al importarse con una función de estadísticas y otra
+para vaciarla; el panel de administración las consulta y vacía por nombre.
+"""
+import threading
+from typing import Any, Callable, Dict, List
+
+
+class CacheRegistry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._caches: Dict[str, dict] = {}
+
+    def registrar(self, nombre: str, estadisticas: Callable[[], Dict[str, Any]],
+                  vaciar: Callable[[], None], descripcion: str = "") -> None:
+        with self._lock:
+            self._caches[nombre] = {"estadisticas": estadisticas, "vaciar": vaciar, "descripcion": descripcion}
+
+    def nombres(self) -> List[str]:
+        with self._lock:
+            return sorted(self._caches)
+
+    def estadisticas(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            caches = dict(self._caches)
+        resultado = {}
+        for nombre, cache in sorted(caches.items()):
+            try:
+                datos = cache["estadisticas"]()
+            except Exception as e:
+                datos = {"error": str(e)}
+            resultado[nombre] = {"descripcion": cache["descripcion"], **datos}
+        return resultado
+
+    def vaciar(self, nombre: str) -> bool:
+        """Vacía una caché por nombre. Retorna False si no está registrada."""
+        with self._lock:
+            cache = self._caches.get(nombre)
+        if cache is None:
+            return False
+        cache["vaciar"]()
+        return True
+
+
+# Instancia compartida por proceso
+cache_registry = CacheRegistry()
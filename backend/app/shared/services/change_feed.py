@@ -0,0 +1,413 @@
+"""
+Feed de cambios por entidad para clientes conectados por SSE
+
+Los servicios de escritura publican eventos ("bloque" creado, "asignacion"
+eliminada, ...) después de confirmar sus cambios; el feed los reparte a cada
+suscriptor conectado a GET /api/profesores/cambios, que aplica el delta en
+lugar de volver a pedir listas completas.
+
+El reparto entre procesos es intercambiable (CHANGE_FEED_FANOUT):
+- "local": un solo proceso; los eventos se entregan al instante con IDs de
+  un contador en memoria
+- "bd": los eventos se insertan en la tabla eventos_cambio y cada proceso la
+  consulta cada CHANGE_FEED_POLL_INTERVAL segundos; el ID de la tabla es el
+  ID del evento en todos los workers. El auto-increment se asigna al insertar
+  y no al confirmar, así que un ID puede aparecer después de otros mayores:
+  los IDs saltados se vuelven a buscar durante _SOLAPAMIENTO (a los clientes
+  conectados les llegan fuera de orden; un Last-Event-ID posterior no los
+  reenvía)
+
+Otros transportes (Redis pub/sub, NOTIFY de PostgreSQL) se conectan con
+change_feed.configurar_fanout() implementando publicar/iniciar/detener.
+
+Cada suscriptor tiene una cola acotada: si no la consume a tiempo se le
+envía "resync" y se cierra su conexión, para que vuelva a cargar sus listas.
+Last-Event-ID reenvía los eventos que siguen en el buffer de reenvío.
+
+Las entidades registradas con escuchar() son internas: cada proceso las
+aplica con su oyente al recibirlas y no llegan a los suscriptores SSE (así se
+difunden, por ejemplo, los cambios del panel de control a todos los workers).
+"""
+import asyncio
+import itertools
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func
+
+from app.shared.models.change_models import EventoCambio
+
+CHANGE_FEED_FANOUT = os.getenv("CHANGE_FEED_FANOUT", "local")
+CHANGE_FEED_POLL_INTERVAL = float(os.getenv("CHANGE_FEED_POLL_INTERVAL", 0.5))
+CHANGE_FEED_BUFFER = int(os.getenv("CHANGE_FEED_BUFFER", 1000))
+CHANGE_FEED_COLA = int(os.getenv("CHANGE_FEED_COLA", 256))
+CHANGE_FEED_MAX_SUSCRIPTORES = int(os.getenv("CHANGE_FEED_MAX_SUSCRIPTORES", 500))
+CHANGE_FEED_HEARTBEAT = float(os.getenv("CHANGE_FEED_HEARTBEAT", 15))
+CHANGE_FEED_RETENCION_MIN = int(os.getenv("CHANGE_FEED_RETENCION_MIN", 10))
+
+# Cuánto se sigue buscando un ID saltado antes de darlo por descartado (rollback)
+_SOLAPAMIENTO = timedelta(seconds=5)
+_MAX_HUECOS = 1000
+
+# Marcas internas en las colas de suscriptores
+_RESYNC = object()
+_CERRAR = object()
+
+Entregar = Callable[[List[Dict[str, Any]]], None]
+
+
+# ============ FANOUT ============
+class FanoutLocal:
+    """Reparto dentro del proceso: válido solo con un worker"""
+
+    nombre = "local"
+
+    def __init__(self):
+        self._secuencia = itertools.count(1)
+        self._lock = threading.Lock()
+        self._entregar: Optional[Entregar] = None
+
+    def publicar(self, evento: Dict[str, Any], entregar: Entregar) -> None:
+        with self._lock:
+            evento["id"] = next(self._secuencia)
+            entregar([evento])
+
+    async def iniciar(self, entregar: Entregar) -> int:
+        """Retorna el último ID ya emitido"""
+        return 0
+
+    async def detener(self) -> None:
+        pass
+
+
+class FanoutBD:
+    """Reparto entre procesos a través de la tabla eventos_cambio"""
+
+    nombre = "bd"
+
+    def __init__(self, session_factory=None, poll_interval: float = CHANGE_FEED_POLL_INTERVAL,
+                 retencion_min: int = CHANGE_FEED_RETENCION_MIN, lote: int = 500):
+        self._session_factory = session_factory
+        self._poll_interval = poll_interval
+        self._retencion = timedelta(minutes=retencion_min)
+        self._lote = lote
+        self._ultimo_id = 0
+        # id_evento saltado -> cuándo se detectó
+        self._huecos: Dict[int, datetime] = {}
+        self._tarea: Optional[asyncio.Task] = None
+        self._errores = 0
+
+    def publicar(self, evento: Dict[str, Any], entregar: Entregar) -> None:
+        # El evento llega a este proceso por la misma consulta que a los demás
+        db = self._sesion()
+        try:
+            db.add(EventoCambio(payload=json.dumps(evento, ensure_ascii=False)))
+            db.commit()
+        finally:
+            db.close()
+
+    async def iniciar(self, entregar: Entregar) -> int:
+        if self._tarea is None:
+            self._ultimo_id = await asyncio.to_thread(self._ultimo_id_bd)
+            self._tarea = asyncio.create_task(self._bucle(entregar), name="change-feed-fanout")
+        return self._ultimo_id
+
+    async def detener(self) -> None:
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+
+    def leer_nuevos(self) -> List[Dict[str, Any]]:
+        """Eventos con ID mayor al último leído por este proceso y los de IDs saltados que ya confirmaron"""
+        ahora = datetime.utcnow()
+        self._huecos = {id_evento: visto for id_evento, visto in self._huecos.items()
+                        if ahora - visto < _SOLAPAMIENTO}
+        db = self._sesion()
+        try:
+            filas = (
+                db.query(EventoCambio.id_evento, EventoCambio.payload)
+                .filter(EventoCambio.id_evento > self._ultimo_id)
+                .order_by(EventoCambio.id_evento)
+                .limit(self._lote)
+                .all()
+            )
+            tardias = (
+                db.query(EventoCambio.id_evento, EventoCambio.payload)
+                .filter(EventoCambio.id_evento.in_(list(self._huecos)))
+                .all()
+            ) if self._huecos else []
+        finally:
+            db.close()
+
+        for id_evento, _ in tardias:
+            del self._huecos[id_evento]
+        anterior = self._ultimo_id
+        for id_evento, _ in filas:
+            for saltado in range(max(anterior + 1, id_evento - _MAX_HUECOS), id_evento):
+                self._huecos[saltado] = ahora
+            anterior = id_evento
+        if len(self._huecos) > _MAX_HUECOS:
+            self._huecos = dict(sorted(self._huecos.items())[-_MAX_HUECOS:])
+        if filas:
+            self._ultimo_id = filas[-1][0]
+
+        eventos = []
+        for id_evento, payload in sorted(tardias + filas):
+            evento = json.loads(payload)
+            evento["id"] = id_evento
+            eventos.append(evento)
+        return eventos
+
+    def purgar(self) -> int:
+        db = self._sesion()
+        try:
+            borrados = (
+                db.query(EventoCambio)
+                .filter(EventoCambio.fecha < datetime.utcnow() - self._retencion)
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+            return borrados
+        finally:
+            db.close()
+
+    async def _bucle(self, entregar: Entregar) -> None:
+        vueltas = 0
+        while True:
+            try:
+                eventos = await asyncio.to_thread(self.leer_nuevos)
+                if eventos:
+                    entregar(eventos)
+                vueltas += 1
+                if vueltas % 600 == 0:
+                    await asyncio.to_thread(self.purgar)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._errores += 1
+                print(f"[ERROR] Fanout del feed de cambios: {e}")
+                eventos = []
+            # Con un lote completo probablemente hay más pendientes: seguir sin esperar
+            if len(eventos) < self._lote:
+                await asyncio.sleep(self._poll_interval)
+
+    def _ultimo_id_bd(self) -> int:
+        db = self._sesion()
+        try:
+            return db.query(func.max(EventoCambio.id_evento)).scalar() or 0
+        finally:
+            db.close()
+
+    def _sesion(self):
+        if self._session_factory is None:
+            from app.config.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+
+def crear_fanout(nombre: str = CHANGE_FEED_FANOUT):
+    if nombre == "local":
+        return FanoutLocal()
+    if nombre == "bd":
+        return FanoutBD()
+    raise ValueError(f"CHANGE_FEED_FANOUT inválido: '{nombre}'. Use 'local' o 'bd'")
+
+
+# ============ FEED DE CAMBIOS ============
+class ChangeFeed:
+
+    def __init__(self, fanout=None, capacidad_buffer: int = CHANGE_FEED_BUFFER,
+                 tamano_cola: int = CHANGE_FEED_COLA, max_suscriptores: int = CHANGE_FEED_MAX_SUSCRIPTORES,
+                 heartbeat: float = CHANGE_FEED_HEARTBEAT):
+        self._fanout = fanout or crear_fanout()
+        self._tamano_cola = tamano_cola
+        self._max_suscriptores = max_suscriptores
+        self._heartbeat = heartbeat
+        self._lock = threading.Lock()
+        self._buffer: deque = deque(maxlen=capacidad_buffer)
+        self._ultimo_id = 0
+        self._suscriptores: Set[asyncio.Queue] = set()
+        self._oyentes: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._metricas = {"publicados": 0, "entregados": 0, "resync": 0, "errores_publicacion": 0}
+
+    # ---- Ciclo de vida ----
+
+    def configurar_fanout(self, fanout) -> None:
+        """Reemplaza el transporte entre procesos (llamar antes de iniciar())"""
+        self._fanout = fanout
+
+    def escuchar(self, entidad: str, oyente: Callable[[Dict[str, Any]], None]) -> None:
+        """Aplica en este proceso los eventos internos de la entidad (no se envían por SSE)"""
+        self._oyentes[entidad] = oyente
+
+    async def iniciar(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        ultimo_id = await self._fanout.iniciar(self._entregar)
+        with self._lock:
+            self._ultimo_id = max(self._ultimo_id, ultimo_id)
+
+    async def detener(self) -> None:
+        await self._fanout.detener()
+        for cola in list(self._suscriptores):
+            self._vaciar_y_marcar(cola, _CERRAR)
+        self._suscriptores.clear()
+
+    # ---- Publicación ----
+
+    def publicar(self, entidad: str, accion: str, clave: Dict[str, Any], datos: Any = None) -> None:
+        """
+        Publica un cambio; llamar después del commit. Nunca hace fallar la escritura.
+
+        accion: "creado", "actualizado", "eliminado" o "recargar" (cambio masivo:
+        el cliente debe volver a cargar las listas de esa entidad).
+        """
+        evento = {
+            "entidad": entidad,
+            "accion": accion,
+            "clave": clave,
+            "datos": jsonable_encoder(datos) if datos is not None else None,
+            "fecha": datetime.utcnow().isoformat()
+        }
+        try:
+            self._fanout.publicar(evento, self._entregar)
+            self._metricas["publicados"] += 1
+        except Exception as e:
+            self._metricas["errores_publicacion"] += 1
+            print(f"[ERROR] No se pudo publicar el cambio {entidad}/{accion}: {e}")
+
+    def _entregar(self, eventos: List[Dict[str, Any]]) -> None:
+        """Puede llamarse desde cualquier hilo; las colas solo se tocan desde el loop"""
+        ultimo_id = eventos[-1]["id"]
+        if self._oyentes:
+            for evento in eventos:
+                oyente = self._oyentes.get(evento["entidad"])
+                if oyente is None:
+                    continue
+                try:
+                    oyente(evento)
+                except Exception as e:
+                    print(f"[ERROR] No se pudo aplicar el evento interno {evento['entidad']}/{evento['accion']}: {e}")
+            eventos = [e for e in eventos if e["entidad"] not in self._oyentes]
+        with self._lock:
+            self._buffer.extend(eventos)
+            self._ultimo_id = max(self._ultimo_id, ultimo_id)
+        if not eventos:
+            return
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            en_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            en_loop = False
+        if en_loop:
+            self._repartir(eventos)
+        else:
+            loop.call_soon_threadsafe(self._repartir, eventos)
+
+    def _repartir(self, eventos: List[Dict[str, Any]]) -> None:
+        for cola in list(self._suscriptores):
+            if cola.qsize() + len(eventos) > self._tamano_cola:
+                # Cliente lento: se descarta su cola y se le pide recargar
+                self._suscriptores.discard(cola)
+                self._vaciar_y_marcar(cola, _RESYNC)
+                self._metricas["resync"] += 1
+                continue
+            for evento in eventos:
+                cola.put_nowait(evento)
+            self._metricas["entregados"] += len(eventos)
+
+    @staticmethod
+    def _vaciar_y_marcar(cola: asyncio.Queue, marca) -> None:
+        while not cola.empty():
+            cola.get_nowait()
+        cola.put_nowait(marca)
+
+    # ---- Suscripción ----
+
+    def suscribir(self, ultimo_id: Optional[int] = None) -> Tuple[asyncio.Queue, Optional[List[Dict[str, Any]]]]:
+        """
+        Registra un suscriptor (desde el loop). Retorna su cola y los eventos a
+        reenviar desde ultimo_id, o None si ya no están en el buffer (resync).
+        """
+        if len(self._suscriptores) >= self._max_suscriptores:
+            raise HTTPException(status_code=503, detail="Demasiadas conexiones al feed de cambios",
+                                headers={"Retry-After": "5"})
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+
+        with self._lock:
+            if ultimo_id is None or ultimo_id == self._ultimo_id:
+                pendientes = []
+            elif self._buffer and self._buffer[0]["id"] <= ultimo_id + 1 and ultimo_id < self._ultimo_id:
+                pendientes = [e for e in self._buffer if e["id"] > ultimo_id]
+            else:
+                pendientes = None
+        cola: asyncio.Queue = asyncio.Queue()
+        self._suscriptores.add(cola)
+        return cola, pendientes
+
+    def desuscribir(self, cola: asyncio.Queue) -> None:
+        self._suscriptores.discard(cola)
+
+    async def eventos_sse(self, ultimo_id: Optional[int] = None, entidades: Optional[Set[str]] = None,
+                          desconectado: Optional[Callable] = None) -> AsyncIterator[str]:
+        """Flujo text/event-stream para un suscriptor; termina si el cliente se desconecta"""
+        cola, pendientes = self.suscribir(ultimo_id)
+        try:
+            yield "retry: 3000\n\n"
+            if pendientes is None:
+                yield self._formatear_resync()
+                return
+            for evento in pendientes:
+                if not entidades or evento["entidad"] in entidades:
+                    yield self._formatear(evento)
+            while True:
+                try:
+                    evento = await asyncio.wait_for(cola.get(), timeout=self._heartbeat)
+                except asyncio.TimeoutError:
+                    if desconectado is not None and await desconectado():
+                        return
+                    yield ": ping\n\n"
+                    continue
+                if evento is _CERRAR:
+                    return
+                if evento is _RESYNC:
+                    yield self._formatear_resync()
+                    return
+                if not entidades or evento["entidad"] in entidades:
+                    yield self._formatear(evento)
+        finally:
+            self.desuscribir(cola)
+
+    @staticmethod
+    def _formatear(evento: Dict[str, Any]) -> str:
+        return f"id: {evento['id']}\nevent: cambio\ndata: {json.dumps(evento, ensure_ascii=False)}\n\n"
+
+    def _formatear_resync(self) -> str:
+        # El ID actual permite reanudar desde aquí después de recargar las listas
+        return f"id: {self._ultimo_id}\nevent: resync\ndata: {{}}\n\n"
+
+    def estadisticas(self) -> Dict:
+        with self._lock:
+            datos = dict(self._metricas)
+            datos["buffer"] = len(self._buffer)
+            datos["ultimo_id"] = self._ultimo_id
+        datos["fanout"] = getattr(self._fanout, "nombre", type(self._fanout).__name__)
+        datos["suscriptores"] = len(self._suscriptores)
+        return datos
+
+
+# Instancia compartida por proceso
+change_feed = ChangeFeed()
@@ -0,0 +1,202 @@
+"""
+Secuencia de cambios y lápidas para sincronización incremental (?since=)
+
+Cada tabla rastreada tiene una columna seq_cambio. Al insertar o actualizar
+una fila por el ORM se le asigna el siguiente número de la secuencia de su
+entidad ("cambios.<secuencia>", una fila en versiones_datos incrementada
+dentro de la misma transacción); al eliminarla se inserta una lápida en
+registros_eliminados con su clave y el mismo número. Todas las filas de una
+secuencia en un flush comparten número.
+
+Hay una secuencia por listado sincronizable (personas y profesores comparten
+"profesores"), no una global: en MySQL el UPDATE bloquea la fila de la
+secuencia hasta el commit, así que solo se serializan las escrituras de la
+misma entidad. Ese bloqueo es el que garantiza que los números se confirmen en
+orden (un lector nunca ve N+1 antes que N). Obtener el número es una sola
+sentencia (UPDATE ... RETURNING o LAST_INSERT_ID, ver DataVersion.siguiente).
+
+Un cliente guarda el "hasta" de su última respuesta y en la siguiente pide
+solo lo posterior: filas con seq_cambio > desde y lápidas con seq_cambio > desde.
+
+Las sentencias set-based (importación, rollover, archivo) no pasan por los
+eventos del ORM: obtienen su número con siguiente_secuencia(db, entidad) y lo
+escriben ellas mismas (ver GestionRepository y ArchivoRepository).
+
+Las lápidas se purgan después de DELTA_TOMBSTONES_DIAS; un cliente con un
+"desde" anterior a lo purgado recibe la lista completa (completo=true).
+
+Una BD creada antes de la sincronización incremental necesita las columnas,
+las tablas y el backfill de docs/migraciones/seq_cambio_mysql.sql.
+"""
+import os
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import String, cast, event, func, insert, literal, select
+from sqlalchemy.orm import Session, object_session
+
+from app.shared.models.change_models import RegistroEliminado
+from app.shared.services.data_version import DataVersion
+from app.shared.services.job_queue import job_queue
+
+DELTA_TOMBSTONES_DIAS = int(os.getenv("DELTA_TOMBSTONES_DIAS", 30))
+
+_SEQ_FLUSH = "_seq_cambio"
+
+# entidad -> columnas de la clave primaria (en el orden en que se guardan en la lápida)
+_CLAVES: Dict[str, Tuple[str, ...]] = {}
+# entidad -> secuencia que numera sus cambios
+_SECUENCIAS: Dict[str, str] = {}
+
+
+def nombre_secuencia(entidad: str) -> str:
+    """Fila de versiones_datos con el último número de la secuencia de `entidad`"""
+    return f"cambios.{_SECUENCIAS[entidad]}"
+
+
+def nombre_purgado(entidad: str) -> str:
+    """Mayor seq_cambio de las lápidas purgadas de la secuencia: un "desde" menor ya no es confiable"""
+    return f"{nombre_secuencia(entidad)}.purgado"
+
+
+def siguiente_secuencia(db: Session, entidad: str) -> int:
+    """Número para una escritura set-based de `entidad` en la transacción de `db` (no hace commit)"""
+    return DataVersion.siguiente(db.connection(), nombre_secuencia(entidad))
+
+
+def _clave_sql(*columnas):
+    """Expresión SQL 'v1:v2:...' con el mismo formato que las lápidas del ORM"""
+    expresion = cast(columnas[0], String)
+    for columna in columnas[1:]:
+        expresion = expresion + literal(":") + cast(columna, String)
+    return expresion
+
+
+def registrar_eliminados(db: Session, entidad: str, tabla, condicion, seq: int) -> None:
+    """INSERT ... SELECT de lápidas para las filas de `tabla` que cumplen `condicion` (antes del DELETE)"""
+    columnas = [tabla.c[c] for c in _CLAVES[entidad]]
+    db.execute(
+        insert(RegistroEliminado.__table__).from_select(
+            ["entidad", "clave", "seq_cambio", "fecha"],
+            select(literal(entidad), _clave_sql(*columnas), literal(seq), literal(datetime.utcnow())).where(condicion)
+        )
+    )
+
+
+# ============ EVENTOS DEL ORM ============
+def rastrear(modelo, entidad: str, columnas_clave: Sequence[str], secuencia: Optional[str] = None) -> None:
+    """
+    Activa seq_cambio y lápidas para un modelo (el modelo debe tener la columna seq_cambio)
+
+    `secuencia` (por defecto la entidad) agrupa modelos que se sincronizan en
+    un mismo listado y, por lo tanto, se comparan con el mismo "desde".
+    """
+    _CLAVES[entidad] = tuple(columnas_clave)
+    _SECUENCIAS[entidad] = secuencia or entidad
+
+    def marcar_insercion(mapper, conexion, objetivo):
+        objetivo.seq_cambio = _secuencia_del_flush(objetivo, conexion, entidad)
+
+    def marcar_actualizacion(mapper, conexion, objetivo):
+        sesion = object_session(objetivo)
+        # before_update también se dispara para objetos "sucios" sin cambios reales
+        if sesion is not None and sesion.is_modified(objetivo, include_collections=False):
+            objetivo.seq_cambio = _secuencia_del_flush(objetivo, conexion, entidad)
+
+    def registrar_eliminado(mapper, conexion, objetivo):
+        conexion.execute(insert(RegistroEliminado.__table__).values(
+            entidad=entidad,
+            clave=":".join(str(getattr(objetivo, c)) for c in columnas_clave),
+            seq_cambio=_secuencia_del_flush(objetivo, conexion, entidad),
+            fecha=datetime.utcnow()
+        ))
+
+    event.listen(modelo, "before_insert", marcar_insercion)
+    event.listen(modelo, "before_update", marcar_actualizacion)
+    event.listen(modelo, "after_delete", registrar_eliminado)
+
+
+def _secuencia_del_flush(objetivo, conexion, entidad: str) -> int:
+    sesion = object_session(objetivo)
+    numeros = sesion.info.setdefault(_SEQ_FLUSH, {}) if sesion is not None else {}
+    nombre = nombre_secuencia(entidad)
+    seq = numeros.get(nombre)
+    if seq is None:
+        seq = DataVersion.siguiente(conexion, nombre)
+        numeros[nombre] = seq
+    return seq
+
+
+@event.listens_for(Session, "after_flush")
+def _liberar_secuencia(sesion, contexto):
+    # Un número por flush: si la transacción se revierte, el número se revierte con ella
+    sesion.info.pop(_SEQ_FLUSH, None)
+
+
+# ============ DELTA SYNC ============
+class DeltaSync:
+
+    @staticmethod
+    def respuesta(db: Session, desde: int, entidad: str,
+                  obtener_cambios: Callable[[Optional[int]], List]) -> Dict:
+        """
+        Arma {desde, hasta, completo, cambios, eliminados} para una entidad
+
+        obtener_cambios(None) debe retornar todas las filas y obtener_cambios(n)
+        las filas con seq_cambio > n. La marca "hasta" se lee antes que las filas:
+        una escritura concurrente puede aparecer dos veces, nunca perderse.
+        """
+        hasta = DataVersion.obtener(db, nombre_secuencia(entidad))
+        completo = desde <= 0 or desde > hasta or desde < DataVersion.obtener(db, nombre_purgado(entidad))
+        return {
+            "desde": desde,
+            "hasta": hasta,
+            "completo": completo,
+            "cambios": obtener_cambios(None if completo else desde),
+            "eliminados": [] if completo else DeltaSync.eliminados(db, entidad, desde)
+        }
+
+    @staticmethod
+    def eliminados(db: Session, entidad: str, desde: int) -> List[Dict[str, int]]:
+        columnas = _CLAVES[entidad]
+        filas = (
+            db.query(RegistroEliminado.clave)
+            .filter(RegistroEliminado.entidad == entidad, RegistroEliminado.seq_cambio > desde)
+            .order_by(RegistroEliminado.seq_cambio)
+            .all()
+        )
+        return [dict(zip(columnas, map(int, f.clave.split(":")))) for f in filas]
+
+    @staticmethod
+    def purgar(db: Session, dias: int = DELTA_TOMBSTONES_DIAS) -> int:
+        """Elimina lápidas antiguas y registra, por secuencia, el mayor número purgado"""
+        limite = datetime.utcnow() - timedelta(days=dias)
+        maximos = (
+            db.query(RegistroEliminado.entidad, func.max(RegistroEliminado.seq_cambio))
+            .filter(RegistroEliminado.fecha < limite)
+            .group_by(RegistroEliminado.entidad)
+            .all()
+        )
+        borrados = 0
+        for entidad, maximo in maximos:
+            borrados += (
+                db.query(RegistroEliminado)
+                .filter(RegistroEliminado.entidad == entidad, RegistroEliminado.seq_cambio <= maximo)
+                .delete(synchronize_session=False)
+            )
+            if entidad in _SECUENCIAS:
+                DataVersion.avanzar(db.connection(), nombre_purgado(entidad), maximo)
+        db.commit()
+        return borrados
+
+
+# ============ TAREAS EN SEGUNDO PLANO ============
+@job_queue.periodica("cambios.purgar_eliminados", cada=timedelta(hours=6), prioridad=-10)
+def purgar_eliminados(payload: dict) -> dict:
+    from app.config.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return {"borrados": DeltaSync.purgar(db)}
+    finally:
+        db.close()
@@ -0,0 +1,166 @@
+"""
+Compresión de respuestas (gzip y brotli) y caché de cuerpos precomprimidos
+
+Para las rutas de catálogo (COMPRESSION_RUTAS_CACHE, rutas exactas) el
+middleware calcula un ETag sobre el cuerpo sin comprimir: responde 304 si el
+cliente ya lo tiene y guarda el cuerpo comprimido por (ETag, codificación).
+La primera vez se comprime con el nivel rápido; solo si el mismo cuerpo se
+pide otra vez se recomprime con el nivel más alto, así una respuesta que no
+se repite no paga el nivel 9. Las peticiones con ?since= (deltas distintos
+por cliente), las búsquedas y las rutas por profesor no entran al caché.
+brotli es opcional: si no está instalado solo se ofrece gzip.
+"""
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from app.shared.services.cache_registry import cache_registry
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", 1024))
+COMPRESSION_CACHE_MB = float(os.getenv("COMPRESSION_CACHE_MB", 32))
+COMPRESSION_RUTAS_CACHE = os.getenv(
+    "COMPRESSION_RUTAS_CACHE",
+    "/api/profesores,/api/profesores/materias,/api/profesores/cursos,/api/profesores/cargos,"
+    "/api/profesores/asignaciones,/api/profesores/asignaciones/detalle,/api/profesores/bloques,"
+    "/api/profesores/bootstrap,/api/reportes/horas-por-nivel,/api/reportes/profesores-por-materia,"
+    "/api/reportes/carga-por-cargo,/api/reportes/resumen,/api/esquelas/plantillas"
+)
+
+TIPOS_COMPRIMIBLES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+# Por encima de este tamaño se comprime en un hilo (zlib y brotli liberan el GIL)
+BYTES_EN_HILO = 256 * 1024
+
+# Niveles: rápidos al comprimir en cada petición, máximos para el caché
+_NIVEL = {"gzip": 6, "br": 4}
+_NIVEL_CACHE = {"gzip": 9, "br": 9}
+
+try:
+    import brotli
+except ModuleNotFoundError:
+    brotli = None
+
+
+def codificaciones_disponibles() -> Tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def elegir_codificacion(accept_encoding: str) -> Optional[str]:
+    """Codificación preferida según Accept-Encoding (br antes que gzip a igual q)"""
+    aceptadas = {}
+    for parte in accept_encoding.split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        q = 1.0
+        if parametros.strip().startswith("q="):
+            try:
+                q = float(parametros.strip()[2:])
+            except ValueError:
+                q = 0.0
+        aceptadas[nombre.strip().lower()] = q
+    comodin = aceptadas.get("*", 0.0)
+    candidatas = [(aceptadas.get(c, comodin), -i, c) for i, c in enumerate(codificaciones_disponibles())]
+    q, _, mejor = max(candidatas)
+    return mejor if q > 0 else None
+
+
+def comprimir(cuerpo: bytes, codificacion: str, para_cache: bool = False) -> bytes:
+    nivel = (_NIVEL_CACHE if para_cache else _NIVEL)[codificacion]
+    if codificacion == "br":
+        return brotli.compress(cuerpo, quality=nivel)
+    return gzip.compress(cuerpo, compresslevel=nivel, mtime=0)
+
+
+def parsear_rutas(texto: str) -> frozenset:
+    """"/api/x,/api/y/" -> {"/api/x", "/api/y"} (sin barra final)"""
+    return frozenset(r.strip().rstrip("/") for r in texto.split(",") if r.strip())
+
+
+def ruta_cacheable(rutas: frozenset, ruta: str, query_string: bytes) -> bool:
+    """Ruta exacta de catálogo y sin ?since= (cada cliente pide un delta distinto)"""
+    if ruta.rstrip("/") not in rutas:
+        return False
+    return not query_string or "since" not in parse_qs(query_string.decode("latin-1"))
+
+
+def calcular_etag(cuerpo: bytes) -> str:
+    # Débil: el mismo contenido se sirve con distintas codificaciones
+    return f'W/"{hashlib.blake2b(cuerpo, digest_size=16).hexdigest()}"'
+
+
+class CompressionCache:
+    """
+    LRU de cuerpos comprimidos por (ETag, codificación), acotada en bytes
+
+    Cada entrada recuerda si ya tiene el nivel máximo (`definitivo`) o el
+    rápido de la primera vez.
+    """
+
+    def __init__(self, max_bytes: int = int(COMPRESSION_CACHE_MB * 1024 * 1024)):
+        self._max_bytes = max_bytes
+        self._entradas: "OrderedDict[Tuple[str, str], Tuple[bytes, bool]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._metricas = {"aciertos": 0, "fallos": 0, "recomprimidos": 0, "no_modificados": 0,
+                          "bytes_originales": 0, "bytes_enviados": 0}
+
+    def obtener(self, etag: str, codificacion: str) -> Optional[Tuple[bytes, bool]]:
+        """(cuerpo comprimido, definitivo) o None"""
+        with self._lock:
+            entrada = self._entradas.get((etag, codificacion))
+            if entrada is None:
+                self._metricas["fallos"] += 1
+                return None
+            self._entradas.move_to_end((etag, codificacion))
+            self._metricas["aciertos"] += 1
+            return entrada
+
+    def guardar(self, etag: str, codificacion: str, comprimido: bytes, definitivo: bool = True) -> None:
+        if len(comprimido) > self._max_bytes:
+            return
+        with self._lock:
+            anterior = self._entradas.pop((etag, codificacion), None)
+            if anterior is not None:
+                self._bytes -= len(anterior[0])
+                if definitivo and not anterior[1]:
+                    self._metricas["recomprimidos"] += 1
+            self._entradas[(etag, codificacion)] = (comprimido, definitivo)
+            self._bytes += len(comprimido)
+            while self._bytes > self._max_bytes:
+                _, (expulsado, _) = self._entradas.popitem(last=False)
+                self._bytes -= len(expulsado)
+
+    def registrar_envio(self, original: int, enviado: int) -> None:
+        with self._lock:
+            self._metricas["bytes_originales"] += original
+            self._metricas["bytes_enviados"] += enviado
+
+    def registrar_no_modificado(self) -> None:
+        with self._lock:
+            self._metricas["no_modificados"] += 1
+
+    def vaciar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def estadisticas(self) -> Dict:
+        with self._lock:
+            datos = dict(self._metricas)
+            datos["entradas"] = len(self._entradas)
+            datos["bytes"] = self._bytes
+            datos["max_bytes"] = self._max_bytes
+        datos["codificaciones"] = list(codificaciones_disponibles())
+        datos["ratio"] = round(datos["bytes_enviados"] / datos["bytes_originales"], 3) if datos["bytes_originales"] else None
+        return datos
+
+
+# Instancia compartida por proceso
+compression_cache = CompressionCache()
+cache_registry.registrar(
+    "http.comprimidos", compression_cache.estadisticas, compression_cache.vaciar,
+    "Respuestas de catálogo precomprimidas por ETag"
+)
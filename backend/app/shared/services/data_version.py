@@ -0,0 +1,131 @@
+"""
+Versiones de datos compartidas entre procesos, persistidas en la tabla versiones_datos
+
+Los servicios de escritura llaman a incrementar() dentro de su propia
+transacción, antes del commit: la versión se confirma (o se revierte) junto
+con los datos. Las cachés derivadas (snapshots, respuestas precalculadas)
+comparan su versión con obtener() y se reconstruyen solo cuando cambió. Al
+vivir en la BD, una escritura hecha por cualquier worker invalida las cachés
+de todos.
+
+siguiente() además retorna el número; sirve como secuencia monotónica de
+cambios (ver change_sequence.py).
+"""
+from datetime import datetime
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.shared.models.version_models import VersionDatos
+
+
+class DataVersion:
+
+    @staticmethod
+    def obtener(db: Session, nombre: str) -> int:
+        """Versión actual del conjunto (0 si nunca se escribió). Una lectura por clave primaria."""
+        version = db.query(VersionDatos.version).filter(VersionDatos.nombre == nombre).scalar()
+        return version or 0
+
+    @staticmethod
+    def incrementar(conexion, nombre: str) -> None:
+        """
+        Incrementa la versión dentro de la transacción en curso (no hace commit)
+
+        UPDATE atómico; la primera vez, INSERT en un savepoint. En MySQL el
+        UPDATE bloquea la fila hasta el commit del llamador.
+        """
+        tabla = VersionDatos.__table__
+        resultado = conexion.execute(
+            update(tabla)
+            .where(tabla.c.nombre == nombre)
+            .values(version=tabla.c.version + 1, fecha_actualizacion=datetime.utcnow())
+        )
+        if not resultado.rowcount and not DataVersion._crear(conexion, nombre):
+            DataVersion.incrementar(conexion, nombre)
+
+    @staticmethod
+    def siguiente(conexion, nombre: str) -> int:
+        """
+        Incrementa y retorna la versión dentro de la transacción en curso (no hace commit)
+
+        En MySQL el UPDATE bloquea la fila hasta el commit, así que las
+        transacciones concurrentes obtienen números en el mismo orden en que
+        se confirman: un lector nunca ve el número N+1 antes que el N.
+
+        Es una sola sentencia: UPDATE ... RETURNING donde el motor lo soporta
+        (PostgreSQL, SQLite) y UPDATE ... LAST_INSERT_ID(version + 1) en MySQL,
+        cuyo valor llega en la respuesta del UPDATE. En otros motores, UPDATE + SELECT.
+        """
+        tabla = VersionDatos.__table__
+        condicion = tabla.c.nombre == nombre
+        ahora = datetime.utcnow()
+        dialecto = conexion.dialect
+
+        if dialecto.update_returning:
+            version = conexion.execute(
+                update(tabla).where(condicion)
+                .values(version=tabla.c.version + 1, fecha_actualizacion=ahora)
+                .returning(tabla.c.version)
+            ).scalar()
+        elif dialecto.name == "mysql":
+            resultado = conexion.execute(
+                update(tabla).where(condicion)
+                .values(version=func.last_insert_id(tabla.c.version + 1), fecha_actualizacion=ahora)
+            )
+            version = resultado.lastrowid if resultado.rowcount else None
+        else:
+            resultado = conexion.execute(
+                update(tabla).where(condicion).values(version=tabla.c.version + 1, fecha_actualizacion=ahora)
+            )
+            version = conexion.execute(select(tabla.c.version).where(condicion)).scalar() if resultado.rowcount else None
+
+        if version is not None:
+            return version
+        if DataVersion._crear(conexion, nombre):
+            return 1
+        return DataVersion.siguiente(conexion, nombre)
+
+    @staticmethod
+    def bloquear(conexion, nombre: str, compartido: bool = False) -> None:
+        """
+        Toma el lock de la fila `nombre` hasta el fin de la transacción en curso
+
+        SELECT ... FOR UPDATE: sirve de mutex entre procesos para operaciones
+        que validan y luego escriben (la validación se repite con el lock
+        tomado). Con compartido=True es FOR SHARE / LOCK IN SHARE MODE: varias
+        transacciones lo toman a la vez y solo excluyen al que lo pide sin
+        compartir. SQLite omite FOR UPDATE; ahí las escrituras ya son exclusivas.
+        """
+        tabla = VersionDatos.__table__
+        fila = conexion.execute(
+            select(tabla.c.nombre).where(tabla.c.nombre == nombre).with_for_update(read=compartido)
+        ).first()
+        if fila is None and not DataVersion._crear(conexion, nombre):
+            DataVersion.bloquear(conexion, nombre, compartido)
+
+    @staticmethod
+    def _crear(conexion, nombre: str) -> bool:
+        """Crea la fila con versión 1; False si otro proceso la creó primero"""
+        tabla = VersionDatos.__table__
+        try:
+            with conexion.begin_nested():
+                conexion.execute(insert(tabla).values(nombre=nombre, version=1, fecha_actualizacion=datetime.utcnow()))
+            return True
+        except IntegrityError:
+            return False
+
+    @staticmethod
+    def avanzar(conexion, nombre: str, valor: int) -> None:
+        """Lleva la versión al menos hasta `valor` dentro de la transacción en curso (no hace commit)"""
+        tabla = VersionDatos.__table__
+        resultado = conexion.execute(
+            update(tabla)
+            .where(tabla.c.nombre == nombre, tabla.c.version < valor)
+            .values(version=valor, fecha_actualizacion=datetime.utcnow())
+        )
+        if resultado.rowcount == 0 and conexion.execute(
+            select(tabla.c.nombre).where(tabla.c.nombre == nombre)
+        ).first() is None:
+            conexion.execute(insert(tabla).values(nombre=nombre, version=valor, fecha_actualizacion=datetime.utcnow()))
@@ -0,0 +1,409 @@
+"""
+Cola de trabajos en segundo plano, persistida en la tabla jobs
+
+- Las tareas se registran por nombre con @job_queue.tarea("modulo.accion")
+  (funciones síncronas se ejecutan en un pool de hilos; las async, en el loop)
+- encolar() acepta prioridad, fecha programada e idempotency_key
+- @job_queue.periodica(...) encola la tarea cada cierto intervalo; la
+  idempotency_key por intervalo evita duplicados entre procesos
+- El worker se inicia desde el lifespan y ejecuta hasta JOBS_CONCURRENCY
+  trabajos a la vez. Los trabajos fallidos se reintentan con backoff.
+- Reserva: un trabajo reclamado queda "en_proceso" por JOBS_RESERVA segundos
+  y el proceso que lo ejecuta la renueva cada JOBS_HEARTBEAT segundos
+  mientras corre (hasta JOBS_TIMEOUT en total). Si el proceso se cae, la
+  reserva vence y otro worker lo recupera como un intento más; si ese era el
+  último intento, se marca como error en lugar de volver a ejecutarlo.
+"""
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.shared.models.job_models import Job
+
+JOBS_CONCURRENCY = int(os.getenv("JOBS_CONCURRENCY", 4))
+JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", 1.0))
+JOBS_TIMEOUT = int(os.getenv("JOBS_TIMEOUT", 1800))
+JOBS_RESERVA = float(os.getenv("JOBS_RESERVA", 120))
+JOBS_HEARTBEAT = float(os.getenv("JOBS_HEARTBEAT", 30))
+JOBS_RETENCION_DIAS = int(os.getenv("JOBS_RETENCION_DIAS", 30))
+
+_BACKOFF_BASE = 5
+
+
+class JobQueue:
+
+    def __init__(self, session_factory=None, concurrencia: int = JOBS_CONCURRENCY,
+                 poll_interval: float = JOBS_POLL_INTERVAL, reserva: float = JOBS_RESERVA,
+                 latido: float = JOBS_HEARTBEAT, timeout: float = JOBS_TIMEOUT):
+        self._session_factory = session_factory
+        self._concurrencia = concurrencia
+        self._poll_interval = poll_interval
+        self._reserva = reserva
+        self._latido = latido
+        self._timeout = timeout
+        self._tareas: Dict[str, Callable] = {}
+        self._periodicas: Dict[str, dict] = {}
+        self._en_curso: set = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tarea_bucle: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._despertar: Optional[asyncio.Event] = None
+        self._metricas = {"completados": 0, "errores": 0, "reintentos": 0, "errores_bucle": 0,
+                          "reservas_vencidas": 0}
+
+    # ---- Registro de tareas ----
+
+    def tarea(self, nombre: str):
+        """Decorador: registra una función como tarea ejecutable por nombre"""
+        def registrar(funcion: Callable):
+            self._tareas[nombre] = funcion
+            return funcion
+        return registrar
+
+    def periodica(self, nombre: str, cada: timedelta, payload: Optional[dict] = None, prioridad: int = 0):
+        """Decorador: registra la tarea y la encola automáticamente cada `cada`"""
+        def registrar(funcion: Callable):
+            self._tareas[nombre] = funcion
+            self._periodicas[nombre] = {
+                "cada": cada.total_seconds(), "payload": payload or {},
+                "prioridad": prioridad, "proxima": 0.0
+            }
+            return funcion
+        return registrar
+
+    # ---- Encolado ----
+
+    def encolar(self, tipo: str, payload: Optional[dict] = None, prioridad: int = 0,
+                programar_para: Optional[datetime] = None, idempotency_key: Optional[str] = None,
+                max_intentos: int = 3, db: Optional[Session] = None) -> int:
+        """
+        Encola un trabajo y retorna su id_job
+
+        Con idempotency_key, si ya existe un trabajo con esa clave se retorna el
+        existente. Con `db` el trabajo se agrega a la transacción del llamador
+        (se hace flush dentro de un savepoint para obtener el id, el commit
+        queda a su cargo).
+        """
+        if tipo not in self._tareas:
+            raise ValueError(f"Tarea no registrada: {tipo}")
+
+        propia = db is None
+        db = db or self._sesion()
+        try:
+            if idempotency_key:
+                existente = db.query(Job.id_job).filter(Job.idempotency_key == idempotency_key).first()
+                if existente:
+                    return existente.id_job
+
+            job = Job(
+                tipo=tipo,
+                payload=json.dumps(payload or {}, default=str),
+                estado="pendiente",
+                prioridad=prioridad,
+                idempotency_key=idempotency_key,
+                intentos=0,
+                max_intentos=max_intentos,
+                programado_para=programar_para or datetime.utcnow(),
+                fecha_creacion=datetime.utcnow()
+            )
+            try:
+                if propia:
+                    db.add(job)
+                    db.flush()
+                else:
+                    # Savepoint: si la clave choca se deshace solo el trabajo, no la
+                    # transacción del llamador
+                    with db.begin_nested():
+                        db.add(job)
+                        db.flush()
+            except IntegrityError:
+                # Otra petición encoló la misma clave al mismo tiempo
+                if propia:
+                    db.rollback()
+                return db.query(Job.id_job).filter(Job.idempotency_key == idempotency_key).one().id_job
+            id_job = job.id_job
+            if propia:
+                db.commit()
+        finally:
+            if propia:
+                db.close()
+
+        self._avisar()
+        return id_job
+
+    # ---- Consultas ----
+
+    def obtener(self, id_job: int) -> Optional[Job]:
+        db = self._sesion()
+        try:
+            return db.query(Job).filter(Job.id_job == id_job).first()
+        finally:
+            db.close()
+
+    def listar(self, estado: Optional[str] = None, tipo: Optional[str] = None, limite: int = 50) -> List[Job]:
+        db = self._sesion()
+        try:
+            query = db.query(Job)
+            if estado:
+                query = query.filter(Job.estado == estado)
+            if tipo:
+                query = query.filter(Job.tipo == tipo)
+            return query.order_by(Job.id_job.desc()).limit(limite).all()
+        finally:
+            db.close()
+
+    def cancelar(self, id_job: int) -> bool:
+        """Cancela un trabajo que todavía no empezó"""
+        db = self._sesion()
+        try:
+            cantidad = (
+                db.query(Job)
+                .filter(Job.id_job == id_job, Job.estado == "pendiente")
+                .update({"estado": "cancelado", "fecha_fin": datetime.utcnow()}, synchronize_session=False)
+            )
+            db.commit()
+            return cantidad > 0
+        finally:
+            db.close()
+
+    def estadisticas(self) -> Dict:
+        """Profundidad de la cola por estado y métricas del worker de este proceso"""
+        db = self._sesion()
+        try:
+            por_estado = dict(db.query(Job.estado, func.count(Job.id_job)).group_by(Job.estado).all())
+        finally:
+            db.close()
+        return {
+            "por_estado": por_estado,
+            "en_curso_local": len(self._en_curso),
+            "concurrencia": self._concurrencia,
+            "tareas_registradas": sorted(self._tareas),
+            "periodicas": sorted(self._periodicas),
+            "activo": self._tarea_bucle is not None and not self._tarea_bucle.done(),
+            **self._metricas
+        }
+
+    # ---- Ciclo de vida ----
+
+    async def iniciar(self) -> None:
+        if self._tarea_bucle is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._despertar = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=self._concurrencia, thread_name_prefix="job")
+        self._tarea_bucle = asyncio.create_task(self._bucle(), name="job-queue")
+
+    async def detener(self, timeout: float = 30.0) -> None:
+        """Deja de reclamar trabajos y espera (hasta `timeout`) a los que están en curso"""
+        if self._tarea_bucle is None:
+            return
+        self._tarea_bucle.cancel()
+        try:
+            await self._tarea_bucle
+        except asyncio.CancelledError:
+            pass
+        self._tarea_bucle = None
+
+        if self._en_curso:
+            await asyncio.wait(self._en_curso, timeout=timeout)
+        self._executor.shutdown(wait=False)
+        self._executor = None
+
+    async def procesar_pendientes(self) -> int:
+        """Reclama trabajos hasta llenar la concurrencia libre y espera a que terminen"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._concurrencia, thread_name_prefix="job")
+        trabajos = await asyncio.to_thread(self._reclamar, self._concurrencia)
+        await asyncio.gather(*(self._ejecutar(t) for t in trabajos))
+        return len(trabajos)
+
+    # ---- Internos ----
+
+    def _avisar(self) -> None:
+        """Despierta al worker si el trabajo se encoló en este mismo proceso"""
+        if self._loop is not None and self._despertar is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._despertar.set)
+            except RuntimeError:
+                pass
+
+    async def _bucle(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self._encolar_periodicas)
+                libres = self._concurrencia - len(self._en_curso)
+                trabajos = await asyncio.to_thread(self._reclamar, libres) if libres > 0 else []
+                for trabajo in trabajos:
+                    tarea = asyncio.create_task(self._ejecutar(trabajo))
+                    self._en_curso.add(tarea)
+                    tarea.add_done_callback(self._en_curso.discard)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._metricas["errores_bucle"] += 1
+                print(f"[ERROR] Cola de trabajos: {e}")
+                trabajos = []
+
+            if not trabajos:
+                self._despertar.clear()
+                try:
+                    await asyncio.wait_for(self._despertar.wait(), timeout=self._poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _encolar_periodicas(self) -> None:
+        ahora = time.time()
+        for nombre, periodica in self._periodicas.items():
+            if ahora < periodica["proxima"]:
+                continue
+            ranura = int(ahora // periodica["cada"])
+            self.encolar(nombre, periodica["payload"], prioridad=periodica["prioridad"],
+                         idempotency_key=f"periodica:{nombre}:{ranura}")
+            periodica["proxima"] = (ranura + 1) * periodica["cada"]
+
+    def _reclamar(self, cantidad: int) -> List[Dict]:
+        """
+        Reserva trabajos vencidos por prioridad (SKIP LOCKED permite varios procesos)
+
+        Un trabajo "en_proceso" con la reserva vencida perdió a su proceso; si
+        ya agotó sus intentos se marca como error y no se ejecuta otra vez.
+        """
+        if cantidad <= 0:
+            return []
+        ahora = datetime.utcnow()
+        db = self._sesion()
+        try:
+            filas = (
+                db.query(Job)
+                .filter(or_(
+                    and_(Job.estado == "pendiente", Job.programado_para <= ahora),
+                    and_(Job.estado == "en_proceso", Job.reservado_hasta < ahora)
+                ))
+                .order_by(Job.prioridad.desc(), Job.programado_para)
+                .limit(cantidad)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            trabajos = []
+            for job in filas:
+                if job.estado == "en_proceso":
+                    self._metricas["reservas_vencidas"] += 1
+                    if job.intentos >= job.max_intentos:
+                        job.estado = "error"
+                        job.error = (f"La reserva venció en el intento {job.intentos} de {job.max_intentos} "
+                                     f"(el proceso que lo ejecutaba se detuvo o superó JOBS_TIMEOUT)")
+                        job.fecha_fin = ahora
+                        job.reservado_hasta = None
+                        self._metricas["errores"] += 1
+                        print(f"[ERROR] Trabajo {job.id_job} ({job.tipo}) abandonado tras {job.intentos} intentos")
+                        continue
+                job.estado = "en_proceso"
+                job.intentos += 1
+                job.fecha_inicio = ahora
+                job.reservado_hasta = ahora + timedelta(seconds=self._reserva)
+                trabajos.append({
+                    "id_job": job.id_job, "tipo": job.tipo, "payload": job.payload,
+                    "intentos": job.intentos, "max_intentos": job.max_intentos
+                })
+            db.commit()
+            return trabajos
+        finally:
+            db.close()
+
+    async def _ejecutar(self, trabajo: Dict) -> None:
+        funcion = self._tareas.get(trabajo["tipo"])
+        latido = asyncio.create_task(self._renovar_reserva(trabajo), name=f"job-{trabajo['id_job']}-latido")
+        try:
+            if funcion is None:
+                raise LookupError(f"Tarea no registrada en este proceso: {trabajo['tipo']}")
+            payload = json.loads(trabajo["payload"] or "{}")
+            if asyncio.iscoroutinefunction(funcion):
+                resultado = await funcion(payload)
+            else:
+                resultado = await asyncio.get_running_loop().run_in_executor(self._executor, funcion, payload)
+            cambios = {"estado": "completado", "resultado": json.dumps(resultado, default=str),
+                       "error": None, "fecha_fin": datetime.utcnow(), "reservado_hasta": None}
+            self._metricas["completados"] += 1
+        except Exception as e:
+            if trabajo["intentos"] < trabajo["max_intentos"]:
+                espera = _BACKOFF_BASE * (2 ** (trabajo["intentos"] - 1))
+                cambios = {"estado": "pendiente", "error": str(e), "reservado_hasta": None,
+                           "programado_para": datetime.utcnow() + timedelta(seconds=espera)}
+                self._metricas["reintentos"] += 1
+            else:
+                cambios = {"estado": "error", "error": str(e), "fecha_fin": datetime.utcnow(),
+                           "reservado_hasta": None}
+                self._metricas["errores"] += 1
+                print(f"[ERROR] Trabajo {trabajo['id_job']} ({trabajo['tipo']}) falló: {e}")
+        finally:
+            latido.cancel()
+        await asyncio.to_thread(self._actualizar, trabajo["id_job"], cambios)
+
+    async def _renovar_reserva(self, trabajo: Dict) -> None:
+        """Extiende la reserva cada `latido` segundos mientras el trabajo corre (hasta `timeout`)"""
+        limite = time.monotonic() + self._timeout
+        while True:
+            await asyncio.sleep(self._latido)
+            if time.monotonic() >= limite:
+                print(f"[ERROR] Trabajo {trabajo['id_job']} ({trabajo['tipo']}) superó JOBS_TIMEOUT; "
+                      f"su reserva ya no se renueva")
+                return
+            try:
+                await asyncio.to_thread(self._renovar, trabajo["id_job"], trabajo["intentos"])
+            except Exception as e:
+                print(f"[ERROR] No se pudo renovar la reserva del trabajo {trabajo['id_job']}: {e}")
+
+    def _renovar(self, id_job: int, intento: int) -> None:
+        db = self._sesion()
+        try:
+            # Solo el intento en curso: si otro proceso lo recuperó, la reserva es suya
+            db.query(Job).filter(
+                Job.id_job == id_job, Job.estado == "en_proceso", Job.intentos == intento
+            ).update({"reservado_hasta": datetime.utcnow() + timedelta(seconds=self._reserva)},
+                     synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _actualizar(self, id_job: int, cambios: Dict[str, Any]) -> None:
+        db = self._sesion()
+        try:
+            db.query(Job).filter(Job.id_job == id_job).update(cambios, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _sesion(self) -> Session:
+        if self._session_factory is None:
+            from app.config.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+
+# Instancia compartida por proceso
+job_queue = JobQueue()
+
+
+@job_queue.periodica("sistema.limpiar_jobs", cada=timedelta(hours=24), prioridad=-10)
+def limpiar_jobs(payload: dict) -> dict:
+    """Elimina trabajos terminados con más de JOBS_RETENCION_DIAS días"""
+    limite = datetime.utcnow() - timedelta(days=JOBS_RETENCION_DIAS)
+    db = job_queue._sesion()
+    try:
+        eliminados = (
+            db.query(Job)
+            .filter(Job.estado.in_(["completado", "cancelado", "error"]), Job.fecha_fin < limite)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return {"eliminados": eliminados}
+    finally:
+        db.close()
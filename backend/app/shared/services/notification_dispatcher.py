@@ -0,0 +1,319 @@
+"""
+Despachador asíncrono del outbox de notificaciones
+
+Un bucle asyncio reclama lotes de notificaciones vencidas (SELECT ... FOR UPDATE
+SKIP LOCKED en MySQL), las envía con un pool de NOTIF_WORKERS conexiones SMTP
+reutilizables y registra el resultado en una sola transacción por lote.
+Los fallos se reintentan con backoff exponencial; al superar NOTIF_MAX_INTENTOS
+la notificación pasa a 'fallido' (dead-letter).
+
+Los SMS salen por el proveedor conectado con configurar_sms(). Si un canal
+no tiene proveedor (SMS sin configurar, email sin SMTP_HOST) la notificación
+no se da por enviada: queda 'pendiente' con el error en ultimo_error, sin
+consumir intentos, y se vuelve a revisar cada _ESPERA_SIN_PROVEEDOR. En
+desarrollo, NOTIF_CONSOLA=true las imprime en consola y las marca enviadas.
+"""
+import asyncio
+import os
+import smtplib
+import time
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import bindparam, update
+
+from app.shared.models.notification_models import NotificacionOutbox
+
+SMTP_HOST = os.getenv("SMTP_HOST", "")
+SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
+SMTP_USER = os.getenv("SMTP_USER", "")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
+SMTP_FROM = os.getenv("SMTP_FROM", "no-reply@brisa.edu.bo")
+SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
+
+NOTIF_WORKERS = int(os.getenv("NOTIF_WORKERS", 4))
+NOTIF_BATCH_SIZE = int(os.getenv("NOTIF_BATCH_SIZE", 100))
+NOTIF_POLL_INTERVAL = float(os.getenv("NOTIF_POLL_INTERVAL", 2.0))
+NOTIF_MAX_INTENTOS = int(os.getenv("NOTIF_MAX_INTENTOS", 5))
+NOTIF_BACKOFF_BASE = float(os.getenv("NOTIF_BACKOFF_BASE", 30.0))
+NOTIF_CONSOLA = os.getenv("NOTIF_CONSOLA", "false").lower() == "true"
+
+# Tiempo que una notificación reclamada queda reservada antes de poder reclamarse de nuevo
+_RESERVA = timedelta(minutes=5)
+_BACKOFF_MAXIMO = 6 * 3600
+_ESPERA_SIN_PROVEEDOR = timedelta(minutes=10)
+
+# Proveedor de SMS: (destinatario, mensaje); lanza una excepción si el envío falla
+EnviarSMS = Callable[[str, str], None]
+
+
+class SinProveedor(Exception):
+    """El canal no tiene proveedor configurado: la notificación no se envió"""
+
+
+def crear_conexion_smtp() -> smtplib.SMTP:
+    """Abre una conexión SMTP según la configuración del entorno"""
+    conexion = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=10)
+    if SMTP_USE_TLS:
+        conexion.starttls()
+    if SMTP_USER:
+        conexion.login(SMTP_USER, SMTP_PASSWORD)
+    return conexion
+
+
+class _PoolSMTP:
+    """Pool acotado de conexiones SMTP reutilizables entre lotes"""
+
+    def __init__(self, factory: Callable[[], smtplib.SMTP], tamano: int):
+        self._factory = factory
+        self._libres: "asyncio.Queue[Optional[smtplib.SMTP]]" = asyncio.Queue()
+        for _ in range(tamano):
+            self._libres.put_nowait(None)  # se conecta al primer uso
+
+    async def enviar(self, mensaje: EmailMessage) -> None:
+        conexion = await self._libres.get()
+        try:
+            if conexion is None:
+                conexion = await asyncio.to_thread(self._factory)
+            await asyncio.to_thread(conexion.send_message, mensaje)
+        except Exception:
+            # La conexión puede haber quedado inutilizable: se descarta
+            if conexion is not None:
+                await asyncio.to_thread(_cerrar, conexion)
+            conexion = None
+            raise
+        finally:
+            self._libres.put_nowait(conexion)
+
+    async def cerrar(self) -> None:
+        while not self._libres.empty():
+            conexion = self._libres.get_nowait()
+            if conexion is not None:
+                await asyncio.to_thread(_cerrar, conexion)
+
+
+def _cerrar(conexion: smtplib.SMTP) -> None:
+    try:
+        conexion.quit()
+    except Exception:
+        pass
+
+
+class NotificationDispatcher:
+
+    def __init__(self, session_factory=None, smtp_factory: Optional[Callable[[], smtplib.SMTP]] = None,
+                 sms_sender: Optional[EnviarSMS] = None,
+                 workers: int = NOTIF_WORKERS, batch_size: int = NOTIF_BATCH_SIZE,
+                 poll_interval: float = NOTIF_POLL_INTERVAL, max_intentos: int = NOTIF_MAX_INTENTOS,
+                 backoff_base: float = NOTIF_BACKOFF_BASE, consola: bool = NOTIF_CONSOLA):
+        self._session_factory = session_factory
+        self._smtp_factory = smtp_factory or (crear_conexion_smtp if SMTP_HOST else None)
+        self._sms_sender = sms_sender
+        self._consola = consola
+        self._workers = workers
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._max_intentos = max_intentos
+        self._backoff_base = backoff_base
+        self._pool: Optional[_PoolSMTP] = None
+        self._tarea: Optional[asyncio.Task] = None
+        self._inicio = time.monotonic()
+        self._metricas = {
+            "enviados": 0,
+            "reintentos": 0,
+            "fallidos": 0,
+            "sin_proveedor": 0,
+            "lotes": 0,
+            "errores_bucle": 0,
+            "segundos_envio": 0.0
+        }
+
+    # ---- Ciclo de vida ----
+
+    def configurar_sms(self, sms_sender: Optional[EnviarSMS]) -> None:
+        """Conecta el proveedor de SMS; se llama en un hilo por cada mensaje"""
+        self._sms_sender = sms_sender
+
+    async def iniciar(self) -> None:
+        if self._tarea is None:
+            self._inicio = time.monotonic()
+            self._tarea = asyncio.create_task(self._bucle(), name="notification-dispatcher")
+
+    async def detener(self) -> None:
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+        if self._pool is not None:
+            await self._pool.cerrar()
+            self._pool = None
+
+    def estadisticas(self) -> Dict:
+        datos = dict(self._metricas)
+        transcurrido = max(time.monotonic() - self._inicio, 1e-9)
+        datos["por_segundo"] = round(datos["enviados"] / transcurrido, 3)
+        datos["ms_promedio_envio"] = (
+            round(1000 * datos["segundos_envio"] / datos["enviados"], 2) if datos["enviados"] else 0.0
+        )
+        datos["activo"] = self._tarea is not None and not self._tarea.done()
+        return datos
+
+    # ---- Procesamiento ----
+
+    async def procesar_pendientes(self) -> int:
+        """Reclama y envía un lote. Retorna la cantidad de notificaciones procesadas."""
+        lote = await asyncio.to_thread(self._reclamar_lote)
+        if not lote:
+            return 0
+
+        inicio = time.monotonic()
+        resultados = await asyncio.gather(*(self._enviar(n) for n in lote), return_exceptions=True)
+        self._metricas["segundos_envio"] += time.monotonic() - inicio
+
+        await asyncio.to_thread(self._registrar_resultados, lote, resultados)
+        self._metricas["lotes"] += 1
+        return len(lote)
+
+    async def _bucle(self) -> None:
+        while True:
+            try:
+                procesadas = await self.procesar_pendientes()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._metricas["errores_bucle"] += 1
+                print(f"[ERROR] Despachador de notificaciones: {e}")
+                procesadas = 0
+            # Con un lote completo probablemente hay más pendientes: seguir sin esperar
+            if procesadas < self._batch_size:
+                await asyncio.sleep(self._poll_interval)
+
+    async def _enviar(self, notificacion: Dict) -> None:
+        canal = notificacion["canal"]
+        if canal == "sms" and self._sms_sender is not None:
+            await asyncio.to_thread(self._sms_sender, notificacion["destinatario"], notificacion["cuerpo"])
+            return
+        if canal == "email" and self._smtp_factory is not None:
+            if self._pool is None:
+                self._pool = _PoolSMTP(self._smtp_factory, self._workers)
+            await self._pool.enviar(self._construir_mensaje(notificacion))
+            return
+        if canal not in ("sms", "email"):
+            raise ValueError(f"Canal de notificación desconocido: '{canal}'")
+
+        if self._consola:
+            print(f"[INFO] {canal.upper()} a {notificacion['destinatario']}: "
+                  f"{notificacion['asunto'] or notificacion['cuerpo']}")
+            return
+        raise SinProveedor(
+            "No hay proveedor de SMS configurado (notification_dispatcher.configurar_sms)" if canal == "sms"
+            else "SMTP_HOST no configurado"
+        )
+
+    @staticmethod
+    def _construir_mensaje(notificacion: Dict) -> EmailMessage:
+        mensaje = EmailMessage()
+        mensaje["From"] = SMTP_FROM
+        mensaje["To"] = notificacion["destinatario"]
+        mensaje["Subject"] = notificacion["asunto"] or ""
+        mensaje.set_content(notificacion["cuerpo"])
+        if notificacion["cuerpo_html"]:
+            mensaje.add_alternative(notificacion["cuerpo_html"], subtype="html")
+        return mensaje
+
+    # ---- Acceso a BD (se ejecuta en hilos) ----
+
+    def _sesion(self):
+        if self._session_factory is None:
+            from app.config.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def _reclamar_lote(self) -> List[Dict]:
+        """Reserva un lote de notificaciones vencidas marcándolas como 'enviando'"""
+        ahora = datetime.utcnow()
+        db = self._sesion()
+        try:
+            filas = (
+                db.query(NotificacionOutbox)
+                .filter(
+                    NotificacionOutbox.estado.in_(["pendiente", "enviando"]),
+                    NotificacionOutbox.proximo_intento <= ahora
+                )
+                .order_by(NotificacionOutbox.proximo_intento)
+                .limit(self._batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            lote = []
+            for fila in filas:
+                fila.estado = "enviando"
+                fila.proximo_intento = ahora + _RESERVA
+                lote.append({
+                    "id_notificacion": fila.id_notificacion,
+                    "canal": fila.canal,
+                    "destinatario": fila.destinatario,
+                    "asunto": fila.asunto,
+                    "cuerpo": fila.cuerpo,
+                    "cuerpo_html": fila.cuerpo_html,
+                    "intentos": fila.intentos
+                })
+            db.commit()
+            return lote
+        finally:
+            db.close()
+
+    def _registrar_resultados(self, lote: List[Dict], resultados: List) -> None:
+        """Actualiza todo el lote con un executemany"""
+        ahora = datetime.utcnow()
+        cambios = []
+        sin_proveedor = []
+        for notificacion, resultado in zip(lote, resultados):
+            intentos = notificacion["intentos"] + 1
+            if isinstance(resultado, SinProveedor):
+                # No es un fallo del envío: no consume intentos
+                cambios.append({"b_id": notificacion["id_notificacion"], "estado": "pendiente",
+                                "intentos": notificacion["intentos"],
+                                "proximo_intento": ahora + _ESPERA_SIN_PROVEEDOR,
+                                "ultimo_error": str(resultado), "fecha_envio": None})
+                sin_proveedor.append(str(resultado))
+            elif not isinstance(resultado, Exception):
+                cambios.append({"b_id": notificacion["id_notificacion"], "estado": "enviado",
+                                "intentos": intentos, "proximo_intento": ahora,
+                                "ultimo_error": None, "fecha_envio": ahora})
+                self._metricas["enviados"] += 1
+            elif intentos >= self._max_intentos:
+                cambios.append({"b_id": notificacion["id_notificacion"], "estado": "fallido",
+                                "intentos": intentos, "proximo_intento": ahora,
+                                "ultimo_error": str(resultado), "fecha_envio": None})
+                self._metricas["fallidos"] += 1
+            else:
+                espera = min(self._backoff_base * (2 ** (intentos - 1)), _BACKOFF_MAXIMO)
+                cambios.append({"b_id": notificacion["id_notificacion"], "estado": "pendiente",
+                                "intentos": intentos, "proximo_intento": ahora + timedelta(seconds=espera),
+                                "ultimo_error": str(resultado), "fecha_envio": None})
+                self._metricas["reintentos"] += 1
+
+        if sin_proveedor:
+            self._metricas["sin_proveedor"] += len(sin_proveedor)
+            for error in sorted(set(sin_proveedor)):
+                print(f"[ERROR] {sin_proveedor.count(error)} notificaciones sin enviar: {error}")
+
+        tabla = NotificacionOutbox.__table__
+        db = self._sesion()
+        try:
+            db.execute(
+                update(tabla).where(tabla.c.id_notificacion == bindparam("b_id")),
+                cambios
+            )
+            db.commit()
+        finally:
+            db.close()
+
+
+# Instancia compartida por proceso
+notification_dispatcher = NotificationDispatcher()
@@ -0,0 +1,327 @@
+"""
+Registro de consultas SQL lentas
+
+Escucha los eventos de ejecución del engine y guarda en un buffer circular
+las consultas que superan SLOW_QUERY_MS. El umbral se puede cambiar en
+caliente desde el panel de administración. Si la consulta corre dentro de una
+petición perfilada, su tiempo se suma también al desglose de esa petición.
+
+Reemplaza a echo=True: en lugar de imprimir cada sentencia, solo las lentas
+se registran (una línea [INFO] en consola) con:
+
+- huella: la sentencia sin literales ni parámetros (`IN (?, ?, ?)` queda como
+  `IN (...)`), para agrupar las ejecuciones de la misma consulta.
+- origen: el método de repositorio (o el primer código de la app) que la
+  ejecutó.
+- plan: EXPLAIN de los SELECT lentos, tomado en un hilo aparte con otra
+  conexión para no demorar la petición; como máximo uno por huella cada
+  SLOW_QUERY_EXPLAIN_SEGUNDOS.
+
+Las huellas lentas se acumulan en una tabla de las SLOW_QUERY_TOP con más
+tiempo total (veces, total, máximo, orígenes y último plan).
+
+Los parámetros de las consultas no se guardan salvo con
+SLOW_QUERY_PARAMETROS=true, y aun así los de columnas sensibles (password,
+token, secret) quedan como "***".
+"""
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.shared.services.request_profiler import perfil_actual
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+SLOW_QUERY_SAMPLES = int(os.getenv("SLOW_QUERY_SAMPLES", 100))
+SLOW_QUERY_TOP = int(os.getenv("SLOW_QUERY_TOP", 50))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+SLOW_QUERY_EXPLAIN_SEGUNDOS = float(os.getenv("SLOW_QUERY_EXPLAIN_SEGUNDOS", 600))
+SLOW_QUERY_PARAMETROS = os.getenv("SLOW_QUERY_PARAMETROS", "false").lower() == "true"
+
+_MAX_SQL = 2000
+_MAX_PARAMETROS = 500
+_MAX_LOG_SQL = 200
+_MAX_HUELLAS_CACHE = 5000
+_MAX_EXPLAINS_PENDIENTES = 20
+_MAX_FILAS_PLAN = 50
+_MAX_ORIGENES = 5
+
+_LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAMETROS = re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|\?")
+_LISTAS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ESPACIOS = re.compile(r"\s+")
+_EXPLICABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_SENSIBLE = re.compile(r"password|passwd|secret|token", re.IGNORECASE)
+_OCULTO = "***"
+# Módulos que no cuentan como origen de la consulta
+_INTERNOS = ("app.shared.services.query_monitor", "app.config.database")
+
+
+def huella_sql(statement: str) -> str:
+    """Sentencia normalizada: mismos valores o cantidad de parámetros = misma huella"""
+    huella = _LITERALES.sub("?", statement)
+    huella = _PARAMETROS.sub("?", huella)
+    huella = _LISTAS.sub("(...)", huella)
+    return _ESPACIOS.sub(" ", huella).strip()
+
+
+def origen_consulta(marco=None) -> Optional[str]:
+    """
+    Método de la app que ejecutó la consulta: el primer repositorio en la pila
+    o, si no hay, el primer marco de la app
+    """
+    marco = marco or sys._getframe(1)
+    primero = None
+    while marco is not None:
+        modulo = marco.f_globals.get("__name__", "")
+        if modulo.startswith("app.") and modulo not in _INTERNOS:
+            origen = f"{modulo}:{marco.f_code.co_qualname}:{marco.f_lineno}"
+            if ".repositories." in modulo:
+                return origen
+            primero = primero or origen
+        marco = marco.f_back
+    return primero
+
+
+def parametros_seguros(statement: str, parameters) -> str:
+    """
+    repr de los parámetros sin valores sensibles
+
+    Con parámetros por nombre se ocultan solo los de nombre sensible; con
+    parámetros posicionales no se sabe a qué columna va cada uno, así que se
+    ocultan todos si la sentencia menciona una columna sensible.
+    """
+    if isinstance(parameters, dict):
+        return repr({k: _OCULTO if _SENSIBLE.search(str(k)) else v for k, v in parameters.items()})
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], dict):
+        # executemany con parámetros por nombre
+        return repr([
+            {k: _OCULTO if _SENSIBLE.search(str(k)) else v for k, v in fila.items()} for fila in parameters
+        ])
+    if _SENSIBLE.search(statement):
+        return _OCULTO
+    return repr(parameters)
+
+
+def _sentencia_explain(dialecto: str, statement: str) -> Optional[str]:
+    if not _EXPLICABLE.match(statement):
+        return None
+    if dialecto == "sqlite":
+        return f"EXPLAIN QUERY PLAN {statement}"
+    if dialecto in ("mysql", "mariadb", "postgresql"):
+        return f"EXPLAIN {statement}"
+    return None
+
+
+class QueryMonitor:
+
+    def __init__(self, umbral_ms: float = SLOW_QUERY_MS, capacidad: int = SLOW_QUERY_SAMPLES,
+                 top: int = SLOW_QUERY_TOP, explain: bool = SLOW_QUERY_EXPLAIN,
+                 explain_segundos: float = SLOW_QUERY_EXPLAIN_SEGUNDOS,
+                 parametros: bool = SLOW_QUERY_PARAMETROS):
+        self.umbral_ms = umbral_ms
+        self.parametros = parametros
+        self.top = top
+        self.explain = explain
+        self.explain_segundos = explain_segundos
+        self._muestras: deque = deque(maxlen=capacidad)
+        self._huellas: Dict[str, Dict] = {}
+        self._cache_huellas: Dict[str, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+        self._engines = set()
+        self._consultas = 0
+        self._lentas = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._explains_pendientes = 0
+        self._explains = 0
+
+    def instalar(self, engine) -> None:
+        """Registra los listeners en el engine (una sola vez por engine)"""
+        if id(engine) in self._engines:
+            return
+        self._engines.add(id(engine))
+        event.listen(engine, "before_cursor_execute", self._antes)
+        event.listen(engine, "after_cursor_execute", self._despues)
+
+    def configurar(self, umbral_ms: float, explain: Optional[bool] = None) -> None:
+        self.umbral_ms = umbral_ms
+        if explain is not None:
+            self.explain = explain
+
+    def muestras(self, limite: int = 50) -> List[Dict]:
+        """Consultas lentas más recientes primero"""
+        with self._lock:
+            return list(reversed(self._muestras))[:limite]
+
+    def ranking(self, limite: int = 20, orden: str = "total_ms") -> List[Dict]:
+        """Huellas lentas ordenadas por tiempo total, máximo o cantidad de veces"""
+        with self._lock:
+            huellas = [self._resumen_huella(h) for h in self._huellas.values()]
+        return sorted(huellas, key=lambda h: h[orden], reverse=True)[:limite]
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._muestras.clear()
+            self._huellas.clear()
+            self._lentas = 0
+
+    def estadisticas(self) -> Dict:
+        with self._lock:
+            return {
+                "umbral_ms": self.umbral_ms,
+                "consultas": self._consultas,
+                "lentas": self._lentas,
+                "muestras": len(self._muestras),
+                "capacidad": self._muestras.maxlen,
+                "huellas": len(self._huellas),
+                "explain": self.explain,
+                "planes": self._explains,
+                "parametros": self.parametros
+            }
+
+    # ---- Listeners ----
+
+    def _antes(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_inicio", []).append(time.perf_counter())
+
+    def _despues(self, conn, cursor, statement, parameters, context, executemany):
+        inicios = conn.info.get("query_inicio")
+        if not inicios:
+            return
+        duracion_ms = (time.perf_counter() - inicios.pop()) * 1000
+        perfil = perfil_actual.get()
+        if perfil is not None:
+            perfil.registrar_consulta(statement, duracion_ms)
+        with self._lock:
+            self._consultas += 1
+            if duracion_ms < self.umbral_ms:
+                return
+
+        # Solo las lentas pagan la huella y el recorrido de la pila
+        huella, huella_id = self._huella(statement)
+        origen = origen_consulta()
+        ahora = datetime.utcnow()
+        with self._lock:
+            self._lentas += 1
+            self._muestras.append({
+                "sql": statement[:_MAX_SQL],
+                "parametros": parametros_seguros(statement, parameters)[:_MAX_PARAMETROS] if self.parametros else None,
+                "executemany": executemany,
+                "duracion_ms": round(duracion_ms, 2),
+                "fecha": ahora,
+                "huella_id": huella_id,
+                "origen": origen
+            })
+            pedir_plan = self._acumular(huella_id, huella, statement, duracion_ms, origen, ahora)
+        print(f"[INFO] Consulta lenta {duracion_ms:.0f} ms [{huella_id}] en {origen or '?'}: "
+              f"{huella[:_MAX_LOG_SQL]}")
+        if pedir_plan and not executemany:
+            self._pedir_explain(conn, huella_id, statement, parameters)
+
+    # ---- Internos ----
+
+    def _huella(self, statement: str) -> Tuple[str, str]:
+        # SQLAlchemy repite el mismo texto compilado: se normaliza una vez
+        cacheada = self._cache_huellas.get(statement)
+        if cacheada is None:
+            huella = huella_sql(statement)
+            cacheada = (huella, hashlib.sha1(huella.encode("utf-8")).hexdigest()[:12])
+            if len(self._cache_huellas) >= _MAX_HUELLAS_CACHE:
+                self._cache_huellas.clear()
+            self._cache_huellas[statement] = cacheada
+        return cacheada
+
+    def _acumular(self, huella_id: str, huella: str, statement: str, duracion_ms: float,
+                  origen: Optional[str], ahora: datetime) -> bool:
+        """Suma la ejecución a la tabla de huellas. Retorna True si corresponde tomar el plan."""
+        entrada = self._huellas.get(huella_id)
+        if entrada is None:
+            if len(self._huellas) >= self.top:
+                # Sale la huella con menos tiempo total
+                menor = min(self._huellas, key=lambda h: self._huellas[h]["total_ms"])
+                del self._huellas[menor]
+            entrada = self._huellas[huella_id] = {
+                "huella_id": huella_id,
+                "huella": huella[:_MAX_SQL],
+                "ejemplo": statement[:_MAX_SQL],
+                "veces": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "ultima": ahora,
+                "origenes": Counter(),
+                "plan": None,
+                "plan_error": None,
+                "plan_fecha": None,
+                "_plan_pedido": None
+            }
+        entrada["veces"] += 1
+        entrada["total_ms"] += duracion_ms
+        entrada["max_ms"] = max(entrada["max_ms"], duracion_ms)
+        entrada["ultima"] = ahora
+        if origen:
+            entrada["origenes"][origen] += 1
+        pedido = entrada["_plan_pedido"]
+        if not self.explain or (pedido is not None and time.monotonic() - pedido < self.explain_segundos):
+            return False
+        entrada["_plan_pedido"] = time.monotonic()
+        return True
+
+    def _pedir_explain(self, conn, huella_id: str, statement: str, parameters) -> None:
+        sentencia = _sentencia_explain(conn.dialect.name, statement)
+        if sentencia is None:
+            return
+        with self._lock:
+            if self._explains_pendientes >= _MAX_EXPLAINS_PENDIENTES:
+                return
+            self._explains_pendientes += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+        self._executor.submit(self._tomar_plan, conn.engine, huella_id, sentencia, parameters)
+
+    def _tomar_plan(self, engine, huella_id: str, sentencia: str, parameters) -> None:
+        """EXPLAIN con una conexión cruda del pool: no dispara estos mismos listeners"""
+        plan = error = None
+        try:
+            crudo = engine.raw_connection()
+            try:
+                cursor = crudo.cursor()
+                cursor.execute(sentencia, parameters)
+                columnas = [d[0] for d in cursor.description or ()]
+                plan = [
+                    {columna: valor if isinstance(valor, (int, float, type(None))) else str(valor)
+                     for columna, valor in zip(columnas, fila)}
+                    for fila in cursor.fetchmany(_MAX_FILAS_PLAN)
+                ]
+                cursor.close()
+            finally:
+                crudo.close()
+        except Exception as e:
+            error = str(e)[:_MAX_PARAMETROS]
+            print(f"[ERROR] No se pudo tomar el plan de la consulta [{huella_id}]: {error}")
+        with self._lock:
+            self._explains_pendientes -= 1
+            self._explains += 1
+            entrada = self._huellas.get(huella_id)
+            if entrada is not None:
+                entrada["plan"], entrada["plan_error"], entrada["plan_fecha"] = plan, error, datetime.utcnow()
+
+    def _resumen_huella(self, entrada: Dict) -> Dict:
+        return {
+            **{k: v for k, v in entrada.items() if not k.startswith("_")},
+            "total_ms": round(entrada["total_ms"], 2),
+            "max_ms": round(entrada["max_ms"], 2),
+            "promedio_ms": round(entrada["total_ms"] / entrada["veces"], 2),
+            "origenes": dict(entrada["origenes"].most_common(_MAX_ORIGENES))
+        }
+
+
+# Instancia compartida por proceso
+query_monitor = QueryMonitor()
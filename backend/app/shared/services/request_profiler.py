@@ -0,0 +1,479 @@
+"""
+Perfilado por petición, activable en caliente
+
+Con el perfilado activo, ProfilingMiddleware mide las peticiones (según la
+fracción de muestreo y el prefijo de ruta) y guarda las últimas mediciones
+para el panel de administración. Desactivado, el middleware solo hace una
+comparación por petición.
+
+Cada petición medida lleva un desglose: tiempo del endpoint, SQL por sentencia
+(lo aporta query_monitor), Python del endpoint sin SQL y serialización (desde
+que el endpoint retorna hasta que sale la respuesta, con la compresión). Según
+el perfilador además se capturan pilas y se guardan en PROFILING_DIR en
+formato "collapsed" (una línea "a;b;c N" por pila, lo que leen flamegraph.pl,
+speedscope o inferno):
+
+- tiempos: solo el desglose.
+- muestreo: un hilo toma la pila del event loop y del hilo del endpoint cada
+  PROFILING_INTERVALO_MS; N es la cantidad de muestras. Costo bajo. El event
+  loop atiende a todas las peticiones a la vez: sus pilas van bajo el marco
+  "[event loop]" porque pueden ser de otras peticiones.
+- determinista: sys.setprofile en el hilo del endpoint; N son microsegundos
+  de tiempo propio por pila. Exacto pero hace el endpoint varias veces más lento.
+
+Un admin también puede perfilar una petición puntual con el header
+`X-Perfilar: muestreo|determinista|tiempos` y su token, aunque el perfilado
+esté desactivado. Solo esas respuestas llevan Server-Timing y X-Perfil: el
+desglose de una petición cualquiera no se expone a quien la hizo. Solo una petición a la vez captura pilas (el hilo del event
+loop es compartido y las pilas de dos peticiones se mezclarían); las demás
+se miden con el desglose.
+"""
+import asyncio
+import functools
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", 1.0))
+PROFILING_SAMPLES = int(os.getenv("PROFILING_SAMPLES", 200))
+PROFILING_PERFILADOR = os.getenv("PROFILING_PERFILADOR", "tiempos")
+PROFILING_DIR = os.getenv("PROFILING_DIR", "perfiles")
+PROFILING_MAX_ARCHIVOS = int(os.getenv("PROFILING_MAX_ARCHIVOS", 100))
+PROFILING_INTERVALO_MS = float(os.getenv("PROFILING_INTERVALO_MS", 5))
+
+PERFILADORES = ("tiempos", "muestreo", "determinista")
+HEADER_PERFILAR = b"x-perfilar"
+
+_MAX_CAPTURAS_SIMULTANEAS = 1
+_MAX_PROFUNDIDAD = 200
+_MAX_SQL = 500
+_TOP_CONSULTAS = 20
+_NOMBRE_ARCHIVO = re.compile(r"^[\w.-]+\.folded$")
+# Raíz de las pilas del hilo del event loop, compartido con otras peticiones
+_MARCO_EVENT_LOOP = "[event loop]"
+
+# Perfil de la petición en curso; los hilos del threadpool heredan el contexto
+perfil_actual: ContextVar[Optional["PerfilPeticion"]] = ContextVar("perfil_actual", default=None)
+
+
+def _nombre_marco(marco) -> str:
+    return f"{marco.f_globals.get('__name__', '?')}:{marco.f_code.co_qualname}"
+
+
+def _nombre_builtin(funcion) -> str:
+    return f"{getattr(funcion, '__module__', None) or 'builtins'}:{getattr(funcion, '__qualname__', repr(funcion))}"
+
+
+def _pila(marco) -> str:
+    nombres = []
+    while marco is not None and len(nombres) < _MAX_PROFUNDIDAD:
+        nombres.append(_nombre_marco(marco))
+        marco = marco.f_back
+    return ";".join(reversed(nombres))
+
+
+def _en_espera(marco) -> bool:
+    # El event loop sin trabajo está bloqueado en selectors (epoll/kqueue)
+    return marco.f_code.co_filename.endswith("selectors.py")
+
+
+class _Trazador:
+    """Perfilador determinista: tiempo propio por pila completa, vía sys.setprofile"""
+
+    def __init__(self, pilas: Counter):
+        self.pilas = pilas
+        self._pila: List[list] = []  # [clave, nombre, inicio_ns, hijos_ns]
+
+    def __call__(self, marco, evento, arg):
+        ahora = time.perf_counter_ns()
+        if evento == "call":
+            self._pila.append([marco, _nombre_marco(marco), ahora, 0])
+        elif evento == "c_call":
+            self._pila.append([arg, _nombre_builtin(arg), ahora, 0])
+        else:
+            clave = marco if evento == "return" else arg
+            for i in range(len(self._pila) - 1, -1, -1):
+                if self._pila[i][0] is clave:
+                    break
+            else:
+                # Empezó antes de activar el trazador
+                return
+            # Lo que quedó abierto encima (corutinas suspendidas) se cierra junto
+            while len(self._pila) > i:
+                self._cerrar(ahora)
+
+    def cerrar(self) -> None:
+        ahora = time.perf_counter_ns()
+        while self._pila:
+            self._cerrar(ahora)
+
+    def _cerrar(self, ahora: int) -> None:
+        _, nombre, inicio, hijos = self._pila.pop()
+        total = ahora - inicio
+        ruta = ";".join([e[1] for e in self._pila] + [nombre])
+        self.pilas[ruta] += max(total - hijos, 0) // 1000
+        if self._pila:
+            self._pila[-1][3] += total
+
+
+class _Muestreador(threading.Thread):
+    """Toma la pila de los hilos de una petición a intervalos fijos"""
+
+    def __init__(self, perfil: "PerfilPeticion", intervalo_ms: float):
+        super().__init__(name="perfilador-muestreo", daemon=True)
+        self.perfil = perfil
+        self.intervalo = intervalo_ms / 1000
+        self._alto = threading.Event()
+
+    def run(self):
+        while not self._alto.wait(self.intervalo):
+            marcos = sys._current_frames()
+            for hilo in self.perfil.hilos():
+                marco = marcos.get(hilo)
+                if marco is None or _en_espera(marco):
+                    continue
+                pila = _pila(marco)
+                if hilo == self.perfil.hilo_principal:
+                    pila = f"{_MARCO_EVENT_LOOP};{pila}"
+                self.perfil.pilas[pila] += 1
+
+    def detener(self) -> None:
+        self._alto.set()
+        self.join()
+
+
+class PerfilPeticion:
+    """Mediciones de una petición (se crea en el middleware, vive en perfil_actual)"""
+
+    def __init__(self, perfilador: str, metodo: str, ruta: str, intervalo_ms: float = PROFILING_INTERVALO_MS,
+                 por_header: bool = False):
+        self.perfilador = perfilador
+        # Pedido por un admin con X-Perfilar: la respuesta lleva Server-Timing y X-Perfil
+        self.por_header = por_header
+        self.metodo = metodo
+        self.ruta = ruta
+        self.intervalo_ms = intervalo_ms
+        self.inicio = time.perf_counter()
+        self.hilo_principal = threading.get_ident()
+        self.pilas: Counter = Counter()
+        self.endpoint_ms = 0.0
+        self.sql_ms = 0.0
+        self.serializacion_ms: Optional[float] = None
+        self.flamegraph: Optional[str] = None
+        if perfilador != "tiempos":
+            slug = re.sub(r"[^\w]+", "_", ruta).strip("_")[:60] or "raiz"
+            self.flamegraph = f"{datetime.utcnow():%Y%m%d-%H%M%S-%f}-{os.getpid()}-{metodo}-{slug}.folded"
+        self._consultas: Dict[str, list] = {}
+        self._hilos = {self.hilo_principal}
+        self._fin_endpoint: Optional[float] = None
+        self._lock = threading.Lock()
+        self._muestreador: Optional[_Muestreador] = None
+
+    def iniciar(self) -> None:
+        if self.perfilador == "muestreo":
+            self._muestreador = _Muestreador(self, self.intervalo_ms)
+            self._muestreador.start()
+
+    def detener(self) -> None:
+        if self._muestreador is not None:
+            self._muestreador.detener()
+            self._muestreador = None
+
+    def hilos(self) -> List[int]:
+        with self._lock:
+            return list(self._hilos)
+
+    @contextmanager
+    def endpoint(self):
+        """Envuelve la ejecución del endpoint, en el hilo donde corre"""
+        hilo = threading.get_ident()
+        with self._lock:
+            self._hilos.add(hilo)
+        trazador = anterior = None
+        if self.perfilador == "determinista":
+            trazador = _Trazador(Counter())
+            anterior = sys.getprofile()
+            sys.setprofile(trazador)
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            fin = time.perf_counter()
+            if trazador is not None:
+                sys.setprofile(anterior)
+                trazador.cerrar()
+            with self._lock:
+                self.endpoint_ms += (fin - inicio) * 1000
+                self._fin_endpoint = fin
+                if trazador is not None:
+                    self.pilas.update(trazador.pilas)
+                if hilo != self.hilo_principal:
+                    self._hilos.discard(hilo)
+
+    def registrar_consulta(self, sql: str, duracion_ms: float) -> None:
+        with self._lock:
+            self.sql_ms += duracion_ms
+            acumulado = self._consultas.get(sql)
+            if acumulado is None:
+                self._consultas[sql] = [1, duracion_ms]
+            else:
+                acumulado[0] += 1
+                acumulado[1] += duracion_ms
+
+    def marcar_respuesta(self) -> None:
+        """Llamado al enviar http.response.start"""
+        if self._fin_endpoint is not None and self.serializacion_ms is None:
+            self.serializacion_ms = (time.perf_counter() - self._fin_endpoint) * 1000
+
+    def duracion_ms(self) -> float:
+        return (time.perf_counter() - self.inicio) * 1000
+
+    def server_timing(self) -> str:
+        partes = [f"app;dur={self.duracion_ms():.2f}"]
+        if self._fin_endpoint is not None:
+            partes.append(f"endpoint;dur={self.endpoint_ms:.2f}")
+            partes.append(f"python;dur={self._python_ms():.2f}")
+        partes.append(f'sql;dur={self.sql_ms:.2f};desc="{self._total_consultas()} consultas"')
+        if self.serializacion_ms is not None:
+            partes.append(f"serializacion;dur={self.serializacion_ms:.2f}")
+        return ", ".join(partes)
+
+    def desglose(self) -> Dict:
+        with self._lock:
+            consultas = sorted(self._consultas.items(), key=lambda c: c[1][1], reverse=True)
+            return {
+                "perfilador": self.perfilador,
+                "endpoint_ms": round(self.endpoint_ms, 2),
+                "python_ms": round(self._python_ms(), 2),
+                "sql_ms": round(self.sql_ms, 2),
+                "consultas": self._total_consultas(),
+                "serializacion_ms": round(self.serializacion_ms, 2) if self.serializacion_ms is not None else None,
+                "detalle_sql": [
+                    {"sql": sql[:_MAX_SQL], "veces": veces, "duracion_ms": round(ms, 2)}
+                    for sql, (veces, ms) in consultas[:_TOP_CONSULTAS]
+                ],
+                "flamegraph": self.flamegraph if self.pilas else None
+            }
+
+    def collapsed(self) -> str:
+        raiz = f"{self.metodo} {self.ruta}"
+        return "".join(f"{raiz};{pila} {n}\n" for pila, n in sorted(self.pilas.items()) if n > 0)
+
+    def _python_ms(self) -> float:
+        return max(self.endpoint_ms - self.sql_ms, 0.0)
+
+    def _total_consultas(self) -> int:
+        return sum(veces for veces, _ in self._consultas.values())
+
+
+def instrumentar_endpoints(rutas) -> None:
+    """
+    Envuelve el endpoint de cada APIRoute para medirlo en el hilo donde corre
+
+    FastAPI ejecuta los endpoints síncronos en el threadpool: el trazador
+    determinista y el muestreador necesitan ese hilo, no el del middleware.
+    Sin perfil activo el envoltorio solo consulta perfil_actual.
+    """
+    for ruta in rutas:
+        dependant = getattr(ruta, "dependant", None)
+        if dependant is None or dependant.call is None or getattr(dependant.call, "_perfilable", False):
+            continue
+        dependant.call = _envolver(dependant.call)
+
+
+def _envolver(endpoint):
+    # Mantener síncrono/asíncrono: FastAPI lo decidió al crear la ruta
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def envuelto(*args, **kwargs):
+            perfil = perfil_actual.get()
+            if perfil is None:
+                return await endpoint(*args, **kwargs)
+            with perfil.endpoint():
+                return await endpoint(*args, **kwargs)
+    else:
+        @functools.wraps(endpoint)
+        def envuelto(*args, **kwargs):
+            perfil = perfil_actual.get()
+            if perfil is None:
+                return endpoint(*args, **kwargs)
+            with perfil.endpoint():
+                return endpoint(*args, **kwargs)
+    envuelto._perfilable = True
+    return envuelto
+
+
+class RequestProfiler:
+
+    def __init__(self, activo: bool = PROFILING_ENABLED, muestreo: float = PROFILING_SAMPLE_RATE,
+                 capacidad: int = PROFILING_SAMPLES, perfilador: str = PROFILING_PERFILADOR,
+                 directorio: str = PROFILING_DIR, max_archivos: int = PROFILING_MAX_ARCHIVOS):
+        self.activo = activo
+        self.muestreo = muestreo
+        self.prefijo: Optional[str] = None
+        self.perfilador = perfilador if perfilador in PERFILADORES else "tiempos"
+        self.directorio = directorio
+        self.max_archivos = max_archivos
+        self._muestras: deque = deque(maxlen=capacidad)
+        self._lock = threading.Lock()
+        self._medidas = 0
+        self._capturas = 0
+
+    def configurar(self, activo: bool, muestreo: Optional[float] = None, prefijo: Optional[str] = None,
+                   perfilador: Optional[str] = None) -> None:
+        if perfilador is not None and perfilador not in PERFILADORES:
+            raise ValueError(f"Perfilador desconocido: {perfilador}. Opciones: {', '.join(PERFILADORES)}")
+        self.activo = activo
+        if muestreo is not None:
+            self.muestreo = muestreo
+        self.prefijo = prefijo or None
+        if perfilador is not None:
+            self.perfilador = perfilador
+
+    def debe_perfilar(self, ruta: str) -> bool:
+        if not self.activo:
+            return False
+        if self.prefijo and not ruta.startswith(self.prefijo):
+            return False
+        return self.muestreo >= 1.0 or random.random() < self.muestreo
+
+    def iniciar_perfil(self, scope) -> Optional[PerfilPeticion]:
+        """Perfil para la petición o None si no se mide (header de admin o configuración)"""
+        perfilador = self._pedido_por_header(scope)
+        por_header = perfilador is not None
+        if perfilador is None:
+            if not self.debe_perfilar(scope["path"]):
+                return None
+            perfilador = self.perfilador
+        if perfilador != "tiempos":
+            with self._lock:
+                if self._capturas >= _MAX_CAPTURAS_SIMULTANEAS:
+                    perfilador = "tiempos"
+                else:
+                    self._capturas += 1
+        perfil = PerfilPeticion(perfilador, scope["method"], scope["path"], por_header=por_header)
+        perfil.iniciar()
+        return perfil
+
+    def finalizar(self, perfil: PerfilPeticion, estado: int) -> None:
+        perfil.detener()
+        if perfil.perfilador != "tiempos":
+            with self._lock:
+                self._capturas -= 1
+        self.registrar(perfil.metodo, perfil.ruta, estado, perfil.duracion_ms(), perfil.desglose())
+
+    def registrar(self, metodo: str, ruta: str, estado: int, duracion_ms: float,
+                  desglose: Optional[Dict] = None) -> None:
+        with self._lock:
+            self._medidas += 1
+            self._muestras.append({
+                "metodo": metodo,
+                "ruta": ruta,
+                "estado": estado,
+                "duracion_ms": round(duracion_ms, 2),
+                "fecha": datetime.utcnow(),
+                **(desglose or {})
+            })
+
+    def muestras(self, limite: int = 50) -> List[Dict]:
+        with self._lock:
+            return list(reversed(self._muestras))[:limite]
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._muestras.clear()
+
+    def estadisticas(self) -> Dict:
+        flamegraphs = len(self._archivos())
+        with self._lock:
+            return {
+                "activo": self.activo,
+                "muestreo": self.muestreo,
+                "prefijo": self.prefijo,
+                "perfilador": self.perfilador,
+                "medidas": self._medidas,
+                "muestras": len(self._muestras),
+                "capacidad": self._muestras.maxlen,
+                "flamegraphs": flamegraphs
+            }
+
+    # ---- Flamegraphs ----
+
+    def guardar_flamegraph(self, perfil: PerfilPeticion) -> Optional[str]:
+        """Escribe las pilas del perfil en el directorio y descarta los archivos más viejos"""
+        if not perfil.pilas or perfil.flamegraph is None:
+            return None
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            with open(os.path.join(self.directorio, perfil.flamegraph), "w", encoding="utf-8") as f:
+                f.write(perfil.collapsed())
+            for nombre in self._archivos()[self.max_archivos:]:
+                os.remove(os.path.join(self.directorio, nombre))
+        except OSError as e:
+            print(f"[ERROR] No se pudo guardar el flamegraph {perfil.flamegraph}: {e}")
+            return None
+        return perfil.flamegraph
+
+    def flamegraphs(self) -> List[Dict]:
+        """Archivos guardados, los más recientes primero"""
+        archivos = []
+        for nombre in self._archivos():
+            try:
+                info = os.stat(os.path.join(self.directorio, nombre))
+            except OSError:
+                continue
+            archivos.append({"nombre": nombre, "bytes": info.st_size, "fecha": datetime.utcfromtimestamp(info.st_mtime)})
+        return archivos
+
+    def ruta_flamegraph(self, nombre: str) -> Optional[str]:
+        """Ruta del archivo o None si el nombre no es válido o no existe"""
+        if not _NOMBRE_ARCHIVO.match(nombre):
+            return None
+        ruta = os.path.join(self.directorio, nombre)
+        return ruta if os.path.isfile(ruta) else None
+
+    # ---- Internos ----
+
+    def _archivos(self) -> List[str]:
+        try:
+            nombres = [n for n in os.listdir(self.directorio) if _NOMBRE_ARCHIVO.match(n)]
+        except OSError:
+            return []
+        # El nombre empieza con la fecha: orden inverso = más recientes primero
+        return sorted(nombres, reverse=True)
+
+    def _pedido_por_header(self, scope) -> Optional[str]:
+        valor = None
+        token = None
+        for nombre, contenido in scope.get("headers", ()):
+            if nombre == HEADER_PERFILAR:
+                valor = contenido.decode("latin-1").strip().lower()
+            elif nombre == b"authorization":
+                token = contenido.decode("latin-1")
+        if valor is None:
+            return None
+        if not token or not token.lower().startswith("bearer ") or not self._es_admin(token[7:].strip()):
+            return None
+        return valor if valor in PERFILADORES else "muestreo"
+
+    @staticmethod
+    def _es_admin(token: str) -> bool:
+        from fastapi import HTTPException
+        from app.shared.decorators.auth_decorators import verify_token
+        try:
+            return verify_token(token).get("rol") == "admin"
+        except HTTPException:
+            return False
+
+
+# Instancia compartida por proceso
+request_profiler = RequestProfiler()
@@ -0,0 +1,156 @@
+"""
+Benchmark de inicio de sesión: ráfaga de logins al comienzo de la jornada
+
+Varios clientes inician sesión en paralelo mientras otro cliente consulta
+/api/health sin pausa; se reporta el throughput de logins y la latencia de
+ambas rutas. Con --inline bcrypt corre directamente en el event loop (como
+sería sin el pool) para comparar cuánto afecta a las demás rutas.
+
+Por defecto corre contra la aplicación en proceso con una BD SQLite temporal.
+Con --url corre contra un servidor levantado (los usuarios se crean por la API).
+
+Uso:
+    python benchmarks/benchmark_login.py
+    python benchmarks/benchmark_login.py --inline
+    python benchmarks/benchmark_login.py --logins 400 --concurrencia 64 --costo 12
+    python benchmarks/benchmark_login.py --url http://localhost:5000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = "jornada-2025"
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def _resumen(nombre, latencias):
+    if not latencias:
+        return f"{nombre}: sin datos"
+    return (
+        f"{nombre} ms: p50={statistics.median(latencias):.2f} p95={_percentil(latencias, 95):.2f} "
+        f"p99={_percentil(latencias, 99):.2f} max={max(latencias):.2f} (n={len(latencias)})"
+    )
+
+
+async def _cliente_login(cliente, pendientes, latencias, resultados):
+    while pendientes:
+        username = pendientes.pop()
+        inicio = time.perf_counter()
+        respuesta = await cliente.post("/api/usuarios/auth/login", json={"username": username, "password": PASSWORD})
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        resultados[respuesta.status_code] = resultados.get(respuesta.status_code, 0) + 1
+
+
+async def _sonda(cliente, latencias, terminado):
+    while not terminado.is_set():
+        inicio = time.perf_counter()
+        await cliente.get("/api/health")
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        await asyncio.sleep(0.005)
+
+
+async def _simular(cliente, usuarios: int, logins: int, concurrencia: int):
+    pendientes = [f"usuario{i % usuarios}" for i in range(logins)]
+    latencias_login, latencias_sonda, resultados = [], [], {}
+    terminado = asyncio.Event()
+
+    # Línea base de la otra ruta sin logins en curso
+    sonda = asyncio.create_task(_sonda(cliente, latencias_sonda, terminado))
+    await asyncio.sleep(1)
+    terminado.set()
+    await sonda
+    base = list(latencias_sonda)
+    latencias_sonda.clear()
+    terminado.clear()
+
+    sonda = asyncio.create_task(_sonda(cliente, latencias_sonda, terminado))
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_cliente_login(cliente, pendientes, latencias_login, resultados) for _ in range(concurrencia)))
+    duracion = time.perf_counter() - inicio
+    terminado.set()
+    await sonda
+
+    print(f"Logins: {len(latencias_login)} en {duracion:.2f}s ({len(latencias_login) / duracion:.1f}/s) "
+          f"con {concurrencia} clientes")
+    print(f"Respuestas: {dict(sorted(resultados.items()))}  (200 ok, 503 cola de hash llena)")
+    print(_resumen("Login", latencias_login))
+    print(_resumen("/api/health sin logins", base))
+    print(_resumen("/api/health durante logins", latencias_sonda))
+
+
+async def _en_proceso(args):
+    import httpx
+
+    ruta = os.path.join(tempfile.mkdtemp(), "login.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{ruta}"
+    # Todas las peticiones salen del mismo cliente: sin límite por cliente
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    if args.costo:
+        os.environ["BCRYPT_ROUNDS"] = str(args.costo)
+
+    from sqlalchemy import insert
+    from app import create_app
+    from app.config import database
+    from app.modules.profesores.models import profesor_models  # noqa: F401 (FK a personas)
+    from app.modules.retiros_tempranos.models import retiro_models  # noqa: F401 (precarga del lifespan)
+    from app.modules.usuarios.models.usuario_models import Usuario
+    from app.modules.usuarios.services.password_hasher import password_hasher
+    from app.shared.models import audit_models, job_models, notification_models  # noqa: F401
+
+    database.engine.echo = False
+    database.Base.metadata.create_all(database.engine)
+    # Un solo hash para todos los usuarios: el costo de verificar es el mismo
+    password_hash = await password_hasher.hash(PASSWORD)
+    print(f"Costo bcrypt: {await password_hasher.obtener_costo()}  pool: {password_hasher.estadisticas()['pool']} "
+          f"x{password_hasher.estadisticas()['workers']}{'  (INLINE en el event loop)' if args.inline else ''}")
+    with database.engine.begin() as conn:
+        conn.execute(insert(Usuario), [
+            {"username": f"usuario{i}", "password_hash": password_hash, "rol": "profesor"} for i in range(args.usuarios)
+        ])
+
+    if args.inline:
+        async def _ejecutar_inline(funcion, *argumentos):
+            return funcion(*argumentos)
+        password_hasher._ejecutar = _ejecutar_inline
+
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://login", timeout=60) as cliente:
+            await _simular(cliente, args.usuarios, args.logins, args.concurrencia)
+
+
+async def _remoto(args):
+    import httpx
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=60) as cliente:
+        for i in range(args.usuarios):
+            await cliente.post("/api/usuarios/", json={"username": f"usuario{i}", "password": PASSWORD})
+        await _simular(cliente, args.usuarios, args.logins, args.concurrencia)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usuarios", type=int, default=100)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrencia", type=int, default=32, help="Clientes iniciando sesión a la vez")
+    parser.add_argument("--costo", type=int, help="Costo bcrypt fijo (por defecto se calibra)")
+    parser.add_argument("--inline", action="store_true", help="Ejecutar bcrypt en el event loop (comparación)")
+    parser.add_argument("--url", help="Servidor a medir en lugar de la aplicación en proceso")
+    args = parser.parse_args()
+
+    asyncio.run(_remoto(args) if args.url else _en_proceso(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark de portería: simula la salida masiva de la tarde en retiros tempranos
+
+Varias "puertas" atienden en paralelo a apoderados que llegan a retirar
+estudiantes: consultan por CI los estudiantes autorizados y registran la
+salida. Se mezclan apoderados no autorizados y retiros repetidos.
+
+Por defecto corre contra la aplicación en proceso con una BD SQLite temporal
+(carga los datos, mide y verifica que todas las salidas llegaron a la BD).
+Con --url corre contra un servidor levantado (los datos se cargan por la API).
+
+Uso:
+    python benchmarks/benchmark_retiros.py
+    python benchmarks/benchmark_retiros.py --estudiantes 2000 --puertas 32
+    python benchmarks/benchmark_retiros.py --url http://localhost:5000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def _datos(estudiantes: int):
+    """Autorizaciones: uno o dos apoderados por estudiante, algunos con varios hijos"""
+    autorizaciones = []
+    for id_estudiante in range(1, estudiantes + 1):
+        familia = (id_estudiante + 1) // 2 if id_estudiante % 5 == 0 else id_estudiante
+        for rol, parentesco in ((0, "madre"), (1, "padre"))[: 1 + id_estudiante % 2]:
+            autorizaciones.append({
+                "id_estudiante": id_estudiante,
+                "ci_estudiante": f"E{id_estudiante:07d}",
+                "nombre_estudiante": f"Estudiante {id_estudiante}",
+                "ci_apoderado": f"{9000000 + familia * 2 + rol}",
+                "nombre_apoderado": f"Apoderado {familia}-{rol}",
+                "parentesco": parentesco
+            })
+    return autorizaciones
+
+
+async def _puerta(cliente, llegadas, latencias, resultados):
+    while llegadas:
+        ci_apoderado, id_estudiante = llegadas.pop()
+        inicio = time.perf_counter()
+        respuesta = await cliente.get(f"/api/retiros/apoderado/{ci_apoderado}")
+        if respuesta.status_code == 200:
+            respuesta = await cliente.post(
+                "/api/retiros/salida", json={"ci_apoderado": ci_apoderado, "id_estudiante": id_estudiante}
+            )
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        resultados[respuesta.status_code] = resultados.get(respuesta.status_code, 0) + 1
+
+
+async def _simular(cliente, autorizaciones, puertas: int, repetidos: float, intrusos: float):
+    llegadas = [(a["ci_apoderado"], a["id_estudiante"]) for a in autorizaciones]
+    random.shuffle(llegadas)
+    llegadas += random.sample(llegadas, int(len(llegadas) * repetidos))
+    llegadas += [(f"{1000000 + i}", random.randint(1, len(autorizaciones))) for i in range(int(len(llegadas) * intrusos))]
+    random.shuffle(llegadas)
+
+    latencias, resultados = [], {}
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_puerta(cliente, llegadas, latencias, resultados) for _ in range(puertas)))
+    duracion = time.perf_counter() - inicio
+
+    print(f"Llegadas: {len(latencias)} en {duracion:.2f}s ({len(latencias) / duracion:.0f}/s) con {puertas} puertas")
+    print(f"Respuestas: {dict(sorted(resultados.items()))}  (201 salida, 403 no autorizado, 409 ya retirado)")
+    print(
+        f"Latencia (consulta + salida) ms: p50={statistics.median(latencias):.2f} "
+        f"p95={_percentil(latencias, 95):.2f} p99={_percentil(latencias, 99):.2f} max={max(latencias):.2f}"
+    )
+    return resultados.get(201, 0)
+
+
+async def _en_proceso(args):
+    import httpx
+
+    ruta = os.path.join(tempfile.mkdtemp(), "retiros.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{ruta}"
+    # Todas las peticiones salen del mismo cliente: sin límite por cliente
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+    from sqlalchemy import func, insert
+    from app import create_app
+    from app.config import database
+    from app.modules.profesores.models import profesor_models  # noqa: F401 (FK a cursos y personas)
+    from app.modules.retiros_tempranos.models.retiro_models import AutorizacionRetiro, RegistroRetiro
+    from app.shared.models import audit_models, job_models, notification_models  # noqa: F401
+
+    database.engine.echo = False
+    database.Base.metadata.create_all(database.engine)
+    autorizaciones = _datos(args.estudiantes)
+    with database.engine.begin() as conn:
+        conn.execute(insert(AutorizacionRetiro), autorizaciones)
+    # Los retiros elegibles son uno por estudiante
+    esperados = len({a["id_estudiante"] for a in autorizaciones})
+
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://porteria") as cliente:
+            registrados = await _simular(cliente, autorizaciones, args.puertas, args.repetidos, args.intrusos)
+
+    db = database.SessionLocal()
+    en_bd = db.query(func.count(RegistroRetiro.id_retiro)).scalar()
+    db.close()
+    print(f"Salidas registradas: {registrados}/{esperados}; filas en retiros_registro tras el apagado: {en_bd}")
+    if registrados != esperados or en_bd != registrados:
+        sys.exit("ERROR: las salidas registradas no coinciden")
+
+
+async def _remoto(args):
+    import httpx
+
+    autorizaciones = _datos(args.estudiantes)
+    async with httpx.AsyncClient(base_url=args.url, timeout=30) as cliente:
+        for autorizacion in autorizaciones:
+            await cliente.post("/api/retiros/autorizaciones", json=autorizacion)
+        await _simular(cliente, autorizaciones, args.puertas, args.repetidos, args.intrusos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--estudiantes", type=int, default=1000)
+    parser.add_argument("--puertas", type=int, default=16, help="Atenciones simultáneas")
+    parser.add_argument("--repetidos", type=float, default=0.05, help="Fracción de retiros repetidos")
+    parser.add_argument("--intrusos", type=float, default=0.02, help="Fracción de apoderados no autorizados")
+    parser.add_argument("--url", help="Servidor a medir en lugar de la aplicación en proceso")
+    args = parser.parse_args()
+
+    random.seed(7)
+    asyncio.run(_remoto(args) if args.url else _en_proceso(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Crea el primer usuario admin
+
+Las altas de usuarios por la API requieren un token de admin, así que el
+primero se crea desde la consola:
+
+    python crear_admin.py <username> [correo]
+"""
+import asyncio
+import getpass
+import sys
+
+from app.config.database import SessionLocal
+from app.modules.usuarios.dto.usuario_dto import UsuarioCreateDTO
+from app.modules.usuarios.services.password_hasher import password_hasher
+from app.modules.usuarios.services.usuario_service import UsuarioService
+
+
+def main(argv) -> int:
+    if len(argv) not in (2, 3):
+        print(__doc__)
+        return 2
+    password = getpass.getpass("Contraseña: ")
+    if password != getpass.getpass("Repetir contraseña: "):
+        print(" ERROR: Las contraseñas no coinciden")
+        return 1
+    db = SessionLocal()
+    try:
+        data = UsuarioCreateDTO(username=argv[1], password=password, correo=argv[2] if len(argv) == 3 else None, rol="admin")
+        usuario = asyncio.run(UsuarioService.crear_usuario(db, data))
+    except Exception as e:
+        print(" ERROR: No se pudo crear el usuario:", getattr(e, "detail", e))
+        return 1
+    finally:
+        db.close()
+        password_hasher.cerrar()
+    print(f"Usuario admin '{usuario.username}' creado (id {usuario.id_usuario})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
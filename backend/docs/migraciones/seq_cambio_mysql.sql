@@ -0,0 +1,64 @@
+-- Sincronización incremental (?since=) sobre una BD MySQL existente
+--
+-- Agrega seq_cambio a las seis tablas rastreadas, las tablas de lápidas y de
+-- versiones, y el índice FULLTEXT de la búsqueda de profesores. Las BD nuevas
+-- los crean desde los modelos; este script es solo para las ya creadas.
+--
+-- Backfill: las filas existentes quedan con seq_cambio = 1 y cada secuencia
+-- arranca en 1, así que cualquier cliente con since >= 1 ya las tiene (las
+-- recibió en una carga completa). Si la BD ya usaba la secuencia global
+-- "cambios" de la primera versión, las secuencias por entidad continúan desde
+-- su valor para que ningún "since" guardado por un cliente retroceda.
+
+ALTER TABLE personas
+    ADD COLUMN seq_cambio BIGINT NULL,
+    ADD INDEX ix_personas_seq_cambio (seq_cambio),
+    ADD FULLTEXT INDEX ft_personas_busqueda (nombres, apellido_paterno, apellido_materno, ci, correo);
+ALTER TABLE profesores ADD COLUMN seq_cambio BIGINT NULL, ADD INDEX ix_profesores_seq_cambio (seq_cambio);
+ALTER TABLE materias ADD COLUMN seq_cambio BIGINT NULL, ADD INDEX ix_materias_seq_cambio (seq_cambio);
+ALTER TABLE cursos ADD COLUMN seq_cambio BIGINT NULL, ADD INDEX ix_cursos_seq_cambio (seq_cambio);
+ALTER TABLE profesores_cursos_materias ADD COLUMN seq_cambio BIGINT NULL, ADD INDEX ix_asignaciones_seq_cambio (seq_cambio);
+ALTER TABLE bloques_horarios ADD COLUMN seq_cambio BIGINT NULL, ADD INDEX ix_bloques_seq_cambio (seq_cambio);
+
+CREATE TABLE IF NOT EXISTS versiones_datos (
+    nombre VARCHAR(100) NOT NULL,
+    version BIGINT NOT NULL,
+    fecha_actualizacion DATETIME NOT NULL,
+    PRIMARY KEY (nombre)
+);
+
+CREATE TABLE IF NOT EXISTS registros_eliminados (
+    id_registro BIGINT NOT NULL AUTO_INCREMENT,
+    entidad VARCHAR(50) NOT NULL,
+    clave VARCHAR(100) NOT NULL,
+    seq_cambio BIGINT NOT NULL,
+    fecha DATETIME NOT NULL,
+    PRIMARY KEY (id_registro),
+    INDEX ix_registros_eliminados_entidad_seq (entidad, seq_cambio),
+    INDEX ix_registros_eliminados_fecha (fecha)
+);
+
+-- Backfill de las filas existentes
+UPDATE personas SET seq_cambio = 1 WHERE seq_cambio IS NULL;
+UPDATE profesores SET seq_cambio = 1 WHERE seq_cambio IS NULL;
+UPDATE materias SET seq_cambio = 1 WHERE seq_cambio IS NULL;
+UPDATE cursos SET seq_cambio = 1 WHERE seq_cambio IS NULL;
+UPDATE profesores_cursos_materias SET seq_cambio = 1 WHERE seq_cambio IS NULL;
+UPDATE bloques_horarios SET seq_cambio = 1 WHERE seq_cambio IS NULL;
+
+-- Secuencias por entidad (ver rastrear() en profesor_models.py)
+INSERT IGNORE INTO versiones_datos (nombre, version, fecha_actualizacion)
+SELECT s.nombre, GREATEST(1, COALESCE((SELECT version FROM versiones_datos WHERE nombre = 'cambios'), 1)), NOW()
+FROM (
+    SELECT 'cambios.profesores' AS nombre UNION ALL SELECT 'cambios.materia' UNION ALL SELECT 'cambios.curso'
+    UNION ALL SELECT 'cambios.asignacion' UNION ALL SELECT 'cambios.bloque'
+) s;
+
+INSERT IGNORE INTO versiones_datos (nombre, version, fecha_actualizacion)
+SELECT CONCAT(s.nombre, '.purgado'), g.version, NOW()
+FROM versiones_datos g
+JOIN (
+    SELECT 'cambios.profesores' AS nombre UNION ALL SELECT 'cambios.materia' UNION ALL SELECT 'cambios.curso'
+    UNION ALL SELECT 'cambios.asignacion' UNION ALL SELECT 'cambios.bloque'
+) s
+WHERE g.nombre = 'cambios.purgado';
@@ -3,19 +3,40 @@ Punto de entrada principal para la aplicación BRISA Backend
 """
 
 import os
-import uvicorn
-from app import create_app
 
 # Obtener configuración del entorno
 config_name = os.environ.get('ENV', 'development')
 
-# Crear aplicación
-app = create_app(config_name)
+
+def __getattr__(nombre):
+    # `uvicorn run:app` sigue funcionando, pero la app se arma al pedirla y no
+    # al importar run.py (el proceso vigilante de --reload nunca la necesita)
+    if nombre == "app":
+        global app
+        from app import create_app
+        app = create_app(config_name)
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
 
 if __name__ == '__main__':
-    # Configuración para desarrollo
+    import sys
+    import uvicorn
+
     port = int(os.environ.get('PORT', 8000))
-    reload = os.environ.get('ENV', 'development') == 'development'
+    # Producción (o WEB_WORKERS > 1): varios workers con reciclado, ver app/core/launcher.py
+    multiproceso = config_name == 'production' or int(os.environ.get('WEB_WORKERS', 1)) > 1
+
+    if multiproceso:
+        from app.core.launcher import AjustesLanzador, Lanzador
+
+        ajustes = AjustesLanzador.desde_entorno("run:app", os.environ.get('HOST', '0.0.0.0'), port)
+        print(f"🚀 Iniciando BRISA Backend API en puerto {port} ({ajustes.workers} workers)")
+        print(f"📝 Entorno: {config_name}")
+        sys.exit(Lanzador(ajustes).ejecutar())
+
+    # Configuración para desarrollo
+    reload = config_name == 'development'
     
     print(f"🚀 Iniciando BRISA Backend API en puerto {port}")
     print(f"📝 Entorno: {config_name}")
@@ -30,4 +51,4 @@ if __name__ == '__main__':
         port=port,
         reload=reload,
         log_level="info"
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,76 @@
+"""
+Fixtures compartidas: BD SQLite temporal con todas las tablas y conteo de consultas
+
+Un test que necesita datos propios redefine `db` en su módulo; si usa la
+profesora base (cargo 1, persona 1, profesor 1) parte de `db_profesor`:
+
+    @pytest.fixture
+    def db(db_profesor):
+        db_profesor.add(...)
+        db_profesor.commit()
+        return db_profesor
+"""
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.config.database import Base
+# Registrar todos los modelos en Base.metadata
+from app.modules.esquelas.models import esquela_models  # noqa: F401
+from app.modules.incidentes.models import incidente_models  # noqa: F401
+from app.modules.profesores.models import profesor_models  # noqa: F401
+from app.modules.profesores.models.profesor_models import Cargo, Persona, Profesor
+from app.modules.reportes.models import reporte_models  # noqa: F401
+from app.modules.retiros_tempranos.models import retiro_models  # noqa: F401
+from app.modules.usuarios.models import usuario_models  # noqa: F401
+from app.shared.models import (  # noqa: F401
+    audit_models, change_models, job_models, notification_models, version_models
+)
+
+@pytest.fixture
+def crear_engine(tmp_path):
+    """Fábrica de engines SQLite en tmp_path; se liberan al terminar el test"""
+    engines = []
+
+    def crear(nombre="test.db", tablas=True):
+        engine = create_engine(f"sqlite:///{tmp_path / nombre}")
+        if tablas:
+            Base.metadata.create_all(engine)
+        engines.append(engine)
+        return engine
+
+    yield crear
+    for engine in engines:
+        engine.dispose()
+
+@pytest.fixture
+def engine(crear_engine):
+    return crear_engine()
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine)
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+@pytest.fixture
+def db_profesor(db):
+    """Sesión con el cargo "Docente" y la profesora Ana Rojas (id 1 en las tres tablas)"""
+    db.add_all([
+        Cargo(id_cargo=1, nombre_cargo="Docente"),
+        Persona(id_persona=1, ci="1000001", nombres="Ana", apellido_paterno="Rojas", correo="ana@example.com",
+                tipo_persona="profesor", id_cargo=1),
+        Profesor(id_profesor=1, id_persona=1),
+    ])
+    db.commit()
+    return db
+
+@pytest.fixture
+def consultas(engine):
+    """Sentencias SQL ejecutadas en el engine (limpiar antes de medir)"""
+    registradas = []
+    event.listen(engine, "before_cursor_execute", lambda *args: registradas.append(args[2]))
+    return registradas
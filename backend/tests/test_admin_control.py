@@ -0,0 +1,150 @@
+import asyncio
+import os
+import time
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.modules.profesores.repositories.profesor_repository import PersonaRepository
+from app.modules.usuarios.models.usuario_models import Usuario
+from app.core.middleware import ProfilingMiddleware
+from app.modules.administracion.dto.control_dto import ConsultasLentasConfigDTO
+from app.modules.administracion.services import control_service
+from app.modules.administracion.services.control_service import ControlService
+from app.shared.services.change_feed import ChangeFeed, FanoutLocal
+from app.shared.services.cache_registry import CacheRegistry
+from app.shared.services.query_monitor import QueryMonitor, huella_sql, parametros_seguros
+from app.shared.services.request_profiler import RequestProfiler
+import app.core.middleware as middleware
+
+def test_cache_registry_estadisticas_y_vaciado():
+    registro = CacheRegistry()
+    datos = {"a": 1}
+    registro.registrar("demo", lambda: {"entradas": len(datos)}, datos.clear, "Caché de prueba")
+    registro.registrar("rota", lambda: 1 / 0, lambda: None)
+
+    stats = registro.estadisticas()
+    assert stats["demo"] == {"descripcion": "Caché de prueba", "entradas": 1}
+    assert "error" in stats["rota"]
+
+    assert registro.vaciar("demo") is True
+    assert registro.estadisticas()["demo"]["entradas"] == 0
+    assert registro.vaciar("no-existe") is False
+
+def test_cambios_de_control_se_difunden_a_los_demas_workers(monkeypatch):
+    feed, monitor, registro = ChangeFeed(FanoutLocal()), QueryMonitor(umbral_ms=500), CacheRegistry()
+    publicados = []
+    feed.escuchar("control", publicados.append)
+    vaciadas = []
+    registro.registrar("demo", dict, lambda: vaciadas.append("demo"))
+    for nombre, valor in (("change_feed", feed), ("query_monitor", monitor), ("cache_registry", registro)):
+        monkeypatch.setattr(control_service, nombre, valor)
+
+    ControlService.configurar_consultas_lentas(ConsultasLentasConfigDTO(umbral_ms=50))
+    assert [c.pid for c in ControlService.vaciar_caches()] == [os.getpid()]
+    umbral, vaciado = publicados
+    assert (umbral["entidad"], umbral["accion"], umbral["datos"]["umbral_ms"]) == ("control", "consultas_lentas", 50)
+
+    # El worker que lo originó no lo aplica otra vez al recibirlo del feed
+    monitor.configurar(500)
+    ControlService.aplicar_difusion(umbral)
+    ControlService.aplicar_difusion(vaciado)
+    assert monitor.umbral_ms == 500 and vaciadas == ["demo"]
+
+    # Otro worker sí
+    for evento in (umbral, vaciado):
+        evento["clave"]["origen"] = "otro-host:4242"
+        ControlService.aplicar_difusion(evento)
+    assert monitor.umbral_ms == 50 and vaciadas == ["demo", "demo"]
+
+def test_query_monitor_guarda_solo_consultas_sobre_umbral(engine):
+    monitor = QueryMonitor(umbral_ms=10_000, capacidad=2)
+    monitor.instalar(engine)
+    monitor.instalar(engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        monitor.configurar(0)
+        for i in range(3):
+            conn.execute(text(f"SELECT {i}"))
+
+    stats = monitor.estadisticas()
+    assert (stats["consultas"], stats["lentas"], stats["muestras"]) == (4, 3, 2)
+    assert [m["sql"] for m in monitor.muestras()] == ["SELECT 2", "SELECT 1"]
+
+    monitor.limpiar()
+    assert monitor.muestras() == []
+
+def test_query_monitor_agrupa_por_huella_con_origen_y_plan(engine):
+    assert huella_sql("SELECT * FROM t WHERE a = 'x'  AND b IN (%(b_1)s, %(b_2)s) LIMIT 10") == \
+        "SELECT * FROM t WHERE a = ? AND b IN (...) LIMIT ?"
+
+    monitor = QueryMonitor(umbral_ms=0, explain=True, explain_segundos=600)
+    monitor.instalar(engine)
+
+    with Session(engine) as db:
+        PersonaRepository.get_ci_correo_existentes(db, ["1", "2"], [])
+        PersonaRepository.get_ci_correo_existentes(db, ["3", "4", "5"], [])
+        db.execute(text("SELECT 1"))
+        db.execute(text("SELECT 2 + 2"))
+
+    ranking = monitor.ranking(orden="veces")
+    assert len(ranking) == 3
+    personas = ranking[0]
+    assert personas["veces"] == 2 and "IN (...)" in personas["huella"]
+    assert list(personas["origenes"]) and all(
+        "PersonaRepository.get_ci_correo_existentes" in origen for origen in personas["origenes"]
+    )
+    assert monitor.muestras()[-1]["huella_id"] == personas["huella_id"]
+
+    # Un solo EXPLAIN por huella, tomado en segundo plano
+    for _ in range(100):
+        if monitor.estadisticas()["planes"] >= 3:
+            break
+        time.sleep(0.02)
+    personas = next(h for h in monitor.ranking() if h["huella_id"] == personas["huella_id"])
+    assert personas["plan_error"] is None
+    assert any("persona" in str(fila).lower() for fila in personas["plan"])
+    assert monitor.estadisticas()["planes"] == 3
+
+    monitor.limpiar()
+    assert monitor.ranking() == []
+
+def test_query_monitor_no_guarda_parametros_ni_hashes(engine):
+    with Session(engine) as db:
+        monitor = QueryMonitor(umbral_ms=0, explain=False)
+        monitor.instalar(engine)
+        db.execute(text("SELECT :ci"), {"ci": "1000001"})
+        assert monitor.muestras()[0]["parametros"] is None
+
+        monitor.parametros = True
+        db.execute(text("SELECT :ci"), {"ci": "1000001"})
+        db.add(Usuario(username="ana", password_hash="$2b$12$secreto", rol="admin"))
+        db.commit()
+    insercion, seleccion = monitor.muestras(limite=2)
+    assert "'1000001'" in seleccion["parametros"]
+    assert "password_hash" in insercion["sql"] and insercion["parametros"] == "***"
+    assert parametros_seguros("UPDATE usuarios SET password_hash=%(password_hash)s WHERE id_usuario=%(id)s",
+                              {"password_hash": "$2b$12$secreto", "id": 1}) == "{'password_hash': '***', 'id': 1}"
+
+def test_profiling_middleware_respeta_toggle_y_prefijo(monkeypatch):
+    perfilador = RequestProfiler(activo=False)
+    monkeypatch.setattr(middleware, "request_profiler", perfilador)
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def pedir(ruta):
+        enviados = []
+        async def send(mensaje):
+            enviados.append(mensaje)
+        await ProfilingMiddleware(app)({"type": "http", "method": "GET", "path": ruta}, None, send)
+        return dict(enviados[0]["headers"])
+
+    assert b"server-timing" not in asyncio.run(pedir("/api/profesores/"))
+
+    perfilador.configurar(True, prefijo="/api/profesores")
+    assert b"server-timing" not in asyncio.run(pedir("/api/profesores/"))
+    asyncio.run(pedir("/api/retiros/hoy"))
+
+    muestras = perfilador.muestras()
+    assert [(m["ruta"], m["estado"]) for m in muestras] == [("/api/profesores/", 204)]
@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+import app.core.middleware as middleware
+from app.core.middleware import AdmissionMiddleware
+from app.shared.services.admission_control import AdmissionController, Rechazo, TokenBucket, parsear_reglas
+
+def test_token_bucket_rafaga_y_recarga():
+    bucket = TokenBucket(capacidad=2, tasa=4)
+    ahora = bucket.ultimo
+    assert bucket.consumir(ahora) == 0 and bucket.consumir(ahora) == 0
+    assert bucket.consumir(ahora) == pytest.approx(0.25)
+    assert bucket.consumir(ahora + 0.25) == 0
+
+def test_reglas_por_ruta_y_prefijo_mas_largo():
+    assert parsear_reglas("/api=50:5; /api/usuarios/auth/login=2:0.1") == [
+        ("/api/usuarios/auth/login", 2, 0.1), ("/api", 50, 5)
+    ]
+    control = AdmissionController(rafaga=100, tasa=10, reglas="/api/usuarios/auth/login=2:0.1", max_concurrencia=5)
+    for _ in range(2):
+        control.verificar_tasa("10.0.0.1", "/api/usuarios/auth/login")
+    with pytest.raises(Rechazo) as rechazo:
+        control.verificar_tasa("10.0.0.1", "/api/usuarios/auth/login")
+    assert (rechazo.value.estado, rechazo.value.reintentar_en) == (429, 10)
+    # Otro cliente y otras rutas del mismo cliente siguen atendidos
+    control.verificar_tasa("10.0.0.2", "/api/usuarios/auth/login")
+    control.verificar_tasa("10.0.0.1", "/api/profesores/")
+
+def test_concurrencia_rechaza_con_503_sin_encolar_indefinidamente():
+    control = AdmissionController(max_concurrencia=1, max_espera=1, timeout=0.05)
+
+    async def escenario():
+        await control.admitir()
+        esperando = asyncio.create_task(control.admitir())
+        await asyncio.sleep(0)
+        # La cola de espera (1) está llena: rechazo inmediato
+        with pytest.raises(Rechazo) as inmediato:
+            await control.admitir()
+        with pytest.raises(Rechazo) as por_timeout:
+            await esperando
+        control.liberar()
+        await control.admitir()
+        control.liberar()
+        return inmediato.value, por_timeout.value
+
+    inmediato, por_timeout = asyncio.run(escenario())
+    assert inmediato.estado == por_timeout.estado == 503
+    stats = control.estadisticas()
+    assert (stats["admitidos"], stats["rechazados_503"], stats["en_curso"], stats["en_espera"]) == (2, 2, 0, 0)
+
+def test_middleware_responde_429_con_retry_after(monkeypatch):
+    monkeypatch.setattr(middleware, "admission_controller",
+                        AdmissionController(rafaga=1, tasa=0.5, reglas="", max_concurrencia=2, exentos="/api/health"))
+    llamadas = []
+
+    async def app(scope, receive, send):
+        llamadas.append(scope["path"])
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def pedir(ruta):
+        enviados = []
+        async def send(mensaje):
+            enviados.append(mensaje)
+        scope = {"type": "http", "method": "GET", "path": ruta, "client": ("10.0.0.1", 5000), "headers": []}
+        await AdmissionMiddleware(app)(scope, None, send)
+        return enviados[0]["status"], dict(enviados[0]["headers"])
+
+    assert asyncio.run(pedir("/api/profesores/"))[0] == 200
+    estado, headers = asyncio.run(pedir("/api/profesores/"))
+    assert (estado, headers[b"retry-after"]) == (429, b"2")
+    assert asyncio.run(pedir("/api/health"))[0] == 200
+    assert llamadas == ["/api/profesores/", "/api/health"]
@@ -0,0 +1,51 @@
+import re
+import subprocess
+import sys
+from pathlib import Path
+from fastapi.testclient import TestClient
+from app import create_app
+from app.shared.decorators.auth_decorators import create_access_token
+
+BACKEND = Path(__file__).resolve().parents[1]
+# Tiempo propio (sin dependencias) de importar app y armarla con create_app()
+PRESUPUESTO_IMPORTACION_MS = 150
+
+_SONDA = """
+import sys
+import app
+app.create_app()
+pesados = [m for m in sys.modules if m.startswith("sqlalchemy") or m.endswith("_controller")]
+print("PESADOS=" + ",".join(pesados), file=sys.stderr)
+"""
+
+def test_importacion_dentro_del_presupuesto():
+    salida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _SONDA],
+        cwd=BACKEND, capture_output=True, text=True, check=True
+    ).stderr
+    # Cada línea: "import time: <propio us> | <acumulado us> | <módulo>"
+    propios = {
+        modulo.strip(): int(propio)
+        for propio, _, modulo in re.findall(r"import time:\s+(\d+) \|\s+(\d+) \|(.+)", salida)
+    }
+    total_ms = sum(us for modulo, us in propios.items() if modulo == "app" or modulo.startswith("app.")) / 1000
+    assert total_ms < PRESUPUESTO_IMPORTACION_MS, f"importar app tomó {total_ms:.0f} ms"
+    # Ni el engine (SQLAlchemy) ni los controladores se cargan al importar
+    assert re.search(r"PESADOS=(.*)", salida).group(1) == ""
+
+def test_routers_se_cargan_con_la_primera_peticion():
+    app = create_app()
+    cargador = app.state.routers
+    assert "administracion" in cargador.estadisticas()["pendientes"]
+
+    cliente = TestClient(app)
+    admin = {"Authorization": f"Bearer {create_access_token({'sub': '1', 'rol': 'admin'})}"}
+    assert cliente.get("/api/admin/caches", headers=admin).status_code == 200
+    estadisticas = cargador.estadisticas()
+    assert "administracion" in estadisticas["cargados_ms"] and "profesores" in estadisticas["pendientes"]
+
+    # El esquema OpenAPI incluye también los módulos aún no usados
+    rutas = cliente.get("/openapi.json").json()["paths"]
+    assert "/api/profesores/materias" in rutas and "/api/usuarios/auth/login" in rutas
+    assert cargador.estadisticas()["pendientes"] == []
+    assert cliente.get("/api/no-existe").status_code == 404
@@ -0,0 +1,108 @@
+import time
+import pytest
+from sqlalchemy import func, select
+from app.shared.models.audit_models import AuditLog
+from app.shared.services.audit_writer import AuditWriter
+
+def _entrada(i):
+    return {'user_id': 1, 'action': 'crear', 'entity_type': 'profesor', 'entity_id': i}
+
+def _contar(engine):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(AuditLog.__table__)).scalar()
+
+def test_escribe_por_lotes_al_alcanzar_el_tamano(engine):
+    """Un lote completo se escribe sin esperar el intervalo"""
+    writer = AuditWriter(engine=engine, batch_size=10, flush_interval=60)
+    for i in range(25):
+        writer.registrar(_entrada(i))
+    
+    limite = time.monotonic() + 5
+    while _contar(engine) < 20 and time.monotonic() < limite:
+        time.sleep(0.01)
+    
+    assert _contar(engine) >= 20
+    writer.detener()
+    assert _contar(engine) == 25
+    assert writer.estadisticas()['escritos'] == 25
+
+def test_detener_vacia_lo_pendiente(engine):
+    """El apagado ordenado escribe los registros que quedaban en la cola"""
+    writer = AuditWriter(engine=engine, batch_size=1000, flush_interval=60)
+    for i in range(50):
+        writer.registrar(_entrada(i))
+    writer.detener()
+    
+    assert _contar(engine) == 50
+    assert writer.estadisticas()['pendientes'] == 0
+
+def test_cola_llena_descarta_sin_bloquear(engine):
+    """Con la cola llena registrar() retorna False y cuenta el descarte"""
+    writer = AuditWriter(engine=engine, queue_size=5, batch_size=1000, flush_interval=60)
+    writer._asegurar_iniciado = lambda: None  # sin hilo: la cola no se vacía
+    
+    resultados = [writer.registrar(_entrada(i)) for i in range(8)]
+    
+    assert resultados.count(False) == 3
+    assert writer.estadisticas()['descartados'] == 3
+
+def test_escrituras_de_profesores_y_bloques_quedan_auditadas(db, engine, monkeypatch):
+    """Los servicios de escritura encolan en audit_writer con el usuario y la IP de la petición"""
+    from app.modules.profesores.dto.profesor_dto import (
+        AsignacionCreateDTO, BloqueHorarioCreateDTO, CursoCreateDTO, MateriaCreateDTO, ProfesorCreateDTO,
+        ProfesorUpdateDTO
+    )
+    from app.modules.profesores.services.gestion_service import GestionService
+    from app.modules.profesores.services.profesor_service import (
+        AsignacionService, BloqueHorarioService, CursoService, MateriaService, ProfesorService
+    )
+    from app.modules.reportes.services.reporte_service import ReporteService
+    from app.shared.services import base_services
+    from app.shared.services.base_services import Autor
+
+    writer = AuditWriter(engine=engine, batch_size=1000, flush_interval=60)
+    monkeypatch.setattr(base_services, "audit_writer", writer)
+    monkeypatch.setattr(ReporteService, "programar_recalculo", staticmethod(lambda *args: None))
+    autor = Autor(usuario_id=7, ip="10.0.0.5")
+
+    curso = CursoService.crear_curso(db, CursoCreateDTO(nombre_curso="1ro A", nivel="primaria", gestion="2024"), autor)
+    materia = MateriaService.crear_materia(db, MateriaCreateDTO(nombre_materia="Física", nivel="primaria"), autor)
+    profesor = ProfesorService.crear_profesor(
+        db, ProfesorCreateDTO(ci="1000001", nombres="Ana", apellido_paterno="Rojas"), autor=autor)
+    ProfesorService.actualizar_profesor(db, profesor.id_persona, ProfesorUpdateDTO(telefono="700"), autor=autor)
+    AsignacionService.asignar_materia(db, AsignacionCreateDTO(
+        id_profesor=profesor.id_profesor, id_curso=curso.id_curso, id_materia=materia.id_materia), autor)
+    bloque = BloqueHorarioService.crear_bloque(db, BloqueHorarioCreateDTO(
+        id_profesor=profesor.id_profesor, id_curso=curso.id_curso, id_materia=materia.id_materia,
+        dia_semana="lunes", hora_inicio="08:00", hora_fin="09:00", gestion="2024"))
+    GestionService.archivar_gestion(db, "2024", autor)
+    GestionService.restaurar_gestion(db, "2024", autor)
+    BloqueHorarioService.eliminar_bloque(db, bloque.id_bloque, autor=autor)
+    AsignacionService.eliminar_asignacion(db, profesor.id_profesor, curso.id_curso, materia.id_materia, autor)
+    writer.detener()
+
+    with engine.connect() as conn:
+        filas = conn.execute(select(AuditLog.user_id, AuditLog.action, AuditLog.entity_type, AuditLog.entity_id,
+                                    AuditLog.ip_address).order_by(AuditLog.id_audit)).all()
+    assert [tuple(f[:4]) for f in filas] == [
+        (7, "crear", "curso", curso.id_curso), (7, "crear", "materia", materia.id_materia),
+        (7, "crear", "profesor", profesor.id_persona), (7, "actualizar", "profesor", profesor.id_persona),
+        (7, "crear", "asignacion", None), (None, "crear", "bloque", bloque.id_bloque),
+        (7, "archivar", "gestion", None), (7, "restaurar", "gestion", None),
+        (7, "eliminar", "bloque", bloque.id_bloque), (7, "eliminar", "asignacion", None)
+    ]
+    assert [f.ip_address for f in filas if f.user_id] == ["10.0.0.5"] * 9
+
+def test_fila_invalida_no_descarta_el_lote(engine):
+    """Un IntegrityError reescribe el lote fila por fila: solo la fila mala queda rechazada"""
+    writer = AuditWriter(engine=engine, batch_size=1000, flush_interval=60)
+    for i in range(5):
+        writer.registrar(_entrada(i))
+    writer.registrar({**_entrada(99), 'action': None})
+    writer.detener()
+
+    assert _contar(engine) == 5
+    stats = writer.estadisticas()
+    assert (stats['escritos'], stats['rechazados'], stats['descartados']) == (5, 1, 0)
+    rechazada = writer.rechazadas()[0]
+    assert rechazada['fila']['entity_id'] == 99 and "NOT NULL" in rechazada['error']
@@ -0,0 +1,45 @@
+import asyncio
+import pytest
+from fastapi import Request
+from fastapi.testclient import TestClient
+from app import create_app
+from app.shared.decorators.auth_decorators import create_access_token, get_autor
+from app.shared.services.base_services import Autor
+
+@pytest.fixture(scope="module")
+def cliente():
+    return TestClient(create_app())
+
+def _bearer(rol):
+    return {"Authorization": f"Bearer {create_access_token({'sub': '7', 'rol': rol})}"}
+
+@pytest.mark.parametrize("ruta", ["/api/admin/caches", "/api/admin/consultas-lentas", "/api/admin/jobs/"])
+def test_rutas_admin_sin_token_responden_401(cliente, ruta):
+    respuesta = cliente.get(ruta)
+    assert respuesta.status_code == 401
+    assert respuesta.headers["www-authenticate"] == "Bearer"
+
+def test_token_invalido_responde_401(cliente):
+    assert cliente.get("/api/admin/caches", headers={"Authorization": "Bearer no-es-un-jwt"}).status_code == 401
+    assert cliente.get("/api/admin/caches", headers={"Authorization": "Basic abc"}).status_code == 401
+
+def test_rol_no_permitido_responde_403(cliente):
+    respuesta = cliente.get("/api/admin/caches", headers=_bearer("profesor"))
+    assert respuesta.status_code == 403
+    assert respuesta.json()["detail"] == "Role required: admin"
+
+def test_recalcular_contadores_de_incidentes_exige_admin(cliente):
+    assert cliente.post("/api/incidentes/contadores/recalcular").status_code == 401
+    assert cliente.post("/api/incidentes/contadores/recalcular", headers=_bearer("profesor")).status_code == 403
+
+def test_admin_accede(cliente):
+    assert cliente.get("/api/admin/caches", headers=_bearer("admin")).status_code == 200
+
+def test_autor_lleva_usuario_del_token_e_ip_del_cliente():
+    def pedir(headers):
+        scope = {"type": "http", "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+                 "client": ("10.0.0.5", 5123)}
+        return asyncio.run(get_autor(Request(scope)))
+
+    assert pedir(_bearer("admin")) == Autor(usuario_id=7, ip="10.0.0.5")
+    assert pedir({"X-Forwarded-For": "1.2.3.4"}) == Autor(usuario_id=None, ip="10.0.0.5")
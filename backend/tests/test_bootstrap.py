@@ -0,0 +1,45 @@
+import json
+import pytest
+from app.modules.profesores.dto.profesor_dto import MateriaCreateDTO
+from app.modules.profesores.models.profesor_models import Profesor, Curso
+from app.modules.profesores.services.bootstrap_service import BootstrapService, catalogo_snapshot
+from app.modules.profesores.services.profesor_service import MateriaService
+from app.shared.models.version_models import VersionDatos
+
+@pytest.fixture
+def db(db_profesor):
+    db_profesor.get(Profesor, 1).especialidad = "Física"
+    db_profesor.add(Curso(id_curso=1, nombre_curso="1ro A", nivel="primaria", gestion="2025"))
+    db_profesor.commit()
+    catalogo_snapshot.vaciar()
+    return db_profesor
+
+def test_snapshot_se_construye_una_vez_por_version(db, consultas):
+    respuesta = BootstrapService.obtener_respuesta(db)
+    cuerpo = json.loads(respuesta.body)
+    assert (cuerpo["version"], respuesta.headers["x-catalogo-version"]) == (0, "0")
+    assert cuerpo["profesores"] == [{
+        "id_persona": 1, "id_profesor": 1, "ci": "1000001", "nombre_completo": "Ana Rojas", "correo": "ana@example.com",
+        "id_cargo": 1, "nombre_cargo": "Docente", "estado_laboral": "activo", "especialidad": "Física"
+    }]
+    assert [c["nombre_curso"] for c in cuerpo["cursos"]] == ["1ro A"]
+
+    # Misma versión: una sola lectura por clave primaria y el mismo buffer
+    consultas.clear()
+    otra = BootstrapService.obtener_respuesta(db)
+    assert len(consultas) == 1 and "versiones_datos" in consultas[0]
+    assert otra.body == respuesta.body and otra.headers["etag"] == respuesta.headers["etag"]
+
+    no_modificado = BootstrapService.obtener_respuesta(db, respuesta.headers["etag"])
+    assert no_modificado.status_code == 304 and no_modificado.body == b""
+
+def test_escritura_incrementa_version_e_invalida(db):
+    etag = BootstrapService.obtener_respuesta(db).headers["etag"]
+    MateriaService.crear_materia(db, MateriaCreateDTO(nombre_materia="Matemática", nivel="primaria"))
+    assert db.get(VersionDatos, "profesores.catalogos").version == 1
+
+    respuesta = BootstrapService.obtener_respuesta(db, etag)
+    assert respuesta.status_code == 200 and respuesta.headers["etag"] != etag
+    cuerpo = json.loads(respuesta.body)
+    assert cuerpo["version"] == 1 and [m["nombre_materia"] for m in cuerpo["materias"]] == ["Matemática"]
+    assert catalogo_snapshot.estadisticas()["construcciones"] >= 2
@@ -0,0 +1,124 @@
+import asyncio
+import json
+from datetime import timedelta
+import pytest
+from app.shared.models.change_models import EventoCambio
+from app.shared.services import change_feed
+from app.shared.services.change_feed import ChangeFeed, FanoutBD, FanoutLocal
+
+def _parsear(bloque):
+    campos = dict(linea.split(": ", 1) for linea in bloque.strip().splitlines() if ": " in linea)
+    return campos.get("event"), json.loads(campos["data"]) if "data" in campos else None
+
+def test_entrega_desde_hilos_filtra_y_reenvia_con_last_event_id():
+    async def escenario():
+        feed = ChangeFeed(FanoutLocal(), heartbeat=0.05)
+        await feed.iniciar()
+        flujo = feed.eventos_sse(entidades={"bloque"})
+        assert await flujo.__anext__() == "retry: 3000\n\n"
+        # Las escrituras corren en el threadpool de los endpoints síncronos
+        await asyncio.to_thread(feed.publicar, "profesor", "creado", {"id_persona": 1})
+        await asyncio.to_thread(feed.publicar, "bloque", "eliminado", {"id_bloque": 7})
+        recibido = await flujo.__anext__()
+        await flujo.aclose()
+
+        # Reconexión con Last-Event-ID=1: solo lo que vino después
+        reconexion = feed.eventos_sse(ultimo_id=1)
+        await reconexion.__anext__()
+        pendiente = await reconexion.__anext__()
+        await reconexion.aclose()
+        await feed.detener()
+        return recibido, pendiente, feed.estadisticas()
+
+    recibido, pendiente, estadisticas = asyncio.run(escenario())
+    assert recibido.startswith("id: 2\n")
+    evento, datos = _parsear(recibido)
+    assert (evento, datos["entidad"], datos["accion"], datos["clave"]) == ("cambio", "bloque", "eliminado", {"id_bloque": 7})
+    assert _parsear(pendiente)[1]["id"] == 2
+    assert estadisticas["publicados"] == 2 and estadisticas["suscriptores"] == 0
+
+def test_entidades_internas_se_aplican_sin_llegar_a_los_suscriptores():
+    aplicados = []
+
+    async def escenario():
+        feed = ChangeFeed(FanoutLocal(), heartbeat=0.05)
+        feed.escuchar("control", aplicados.append)
+        await feed.iniciar()
+        flujo = feed.eventos_sse()
+        await flujo.__anext__()
+        await asyncio.to_thread(feed.publicar, "control", "perfilado", {"pid": 1}, {"activo": True})
+        await asyncio.to_thread(feed.publicar, "bloque", "creado", {"id_bloque": 1})
+        recibido = await flujo.__anext__()
+        await flujo.aclose()
+        await feed.detener()
+        return recibido, feed.estadisticas()
+
+    recibido, estadisticas = asyncio.run(escenario())
+    assert [(e["accion"], e["datos"]) for e in aplicados] == [("perfilado", {"activo": True})]
+    assert _parsear(recibido)[1]["entidad"] == "bloque" and recibido.startswith("id: 2\n")
+    assert (estadisticas["buffer"], estadisticas["ultimo_id"]) == (1, 2)
+
+def test_cliente_lento_recibe_resync():
+    async def escenario():
+        feed = ChangeFeed(FanoutLocal(), tamano_cola=3, capacidad_buffer=2)
+        await feed.iniciar()
+        flujo = feed.eventos_sse()
+        await flujo.__anext__()
+        for i in range(5):
+            feed.publicar("bloque", "eliminado", {"id_bloque": i})
+        resync = await flujo.__anext__()
+        # Last-Event-ID fuera del buffer de reenvío: también resync
+        viejo = feed.eventos_sse(ultimo_id=1)
+        await viejo.__anext__()
+        fuera_de_buffer = await viejo.__anext__()
+        await feed.detener()
+        return resync, fuera_de_buffer
+
+    resync, fuera_de_buffer = asyncio.run(escenario())
+    assert _parsear(resync)[0] == "resync" and "id: 5" in resync
+    assert _parsear(fuera_de_buffer)[0] == "resync"
+
+def test_fanout_bd_reparte_entre_procesos(session_factory):
+    async def escenario():
+        origen = ChangeFeed(FanoutBD(session_factory, poll_interval=0.01))
+        destino = ChangeFeed(FanoutBD(session_factory, poll_interval=0.01))
+        await origen.iniciar()
+        await destino.iniciar()
+        flujo = destino.eventos_sse()
+        await flujo.__anext__()
+        await asyncio.to_thread(origen.publicar, "asignacion", "creado",
+                                {"id_profesor": 1, "id_curso": 2, "id_materia": 3})
+        recibido = await asyncio.wait_for(flujo.__anext__(), timeout=2)
+        await flujo.aclose()
+        await origen.detener()
+        await destino.detener()
+        return recibido
+
+    evento, datos = _parsear(asyncio.run(escenario()))
+    assert evento == "cambio" and datos["id"] == 1
+    assert datos["clave"] == {"id_profesor": 1, "id_curso": 2, "id_materia": 3}
+
+def test_fanout_bd_entrega_ids_que_confirman_fuera_de_orden(session_factory, monkeypatch):
+    """Un ID menor que confirma después de uno mayor no se pierde"""
+    fanout = FanoutBD(session_factory)
+    db = session_factory()
+
+    def insertar(id_evento):
+        db.add(EventoCambio(id_evento=id_evento, payload=json.dumps({"n": id_evento})))
+        db.commit()
+
+    insertar(1)
+    assert [e["id"] for e in fanout.leer_nuevos()] == [1]
+    # 2 y 3 se asignaron a transacciones todavía abiertas; 4 confirmó primero
+    insertar(4)
+    assert [e["id"] for e in fanout.leer_nuevos()] == [4]
+    insertar(3)
+    insertar(5)
+    assert [e["id"] for e in fanout.leer_nuevos()] == [3, 5]
+    assert fanout.leer_nuevos() == []
+
+    # Pasado el solapamiento el ID saltado se da por descartado
+    monkeypatch.setattr(change_feed, "_SOLAPAMIENTO", timedelta(0))
+    insertar(2)
+    assert fanout.leer_nuevos() == []
+    db.close()
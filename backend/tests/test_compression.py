@@ -0,0 +1,86 @@
+import asyncio
+import gzip
+import json
+import pytest
+import app.core.middleware as middleware
+from app.core.middleware import CompressionMiddleware
+from app.shared.services.compression import CompressionCache, elegir_codificacion, codificaciones_disponibles
+
+CATALOGO = json.dumps([{"id_materia": i, "nombre_materia": f"Materia {i}", "nivel": "primaria"} for i in range(200)]).encode()
+
+async def _catalogo(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [
+        (b"content-type", b"application/json"), (b"content-length", str(len(CATALOGO)).encode())
+    ]})
+    await send({"type": "http.response.body", "body": CATALOGO})
+
+async def _streaming(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+    for parte in (b"a" * 2000, b"b" * 2000):
+        await send({"type": "http.response.body", "body": parte, "more_body": True})
+    await send({"type": "http.response.body", "body": b""})
+
+def _pedir(app, ruta, headers, query=b""):
+    enviados = []
+    async def send(mensaje):
+        enviados.append(mensaje)
+    scope = {"type": "http", "method": "GET", "path": ruta, "query_string": query,
+             "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()]}
+    rutas = "/api/profesores,/api/profesores/materias"
+    asyncio.run(CompressionMiddleware(app, minimo=1024, rutas_cache=rutas)(scope, None, send))
+    inicio = enviados[0]
+    return inicio["status"], {k.decode(): v.decode() for k, v in inicio["headers"]}, [m.get("body", b"") for m in enviados[1:]]
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    cache = CompressionCache()
+    monkeypatch.setattr(middleware, "compression_cache", cache)
+    return cache
+
+def test_elegir_codificacion():
+    assert elegir_codificacion("") is None
+    assert elegir_codificacion("gzip, deflate") == "gzip"
+    assert elegir_codificacion("identity") is None
+    assert elegir_codificacion("br;q=0, gzip;q=0.5") == "gzip"
+    assert elegir_codificacion("gzip, br") == codificaciones_disponibles()[0]
+
+def test_catalogo_con_etag_304_y_cache_precomprimido(cache):
+    estado, headers, cuerpos = _pedir(_catalogo, "/api/profesores/materias", {"Accept-Encoding": "gzip"})
+    assert (estado, headers["content-encoding"], headers["vary"]) == (200, "gzip", "Accept-Encoding")
+    assert gzip.decompress(cuerpos[0]) == CATALOGO and int(headers["content-length"]) == len(cuerpos[0])
+
+    # La primera vez se comprime con el nivel rápido; al repetirse, con el máximo
+    _, headers_2, cuerpos_2 = _pedir(_catalogo, "/api/profesores/materias", {"Accept-Encoding": "gzip"})
+    assert headers_2["etag"] == headers["etag"] and gzip.decompress(cuerpos_2[0]) == CATALOGO
+    # XFL del encabezado gzip: 2 = compresión máxima
+    assert (cuerpos[0][8], cuerpos_2[0][8]) == (0, 2)
+    # Desde la tercera se envía el cuerpo ya comprimido
+    _, _, cuerpos_3 = _pedir(_catalogo, "/api/profesores/materias", {"Accept-Encoding": "gzip"})
+    assert cuerpos_3 == cuerpos_2
+    estadisticas = cache.estadisticas()
+    assert (estadisticas["aciertos"], estadisticas["recomprimidos"], estadisticas["entradas"]) == (2, 1, 1)
+
+    estado, headers_304, cuerpos_304 = _pedir(
+        _catalogo, "/api/profesores/materias", {"Accept-Encoding": "gzip", "If-None-Match": headers["etag"]}
+    )
+    assert (estado, cuerpos_304) == (304, [b""]) and "content-length" not in headers_304
+
+def test_sin_compresion_para_rutas_pequenas_streaming_o_sin_accept_encoding():
+    estado, headers, cuerpos = _pedir(_catalogo, "/api/retiros/hoy", {})
+    assert "content-encoding" not in headers and "etag" not in headers and cuerpos == [CATALOGO]
+
+    estado, headers, cuerpos = _pedir(_streaming, "/api/esquelas/lote", {"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in headers and b"".join(cuerpos) == b"a" * 2000 + b"b" * 2000
+
+def test_solo_rutas_exactas_de_catalogo_sin_since(cache):
+    for ruta, query in (("/api/profesores/", b""), ("/api/profesores/materias", b"nivel=primaria")):
+        _, headers, _ = _pedir(_catalogo, ruta, {"Accept-Encoding": "gzip"}, query)
+        assert "etag" in headers
+
+    # Búsquedas, rutas por profesor y deltas se comprimen pero no se guardan
+    for ruta, query in (("/api/profesores/search", b"q=ana"), ("/api/profesores/7/bloques", b""),
+                        ("/api/profesores/materias", b"since=42")):
+        _, headers, cuerpos = _pedir(_catalogo, ruta, {"Accept-Encoding": "gzip"}, query)
+        assert "etag" not in headers and gzip.decompress(cuerpos[0]) == CATALOGO
+    # Solo la entrada del catálogo (mismo cuerpo y ETag en las dos rutas cacheables)
+    assert cache.estadisticas()["entradas"] == 1
@@ -0,0 +1,75 @@
+import pytest
+from datetime import time
+from app.modules.profesores.dto.profesor_dto import MateriaCreateDTO
+from app.modules.profesores.models.profesor_models import (
+    Persona, Profesor, Materia, Curso, BloqueHorario
+)
+from app.modules.profesores.repositories.profesor_repository import ArchivoRepository
+from app.modules.profesores.services.profesor_service import (
+    ProfesorService, MateriaService, BloqueHorarioService
+)
+from app.shared.models.change_models import RegistroEliminado
+from app.shared.services.change_sequence import DeltaSync, nombre_secuencia
+from app.shared.services.data_version import DataVersion
+
+@pytest.fixture
+def db(db_profesor):
+    db = db_profesor
+    db.add_all([
+        Materia(id_materia=1, nombre_materia="Física", nivel="secundaria"),
+        Curso(id_curso=1, nombre_curso="1ro A", nivel="secundaria", gestion="2024"),
+    ])
+    db.commit()
+    db.add(BloqueHorario(id_bloque=1, id_profesor=1, id_curso=1, id_materia=1, dia_semana="lunes",
+                         hora_inicio=time(8), hora_fin=time(9), gestion="2024"))
+    db.commit()
+    return db
+
+def test_escrituras_asignan_secuencia_y_lapidas(db, consultas):
+    # Una secuencia por entidad (personas y profesores comparten la suya)
+    assert db.get(Persona, 1).seq_cambio == db.get(Profesor, 1).seq_cambio == 1
+    assert db.get(Materia, 1).seq_cambio == db.get(BloqueHorario, 1).seq_cambio == 1
+
+    materia = MateriaService.crear_materia(db, MateriaCreateDTO(nombre_materia="Química", nivel="secundaria"))
+    consultas.clear()
+    MateriaService.actualizar_materia(db, 1, MateriaCreateDTO(nombre_materia="Física I", nivel="secundaria"))
+    # El número sale de un solo UPDATE ... RETURNING (más el de la versión de catálogos)
+    versiones = [c for c in consultas if "versiones_datos" in c]
+    assert len(versiones) == 2 and not [c for c in versiones if c.startswith("SELECT")]
+    MateriaService.eliminar_materia(db, materia.id_materia)
+
+    delta = MateriaService.listar_materias_delta(db, 2)
+    assert not delta.completo and delta.hasta == DataVersion.obtener(db, nombre_secuencia("materia")) == 4
+    assert [m.nombre_materia for m in delta.cambios] == ["Física I"]
+    assert delta.eliminados == [{"id_materia": materia.id_materia}]
+
+    # Al día: nada nuevo
+    vacio = MateriaService.listar_materias_delta(db, delta.hasta)
+    assert (vacio.cambios, vacio.eliminados) == ([], [])
+
+def test_since_cero_o_futuro_retorna_lista_completa(db):
+    for desde in (0, 99):
+        delta = MateriaService.listar_materias_delta(db, desde)
+        assert delta.completo and [m.id_materia for m in delta.cambios] == [1] and delta.eliminados == []
+
+def test_eliminar_profesor_registra_cascada(db):
+    ProfesorService.eliminar_profesor(db, 1)
+    lapidas = {(r.entidad, r.clave) for r in db.query(RegistroEliminado)}
+    assert {("persona", "1"), ("profesor", "1"), ("bloque", "1")} <= lapidas
+    assert ProfesorService.listar_profesores_delta(db, 1).eliminados == [{"id_persona": 1}]
+    # Las escrituras de otras entidades no avanzan la secuencia de materias
+    assert DataVersion.obtener(db, nombre_secuencia("materia")) == 1
+
+def test_archivo_set_based_registra_lapidas(db):
+    assert ArchivoRepository.archivar_bloques(db, "2024") == 1
+    db.commit()
+    delta = BloqueHorarioService.listar_bloques_delta(db, 1)
+    assert delta.cambios == [] and delta.eliminados == [{"id_bloque": 1}]
+
+def test_purgar_fuerza_lista_completa(db):
+    MateriaService.eliminar_materia(db, 1)  # la materia y su bloque en cascada
+    assert DeltaSync.purgar(db, dias=-1) == 2
+    # Un cliente en 1 no vio la baja purgada (2); uno en 2 sí
+    assert MateriaService.listar_materias_delta(db, 1).completo
+    assert not MateriaService.listar_materias_delta(db, 2).completo
+    assert BloqueHorarioService.listar_bloques_delta(db, 1).completo
@@ -0,0 +1,141 @@
+import io
+import zipfile
+from datetime import date
+import pytest
+from fastapi import HTTPException
+from app.modules.esquelas.dto.esquela_dto import (
+    EsquelaEstudianteDTO, EsquelaLoteCreateDTO, PlantillaEsquelaCreateDTO, PlantillaEsquelaUpdateDTO
+)
+from app.modules.esquelas.services import esquela_renderer
+from app.modules.esquelas.services.esquela_service import EsquelaService, PlantillaService
+from app.modules.profesores.models.profesor_models import Curso
+
+PLANTILLAS = {1: (1, "Citación - $curso", "Estimado(a) $nombre_tutor:\n\nSe cita por $motivo.")}
+
+def _trabajos(cantidad):
+    return [
+        {"nombre_archivo": f"{i}_estudiante", "id_plantilla": 1,
+         "variables": {"curso": "3ro A", "nombre_tutor": f"Tutor {i}", "motivo": "<conducta>"}}
+        for i in range(cantidad)
+    ]
+
+def test_render_escapa_y_cachea_plantilla():
+    esquela_renderer._compiladas.clear()
+    resultado = esquela_renderer.renderizar_bloque("html", PLANTILLAS, _trabajos(3))
+
+    assert [nombre for nombre, _ in resultado] == ["0_estudiante.html", "1_estudiante.html", "2_estudiante.html"]
+    html = resultado[0][1].decode()
+    assert "<title>Citación - 3ro A</title>" in html
+    assert "&lt;conducta&gt;" in html
+    assert list(esquela_renderer._compiladas) == [(1, 1)]
+
+    # Una nueva versión de la plantilla se compila aparte
+    esquela_renderer.renderizar_bloque("html", {1: (2, "Nuevo $curso", "Texto")}, _trabajos(1))
+    assert set(esquela_renderer._compiladas) == {(1, 1), (1, 2)}
+
+def test_zip_en_streaming_con_pool():
+    partes = list(EsquelaService._zip_stream("html", PLANTILLAS, _trabajos(25), zipfile.ZIP_DEFLATED))
+    esquela_renderer.cerrar_pool()
+
+    assert len(partes) > 1
+    archivo = zipfile.ZipFile(io.BytesIO(b"".join(partes)))
+    assert archivo.namelist() == [f"{i}_estudiante.html" for i in range(25)]
+    assert "Tutor 24" in archivo.read("24_estudiante.html").decode()
+
+def test_vaciar_cache_deja_terminar_los_lotes_en_curso():
+    render = esquela_renderer.renderizar("html", PLANTILLAS, _trabajos(25))
+    primero = next(render)
+    anterior = esquela_renderer._pool
+    esquela_renderer.vaciar_cache()
+
+    assert esquela_renderer._pool is None
+    assert [nombre for nombre, _ in [primero, *render]] == [f"{i}_estudiante.html" for i in range(25)]
+    # El siguiente lote usa un pool nuevo
+    assert len(list(esquela_renderer.renderizar("html", PLANTILLAS, _trabajos(10)))) == 10
+    assert esquela_renderer._pool is not anterior
+    esquela_renderer.cerrar_pool()
+
+@pytest.fixture
+def db(db):
+    db.add(Curso(id_curso=1, nombre_curso="3ro A", nivel="primaria", gestion="2025"))
+    db.commit()
+    return db
+
+@pytest.fixture
+def plantilla(db):
+    return PlantillaService.crear_plantilla(db, PlantillaEsquelaCreateDTO(
+        nombre="Citación", tipo="orientacion", asunto="Citación - $curso",
+        contenido="Estimado(a) $nombre_tutor:\n\nSe cita por $motivo el $fecha."
+    ))
+
+def _emitir(db, id_plantilla, estudiantes):
+    return EsquelaService.emitir_lote(db, EsquelaLoteCreateDTO(
+        id_plantilla=id_plantilla, id_curso=1, motivo="inasistencias", fecha_emision=date(2025, 5, 2),
+        estudiantes=estudiantes
+    ))
+
+def _archivos(db, lote, formato="html"):
+    contenido = b"".join(EsquelaService.generar_archivo(db, lote, formato))
+    archivo = zipfile.ZipFile(io.BytesIO(contenido))
+    return {nombre: archivo.read(nombre) for nombre in archivo.namelist()}
+
+def test_emitir_lote_sin_repetidos_y_con_motivo_propio(db, plantilla):
+    resultado = _emitir(db, plantilla.id_plantilla, [
+        EsquelaEstudianteDTO(id_estudiante=7, nombre_estudiante="José Pérez", nombre_tutor="Marta"),
+        EsquelaEstudianteDTO(id_estudiante=7, nombre_estudiante="José Pérez"),
+        EsquelaEstudianteDTO(id_estudiante=8, nombre_estudiante="Ana Luz", motivo="conducta"),
+    ])
+    assert resultado.emitidas == 2
+    esquelas = EsquelaService.listar_lote(db, resultado.lote)
+    assert [(e.id_estudiante, e.motivo) for e in esquelas] == [(7, "inasistencias"), (8, "conducta")]
+
+    archivos = _archivos(db, resultado.lote)
+    ids = [e.id_esquela for e in esquelas]
+    assert list(archivos) == [f"{ids[0]}_jose_perez.html", f"{ids[1]}_ana_luz.html"]
+    html = archivos[f"{ids[0]}_jose_perez.html"].decode()
+    assert "Estimado(a) Marta:" in html and "el 02/05/2025" in html
+
+    for id_plantilla, id_curso, codigo in ((99, 1, 404), (plantilla.id_plantilla, 99, 404)):
+        with pytest.raises(HTTPException) as error:
+            EsquelaService.emitir_lote(db, EsquelaLoteCreateDTO(
+                id_plantilla=id_plantilla, id_curso=id_curso, motivo="inasistencias",
+                estudiantes=[EsquelaEstudianteDTO(id_estudiante=1, nombre_estudiante="Ana Luz")]
+            ))
+        assert error.value.status_code == codigo
+
+def test_plantilla_actualizada_se_recompila_por_version(db, plantilla):
+    esquela_renderer._compiladas.clear()
+    lote = _emitir(db, plantilla.id_plantilla, [EsquelaEstudianteDTO(id_estudiante=1, nombre_estudiante="Ana Luz")]).lote
+    assert "Se cita por" in next(iter(_archivos(db, lote).values())).decode()
+
+    actualizada = PlantillaService.actualizar_plantilla(
+        db, plantilla.id_plantilla, PlantillaEsquelaUpdateDTO(contenido="Felicitamos a $nombre_estudiante.")
+    )
+    assert actualizada.version == plantilla.version + 1
+    # El mismo lote se regenera con el texto nuevo, sin vaciar la caché
+    assert "Felicitamos a Ana Luz." in next(iter(_archivos(db, lote).values())).decode()
+    assert set(esquela_renderer._compiladas) == {
+        (plantilla.id_plantilla, plantilla.version), (plantilla.id_plantilla, actualizada.version)
+    }
+
+    PlantillaService.actualizar_plantilla(db, plantilla.id_plantilla, PlantillaEsquelaUpdateDTO(estado="inactivo"))
+    with pytest.raises(HTTPException) as error:
+        _emitir(db, plantilla.id_plantilla, [EsquelaEstudianteDTO(id_estudiante=1, nombre_estudiante="Ana Luz")])
+    assert error.value.status_code == 400
+
+def test_pdf_sin_reportlab_se_rechaza(db, plantilla, monkeypatch):
+    lote = _emitir(db, plantilla.id_plantilla, [EsquelaEstudianteDTO(id_estudiante=1, nombre_estudiante="Ana Luz")]).lote
+    monkeypatch.setattr(esquela_renderer, "pdf_disponible", lambda: False)
+    with pytest.raises(HTTPException) as error:
+        EsquelaService.generar_archivo(db, lote, "pdf")
+    assert error.value.status_code == 400 and "reportlab" in error.value.detail
+
+def test_pdf_con_reportlab(db, plantilla):
+    pytest.importorskip("reportlab")
+    lote = _emitir(db, plantilla.id_plantilla, [
+        EsquelaEstudianteDTO(id_estudiante=i, nombre_estudiante=f"Estudiante {i}") for i in range(1, 11)
+    ]).lote
+    archivos = _archivos(db, lote, "pdf")
+    assert len(archivos) == 10 and all(nombre.endswith(".pdf") for nombre in archivos)
+    assert all(contenido.startswith(b"%PDF") for contenido in archivos.values())
+    esquela_renderer.cerrar_pool()
@@ -0,0 +1,174 @@
+from datetime import time
+import pytest
+from fastapi import HTTPException
+from app.modules.profesores.dto.profesor_dto import (
+    BloqueHorarioCreateDTO, BloqueHorarioUpdateDTO, GestionRolloverRequestDTO
+)
+from app.modules.profesores.models.profesor_models import (
+    Materia, Curso, ProfesorCursoMateria, BloqueHorario, BloqueHorarioArchivo
+)
+from app.modules.profesores.services import gestion_service
+from app.modules.profesores.services.gestion_service import GESTION_ACTUAL, GestionService
+from app.modules.profesores.services.profesor_service import BloqueHorarioService
+from app.modules.reportes.services.reporte_service import ReporteService
+
+@pytest.fixture
+def db(db_profesor):
+    db = db_profesor
+    db.add_all([
+        Materia(id_materia=1, nombre_materia="Física", nivel="secundaria"),
+        Curso(id_curso=1, nombre_curso="5to A", nivel="secundaria", gestion="2024"),
+        Curso(id_curso=2, nombre_curso="5to A", nivel="secundaria", gestion="2025"),
+    ])
+    db.flush()
+    db.add_all([
+        ProfesorCursoMateria(id_profesor=1, id_curso=1, id_materia=1),
+        BloqueHorario(id_bloque=1, id_profesor=1, id_curso=1, id_materia=1, dia_semana="lunes",
+                      hora_inicio=time(8), hora_fin=time(9), gestion="2024"),
+        BloqueHorario(id_bloque=2, id_profesor=1, id_curso=1, id_materia=1, dia_semana="martes",
+                      hora_inicio=time(8), hora_fin=time(10), gestion="2024"),
+        BloqueHorario(id_bloque=3, id_profesor=1, id_curso=2, id_materia=1, dia_semana="lunes",
+                      hora_inicio=time(8), hora_fin=time(9), gestion="2025"),
+    ])
+    db.commit()
+    return db
+
+def _bloque(gestion, id_curso=1, dia="miercoles"):
+    return BloqueHorarioCreateDTO(id_profesor=1, id_curso=id_curso, id_materia=1, dia_semana=dia,
+                                  hora_inicio="08:00", hora_fin="09:00", gestion=gestion)
+
+def test_archivar_y_restaurar_conserva_los_bloques(db):
+    archivada = GestionService.archivar_gestion(db, "2024")
+    assert (archivada.gestion, archivada.total_bloques) == ("2024", 2)
+    assert [b.gestion for b in db.query(BloqueHorario)] == ["2025"]
+    assert sorted(b.id_bloque for b in db.query(BloqueHorarioArchivo)) == [1, 2]
+    assert [g.gestion for g in GestionService.listar_gestiones_archivadas(db)] == ["2024"]
+
+    listados = BloqueHorarioService.listar_bloques(db, "2024", include_archived=True)
+    assert sorted((b.id_bloque, b.archivado) for b in listados) == [(1, True), (2, True)]
+
+    with pytest.raises(HTTPException) as error:
+        GestionService.archivar_gestion(db, "2024")
+    assert "ya está archivada" in error.value.detail
+
+    restaurada = GestionService.restaurar_gestion(db, "2024")
+    assert restaurada.total_bloques == 2
+    assert sorted((b.id_bloque, b.gestion, b.dia_semana) for b in db.query(BloqueHorario)) == [
+        (1, "2024", "lunes"), (2, "2024", "martes"), (3, "2025", "lunes")
+    ]
+    assert db.query(BloqueHorarioArchivo).count() == 0
+    assert GestionService.listar_gestiones_archivadas(db) == []
+
+def test_no_archiva_la_gestion_actual_ni_una_vacia(db):
+    for gestion, codigo in ((GESTION_ACTUAL, 400), ("1999", 404)):
+        with pytest.raises(HTTPException) as error:
+            GestionService.archivar_gestion(db, gestion)
+        assert error.value.status_code == codigo
+    with pytest.raises(HTTPException) as error:
+        GestionService.restaurar_gestion(db, "2024")
+    assert error.value.status_code == 404
+
+def test_gestion_archivada_no_acepta_escrituras_hasta_restaurarla(db):
+    GestionService.archivar_gestion(db, "2024")
+
+    with pytest.raises(HTTPException) as error:
+        BloqueHorarioService.crear_bloque(db, _bloque("2024"))
+    assert error.value.status_code == 400 and "archivada" in error.value.detail
+    # Tampoco se puede mover un bloque vigente a la gestión archivada
+    with pytest.raises(HTTPException) as error:
+        BloqueHorarioService.actualizar_bloque(db, 3, BloqueHorarioUpdateDTO(gestion="2024"))
+    assert "archivada" in error.value.detail
+    assert db.query(BloqueHorario).count() == 1
+
+    assert BloqueHorarioService.crear_bloque(db, _bloque("2025", id_curso=2)).gestion == "2025"
+
+    GestionService.restaurar_gestion(db, "2024")
+    assert BloqueHorarioService.crear_bloque(db, _bloque("2024")).gestion == "2024"
+    actualizado = BloqueHorarioService.actualizar_bloque(db, 1, BloqueHorarioUpdateDTO(observaciones="Laboratorio"))
+    assert actualizado.observaciones == "Laboratorio"
+
+@pytest.fixture
+def rollover(db, session_factory, consultas, monkeypatch):
+    """Ejecuta el rollover como lo haría la cola de trabajos, con la BD del test"""
+    monkeypatch.setattr(gestion_service, "SessionLocal", session_factory)
+    monkeypatch.setattr(ReporteService, "programar_recalculo", staticmethod(lambda *args: None))
+
+    def ejecutar(origen, destino, **opciones):
+        consultas.clear()
+        return GestionService.ejecutar_rollover(
+            GestionRolloverRequestDTO(gestion_origen=origen, gestion_destino=destino, **opciones).model_dump()
+        )
+    return ejecutar
+
+def test_rollover_copia_cursos_asignaciones_y_bloques_con_insert_select(db, rollover, consultas):
+    # Un bloque de 2024 cuyo curso es de otra gestión conserva su id_curso
+    db.add(BloqueHorario(id_bloque=4, id_profesor=1, id_curso=2, id_materia=1, dia_semana="viernes",
+                         hora_inicio=time(10), hora_fin=time(11), gestion="2024", observaciones="Taller"))
+    db.commit()
+
+    assert rollover("2024", "2026") == {"cursos": 1, "asignaciones": 1, "bloques": 3}
+    inserts = [c for c in consultas if c.startswith("INSERT INTO") and "SELECT" in c]
+    assert [c.split()[2] for c in inserts] == ["cursos", "profesores_cursos_materias", "bloques_horarios"]
+
+    db.expire_all()
+    nuevo = db.query(Curso).filter_by(gestion="2026").one()
+    assert (nuevo.nombre_curso, nuevo.nivel) == ("5to A", "secundaria")
+    assert [(a.id_profesor, a.id_materia) for a in db.query(ProfesorCursoMateria).filter_by(id_curso=nuevo.id_curso)] == [(1, 1)]
+    copiados = db.query(BloqueHorario).filter_by(gestion="2026").order_by(BloqueHorario.hora_inicio, BloqueHorario.dia_semana)
+    assert [(b.id_curso, b.dia_semana, b.observaciones) for b in copiados] == [
+        (nuevo.id_curso, "lunes", None), (nuevo.id_curso, "martes", None), (2, "viernes", "Taller")
+    ]
+    # El origen queda intacto
+    assert GestionService.previsualizar_rollover(
+        db, GestionRolloverRequestDTO(gestion_origen="2024", gestion_destino="2027")
+    ).a_copiar.model_dump() == {"cursos": 1, "asignaciones": 1, "bloques": 3}
+
+def test_rollover_sin_asignaciones_ni_bloques(db, rollover):
+    assert rollover("2024", "2026", incluir_asignaciones=False, incluir_bloques=False) == {
+        "cursos": 1, "asignaciones": 0, "bloques": 0
+    }
+    db.expire_all()
+    assert db.query(BloqueHorario).filter_by(gestion="2026").count() == 0
+
+def test_rollover_repetido_sobre_gestion_existente_se_rechaza(db, rollover):
+    rollover("2024", "2026")
+    db.expire_all()
+    data = GestionRolloverRequestDTO(gestion_origen="2024", gestion_destino="2026")
+
+    preview = GestionService.previsualizar_rollover(db, data)
+    assert preview.existentes_en_destino.model_dump() == {"cursos": 1, "asignaciones": 1, "bloques": 2}
+    assert preview.conflictos == ["La gestión 2026 ya tiene cursos o bloques registrados"]
+    with pytest.raises(HTTPException) as error:
+        GestionService.iniciar_rollover(db, data)
+    assert error.value.status_code == 400
+    assert db.query(Curso).filter_by(gestion="2026").count() == 1
+
+def test_rollover_encolado_revalida_al_ejecutarse(db, rollover):
+    # Otro rollover llenó el destino entre el encolado y la ejecución: no se duplica nada
+    assert rollover("2024", "2026") == {"cursos": 1, "asignaciones": 1, "bloques": 2}
+    assert rollover("2024", "2026") == {"cursos": 0, "asignaciones": 0, "bloques": 0}
+    db.expire_all()
+    assert db.query(Curso).filter_by(gestion="2026").count() == 1
+    assert db.query(BloqueHorario).filter_by(gestion="2026").count() == 2
+
+    # La gestión origen se archivó mientras el job esperaba
+    GestionService.archivar_gestion(db, "2024")
+    with pytest.raises(ValueError, match="2024 está archivada"):
+        rollover("2024", "2027")
+    db.expire_all()
+    assert db.query(Curso).filter_by(gestion="2027").count() == 0
+
+def test_rollover_de_gestion_archivada_se_rechaza_al_iniciar(db):
+    GestionService.archivar_gestion(db, "2024")
+    data = GestionRolloverRequestDTO(gestion_origen="2024", gestion_destino="2026")
+    with pytest.raises(HTTPException) as error:
+        GestionService.iniciar_rollover(db, data)
+    assert error.value.status_code == 400 and "archivada" in error.value.detail
+
+def test_rollover_con_cursos_repetidos_en_origen_se_rechaza(db):
+    db.add(Curso(id_curso=3, nombre_curso="5to A", nivel="secundaria", gestion="2024"))
+    db.commit()
+    preview = GestionService.previsualizar_rollover(
+        db, GestionRolloverRequestDTO(gestion_origen="2024", gestion_destino="2026")
+    )
+    assert preview.conflictos == ["Cursos repetidos en 2024: 5to A (secundaria)"]
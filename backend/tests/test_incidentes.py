@@ -0,0 +1,105 @@
+from datetime import date
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+from app.modules.profesores.models.profesor_models import Curso
+from app.modules.incidentes.dto.incidente_dto import IncidenteCreateDTO, IncidenteLoteCreateDTO
+from app.modules.incidentes.models.incidente_models import Incidente, IncidenteContador
+from app.modules.incidentes.repositories.incidente_repository import ContadorRepository
+from app.modules.incidentes.services.incidente_service import IncidenteService
+
+@pytest.fixture
+def db(db):
+    db.add_all([
+        Curso(id_curso=1, nombre_curso="3ro A", nivel="secundaria", gestion="2025"),
+        Curso(id_curso=2, nombre_curso="3ro B", nivel="secundaria", gestion="2025"),
+    ])
+    db.commit()
+    return db
+
+def _contadores(db):
+    return sorted(
+        (c.id_curso, c.periodo, c.tipo, c.gravedad, c.total) for c in db.query(IncidenteContador).all()
+    )
+
+def test_lote_actualiza_contadores(db):
+    lote = IncidenteLoteCreateDTO(
+        id_curso=1, estudiantes=[10, 11, 12, 11], tipo="convivencia", gravedad="moderada",
+        descripcion="Pelea en el recreo", fecha_incidente=date(2025, 5, 12)
+    )
+    resultado = IncidenteService.registrar_lote(db, lote)
+    assert resultado.registrados == 3
+
+    IncidenteService.registrar_lote(db, lote.model_copy(update={"fecha_incidente": date(2025, 5, 20)}))
+    IncidenteService.registrar_incidente(db, IncidenteCreateDTO(
+        id_estudiante=20, id_curso=2, tipo="academico", descripcion="Copia en examen",
+        fecha_incidente=date(2025, 6, 2)
+    ))
+
+    assert _contadores(db) == [
+        (1, "2025-05", "convivencia", "moderada", 6),
+        (2, "2025-06", "academico", "leve", 1),
+    ]
+    resumen = IncidenteService.obtener_resumen(db, None, "2025-05", "2025-06")
+    assert resumen.total == 7
+    assert resumen.por_periodo == {"2025-05": 6, "2025-06": 1}
+    assert IncidenteService.obtener_resumen(db, 2, None, None).por_tipo == {"academico": 1}
+
+    # Reconstruir desde la tabla base da los mismos contadores
+    antes = _contadores(db)
+    IncidenteService.recalcular_contadores(db)
+    assert _contadores(db) == antes
+
+    historial = IncidenteService.listar_por_estudiante(db, 11, limite=10, offset=0)
+    assert [i.fecha_incidente for i in historial] == [date(2025, 5, 20), date(2025, 5, 12)]
+
+def test_recalcular_se_serializa_con_las_inserciones(db, consultas):
+    """Las inserciones toman el lock de contadores compartido y recalcular exclusivo, antes de escribir"""
+    consultas.clear()
+    IncidenteService.registrar_incidente(db, IncidenteCreateDTO(
+        id_estudiante=20, id_curso=2, tipo="academico", descripcion="Copia en examen",
+        fecha_incidente=date(2025, 6, 2)
+    ))
+    IncidenteService.recalcular_contadores(db)
+    sentencias = [c.split()[0] + (" versiones_datos" if "versiones_datos" in c else "") for c in consultas]
+    assert sentencias.index("SELECT versiones_datos") < sentencias.index("INSERT")
+    recalculo = sentencias[sentencias.index("DELETE") - 1]
+    assert recalculo == "SELECT versiones_datos"
+    assert _contadores(db) == [(2, "2025-06", "academico", "leve", 1)]
+
+def test_borrar_un_curso_no_borra_su_historial_de_incidentes():
+    fk_incidente, = Incidente.__table__.c.id_curso.foreign_keys
+    fk_contador, = IncidenteContador.__table__.c.id_curso.foreign_keys
+    assert (fk_incidente.ondelete, fk_contador.ondelete) == ("RESTRICT", "CASCADE")
+
+def test_lote_curso_inexistente(db):
+    with pytest.raises(HTTPException) as error:
+        IncidenteService.registrar_lote(db, IncidenteLoteCreateDTO(
+            id_curso=99, estudiantes=[1], tipo="otro", descripcion="Prueba",
+            fecha_incidente=date(2025, 5, 12)
+        ))
+    assert error.value.status_code == 404
+    assert _contadores(db) == []
+
+def test_incremento_portable_reintenta_si_otro_inserta_la_clave(db, engine):
+    """UPDATE + INSERT: si otra transacción inserta la clave antes, el INSERT choca y se repite el UPDATE"""
+    ContadorRepository._incrementar_portable(db, [
+        {"id_curso": 1, "periodo": "2025-05", "tipo": "otro", "gravedad": "leve", "total": 2}
+    ])
+
+    pendiente = [True]
+
+    def otro_proceso(conn, cursor, statement, parameters, context, executemany):
+        # Entre el UPDATE sin filas y el INSERT del curso 2
+        if pendiente and statement.startswith("UPDATE incidentes_contadores") and 2 in parameters:
+            pendiente.clear()
+            conn.connection.cursor().execute(
+                "INSERT INTO incidentes_contadores VALUES (2, '2025-05', 'otro', 'leve', 5)")
+
+    event.listen(engine, "after_cursor_execute", otro_proceso)
+    ContadorRepository._incrementar_portable(db, [
+        {"id_curso": 1, "periodo": "2025-05", "tipo": "otro", "gravedad": "leve", "total": 1},
+        {"id_curso": 2, "periodo": "2025-05", "tipo": "otro", "gravedad": "leve", "total": 3},
+    ])
+    db.commit()
+    assert _contadores(db) == [(1, "2025-05", "otro", "leve", 3), (2, "2025-05", "otro", "leve", 8)]
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from app.shared.services.job_queue import JobQueue
+
+@pytest.fixture
+def cola(session_factory):
+    return JobQueue(session_factory=session_factory, concurrencia=2, poll_interval=0.05)
+
+def test_prioridad_e_idempotencia(cola):
+    orden = []
+
+    @cola.tarea("prueba.registrar")
+    def registrar(payload):
+        orden.append(payload["n"])
+        return {"ok": payload["n"]}
+
+    id_baja = cola.encolar("prueba.registrar", {"n": "baja"}, prioridad=0)
+    id_alta = cola.encolar("prueba.registrar", {"n": "alta"}, prioridad=10, idempotency_key="clave-1")
+    assert cola.encolar("prueba.registrar", {"n": "otra"}, idempotency_key="clave-1") == id_alta
+    cola.encolar("prueba.registrar", {"n": "futura"}, programar_para=datetime.utcnow() + timedelta(hours=1))
+
+    cola._concurrencia = 1
+    asyncio.run(cola.procesar_pendientes())
+    asyncio.run(cola.procesar_pendientes())
+    assert orden == ["alta", "baja"]
+
+    job = cola.obtener(id_baja)
+    assert job.estado == "completado"
+    assert json.loads(job.resultado) == {"ok": "baja"}
+    assert cola.estadisticas()["por_estado"] == {"completado": 2, "pendiente": 1}
+
+def test_clave_repetida_en_la_transaccion_del_llamador_solo_deshace_el_savepoint(cola, session_factory):
+    cola.tarea("prueba.registrar")(lambda payload: None)
+    id_existente = cola.encolar("prueba.registrar", idempotency_key="clave-1")
+
+    db = session_factory()
+    id_propio = cola.encolar("prueba.registrar", {"n": "propio"}, db=db)
+    # La consulta previa no ve la clave: simula otra petición que la encoló al mismo tiempo
+    consulta = db.query
+    def carrera(*args):
+        db.query = consulta
+        return SimpleNamespace(filter=lambda *a: SimpleNamespace(first=lambda: None))
+    db.query = carrera
+
+    assert cola.encolar("prueba.registrar", idempotency_key="clave-1", db=db) == id_existente
+    db.commit()
+    db.close()
+    assert cola.obtener(id_propio) is not None
+    assert cola.estadisticas()["por_estado"] == {"pendiente": 2}
+
+def test_reintento_y_error(cola):
+    @cola.tarea("prueba.falla")
+    async def falla(payload):
+        raise RuntimeError("sin conexión")
+
+    id_job = cola.encolar("prueba.falla", max_intentos=2)
+    asyncio.run(cola.procesar_pendientes())
+    job = cola.obtener(id_job)
+    assert job.estado == "pendiente" and job.intentos == 1
+    assert job.programado_para > datetime.utcnow()
+
+    # Adelantar el reintento
+    cola._actualizar(id_job, {"programado_para": datetime.utcnow()})
+    asyncio.run(cola.procesar_pendientes())
+    job = cola.obtener(id_job)
+    assert job.estado == "error" and job.error == "sin conexión"
+
+def test_cancelar_y_periodicas(cola):
+    ejecuciones = []
+
+    @cola.periodica("prueba.periodica", cada=timedelta(hours=1))
+    def periodica(payload):
+        ejecuciones.append(1)
+
+    id_job = cola.encolar("prueba.periodica")
+    assert cola.cancelar(id_job)
+    assert not cola.cancelar(id_job)
+
+    async def ciclo():
+        await cola.iniciar()
+        await asyncio.sleep(0.3)
+        await cola.detener()
+
+    asyncio.run(ciclo())
+    # Una sola ejecución por intervalo aunque el bucle sondee varias veces
+    assert ejecuciones == [1]
+    with pytest.raises(ValueError):
+        cola.encolar("prueba.no_registrada")
+
+def test_reserva_vencida_sin_intentos_restantes_queda_en_error(cola):
+    ejecuciones = []
+    cola.tarea("prueba.registrar")(lambda payload: ejecuciones.append(payload["n"]))
+    vencida = datetime.utcnow() - timedelta(seconds=1)
+
+    # Dos trabajos cuyo proceso se cayó a mitad de ejecución
+    agotado = cola.encolar("prueba.registrar", {"n": "agotado"}, max_intentos=1)
+    con_intentos = cola.encolar("prueba.registrar", {"n": "con_intentos"}, max_intentos=2)
+    for id_job in (agotado, con_intentos):
+        cola._actualizar(id_job, {"estado": "en_proceso", "intentos": 1, "reservado_hasta": vencida})
+
+    asyncio.run(cola.procesar_pendientes())
+    assert ejecuciones == ["con_intentos"]
+    job = cola.obtener(agotado)
+    assert job.estado == "error" and job.intentos == 1 and "intento 1 de 1" in job.error
+    assert cola.obtener(con_intentos).estado == "completado"
+    assert cola.estadisticas()["reservas_vencidas"] == 2
+
+def test_latido_renueva_la_reserva_mientras_el_trabajo_corre(session_factory):
+    cola = JobQueue(session_factory=session_factory, concurrencia=1, reserva=0.3, latido=0.05)
+    otro_worker = JobQueue(session_factory=session_factory, concurrencia=1)
+    reclamados = []
+
+    @cola.tarea("prueba.lenta")
+    def lenta(payload):
+        time.sleep(0.6)
+        # Sin latido la reserva de 0.3 s ya habría vencido y otro worker lo tomaría
+        reclamados.extend(otro_worker._reclamar(1))
+
+    id_job = cola.encolar("prueba.lenta")
+    asyncio.run(cola.procesar_pendientes())
+    assert reclamados == []
+    job = cola.obtener(id_job)
+    assert job.estado == "completado" and job.intentos == 1
@@ -0,0 +1,82 @@
+import asyncio
+import socket
+import threading
+import time
+import httpx
+import uvicorn
+from sqlalchemy import create_engine
+import os
+from app.core.launcher import AjustesLanzador, Lanzador, ServidorWorker, preparar_entorno_multiproceso
+from app.shared.models.change_models import EventoCambio
+from app.shared.services import change_feed as modulo_feed
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _ajustes(**cambios):
+    base = dict(app="run:app", host="127.0.0.1", port=_puerto_libre(), workers=2,
+                timeout_arranque=30, graceful_timeout=5, log_level="warning")
+    return AjustesLanzador(**{**base, **cambios})
+
+class _Canal:
+    def __init__(self):
+        self.avisos = []
+
+    def send(self, aviso):
+        self.avisos.append(aviso)
+
+def test_worker_se_recicla_al_superar_la_memoria():
+    servidor = ServidorWorker(uvicorn.Config("run:app"), _Canal(), max_memoria_mb=1)
+    assert asyncio.run(servidor.on_tick(0)) is True
+    assert servidor.motivo_salida.startswith("memoria")
+
+def test_varios_workers_reparten_el_feed_por_la_bd(monkeypatch):
+    monkeypatch.setenv("CHANGE_FEED_FANOUT", "local")
+    monkeypatch.setenv("WEB_WORKERS", "0")
+    monkeypatch.setattr(modulo_feed, "change_feed", modulo_feed.ChangeFeed())
+    preparar_entorno_multiproceso(1)
+    assert os.environ["CHANGE_FEED_FANOUT"] == "local"
+    assert isinstance(modulo_feed.change_feed._fanout, modulo_feed.FanoutLocal)
+
+    preparar_entorno_multiproceso(4)
+    assert os.environ["CHANGE_FEED_FANOUT"] == "bd" and os.environ["WEB_WORKERS"] == "4"
+    assert isinstance(modulo_feed.change_feed._fanout, modulo_feed.FanoutBD)
+
+def test_lanzador_se_detiene_si_los_workers_no_pasan_el_chequeo(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'no-existe' / 'bd.db'}")
+    lanzador = Lanzador(_ajustes(workers=1, max_fallos_arranque=2))
+    inicio = time.monotonic()
+    assert lanzador.ejecutar() == 1
+    assert lanzador._fallos_seguidos == 2 and time.monotonic() - inicio < 30
+
+def test_workers_se_reciclan_por_peticiones_y_drenan_al_detener(tmp_path, monkeypatch):
+    url_bd = f"sqlite:///{tmp_path / 'bd.db'}"
+    monkeypatch.setenv("DATABASE_URL", url_bd)
+    # Con dos workers el lanzador reparte el feed por la tabla eventos_cambio
+    monkeypatch.setenv("CHANGE_FEED_FANOUT", "local")
+    monkeypatch.setenv("WEB_WORKERS", "0")
+    EventoCambio.__table__.create(create_engine(url_bd))
+    ajustes = _ajustes(max_requests=2)
+    lanzador = Lanzador(ajustes)
+    codigos = []
+
+    def cliente():
+        url = f"http://127.0.0.1:{ajustes.port}/api/health"
+        limite = time.monotonic() + 30
+        while len(codigos) < 8 and time.monotonic() < limite:
+            try:
+                codigos.append(httpx.get(url, timeout=5).status_code)
+            except httpx.TransportError:
+                time.sleep(0.2)  # todavía arrancando o reemplazando un worker
+        lanzador._detener = True
+
+    hilo = threading.Thread(target=cliente)
+    hilo.start()
+    assert lanzador.ejecutar() == 0
+    hilo.join()
+    assert codigos == [200] * 8
+    assert lanzador._reinicios >= 2 and lanzador._workers and not any(
+        w.proceso.is_alive() for w in lanzador._workers.values()
+    )
@@ -0,0 +1,135 @@
+import asyncio
+import smtplib
+import socketserver
+import threading
+from datetime import datetime, timedelta
+import pytest
+from app.shared.models.notification_models import NotificacionOutbox
+from app.shared.services import notification_dispatcher
+from app.shared.services.notification_dispatcher import NotificationDispatcher
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Servidor SMTP mínimo que acepta todo y guarda los mensajes recibidos"""
+    
+    def _responder(self, linea):
+        self.wfile.write((linea + "\r\n").encode())
+    
+    def handle(self):
+        self.server.conexiones += 1
+        self._responder("220 localhost SMTP de prueba")
+        while True:
+            linea = self.rfile.readline().decode().strip()
+            comando = linea.split(" ")[0].upper()
+            if not linea or comando == "QUIT":
+                self._responder("221 Bye")
+                return
+            if comando == "EHLO":
+                self._responder("250 localhost")
+            elif comando == "DATA":
+                self._responder("354 End data with <CR><LF>.<CR><LF>")
+                datos = []
+                while (parte := self.rfile.readline().decode()) != ".\r\n":
+                    datos.append(parte)
+                self.server.mensajes.append("".join(datos))
+                self._responder("250 OK")
+            else:
+                self._responder("250 OK")
+
+@pytest.fixture
+def servidor_smtp():
+    """SMTP local en un puerto libre"""
+    servidor = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPHandler)
+    servidor.daemon_threads = True
+    servidor.mensajes, servidor.conexiones = [], 0
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+def _encolar(session_factory, cantidad):
+    db = session_factory()
+    db.add_all(
+        NotificacionOutbox(canal='email', destinatario=f"padre{i}@example.com", asunto="Aviso",
+                           cuerpo="Texto", estado='pendiente', intentos=0,
+                           proximo_intento=datetime.utcnow() - timedelta(seconds=1))
+        for i in range(cantidad)
+    )
+    db.commit()
+    db.close()
+
+def _estados(session_factory):
+    db = session_factory()
+    try:
+        return [(n.estado, n.intentos) for n in db.query(NotificacionOutbox).all()]
+    finally:
+        db.close()
+
+def test_envia_lote_con_conexiones_reutilizadas(servidor_smtp, session_factory):
+    """Todo el lote se envía y se reutilizan como máximo `workers` conexiones"""
+    _encolar(session_factory, 20)
+    puerto = servidor_smtp.server_address[1]
+    dispatcher = NotificationDispatcher(
+        session_factory=session_factory,
+        smtp_factory=lambda: smtplib.SMTP("127.0.0.1", puerto, timeout=5),
+        workers=3, batch_size=50
+    )
+    
+    async def escenario():
+        procesadas = await dispatcher.procesar_pendientes()
+        await dispatcher.detener()
+        return procesadas
+    
+    assert asyncio.run(escenario()) == 20
+    assert len(servidor_smtp.mensajes) == 20
+    assert servidor_smtp.conexiones <= 3
+    assert all(estado == 'enviado' for estado, _ in _estados(session_factory))
+    assert dispatcher.estadisticas()['enviados'] == 20
+
+def test_reintenta_y_pasa_a_dead_letter(session_factory):
+    """Los fallos se reprograman con backoff y al agotar intentos quedan en 'fallido'"""
+    _encolar(session_factory, 2)
+    
+    def smtp_caido():
+        raise ConnectionRefusedError("SMTP no disponible")
+    
+    dispatcher = NotificationDispatcher(session_factory=session_factory, smtp_factory=smtp_caido,
+                                        workers=2, max_intentos=2, backoff_base=0)
+    
+    async def escenario():
+        await dispatcher.procesar_pendientes()
+        primer_intento = _estados(session_factory)
+        await dispatcher.procesar_pendientes()
+        return primer_intento
+    
+    assert asyncio.run(escenario()) == [('pendiente', 1), ('pendiente', 1)]
+    assert _estados(session_factory) == [('fallido', 2), ('fallido', 2)]
+    assert dispatcher.estadisticas()['fallidos'] == 2
+
+def test_sin_proveedor_queda_pendiente_hasta_configurarlo(session_factory, monkeypatch):
+    """Sin proveedor el SMS/email no se marca enviado ni consume intentos"""
+    _encolar(session_factory, 1)
+    db = session_factory()
+    db.add(NotificacionOutbox(canal='sms', destinatario="70000000", cuerpo="Salida anticipada",
+                              estado='pendiente', intentos=0, proximo_intento=datetime.utcnow() - timedelta(seconds=1)))
+    db.commit()
+    db.close()
+    monkeypatch.setattr(notification_dispatcher, "SMTP_HOST", "")
+    dispatcher = NotificationDispatcher(session_factory=session_factory, consola=False)
+
+    asyncio.run(dispatcher.procesar_pendientes())
+    assert _estados(session_factory) == [('pendiente', 0), ('pendiente', 0)]
+    db = session_factory()
+    errores = {n.canal: n.ultimo_error for n in db.query(NotificacionOutbox)}
+    assert errores == {'email': "SMTP_HOST no configurado",
+                       'sms': "No hay proveedor de SMS configurado (notification_dispatcher.configurar_sms)"}
+    # Se vuelve a revisar más tarde, no en cada vuelta del bucle
+    db.query(NotificacionOutbox).update({NotificacionOutbox.proximo_intento: datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    db.close()
+    assert dispatcher.estadisticas()['sin_proveedor'] == 2
+
+    enviados = []
+    dispatcher.configurar_sms(lambda destinatario, mensaje: enviados.append((destinatario, mensaje)))
+    asyncio.run(dispatcher.procesar_pendientes())
+    assert enviados == [("70000000", "Salida anticipada")]
+    assert sorted(_estados(session_factory)) == [('enviado', 1), ('pendiente', 0)]
@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.dialects import mysql
+from sqlalchemy.schema import CreateIndex
+from app.modules.profesores.models.profesor_models import Persona, Profesor
+from app.modules.profesores.services.persona_search_service import PersonaSearchIndex
+
+@pytest.fixture
+def db(db):
+    for id_persona, ci, nombres, paterno, correo in (
+        (1, "1000001", "Ana", "Rojas", "ana.rojas@example.com"),
+        (2, "1000002", "Anabel", "Rojo", None),
+        (3, "1000003", "Luis", "Núñez", None),
+    ):
+        db.add(Persona(id_persona=id_persona, ci=ci, nombres=nombres, apellido_paterno=paterno,
+                       correo=correo, tipo_persona="profesor"))
+        db.add(Profesor(id_profesor=id_persona, id_persona=id_persona))
+    db.commit()
+    return db
+
+@pytest.fixture
+def indice(db):
+    indice = PersonaSearchIndex()
+    indice.construir(db)
+    return indice
+
+def _resultados(indice, consulta):
+    return [(r.id_persona, r.puntaje) for r in indice.buscar(consulta)]
+
+def test_exacto_antes_que_prefijo(indice):
+    assert _resultados(indice, "ana") == [(1, 1.0), (2, 0.8)]
+    assert _resultados(indice, "1000003") == [(3, 1.0)]
+
+def test_prefijo(indice):
+    assert _resultados(indice, "roj") == [(1, 0.8), (2, 0.8)]
+    # Tildes y mayúsculas se normalizan
+    assert _resultados(indice, "NÚÑ") == [(3, 0.8)]
+
+def test_aproximado_por_trigramas(indice):
+    # "nunes" comparte 4 de 8 trigramas con "nunez": similitud 0.5
+    assert _resultados(indice, "nunes") == [(3, 0.3)]
+
+def test_umbral_de_similitud(indice):
+    # "nxnez" comparte 3 de 9 trigramas con "nunez": queda bajo UMBRAL_SIMILITUD
+    assert _resultados(indice, "nxnez") == []
+    # Ni términos cortos ni numéricos se buscan de forma aproximada
+    assert _resultados(indice, "lx") == []
+    assert _resultados(indice, "1000009") == []
+
+def test_varios_terminos_exigen_todos(indice):
+    assert _resultados(indice, "ana rojas") == [(1, 2.0)]
+
+def test_indice_fulltext_solo_en_mysql(engine):
+    indice = next(i for i in Persona.__table__.indexes if i.name == "ft_personas_busqueda")
+    assert str(CreateIndex(indice).compile(dialect=mysql.dialect())) == (
+        "CREATE FULLTEXT INDEX ft_personas_busqueda ON personas "
+        "(nombres, apellido_paterno, apellido_materno, ci, correo)"
+    )
+    assert "ft_personas_busqueda" not in {i["name"] for i in inspect(engine).get_indexes("personas")}
+
+def test_sincroniza_cambios_hechos_por_otro_worker(db, indice, consultas):
+    consultas.clear()
+    indice.sincronizar(db)
+    assert len(consultas) == 1  # sin cambios: solo la lectura de la secuencia
+
+    # Escrituras de otro proceso: el índice de este worker no recibe indexar()
+    db.get(Persona, 2).apellido_paterno = "Vargas"
+    db.add(Persona(id_persona=4, ci="1000004", nombres="Rosa", apellido_paterno="Rojas", tipo_persona="profesor"))
+    db.flush()
+    db.add(Profesor(id_profesor=4, id_persona=4))
+    db.delete(db.get(Profesor, 3))
+    db.commit()
+    assert _resultados(indice, "roj") == [(1, 0.8), (2, 0.8)]
+
+    indice.sincronizar(db)
+    assert _resultados(indice, "roj") == [(1, 0.8), (4, 0.8)]
+    assert _resultados(indice, "vargas") == [(2, 1.0)]
+    assert _resultados(indice, "luis") == []
+    assert indice.estadisticas()["documentos"] == 3
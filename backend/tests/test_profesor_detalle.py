@@ -0,0 +1,71 @@
+from datetime import datetime, time
+import pytest
+from fastapi import HTTPException
+from app.modules.profesores.models.profesor_models import (
+    Persona, Profesor, Materia, Curso, ProfesorCursoMateria, BloqueHorario, BloqueHorarioArchivo
+)
+from app.modules.profesores.services.profesor_service import AsignacionService, ProfesorService
+
+@pytest.fixture
+def db(db_profesor):
+    db = db_profesor
+    db.add_all([Curso(id_curso=i, nombre_curso=f"{i}ro A", nivel="primaria", gestion="2025") for i in (1, 2)]
+               + [Materia(id_materia=i, nombre_materia=f"Materia {i}", nivel="primaria") for i in (1, 2)])
+    db.flush()
+    dias = ["viernes", "lunes", "martes", "miercoles", "jueves"]
+    db.add_all(
+        [ProfesorCursoMateria(id_profesor=1, id_curso=i, id_materia=i) for i in (1, 2)]
+        + [BloqueHorario(id_profesor=1, id_curso=1 + k % 2, id_materia=1 + k % 2, dia_semana=dias[k % 5],
+                         hora_inicio=time(8 + k // 5, 0), hora_fin=time(8 + k // 5, 30), gestion="2025")
+           for k in range(20)]
+        + [BloqueHorarioArchivo(id_bloque=900, id_profesor=1, id_curso=1, id_materia=1, dia_semana="lunes",
+                                hora_inicio=time(8, 0), hora_fin=time(10, 0), gestion="2024",
+                                fecha_registro=datetime(2024, 2, 1))]
+    )
+    db.commit()
+    return db
+
+def test_detalle_con_numero_fijo_de_consultas(db, consultas):
+    consultas.clear()
+    detalle = ProfesorService.obtener_detalle(db, 1)
+    assert len(consultas) == 3
+
+    assert detalle.profesor.nombre_cargo == "Docente"
+    assert {(a.nombre_curso, a.nombre_materia, a.nombre_profesor) for a in detalle.asignaciones} == {
+        ("1ro A", "Materia 1", "Ana Rojas"), ("2ro A", "Materia 2", "Ana Rojas")
+    }
+    assert len(detalle.bloques) == 20 and detalle.bloques[0].dia_semana == "lunes"
+    assert all(b.nombre_curso and b.nombre_materia and b.nombre_profesor == "Ana Rojas" for b in detalle.bloques)
+    assert (detalle.total_horas_semanales, detalle.horas_por_gestion) == (10.0, {"2025": 10.0})
+
+def test_detalle_con_archivados_no_suma_horas_archivadas(db, consultas):
+    consultas.clear()
+    detalle = ProfesorService.obtener_detalle(db, 1, include_archived=True)
+    assert len(consultas) == 4
+    archivados = [b for b in detalle.bloques if b.archivado]
+    assert [(b.id_bloque, b.nombre_curso) for b in archivados] == [(900, "1ro A")]
+    assert detalle.horas_por_gestion == {"2025": 10.0}
+
+    with pytest.raises(HTTPException) as error:
+        ProfesorService.obtener_detalle(db, 99)
+    assert error.value.status_code == 404
+
+def test_listados_de_pantalla_sin_una_consulta_por_profesor(db, consultas):
+    db.add_all([
+        Persona(id_persona=2, ci="1000002", nombres="Luis", apellido_paterno="Paz", tipo_persona="profesor", id_cargo=1),
+        Profesor(id_profesor=2, id_persona=2),
+    ])
+    db.flush()
+    db.add(BloqueHorario(id_profesor=2, id_curso=2, id_materia=2, dia_semana="lunes",
+                         hora_inicio=time(14, 0), hora_fin=time(15, 30), gestion="2025"))
+    db.commit()
+
+    consultas.clear()
+    listado = ProfesorService.listar_profesores_completo(db)
+    assert {p.id_profesor: p.total_horas_semanales for p in listado} == {1: 10.0, 2: 1.5}
+    assert len([c for c in consultas if "FROM bloques_horarios" in c]) == 1
+
+    consultas.clear()
+    asignaciones = AsignacionService.listar_asignaciones_con_nombres(db)
+    assert len(consultas) == 1
+    assert {(a.id_curso, a.nombre_profesor) for a in asignaciones} == {(1, "Ana Rojas"), (2, "Ana Rojas")}
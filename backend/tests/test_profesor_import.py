@@ -0,0 +1,99 @@
+import io
+import pytest
+from sqlalchemy.exc import OperationalError
+from app.modules.profesores.models.profesor_models import Persona
+from app.modules.profesores.repositories.profesor_repository import ProfesorRepository
+from app.modules.profesores.services import profesor_import_service
+from app.modules.profesores.services.profesor_import_service import ProfesorImportService
+
+ENCABEZADO = "ci;nombres;apellido_paterno;correo;id_cargo;estado_laboral;nivel_enseñanza"
+
+@pytest.fixture
+def db(db_profesor):
+    return db_profesor
+
+def _csv(*lineas):
+    return io.BytesIO("\n".join((ENCABEZADO,) + lineas).encode("utf-8"))
+
+def _errores(resultado):
+    return {e.fila: e.errores for e in resultado.errores}
+
+def test_importa_filas_validas_con_defaults(db):
+    resultado = ProfesorImportService.importar(db, _csv(
+        "2000001;Luis;Paz;luis@example.com;1;;",
+        "2000002;Eva;Mena;;;licencia;secondary",
+    ), "profesores.csv")
+
+    assert (resultado.total_filas, resultado.insertados, resultado.rechazados) == (2, 2, 0)
+    personas = {p.ci: p for p in db.query(Persona).filter(Persona.ci.like("2%"))}
+    assert (personas["2000001"].estado_laboral, personas["2000001"].profesor.nivel_enseñanza) == ("activo", "todos")
+    assert (personas["2000002"].estado_laboral, personas["2000002"].profesor.nivel_enseñanza) == ("licencia", "secondary")
+
+def test_errores_por_fila_incluyen_valores_fuera_del_enum(db):
+    resultado = ProfesorImportService.importar(db, _csv(
+        "2000001;Luis;Paz;;;jubilado;",
+        "2000002;Eva;Mena;;;;universidad",
+        "123;Sol;Vaca;no-es-correo;;;",
+        "2000004;Ivo;Rios;;9;;",
+        "2000005;Ada;Luna;;;;",
+    ), "profesores.csv")
+
+    assert (resultado.insertados, resultado.rechazados) == (1, 4)
+    errores = _errores(resultado)
+    assert sorted(errores) == [2, 3, 4, 5]
+    assert errores[2][0].startswith("estado_laboral:")
+    assert errores[3][0].startswith("nivel_enseñanza:")
+    assert {e.split(":")[0] for e in errores[4]} == {"ci", "correo"}
+    assert errores[5] == ["El cargo especificado no existe"]
+
+def test_rechaza_ci_y_correo_duplicados_en_bd_y_en_archivo(db):
+    resultado = ProfesorImportService.importar(db, _csv(
+        "1000001;Ana;Rojas;;;;",
+        "2000001;Luis;Paz;ana@example.com;;;",
+        "2000002;Eva;Mena;eva@example.com;;;",
+        "2000002;Eva;Mena;;;;",
+        "2000003;Ivo;Rios;eva@example.com;;;",
+    ), "profesores.csv")
+
+    assert resultado.insertados == 1
+    assert _errores(resultado) == {
+        2: ["Ya existe una persona con este CI"],
+        3: ["Ya existe una persona con este correo"],
+        5: ["CI repetido en el archivo"],
+        6: ["Correo repetido en el archivo"],
+    }
+
+def test_importa_xlsx(db):
+    from openpyxl import Workbook
+    libro = Workbook()
+    hoja = libro.active
+    hoja.append(ENCABEZADO.split(";"))
+    hoja.append([2000001, "Luis", "Paz", None, 1, None, "primary"])
+    hoja.append([None] * 7)
+    hoja.append([2000002, "Eva", "Mena", None, None, "retirado", None])
+    archivo = io.BytesIO()
+    libro.save(archivo)
+    archivo.seek(0)
+
+    resultado = ProfesorImportService.importar(db, archivo, "Profesores.XLSX")
+    assert (resultado.total_filas, resultado.insertados, resultado.errores) == (2, 2, [])
+    assert db.query(Persona).filter_by(ci="2000002").one().estado_laboral == "retirado"
+
+def test_error_de_bd_rechaza_solo_el_lote(db, monkeypatch):
+    monkeypatch.setattr(profesor_import_service, "TAMANO_LOTE", 1)
+    original, llamadas = ProfesorRepository.bulk_create, []
+
+    def bulk_create(db, filas):
+        llamadas.append(filas)
+        if len(llamadas) == 1:
+            raise OperationalError("INSERT", {}, Exception("conexión perdida"))
+        return original(db, filas)
+
+    monkeypatch.setattr(ProfesorRepository, "bulk_create", staticmethod(bulk_create))
+    resultado = ProfesorImportService.importar(db, _csv(
+        "2000001;Luis;Paz;;;;",
+        "2000002;Eva;Mena;;;;",
+    ), "profesores.csv")
+
+    assert (resultado.insertados, resultado.rechazados) == (1, 1)
+    assert _errores(resultado) == {2: ["Error de base de datos al insertar el lote"]}
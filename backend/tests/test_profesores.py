@@ -0,0 +1,90 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from app.modules.profesores.dto.profesor_dto import ProfesorCreateDTO, ProfesorUpdateDTO
+from app.modules.profesores.models.profesor_models import Cargo, Persona
+from app.modules.profesores.services.bootstrap_service import VERSION_CATALOGOS
+from app.modules.profesores.services.profesor_service import ProfesorService
+from app.modules.reportes.services.reporte_service import ReporteService
+from app.shared.services.data_version import DataVersion
+
+@pytest.fixture
+def db(db_profesor, monkeypatch):
+    monkeypatch.setattr(ReporteService, "programar_recalculo", staticmethod(lambda *args: None))
+    db_profesor.add(Cargo(id_cargo=2, nombre_cargo="Director"))
+    db_profesor.commit()
+    return db_profesor
+
+@pytest.fixture
+def escrituras(db):
+    """Flushes y commits de la sesión"""
+    conteo = {"flush": 0, "commit": 0}
+    event.listen(db, "after_flush", lambda *args: conteo.update(flush=conteo["flush"] + 1))
+    event.listen(db, "after_commit", lambda *args: conteo.update(commit=conteo["commit"] + 1))
+    return conteo
+
+def _nuevo(**campos):
+    return ProfesorCreateDTO(**{"ci": "2000001", "nombres": "Luis", "apellido_paterno": "Paz", "id_cargo": 1, **campos})
+
+def test_crear_profesor_un_commit_sin_refresh_ni_lazy_load(db, consultas, escrituras):
+    consultas.clear()
+    resultado = ProfesorService.crear_profesor(db, _nuevo())
+
+    # La versión de catálogos se incrementa en la misma transacción
+    assert escrituras == {"flush": 1, "commit": 1}
+    assert resultado.nombre_cargo == "Docente"
+    assert DataVersion.obtener(db, VERSION_CATALOGOS) == 1
+    # Sin refresh: ni la persona ni el profesor se vuelven a leer
+    assert not [c for c in consultas if c.startswith("SELECT") and "FROM personas" in c]
+    assert len([c for c in consultas if "FROM cargos" in c]) <= 1
+
+def test_actualizar_profesor_una_lectura_y_un_commit(db, consultas, escrituras):
+    consultas.clear()
+    resultado = ProfesorService.actualizar_profesor(db, 1, ProfesorUpdateDTO(telefono="777", especialidad="Física"))
+
+    assert escrituras == {"flush": 1, "commit": 1}
+    assert (resultado.telefono, resultado.especialidad, resultado.nombre_cargo) == ("777", "Física", "Docente")
+    # La lectura inicial trae persona y cargo con joinedload
+    assert len([c for c in consultas if c.startswith("SELECT") and "FROM profesores" in c]) == 1
+    assert not [c for c in consultas if "FROM cargos" in c]
+
+def test_actualizar_cargo_carga_el_cargo_nuevo_antes_del_commit(db, consultas, escrituras):
+    consultas.clear()
+    resultado = ProfesorService.actualizar_profesor(db, 1, ProfesorUpdateDTO(id_cargo=2))
+
+    assert escrituras == {"flush": 1, "commit": 1}
+    assert (resultado.id_cargo, resultado.nombre_cargo) == (2, "Director")
+    assert len([c for c in consultas if "FROM cargos" in c]) == 1
+
+@pytest.mark.parametrize("campos, detalle", [
+    ({"ci": "1000001"}, "Ya existe una persona con este CI"),
+    ({"correo": "ana@example.com"}, "Ya existe una persona con este correo"),
+])
+def test_crear_duplicado_se_traduce_a_400(db, campos, detalle):
+    with pytest.raises(HTTPException) as error:
+        ProfesorService.crear_profesor(db, _nuevo(**campos))
+    assert (error.value.status_code, error.value.detail) == (400, detalle)
+    assert db.query(Persona).count() == 1
+    # La versión de catálogos se revierte con la escritura
+    assert DataVersion.obtener(db, VERSION_CATALOGOS) == 0
+
+def test_actualizar_a_correo_duplicado_se_traduce_a_400(db):
+    ProfesorService.crear_profesor(db, _nuevo(correo="luis@example.com"))
+    with pytest.raises(HTTPException) as error:
+        ProfesorService.actualizar_profesor(db, 1, ProfesorUpdateDTO(correo="luis@example.com"))
+    assert (error.value.status_code, error.value.detail) == (400, "Ya existe una persona con este correo")
+    assert db.query(Persona).filter_by(id_persona=1).one().correo == "ana@example.com"
+
+@pytest.mark.parametrize("mensaje, codigo, detalle", [
+    ("(1062, \"Duplicate entry '1000001' for key 'personas.ci'\")", 400, "Ya existe una persona con este CI"),
+    ("(1062, \"Duplicate entry 'a@b.com' for key 'personas.correo'\")", 400, "Ya existe una persona con este correo"),
+    ("UNIQUE constraint failed: personas.ci", 400, "Ya existe una persona con este CI"),
+    ("UNIQUE constraint failed: personas.correo", 400, "Ya existe una persona con este correo"),
+    ("(1452, 'Cannot add or update a child row: a foreign key constraint fails')", 404, "El cargo especificado no existe"),
+    # "ci" dentro de otra palabra no es la columna CI
+    ("UNIQUE constraint failed: personas.ciudad", 400, "por defecto"),
+])
+def test_integrity_error_to_http(mensaje, codigo, detalle):
+    error = ProfesorService._integrity_error_to_http(IntegrityError("INSERT", {}, Exception(mensaje)), "por defecto")
+    assert (error.status_code, error.detail) == (codigo, detalle)
@@ -0,0 +1,84 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session, sessionmaker
+from app.config import database
+from app.config.database import EnrutadorReplicas, RoutingSession, get_db
+from app.modules.profesores.models.profesor_models import Materia
+
+@pytest.fixture
+def bases(crear_engine, monkeypatch):
+    primaria, replica = crear_engine("primaria.db"), crear_engine("replica.db")
+    # La réplica "atrasada" tiene otro contenido para saber de dónde se leyó
+    for engine, nombre in ((primaria, "Primaria"), (replica, "Réplica")):
+        with Session(engine) as s:
+            s.add(Materia(id_materia=1, nombre_materia=nombre, nivel="primaria"))
+            s.commit()
+    caida = crear_engine("no-existe/replica.db", tablas=False)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(class_=RoutingSession, autoflush=False, bind=primaria))
+    return primaria, replica, caida
+
+@pytest.fixture
+def cliente():
+    app = FastAPI()
+
+    @app.get("/materia")
+    def leer(db: Session = Depends(get_db)):
+        return db.get(Materia, 1).nombre_materia
+
+    @app.post("/materia")
+    def escribir(nombre: str, db: Session = Depends(get_db)):
+        db.get(Materia, 1).nombre_materia = nombre
+        db.commit()
+        return nombre
+
+    return TestClient(app)
+
+def _usar(monkeypatch, primaria, replicas, sticky=60):
+    enrutador = EnrutadorReplicas(primaria, replicas, sticky_segundos=sticky, reintento_segundos=60)
+    monkeypatch.setattr(database, "enrutador", enrutador)
+    return enrutador
+
+def test_lecturas_a_replica_y_escrituras_a_primaria_con_sticky(bases, cliente, monkeypatch):
+    primaria, replica, _ = bases
+    enrutador = _usar(monkeypatch, primaria, [replica])
+
+    assert cliente.get("/materia").json() == "Réplica"
+    assert cliente.post("/materia", params={"nombre": "Física"}).json() == "Física"
+    with Session(replica) as s:
+        assert s.get(Materia, 1).nombre_materia == "Réplica"
+
+    # El cliente que escribió lee de la primaria mientras dura la ventana
+    assert cliente.get("/materia").json() == "Física"
+    enrutador.sticky_segundos = 0
+    enrutador._escrituras.clear()
+    assert cliente.get("/materia").json() == "Réplica"
+    estadisticas = enrutador.estadisticas()
+    assert (estadisticas["replica"], estadisticas["sticky"]) == (2, 1)
+
+def test_sesion_de_lectura_que_escribe_pasa_a_primaria(bases, monkeypatch):
+    primaria, replica, _ = bases
+    _usar(monkeypatch, primaria, [replica])
+    db = database.SessionLocal(info={"lectura": True})
+    assert db.get(Materia, 1).nombre_materia == "Réplica"
+    db.add(Materia(id_materia=2, nombre_materia="Química", nivel="primaria"))
+    db.commit()
+    assert db.get_bind() is primaria and db.get(Materia, 1).nombre_materia == "Primaria"
+    db.close()
+    with Session(primaria) as s:
+        assert s.get(Materia, 2) is not None
+
+def test_replica_caida_cae_a_primaria(bases, cliente, monkeypatch):
+    primaria, _, caida = bases
+    enrutador = _usar(monkeypatch, primaria, [caida])
+
+    assert cliente.get("/materia").json() == "Primaria"
+    assert cliente.get("/materia").json() == "Primaria"
+    # Solo el primer intento toca la réplica; después queda fuera de la rotación
+    estadisticas = enrutador.estadisticas()
+    assert (estadisticas["fallos_replica"], estadisticas["replicas_caidas"], estadisticas["primaria"]) == (1, 1, 2)
+
+def test_sin_replicas_todo_va_a_la_primaria(bases, cliente, monkeypatch):
+    primaria, _, _ = bases
+    _usar(monkeypatch, primaria, [])
+    assert cliente.get("/materia").json() == "Primaria"
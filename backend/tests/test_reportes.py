@@ -0,0 +1,73 @@
+from datetime import time
+import pytest
+from fastapi import HTTPException
+from app.modules.profesores.models.profesor_models import (
+    Persona, Profesor, Materia, Curso, ProfesorCursoMateria, BloqueHorario, GestionArchivada
+)
+from app.modules.reportes.services.reporte_service import ReporteService
+
+@pytest.fixture
+def db(db_profesor):
+    db = db_profesor
+    db.add_all([
+        Persona(id_persona=2, ci="1000002", nombres="Luis", apellido_paterno="Paz", tipo_persona="profesor"),
+        Profesor(id_profesor=2, id_persona=2),
+        Materia(id_materia=1, nombre_materia="Matemática", nivel="primaria"),
+        Materia(id_materia=2, nombre_materia="Física", nivel="secundaria"),
+        Curso(id_curso=1, nombre_curso="1ro A", nivel="primaria", gestion="2025"),
+        Curso(id_curso=2, nombre_curso="5to A", nivel="secundaria", gestion="2025"),
+        Curso(id_curso=3, nombre_curso="1ro A", nivel="primaria", gestion="2024"),
+    ])
+    db.flush()
+    db.add_all([
+        ProfesorCursoMateria(id_profesor=1, id_curso=1, id_materia=1),
+        ProfesorCursoMateria(id_profesor=2, id_curso=1, id_materia=1),
+        ProfesorCursoMateria(id_profesor=2, id_curso=2, id_materia=2),
+        ProfesorCursoMateria(id_profesor=1, id_curso=3, id_materia=1),
+        BloqueHorario(id_profesor=1, id_curso=1, id_materia=1, dia_semana="lunes",
+                      hora_inicio=time(8, 0), hora_fin=time(9, 30), gestion="2025"),
+        BloqueHorario(id_profesor=2, id_curso=1, id_materia=1, dia_semana="lunes",
+                      hora_inicio=time(10, 0), hora_fin=time(11, 0), gestion="2025"),
+        BloqueHorario(id_profesor=2, id_curso=2, id_materia=2, dia_semana="martes",
+                      hora_inicio=time(8, 0), hora_fin=time(10, 0), gestion="2025"),
+        BloqueHorario(id_profesor=1, id_curso=3, id_materia=1, dia_semana="lunes",
+                      hora_inicio=time(8, 0), hora_fin=time(9, 0), gestion="2024"),
+    ])
+    db.commit()
+    return db
+
+def test_rollups_por_gestion(db):
+    resultado = ReporteService.recalcular(db)
+    assert (resultado.horas_nivel, resultado.materias, resultado.cargos) == (3, 3, 3)
+
+    niveles = {(r.nivel, r.total_bloques, r.total_profesores, r.total_horas)
+               for r in ReporteService.horas_por_nivel(db, "2025")}
+    assert niveles == {("primaria", 2, 2, 2.5), ("secundaria", 1, 1, 2.0)}
+
+    materias = {(r.nombre_materia, r.total_profesores, r.total_cursos, r.total_horas)
+                for r in ReporteService.profesores_por_materia(db, "2025")}
+    assert materias == {("Matemática", 2, 1, 2.5), ("Física", 1, 1, 2.0)}
+
+    cargos = {(r.nombre_cargo, r.total_profesores, r.total_horas, r.promedio_horas)
+              for r in ReporteService.carga_por_cargo(db, "2025")}
+    assert cargos == {("Docente", 1, 1.5, 1.5), ("Sin cargo", 1, 3.0, 3.0)}
+
+def test_gestion_archivada_conserva_rollup(db):
+    ReporteService.recalcular(db)
+    # Archivar: los bloques salen de la tabla caliente pero el reporte se conserva
+    db.query(BloqueHorario).filter(BloqueHorario.gestion == "2024").delete()
+    db.add(GestionArchivada(gestion="2024", total_bloques=1))
+    db.commit()
+
+    ReporteService.recalcular(db)
+    assert [r.total_horas for r in ReporteService.horas_por_nivel(db, "2024")] == [1.0]
+    with pytest.raises(HTTPException):
+        ReporteService.recalcular(db, "2024")
+
+    # Recalcular una sola gestión no toca las demás
+    db.query(BloqueHorario).filter(BloqueHorario.id_profesor == 2).delete()
+    db.commit()
+    ReporteService.recalcular(db, "2025")
+    assert [(r.nivel, r.total_horas) for r in ReporteService.horas_por_nivel(db, None)] == [
+        ("primaria", 1.0), ("primaria", 1.5)
+    ]
@@ -0,0 +1,104 @@
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.core.middleware import ProfilingMiddleware
+from app.shared.decorators.auth_decorators import create_access_token
+from app.shared.services.query_monitor import QueryMonitor
+from app.shared.services.request_profiler import RequestProfiler, instrumentar_endpoints
+import app.core.middleware as middleware
+
+def _trabajo_python():
+    return sum(i * i for i in range(300_000))
+
+@pytest.fixture
+def entorno(tmp_path, engine, monkeypatch):
+    perfilador = RequestProfiler(activo=False, directorio=str(tmp_path / "perfiles"))
+    monkeypatch.setattr(middleware, "request_profiler", perfilador)
+    QueryMonitor(umbral_ms=10_000).instalar(engine)
+
+    app = FastAPI()
+
+    @app.get("/api/profesores/")
+    def listar():
+        with engine.connect() as conexion:
+            for _ in range(3):
+                conexion.execute(text("SELECT 1"))
+            conexion.execute(text("SELECT 2"))
+        _trabajo_python()
+        return [{"id": i, "nombre": f"Profesor {i}"} for i in range(2000)]
+
+    @app.get("/api/retiros/hoy")
+    async def hoy():
+        _trabajo_python()
+        return {"ok": True}
+
+    instrumentar_endpoints(app.router.routes)
+    app.add_middleware(ProfilingMiddleware)
+    return perfilador, TestClient(app)
+
+def test_desglose_de_sql_por_sentencia_y_serializacion(entorno):
+    perfilador, cliente = entorno
+    perfilador.configurar(True)
+
+    respuesta = cliente.get("/api/profesores/")
+    # El muestreo configurado no expone el desglose al cliente
+    assert "server-timing" not in respuesta.headers and "x-perfil" not in respuesta.headers
+
+    muestra = perfilador.muestras()[0]
+    assert muestra["perfilador"] == "tiempos" and muestra["flamegraph"] is None
+    assert muestra["consultas"] == 4
+    assert [(c["sql"], c["veces"]) for c in muestra["detalle_sql"]] in (
+        [("SELECT 1", 3), ("SELECT 2", 1)], [("SELECT 2", 1), ("SELECT 1", 3)]
+    )
+    assert muestra["endpoint_ms"] >= muestra["python_ms"] > 0
+    assert muestra["serializacion_ms"] > 0
+
+@pytest.mark.parametrize("modo", ["muestreo", "determinista"])
+def test_guarda_flamegraph_con_pilas_del_endpoint(entorno, modo):
+    perfilador, cliente = entorno
+    perfilador.configurar(True, perfilador=modo)
+
+    assert "x-perfil" not in cliente.get("/api/profesores/").headers
+    nombre = perfilador.muestras()[0]["flamegraph"]
+    assert [f["nombre"] for f in perfilador.flamegraphs()] == [nombre]
+
+    with open(perfilador.ruta_flamegraph(nombre)) as f:
+        lineas = f.read().splitlines()
+    assert lineas and all(l.startswith("GET /api/profesores/;") and l.rsplit(" ", 1)[1].isdigit() for l in lineas)
+    assert any("_trabajo_python" in l for l in lineas)
+    if modo == "muestreo":
+        # Las pilas del event loop compartido van aparte de las del hilo del endpoint
+        assert all("[event loop]" not in l for l in lineas if "_trabajo_python" in l)
+    # Solo nombres válidos dentro del directorio
+    assert perfilador.ruta_flamegraph("../test.db") is None
+
+def test_header_de_admin_perfila_sin_activar_y_conserva_max_archivos(entorno):
+    perfilador, cliente = entorno
+    perfilador.max_archivos = 2
+    admin = create_access_token({"sub": "1", "rol": "admin"})
+    profesor = create_access_token({"sub": "2", "rol": "profesor"})
+
+    respuesta = cliente.get("/api/retiros/hoy", headers={"X-Perfilar": "determinista", "Authorization": f"Bearer {profesor}"})
+    assert "server-timing" not in respuesta.headers
+
+    for _ in range(3):
+        respuesta = cliente.get("/api/retiros/hoy", headers={"X-Perfilar": "determinista", "Authorization": f"Bearer {admin}"})
+        assert "x-perfil" in respuesta.headers and respuesta.headers["server-timing"].startswith("app;dur=")
+        time.sleep(0.002)
+    assert len(perfilador.flamegraphs()) == 2
+    assert perfilador.flamegraphs()[0]["nombre"] == respuesta.headers["x-perfil"]
+    assert perfilador.estadisticas()["medidas"] == 3
+
+def test_muestreo_marca_las_pilas_del_event_loop(entorno):
+    perfilador, cliente = entorno
+    admin = create_access_token({"sub": "1", "rol": "admin"})
+    respuesta = cliente.get("/api/retiros/hoy", headers={"X-Perfilar": "muestreo", "Authorization": f"Bearer {admin}"})
+    timing = respuesta.headers["server-timing"]
+    assert 'sql;dur=' in timing and 'desc="0 consultas"' in timing
+
+    with open(perfilador.ruta_flamegraph(respuesta.headers["x-perfil"])) as f:
+        lineas = f.read().splitlines()
+    # El endpoint async corre en el event loop: sus pilas quedan marcadas como compartidas
+    assert lineas and all(l.startswith("GET /api/retiros/hoy;[event loop];") for l in lineas)
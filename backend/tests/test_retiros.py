@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from app.modules.retiros_tempranos.dto.retiro_dto import RetiroCreateDTO
+from app.modules.retiros_tempranos.models.retiro_models import AutorizacionRetiro, RegistroRetiro
+from app.modules.retiros_tempranos.services import retiro_service
+from app.modules.retiros_tempranos.services.retiro_index import RetiroIndex
+from app.modules.retiros_tempranos.services.retiro_service import RetiroService
+
+def _autorizacion(id_estudiante, ci_apoderado, **extra):
+    return AutorizacionRetiro(
+        id_estudiante=id_estudiante, ci_estudiante=f"E{id_estudiante}", nombre_estudiante=f"Estudiante {id_estudiante}",
+        ci_apoderado=ci_apoderado, nombre_apoderado=f"Apoderado {ci_apoderado}",
+        estado=extra.get("estado", "activo"), fecha_actualizacion=extra.get("fecha", datetime.utcnow())
+    )
+
+def test_refresco_incremental(session_factory):
+    db = session_factory()
+    db.add_all([_autorizacion(1, "111"), _autorizacion(2, "111"), _autorizacion(3, "222")])
+    db.commit()
+
+    indice = RetiroIndex(session_factory=session_factory, intervalo=0)
+    assert sorted(a["id_estudiante"] for a in indice.por_apoderado("111")) == [1, 2]
+    assert [a["ci_apoderado"] for a in indice.por_estudiante_ci("E3")] == ["222"]
+
+    # Cambios hechos por otro proceso: revocar una autorización y agregar otra
+    revocada = db.query(AutorizacionRetiro).filter_by(id_estudiante=2).one()
+    revocada.estado = "inactivo"
+    revocada.fecha_actualizacion = datetime.utcnow() + timedelta(seconds=1)
+    db.add(_autorizacion(4, "222"))
+    # Retiro registrado por otro proceso
+    db.add(RegistroRetiro(codigo="otro", id_estudiante=3, id_autorizacion=3, ci_apoderado="222",
+                          fecha=datetime.now().date(), fecha_hora_salida=datetime.now()))
+    db.commit()
+    db.close()
+
+    assert indice.autorizacion("111", 2) is None
+    assert indice.autorizacion("222", 4)["nombre_estudiante"] == "Estudiante 4"
+    assert [r["codigo"] for r in indice.retirados_hoy()] == ["otro"]
+
+def test_retiro_duplicado(session_factory):
+    indice = RetiroIndex(session_factory=session_factory, intervalo=60)
+    retiro = {"codigo": "a", "id_estudiante": 1, "fecha_hora_salida": datetime.now()}
+    assert indice.marcar_retirado(retiro) is None
+    assert indice.marcar_retirado({**retiro, "codigo": "b"})["codigo"] == "a"
+    assert indice.retiro_de_hoy(1)["codigo"] == "a"
+    assert len(indice.retirados_hoy()) == 1
+
+@pytest.fixture
+def porterias(session_factory, monkeypatch):
+    """Dos workers: cada uno con su índice en memoria y la misma BD"""
+    db = session_factory()
+    db.add_all([_autorizacion(1, "11111"), _autorizacion(1, "22222")])
+    db.commit()
+    db.close()
+    indices = [RetiroIndex(session_factory=session_factory, intervalo=60) for _ in range(2)]
+    for indice in indices:
+        indice.asegurar_actualizado()
+
+    def registrar(worker, ci_apoderado):
+        monkeypatch.setattr(retiro_service, "retiro_index", indices[worker])
+        db = session_factory()
+        try:
+            return RetiroService.registrar_retiro(db, RetiroCreateDTO(ci_apoderado=ci_apoderado, id_estudiante=1))
+        finally:
+            db.close()
+    registrar.indices = indices
+    return registrar
+
+def test_salida_queda_en_bd_antes_de_responder(porterias, session_factory):
+    retiro = porterias(0, "11111")
+    db = session_factory()
+    assert [r.codigo for r in db.query(RegistroRetiro)] == [retiro.codigo]
+    db.close()
+    assert porterias.indices[0].retiro_de_hoy(1)["codigo"] == retiro.codigo
+
+    # Segunda salida en el mismo worker: la rechaza el índice sin ir a la BD
+    with pytest.raises(HTTPException) as error:
+        porterias(0, "22222")
+    assert error.value.status_code == 409
+
+def test_dos_workers_no_registran_dos_salidas_el_mismo_dia(porterias, session_factory):
+    """El índice del segundo worker no vio la primera salida: la rechaza el índice único de la BD"""
+    primera = porterias(0, "11111")
+    assert porterias.indices[1].retiro_de_hoy(1) is None
+
+    with pytest.raises(HTTPException) as error:
+        porterias(1, "22222")
+    assert error.value.status_code == 409
+    assert "Apoderado 11111" in error.value.detail
+
+    db = session_factory()
+    assert db.query(RegistroRetiro).count() == 1
+    db.close()
+    # El segundo worker adopta la salida que quedó en la BD
+    assert porterias.indices[1].retiro_de_hoy(1)["codigo"] == primera.codigo
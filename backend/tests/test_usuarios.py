@@ -0,0 +1,77 @@
+import asyncio
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from app.config.config import ProductionConfig
+from app.config.database import get_db
+from app.modules.usuarios.dto.usuario_dto import UsuarioCreateDTO, LoginDTO
+from app.modules.usuarios.models.usuario_models import Usuario
+from app.modules.usuarios.services import usuario_service
+from app.modules.usuarios.services.password_hasher import PasswordHasher, calibrar_costo, costo_de
+from app.modules.usuarios.services.usuario_service import AuthService, UsuarioService
+from app.modules.usuarios.controllers.usuario_controller import router
+from app.shared.decorators.auth_decorators import create_access_token, verify_token
+
+@pytest.fixture
+def db(db, monkeypatch):
+    monkeypatch.setattr(usuario_service, "password_hasher", PasswordHasher(workers=2, costo=4))
+    return db
+
+def test_login_emite_token_y_sube_costo(db):
+    asyncio.run(UsuarioService.crear_usuario(db, UsuarioCreateDTO(username="ana", password="secreto123", rol="admin")))
+    usuario = db.query(Usuario).one()
+    assert costo_de(usuario.password_hash) == 4
+
+    # El costo calibrado sube: el hash existente se regenera al iniciar sesión
+    usuario_service.password_hasher._costo = 5
+    token = asyncio.run(AuthService.login(db, LoginDTO(username="ana", password="secreto123")))
+
+    assert verify_token(token.access_token)["rol"] == "admin"
+    assert token.usuario.ultimo_acceso is not None
+    assert costo_de(db.query(Usuario).one().password_hash) == 5
+
+    for username, password in (("ana", "incorrecta"), ("nadie", "secreto123")):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(AuthService.login(db, LoginDTO(username=username, password=password)))
+        assert error.value.status_code == 401
+
+def test_hasher_rechaza_con_503_si_la_cola_esta_llena():
+    hasher = PasswordHasher(workers=1, max_cola=1, timeout=0.01, costo=10)
+
+    async def escenario():
+        return await asyncio.gather(*(hasher.hash("clave") for _ in range(3)), return_exceptions=True)
+
+    resultados = asyncio.run(escenario())
+    rechazos = [r for r in resultados if isinstance(r, HTTPException)]
+    assert rechazos and all(r.status_code == 503 and "Retry-After" in r.headers for r in rechazos)
+    assert hasher.estadisticas()["rechazados"] == len(rechazos)
+    hasher.cerrar()
+
+def test_calibracion_respeta_limites():
+    assert calibrar_costo(objetivo_ms=0, minimo=4, maximo=6) == 4
+    assert calibrar_costo(objetivo_ms=10_000, minimo=4, maximo=6) == 6
+    assert costo_de("no-es-bcrypt") is None
+
+def test_alta_de_usuarios_requiere_token_de_admin(db):
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_db] = lambda: db
+    cliente = TestClient(app)
+    nuevo = {"username": "intruso", "password": "secreto123", "rol": "admin"}
+    bearer = lambda rol: {"Authorization": f"Bearer {create_access_token({'sub': '1', 'rol': rol})}"}
+
+    assert cliente.post("/api/usuarios/", json=nuevo).status_code == 401
+    assert cliente.post("/api/usuarios/", json=nuevo, headers=bearer("profesor")).status_code == 403
+    assert cliente.get("/api/usuarios/", headers=bearer("profesor")).status_code == 403
+    assert db.query(Usuario).count() == 0
+
+    assert cliente.post("/api/usuarios/", json=nuevo, headers=bearer("admin")).status_code == 201
+    assert [u["username"] for u in cliente.get("/api/usuarios/", headers=bearer("admin")).json()] == ["intruso"]
+
+def test_produccion_no_arranca_con_el_secreto_jwt_de_ejemplo(monkeypatch):
+    for secreto in ("jwt-secret-key", "tu-jwt-secret-key"):
+        monkeypatch.setattr(ProductionConfig, "JWT_SECRET_KEY", secreto)
+        with pytest.raises(RuntimeError):
+            ProductionConfig.validar()
+    monkeypatch.setattr(ProductionConfig, "JWT_SECRET_KEY", "un-secreto-largo-y-propio")
+    ProductionConfig.validar()